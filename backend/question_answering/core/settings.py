@@ -154,6 +154,10 @@ PINECONE_INDEX_NAME = 'pakistan-legal-qa'
 # OpenAI settings
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY_a')
 
+# Async QA endpoints: worker threads for engine calls and the in-flight cap
+QA_ASYNC_MAX_WORKERS = int(os.getenv('QA_ASYNC_MAX_WORKERS', '4'))
+QA_ASYNC_MAX_PENDING = int(os.getenv('QA_ASYNC_MAX_PENDING', '32'))
+
 # Model cache directory
 MODEL_CACHE_DIR = BASE_DIR / 'model_cache'
 
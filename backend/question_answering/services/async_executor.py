@@ -0,0 +1,142 @@
+"""
+Async Executor
+Bounded thread pool used by the async QA views to run blocking engine work
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor already has ``max_pending`` jobs in flight"""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a cap on queued work.
+
+    Retrieval, embedding and LLM calls run on worker threads so the event
+    loop keeps serving other requests; beyond ``max_pending`` jobs new work
+    is rejected with ``ExecutorSaturated``.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, thread_name_prefix: str = 'qa-worker'):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` on a worker thread and await its result"""
+        self._admit()
+        try:
+            return await self._submit(func, args, kwargs)
+        finally:
+            self._release()
+
+    def stream(self, iterator: Iterator) -> 'ExecutorStream':
+        """
+        Async iterator over a blocking ``iterator``, advanced on worker threads.
+
+        The stream is admitted once and holds its slot until it is exhausted
+        or closed, however many items it yields.
+        """
+        self._admit()
+        return ExecutorStream(self, iterator)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+        return {'pending': pending, 'max_workers': self.max_workers, 'max_pending': self.max_pending}
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorSaturated(f"{self._pending} jobs already in flight")
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def _submit(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, self._call, func, args, kwargs)
+        )
+
+    @staticmethod
+    def _call(func: Callable, args: tuple, kwargs: dict) -> Any:
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+class ExecutorStream:
+    """
+    Async iterator returned by ``BoundedExecutor.stream``.
+
+    ``close`` gives the executor slot back; it runs when the iterator is
+    exhausted and is picked up by ``StreamingHttpResponse`` as a resource
+    closer, so an abandoned stream is released too.
+    """
+
+    _done = object()
+
+    def __init__(self, executor: BoundedExecutor, iterator: Iterator):
+        self._executor = executor
+        self._iterator = iterator
+        self._closed = False
+
+    def __aiter__(self) -> 'ExecutorStream':
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._closed:
+            raise StopAsyncIteration
+        try:
+            item = await self._executor._submit(next, (self._iterator, self._done), {})
+        except BaseException:
+            self.close()
+            raise
+        if item is self._done:
+            self.close()
+            raise StopAsyncIteration
+        return item
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._executor._release()
+
+
+_qa_executor: Optional[BoundedExecutor] = None
+_qa_executor_lock = threading.Lock()
+
+
+def get_qa_executor() -> BoundedExecutor:
+    """Return the process-wide executor for async QA views"""
+    global _qa_executor
+
+    if _qa_executor is None:
+        with _qa_executor_lock:
+            if _qa_executor is None:
+                _qa_executor = BoundedExecutor(
+                    max_workers=getattr(settings, 'QA_ASYNC_MAX_WORKERS', 4),
+                    max_pending=getattr(settings, 'QA_ASYNC_MAX_PENDING', 32),
+                )
+    return _qa_executor
@@ -3,11 +3,15 @@ Simple QA System URLs
 """
 
 from django.urls import path
-from simple_views import SimpleQAView, SimpleQAAPIView, SimpleDataView, SystemStatusView, ConversationSessionView, ConversationHistoryView, RAGTestView
+from simple_views import SimpleQAView, SimpleQAAPIView, AsyncQAAPIView, AsyncQAStreamView, SimpleDataView, SystemStatusView, ConversationSessionView, ConversationHistoryView, RAGTestView
 
 urlpatterns = [
     path('', SimpleQAView.as_view(), name='qa_interface'),
     path('ask/', SimpleQAAPIView.as_view(), name='qa_ask'),
+    
+    # Async (ASGI) endpoints; engine work runs on a bounded executor
+    path('ask/async/', AsyncQAAPIView.as_view(), name='qa_ask_async'),
+    path('ask/stream/', AsyncQAStreamView.as_view(), name='qa_ask_stream'),
     path('data/', SimpleDataView.as_view(), name='qa_data'),
     path('status/', SystemStatusView.as_view(), name='qa_status'),
     
@@ -2,16 +2,18 @@
 Simple QA System Views - Basic functionality without complex models
 """
 
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
+import threading
 import time
 from sample_data import search_sample_data, get_sample_data
 from services.enhanced_qa_engine import EnhancedQAEngine
 from services.conversation_manager import ConversationManager
+from services.async_executor import ExecutorSaturated, get_qa_executor
 
 class SimpleQAView(View):
     """Simple QA interface view"""
@@ -77,6 +79,110 @@ class SimpleQAAPIView(View):
                 'error': str(e)
             }, status=400)
 
+# Shared engine for the async views; built once on a worker thread
+_async_qa_engine = None
+_async_qa_engine_lock = threading.Lock()
+
+
+def _get_async_qa_engine():
+    global _async_qa_engine
+    with _async_qa_engine_lock:
+        if _async_qa_engine is None:
+            _async_qa_engine = EnhancedQAEngine()
+    return _async_qa_engine
+
+
+def _busy_response():
+    response = JsonResponse({
+        'answer': 'The QA service is busy. Please try again shortly.',
+        'answer_type': 'error',
+        'status': 'error',
+        'error': 'executor_saturated'
+    }, status=503)
+    response['Retry-After'] = '2'
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncQAAPIView(View):
+    """Async QA API endpoint; engine calls run on the bounded QA executor"""
+    
+    async def post(self, request):
+        """Handle QA requests without blocking the event loop"""
+        data = {}
+        try:
+            data = json.loads(request.body)
+            executor = get_qa_executor()
+            engine = await executor.run(_get_async_qa_engine)
+            
+            result = await executor.run(
+                engine.ask_question,
+                question=data.get('question', ''),
+                conversation_history=None,
+                use_ai=data.get('use_ai', True),
+                use_advanced_rag=data.get('use_advanced_rag', True),
+                session_id=data.get('session_id'),
+                user_id=data.get('user_id', 'anonymous')
+            )
+            result['response_id'] = f"resp_{int(time.time())}"
+            return JsonResponse(result)
+            
+        except ExecutorSaturated:
+            return _busy_response()
+        except Exception as e:
+            print(f"Error in async QA API: {str(e)}")
+            return JsonResponse({
+                'question': data.get('question', ''),
+                'answer': f"I apologize, but I encountered an error while processing your question: {str(e)}. Please try again.",
+                'answer_type': 'error',
+                'confidence': 0.0,
+                'sources': [],
+                'response_id': f"resp_{int(time.time())}",
+                'status': 'error',
+                'error': str(e)
+            }, status=400)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncQAStreamView(View):
+    """Server-sent events QA endpoint; each answer chunk is produced on the QA executor"""
+    
+    async def post(self, request):
+        """Stream the answer to a question as ``data: {...}`` events"""
+        try:
+            data = json.loads(request.body)
+            executor = get_qa_executor()
+            engine = await executor.run(_get_async_qa_engine)
+            chunks = await executor.run(
+                engine.ask_question_streaming,
+                question=data.get('question', ''),
+                user_id=data.get('user_id', 'anonymous'),
+                session_id=data.get('session_id'),
+                filters=data.get('filters')
+            )
+            # One executor slot for the whole stream, not one per chunk
+            events = executor.stream(self._events(chunks))
+        except ExecutorSaturated:
+            return _busy_response()
+        except Exception as e:
+            print(f"Error in async QA stream: {str(e)}")
+            return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
+        
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    def _events(self, chunks):
+        # Blocking generator; the executor stream advances it off the event loop
+        try:
+            for chunk in chunks:
+                yield f"data: {json.dumps(chunk, default=str)}\n\n"
+        except Exception as e:
+            print(f"Error in async QA stream: {str(e)}")
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+
 class SimpleDataView(View):
     """View to show available sample data"""
     
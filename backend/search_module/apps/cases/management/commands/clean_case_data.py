@@ -165,6 +165,7 @@ class Command(BaseCommand):
             self.stdout.write(f'Comments cleaned: {stats["comments_cleaned"]}')
             self.stdout.write(f'Case details cleaned: {stats["case_details_cleaned"]}')
             self.stdout.write(f'Parties cleaned: {stats["parties_cleaned"]}')
+            self.stdout.write(f'Case dates normalized: {stats["case_dates_normalized"]}')
             
             total_cleaned = (
                 stats["cases_cleaned"] + 
@@ -335,6 +335,7 @@ class CompletePipelineCommand(BaseCommand):
         self.stdout.write(f'Cleaned {stats["comments_cleaned"]} comments')
         self.stdout.write(f'Cleaned {stats["case_details_cleaned"]} case details')
         self.stdout.write(f'Cleaned {stats["parties_cleaned"]} parties')
+        self.stdout.write(f'Normalized dates of {stats["case_dates_normalized"]} cases')
         
         if stats['errors']:
             for error in stats['errors']:
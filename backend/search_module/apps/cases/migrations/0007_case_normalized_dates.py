@@ -0,0 +1,82 @@
+import re
+from datetime import date, datetime
+
+from django.db import migrations, models
+
+# Frozen copy of apps.cases.services.data_cleaner's parser, so this backfill
+# keeps its behaviour however the live parser changes later.
+# Day-first dates as scraped (19-06-2025, 19/06/2025) and ISO dates
+DATE_PATTERNS = (
+    (re.compile(r"\b(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4})\b"), ("day", "month", "year")),
+    (re.compile(r"\b(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})\b"), ("year", "month", "day")),
+)
+
+
+def parse_case_date(value):
+    """First valid date in a scraped date string, None when there is none"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    value = str(value)
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(value):
+            parts = dict(zip(order, (int(group) for group in match.groups())))
+            try:
+                return date(parts["year"], parts["month"], parts["day"])
+            except ValueError:
+                continue
+    return None
+
+
+def backfill_case_dates(apps, schema_editor):
+    """Parse the scraped date strings of existing cases into the new columns"""
+    Case = apps.get_model("cases", "Case")
+    fields = ["institution_date_normalized", "hearing_date_normalized", "institution_year"]
+
+    changed = []
+    cases = Case.objects.only("id", "institution_date", "hearing_date").order_by("id")
+    for case in cases.iterator(chunk_size=2000):
+        case.institution_date_normalized = parse_case_date(case.institution_date)
+        case.hearing_date_normalized = parse_case_date(case.hearing_date)
+        if case.institution_date_normalized is None and case.hearing_date_normalized is None:
+            continue
+        case.institution_year = (
+            case.institution_date_normalized.year if case.institution_date_normalized else None
+        )
+        changed.append(case)
+        if len(changed) >= 2000:
+            Case.objects.bulk_update(changed, fields)
+            changed = []
+
+    if changed:
+        Case.objects.bulk_update(changed, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cases", "0006_casesearchprofile_add_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="case",
+            name="institution_date_normalized",
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="case",
+            name="hearing_date_normalized",
+            field=models.DateField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="case",
+            name="institution_year",
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_case_dates, migrations.RunPython.noop),
+    ]
@@ -30,6 +30,10 @@ class Case(models.Model):
     bench = models.CharField(max_length=400, blank=True, null=True)  # BENCH
     hearing_date = models.CharField(max_length=300, blank=True, null=True)  # HEARING_DATE
     status = models.CharField(max_length=50, db_index=True, blank=True, null=True)  # STATUS
+    # Parsed from the date strings by the data cleaner
+    institution_date_normalized = models.DateField(blank=True, null=True, db_index=True)
+    hearing_date_normalized = models.DateField(blank=True, null=True, db_index=True)
+    institution_year = models.PositiveSmallIntegerField(blank=True, null=True, db_index=True)
     # REMOVED: history_options (redundant UI text)
     # REMOVED: details (empty, redundant)
 
@@ -5,7 +5,8 @@ Handles cleaning and normalization of scraped case data to improve quality.
 
 import re
 import unicodedata
-from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
 from django.db import transaction
 from django.utils import timezone
 import logging
@@ -14,6 +15,32 @@ from ..models import Case, OrdersData, CommentsData, CaseDetail, PartiesDetailDa
 
 logger = logging.getLogger(__name__)
 
+# Day-first dates as scraped (19-06-2025, 19/06/2025) and ISO dates
+DATE_PATTERNS = (
+    (re.compile(r'\b(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4})\b'), ('day', 'month', 'year')),
+    (re.compile(r'\b(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})\b'), ('year', 'month', 'day')),
+)
+
+
+def parse_case_date(value: Any) -> Optional[date]:
+    """First valid date in a scraped date string, None when there is none"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+
+    value = str(value)
+    for pattern, order in DATE_PATTERNS:
+        for match in pattern.finditer(value):
+            parts = dict(zip(order, (int(group) for group in match.groups())))
+            try:
+                return date(parts['year'], parts['month'], parts['day'])
+            except ValueError:
+                continue
+    return None
+
 
 class DataCleaner:
     """Comprehensive data cleaning service for case data"""
@@ -92,6 +119,7 @@ class DataCleaner:
             'comments_cleaned': 0,
             'case_details_cleaned': 0,
             'parties_cleaned': 0,
+            'case_dates_normalized': 0,
             'errors': []
         }
         
@@ -100,6 +128,9 @@ class DataCleaner:
                 # Clean cases
                 stats['cases_cleaned'] = self._clean_cases(force)
                 
+                # Materialize parsed date columns
+                stats['case_dates_normalized'] = self._normalize_case_dates(force)
+                
                 # Clean orders data
                 stats['orders_cleaned'] = self._clean_orders_data(force)
                 
@@ -154,6 +185,44 @@ class DataCleaner:
         
         return cleaned_count
 
+    def _normalize_case_dates(self, force: bool = False, batch_size: int = 2000) -> int:
+        """Fill the parsed institution/hearing date and year columns of cases"""
+        normalized_count = 0
+        fields = ['institution_date_normalized', 'hearing_date_normalized', 'institution_year']
+        cases = Case.objects.only('id', 'institution_date', 'hearing_date', *fields).order_by('id')
+        # updated_at lets incremental consumers (facet engine) pick the change up
+        fields.append('updated_at')
+        
+        changed = []
+        for case in cases.iterator(chunk_size=batch_size):
+            institution_date = parse_case_date(case.institution_date)
+            hearing_date = parse_case_date(case.hearing_date)
+            institution_year = institution_date.year if institution_date else None
+            
+            if not force and (
+                case.institution_date_normalized == institution_date and
+                case.hearing_date_normalized == hearing_date and
+                case.institution_year == institution_year
+            ):
+                continue
+            
+            case.institution_date_normalized = institution_date
+            case.hearing_date_normalized = hearing_date
+            case.institution_year = institution_year
+            case.updated_at = timezone.now()
+            changed.append(case)
+            
+            if len(changed) >= batch_size:
+                Case.objects.bulk_update(changed, fields)
+                normalized_count += len(changed)
+                changed = []
+        
+        if changed:
+            Case.objects.bulk_update(changed, fields)
+            normalized_count += len(changed)
+        
+        return normalized_count
+
     def _clean_orders_data(self, force: bool = False) -> int:
         """Clean orders data"""
         cleaned_count = 0
@@ -265,6 +265,13 @@ class PDFProcessor:
             document.is_cleaned = True
             document.save()
             
+            # Refresh the snippet sentence tables of the linked cases
+            try:
+                from search_indexing.services.sentence_index import SentenceIndex
+                SentenceIndex().build_for_document(document.id)
+            except Exception as e:
+                logger.warning(f"Failed to update sentence index for {document.file_name}: {str(e)}")
+            
             logger.info(f"Successfully cleaned text for {document.file_name}")
             return True
             
@@ -1,5 +1,8 @@
-from django.test import TestCase
+from datetime import date, datetime
+
+from django.test import SimpleTestCase, TestCase
 from .models import Court, Case
+from .services.data_cleaner import parse_case_date
 
 class CourtModelTest(TestCase):
     def test_court_creation(self):
@@ -21,3 +24,18 @@ class CaseModelTest(TestCase):
         )
         self.assertEqual(case.sr_number, "TEST001")
         self.assertEqual(case.court, court)
+
+class ParseCaseDateTest(SimpleTestCase):
+    def test_scraped_formats(self):
+        self.assertEqual(parse_case_date("19-06-2025"), date(2025, 6, 19))
+        self.assertEqual(parse_case_date("9/6/2025"), date(2025, 6, 9))
+        self.assertEqual(parse_case_date("2025-06-19"), date(2025, 6, 19))
+        self.assertEqual(parse_case_date(datetime(2025, 6, 19, 10, 30)), date(2025, 6, 19))
+        # Hearing dates carry extra text; the first valid date wins
+        self.assertEqual(parse_case_date("31-02-2024, fixed for 05-03-2024 (Monday)"), date(2024, 3, 5))
+
+    def test_missing_or_invalid_dates(self):
+        self.assertIsNone(parse_case_date(None))
+        self.assertIsNone(parse_case_date(""))
+        self.assertIsNone(parse_case_date("not a date"))
+        self.assertIsNone(parse_case_date("32-13-2024"))
@@ -184,6 +184,124 @@ LEARNED_RERANKER_MODEL_PATH = (
     if LEARNED_RERANKER_MODEL_NAME
     else None
 )
+# Cross-encoder scores are cached per (model, query, case, candidate text);
+# uncached pairs from concurrent requests are merged into shared predict calls.
+LEARNED_RERANKER_SCORE_CACHE_SIZE = config("LEARNED_RERANKER_SCORE_CACHE_SIZE", default=20000, cast=int)
+LEARNED_RERANKER_MAX_BATCH_PAIRS = config("LEARNED_RERANKER_MAX_BATCH_PAIRS", default=256, cast=int)
+LEARNED_RERANKER_BATCH_WAIT_MS = config("LEARNED_RERANKER_BATCH_WAIT_MS", default=0.0, cast=float)
+
+# Search service container settings
+# Build the shared search services when a serving process starts, and
+# optionally run a warm-up query so models and indexes are loaded up front.
+SEARCH_SERVICES_BUILD_ON_READY = config("SEARCH_SERVICES_BUILD_ON_READY", default=True, cast=bool)
+SEARCH_SERVICES_WARM_UP = config("SEARCH_SERVICES_WARM_UP", default=False, cast=bool)
+
+# Search result cache settings
+# Keys are namespaced by the latest IndexingLog id, so rebuilding an index
+# invalidates cached responses once the version check interval elapses.
+SEARCH_RESULT_CACHE_ENABLED = config("SEARCH_RESULT_CACHE_ENABLED", default=True, cast=bool)
+SEARCH_RESULT_CACHE_LOCAL_SIZE = config("SEARCH_RESULT_CACHE_LOCAL_SIZE", default=512, cast=int)
+SEARCH_RESULT_CACHE_ALIAS = config("SEARCH_RESULT_CACHE_ALIAS", default="default")
+SEARCH_RESULT_CACHE_TTL = config("SEARCH_RESULT_CACHE_TTL", default=600, cast=int)
+SEARCH_INDEX_VERSION_CHECK_SECONDS = config("SEARCH_INDEX_VERSION_CHECK_SECONDS", default=30, cast=int)
+
+# Cursor pagination settings
+# The first page ranks and snapshots its own results plus
+# SEARCH_CURSOR_LOOKAHEAD_PAGES further pages; later pages read the snapshot
+# and hydrate only their own cases. A cursor followed past the end of its
+# snapshot re-runs the search ranking at least SEARCH_CURSOR_DEPTH results.
+SEARCH_CURSOR_ENABLED = config("SEARCH_CURSOR_ENABLED", default=True, cast=bool)
+SEARCH_CURSOR_CACHE_ALIAS = config("SEARCH_CURSOR_CACHE_ALIAS", default="default")
+SEARCH_CURSOR_TTL = config("SEARCH_CURSOR_TTL", default=900, cast=int)
+SEARCH_CURSOR_LOOKAHEAD_PAGES = config("SEARCH_CURSOR_LOOKAHEAD_PAGES", default=1, cast=int)
+SEARCH_CURSOR_DEPTH = config("SEARCH_CURSOR_DEPTH", default=100, cast=int)
+
+# Case feature store settings
+# Case and search profile fields used by the rankers are loaded into memory
+# once and reloaded when the index version changes.
+SEARCH_FEATURE_STORE_ENABLED = config("SEARCH_FEATURE_STORE_ENABLED", default=True, cast=bool)
+SEARCH_FEATURE_STORE_CHUNK_SIZE = config("SEARCH_FEATURE_STORE_CHUNK_SIZE", default=2000, cast=int)
+
+# Rerank cascade settings
+# Exact case number hits and queries whose top fused score leads the second
+# by SEARCH_CASCADE_CONFIDENT_MARGIN (relative) skip the rerankers; specific
+# queries with a smaller lead skip only the learned reranker.
+SEARCH_CASCADE_ENABLED = config("SEARCH_CASCADE_ENABLED", default=True, cast=bool)
+SEARCH_CASCADE_CONFIDENT_MARGIN = config("SEARCH_CASCADE_CONFIDENT_MARGIN", default=0.5, cast=float)
+SEARCH_CASCADE_SPECIFIC_MARGIN = config("SEARCH_CASCADE_SPECIFIC_MARGIN", default=0.2, cast=float)
+SEARCH_CASCADE_HIGH_SPECIFICITY = config("SEARCH_CASCADE_HIGH_SPECIFICITY", default=0.8, cast=float)
+
+# Lexical feature settings
+# Parsed candidates and (query, candidate) feature vectors shared by the
+# rerankers are kept in LRU caches of this many entries each.
+SEARCH_LEXICAL_FEATURE_CACHE_SIZE = config("SEARCH_LEXICAL_FEATURE_CACHE_SIZE", default=20000, cast=int)
+
+# Snippet settings
+# Highlighted result pages prefetch their chunks and pages in bulk and build
+# the snippets of each result on this many worker threads.
+SEARCH_SNIPPET_WORKERS = config("SEARCH_SNIPPET_WORKERS", default=4, cast=int)
+
+# Normalized query embeddings kept by the FAISS vector service; snippet and
+# case context scoring reuse the embedding of the search that produced them.
+SEARCH_QUERY_EMBEDDING_CACHE_SIZE = config("SEARCH_QUERY_EMBEDDING_CACHE_SIZE", default=1024, cast=int)
+
+# AI snippet jobs: provider ("simple", "stub", "openai", "anthropic", "google"
+# or "local"), concurrent provider calls per process, how long a page waits
+# before falling back to the simple generator, and the result cache lifetime.
+SEARCH_AI_SNIPPET_PROVIDER = config("SEARCH_AI_SNIPPET_PROVIDER", default="simple")
+SEARCH_AI_SNIPPET_CONCURRENCY = config("SEARCH_AI_SNIPPET_CONCURRENCY", default=4, cast=int)
+SEARCH_AI_SNIPPET_TIMEOUT_MS = config("SEARCH_AI_SNIPPET_TIMEOUT_MS", default=3000, cast=int)
+SEARCH_AI_SNIPPET_CACHE_ENABLED = config("SEARCH_AI_SNIPPET_CACHE_ENABLED", default=True, cast=bool)
+SEARCH_AI_SNIPPET_CACHE_TTL = config("SEARCH_AI_SNIPPET_CACHE_TTL", default=86400, cast=int)
+
+# Lexical snippets come from per-case sentence tables built when a document's
+# text is cleaned; cases without one fall back to scanning their pages.
+SEARCH_SENTENCE_INDEX_ENABLED = config("SEARCH_SENTENCE_INDEX_ENABLED", default=True, cast=bool)
+SEARCH_SENTENCE_MAX_CHARS = config("SEARCH_SENTENCE_MAX_CHARS", default=300, cast=int)
+
+# Facet settings
+# Facets are counted from in-memory value columns refreshed from changed cases
+# at most this often; counting within the result set instead of the whole
+# collection is opt-in.
+SEARCH_FACET_ENGINE_ENABLED = config("SEARCH_FACET_ENGINE_ENABLED", default=True, cast=bool)
+SEARCH_FACET_REFRESH_SECONDS = config("SEARCH_FACET_REFRESH_SECONDS", default=30, cast=int)
+SEARCH_FACETS_WITHIN_RESULTS = config("SEARCH_FACETS_WITHIN_RESULTS", default=False, cast=bool)
+
+# Typeahead settings
+# Suggestions are served from an in-memory prefix index rebuilt in the
+# background after index builds and at most this often.
+SEARCH_SUGGEST_INDEX_ENABLED = config("SEARCH_SUGGEST_INDEX_ENABLED", default=True, cast=bool)
+SEARCH_SUGGEST_REFRESH_SECONDS = config("SEARCH_SUGGEST_REFRESH_SECONDS", default=300, cast=int)
+
+# Fuzzy name matching settings
+# Party names and titles matched within this many edits (tokens shorter than
+# five characters match exactly) feed hybrid retrieval when their mean token
+# similarity reaches the minimum score.
+SEARCH_FUZZY_INDEX_ENABLED = config("SEARCH_FUZZY_INDEX_ENABLED", default=True, cast=bool)
+SEARCH_FUZZY_MAX_EDIT_DISTANCE = config("SEARCH_FUZZY_MAX_EDIT_DISTANCE", default=2, cast=int)
+SEARCH_FUZZY_MIN_SCORE = config("SEARCH_FUZZY_MIN_SCORE", default=0.6, cast=float)
+
+# Maximum number of queries accepted by the batch search endpoint
+SEARCH_BATCH_MAX_QUERIES = config("SEARCH_BATCH_MAX_QUERIES", default=100, cast=int)
+
+# Query plans (normalization, intelligence and expansion of a query string)
+# are cached for the most recent SEARCH_QUERY_PLAN_CACHE_SIZE queries.
+SEARCH_QUERY_PLAN_CACHE_SIZE = config("SEARCH_QUERY_PLAN_CACHE_SIZE", default=1024, cast=int)
+
+# Async search endpoint settings
+# Blocking search work runs on SEARCH_ASYNC_MAX_WORKERS threads; once
+# SEARCH_ASYNC_MAX_PENDING jobs are in flight new requests get a 503.
+SEARCH_ASYNC_MAX_WORKERS = config("SEARCH_ASYNC_MAX_WORKERS", default=8, cast=int)
+SEARCH_ASYNC_MAX_PENDING = config("SEARCH_ASYNC_MAX_PENDING", default=64, cast=int)
+
+# Default per-mode latency budgets (ms) for SearchAPIView; optional stages
+# (rerankers, quality engine, snippets, facets) are skipped once they no
+# longer fit. Callers can override with the budget_ms parameter.
+SEARCH_LATENCY_BUDGETS_MS = {
+    "lexical": config("SEARCH_BUDGET_LEXICAL_MS", default=800, cast=int),
+    "semantic": config("SEARCH_BUDGET_SEMANTIC_MS", default=1500, cast=int),
+    "hybrid": config("SEARCH_BUDGET_HYBRID_MS", default=2500, cast=int),
+}
 
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
@@ -1,6 +1,39 @@
+import logging
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class SearchIndexingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "search_indexing"
+
+    def ready(self):
+        """Build (and optionally warm) the shared search services for serving processes"""
+        if not getattr(settings, "SEARCH_SERVICES_BUILD_ON_READY", True):
+            return
+        if not self._is_serving_process():
+            return
+
+        try:
+            from .services.service_container import get_search_services
+
+            services = get_search_services()
+            if getattr(settings, "SEARCH_SERVICES_WARM_UP", False):
+                services.warm_up()
+        except Exception as e:
+            # Views fall back to building the container on first request
+            logger.error(f"Failed to build search services at startup: {str(e)}")
+
+    @staticmethod
+    def _is_serving_process() -> bool:
+        """Skip management commands (migrate, build_indexes, ...) and the runserver reloader parent"""
+        if not sys.argv or not os.path.basename(sys.argv[0]).startswith("manage"):
+            return True  # WSGI/ASGI server
+        if len(sys.argv) < 2 or sys.argv[1] != "runserver":
+            return False
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
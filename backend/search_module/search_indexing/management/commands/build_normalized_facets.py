@@ -70,7 +70,7 @@ class Command(BaseCommand):
             if options['facet_type']:
                 # Build specific facet type
                 self.stdout.write(f"Building facet type: {options['facet_type']}")
-                stats = facet_service.build_specific_facet(options['facet_type'])
+                stats = facet_service.build_normalized_facets(options['facet_type'])
             else:
                 # Build all facets
                 self.stdout.write("Building all facet types...")
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_indexing", "0008_widen_searchmetadata_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CaseSentenceIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("case_id", models.IntegerField(unique=True)),
+                ("sentences", models.JSONField(default=list)),
+                ("terms", models.JSONField(default=list)),
+                ("postings", models.JSONField(default=list)),
+                ("sentence_count", models.IntegerField(default=0)),
+                ("page_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "case_sentence_indexes",
+            },
+        ),
+    ]
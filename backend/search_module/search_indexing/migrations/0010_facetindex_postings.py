@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_indexing", "0009_casesentenceindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="facetindex",
+            name="postings",
+            field=models.BinaryField(blank=True, default=b""),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+
+
+def backfill_institution_year(apps, schema_editor):
+    """Fill the year column from the dates already stored on the metadata"""
+    SearchMetadata = apps.get_model("search_indexing", "SearchMetadata")
+    SearchMetadata.objects.filter(institution_date__isnull=False).update(
+        institution_year=ExtractYear("institution_date")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search_indexing", "0010_facetindex_postings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchmetadata",
+            name="institution_year",
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_institution_year, migrations.RunPython.noop),
+    ]
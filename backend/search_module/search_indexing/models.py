@@ -160,7 +160,8 @@ class FacetIndex(models.Model):
     facet_type = models.CharField(max_length=50)  # section, judge, court, etc.
     
     # Configuration
-    term_mappings = models.JSONField(default=dict)  # canonical_term -> case_ids
+    term_mappings = models.JSONField(default=dict)  # canonical_term -> case_ids (indexes built before postings)
+    postings = models.BinaryField(blank=True, default=b'')  # Delta-encoded case id postings, see facet_postings
     boost_config = models.JSONField(default=dict)  # Boost configuration for ranking
     
     # Statistics
@@ -246,6 +247,31 @@ class FacetMapping(models.Model):
         ]
 
 
+class CaseSentenceIndex(models.Model):
+    """Sentence table and term postings of a case's page texts for snippet highlighting"""
+    
+    case_id = models.IntegerField(unique=True)  # Store case ID as integer like DocumentChunk
+    
+    # [document_id, page_number, start_char, end_char] per sentence, in page order
+    sentences = models.JSONField(default=list)
+    # Sorted normalized terms and, aligned with them, the ids of the sentences containing each
+    terms = models.JSONField(default=list)
+    postings = models.JSONField(default=list)
+    
+    sentence_count = models.IntegerField(default=0)
+    page_count = models.IntegerField(default=0)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Sentence index of case {self.case_id} ({self.sentence_count} sentences)"
+    
+    class Meta:
+        db_table = "case_sentence_indexes"
+
+
 class IndexingLog(models.Model):
     """Log of indexing operations for observability"""
     
@@ -301,6 +327,7 @@ class SearchMetadata(models.Model):
     institution_date = models.DateField(null=True, blank=True, db_index=True)
     hearing_date = models.DateField(null=True, blank=True, db_index=True)
     disposal_date = models.DateField(null=True, blank=True, db_index=True)
+    institution_year = models.PositiveSmallIntegerField(null=True, blank=True, db_index=True)
     
     # TIER 1 ENHANCEMENT: Rich metadata fields
     legal_entities = models.JSONField(default=list, blank=True)  # Extracted legal entities
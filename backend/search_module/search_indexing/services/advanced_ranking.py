@@ -7,11 +7,16 @@ import logging
 import math
 import re
 from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime, date
+from datetime import date
 from django.utils import timezone
 from django.db.models import Q, F
+import numpy as np
 from apps.cases.models import Case, CaseSearchProfile, Term, TermOccurrence
+from apps.cases.services.data_cleaner import parse_case_date
 from ..models import SearchMetadata
+from .case_feature_store import get_case_feature_store
+from .result_diversity import case_similarity_matrix, mmr_select
+from .score_fusion import FusedScores, top_k_indices, weighted_linear_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +49,10 @@ class AdvancedRankingService:
         if config:
             self.default_config.update(config)
         
+        # Shared case features; the caches back the database fallback
+        self.feature_store = get_case_feature_store()
         self._profile_cache: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._case_cache: Dict[int, Optional[Dict[str, Any]]] = {}
     
     def rank_results(self, 
                     vector_results: List[Dict], 
@@ -97,68 +105,29 @@ class AdvancedRankingService:
             # Fallback to simple ranking
             return self._fallback_ranking(vector_results, keyword_results, top_k)
     
-    def _combine_results(self, vector_results: List[Dict], keyword_results: List[Dict]) -> Dict[int, Dict]:
-        """Combine and deduplicate results by case ID"""
-        combined = {}
-        
-        # Process vector results
-        for result in vector_results:
-            case_id = result.get('case_id')
-            if case_id:
-                if case_id not in combined:
-                    combined[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': result.get('similarity', 0),
-                        'keyword_score': 0,
-                        'result_data': result
-                    }
-                else:
-                    # Take the best vector score
-                    combined[case_id]['vector_score'] = max(
-                        combined[case_id]['vector_score'],
-                        result.get('similarity', 0)
-                    )
-        
-        # Process keyword results
-        for result in keyword_results:
-            case_id = result.get('case_id')
-            if case_id:
-                if case_id not in combined:
-                    combined[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': 0,
-                        'keyword_score': result.get('rank', 0),
-                        'result_data': result
-                    }
-                else:
-                    # Take the best keyword score
-                    combined[case_id]['keyword_score'] = max(
-                        combined[case_id]['keyword_score'],
-                        result.get('rank', 0)
-                    )
-        
-        return combined
+    def _combine_results(self, vector_results: List[Dict], keyword_results: List[Dict]) -> FusedScores:
+        """Combine and deduplicate results by case ID (vectorized, best score per retriever)"""
+        return FusedScores(vector_results, keyword_results)
     
-    def _calculate_base_scores(self, combined_results: Dict[int, Dict], query_info: Dict) -> List[Dict]:
+    def _calculate_base_scores(self, fused: FusedScores, query_info: Dict) -> List[Dict]:
         """Calculate base scores for each result"""
-        scored_results = []
+        # Normalize scores to 0-1 range
+        vector_scores = np.minimum(1.0, fused.vector_scores)
         
-        for case_id, result in combined_results.items():
-            # Normalize scores to 0-1 range
-            vector_score = min(1.0, result['vector_score'])
-            
-            # Keyword score normalization (assuming max rank is around 10)
-            keyword_score = min(1.0, result['keyword_score'] / 10.0) if result['keyword_score'] > 0 else 0
-            
-            scored_result = {
-                'case_id': case_id,
-                'vector_score': vector_score,
-                'keyword_score': keyword_score,
+        # Keyword score normalization (assuming max rank is around 10)
+        keyword_scores = np.where(fused.keyword_scores > 0, np.minimum(1.0, fused.keyword_scores / 10.0), 0.0)
+        
+        # Boosting, recency and diversity need every candidate, so rows are
+        # materialized here in first-seen order
+        scored_results = []
+        for row in np.argsort(fused.first_seen, kind='stable'):
+            scored_results.append({
+                'case_id': fused.case_id(row),
+                'vector_score': float(vector_scores[row]),
+                'keyword_score': float(keyword_scores[row]),
                 'base_score': 0,  # Will be calculated in fusion
-                'result_data': result['result_data']
-            }
-            
-            scored_results.append(scored_result)
+                'result_data': fused.source_results(row)[0]
+            })
         
         return scored_results
     
@@ -234,12 +203,12 @@ class AdvancedRankingService:
     def _calculate_exact_match_boost(self, case_id: int, query_info: Dict[str, Any]) -> float:
         """Calculate boost for exact case number/citation matches"""
         try:
-            case = Case.objects.filter(id=case_id).first()
+            case = self._get_case_fields(case_id)
             if not case:
                 return 0.0
 
             original_query = (query_info.get('original_query') or '').lower()
-            case_number = (case.case_number or '').strip()
+            case_number = (case['case_number'] or '').strip()
             if case_number and case_number.lower() in original_query:
                 return self.default_config['max_boost']
             
@@ -447,6 +416,11 @@ class AdvancedRankingService:
         if not query_info:
             return []
 
+        # Tokenized once per query string by the QueryPlanner
+        query_tokens = query_info.get('query_tokens')
+        if query_tokens is not None:
+            return list(query_tokens)
+
         normalized_query = (query_info.get('normalized_query') or '').lower()
         original_query = (query_info.get('original_query') or '').lower()
 
@@ -479,16 +453,17 @@ class AdvancedRankingService:
             if isinstance(profile_data, dict):
                 return profile_data
 
-        if case_id in self._profile_cache:
+        if self.feature_store.ensure_loaded():
+            serialized = self.feature_store.get_profile(case_id)
+        elif case_id in self._profile_cache:
             return self._profile_cache[case_id]
+        else:
+            profile_obj = CaseSearchProfile.objects.filter(case_id=case_id).first()
+            serialized = self._serialize_profile(profile_obj) if profile_obj else None
+            self._profile_cache[case_id] = serialized
 
-        profile_obj = CaseSearchProfile.objects.filter(case_id=case_id).first()
-        if not profile_obj:
-            self._profile_cache[case_id] = None
+        if serialized is None:
             return None
-
-        serialized = self._serialize_profile(profile_obj)
-        self._profile_cache[case_id] = serialized
         if result:
             result_data = result.setdefault('result_data', {})
             result_data['case_profile'] = serialized
@@ -503,6 +478,29 @@ class AdvancedRankingService:
             'case_number_tokens': profile.case_number_tokens or [],
             'metadata': profile.metadata or {},
         }
+
+    def _get_case_fields(self, case_id: int) -> Optional[Dict[str, Any]]:
+        """Case number, court, status and institution date of a case"""
+        if self.feature_store.ensure_loaded():
+            return self.feature_store.get_case(case_id)
+        if case_id in self._case_cache:
+            return self._case_cache[case_id]
+
+        case = Case.objects.select_related('court').filter(id=case_id).first()
+        fields = None
+        if case:
+            institution_date = case.institution_date_normalized or parse_case_date(case.institution_date)
+            fields = {
+                'case_number': case.case_number or '',
+                'status': case.status or '',
+                'institution_date': case.institution_date or '',
+                'institution_date_normalized': institution_date,
+                'institution_year': institution_date.year if institution_date else 0,
+                'court_id': case.court.id if case.court else None,
+                'court': case.court.name if case.court else None,
+            }
+        self._case_cache[case_id] = fields
+        return fields
     
     def _extract_parties_from_query(self, query: str) -> List[str]:
         """Extract party fragments from queries that look like 'A VS B'."""
@@ -525,28 +523,24 @@ class AdvancedRankingService:
             boost = 0.0
             alignment_count = 0
             
-            case = Case.objects.filter(id=case_id).first()
+            case = self._get_case_fields(case_id)
             if not case:
                 return 0.0
             
             # Check court filter
-            if 'court' in filters and case.court:
-                if str(case.court.id) == str(filters['court']) or case.court.name.lower() == filters['court'].lower():
+            if 'court' in filters and case['court_id']:
+                if str(case['court_id']) == str(filters['court']) or case['court'].lower() == filters['court'].lower():
                     alignment_count += 1
             
             # Check status filter
-            if 'status' in filters and case.status:
-                if case.status.lower() == filters['status'].lower():
+            if 'status' in filters and case['status']:
+                if case['status'].lower() == filters['status'].lower():
                     alignment_count += 1
             
             # Check year filter
-            if 'year' in filters and case.institution_date:
-                try:
-                    case_year = datetime.strptime(case.institution_date, '%d-%m-%Y').year
-                    if case_year == int(filters['year']):
-                        alignment_count += 1
-                except:
-                    pass
+            if 'year' in filters and case['institution_year']:
+                if case['institution_year'] == int(filters['year']):
+                    alignment_count += 1
             
             # Calculate boost based on alignment count
             if alignment_count > 0:
@@ -568,22 +562,18 @@ class AdvancedRankingService:
                 recency_score = 0.0
                 
                 # Get case dates
-                case = Case.objects.filter(id=case_id).first()
-                if case and case.institution_date:
-                    try:
-                        case_date = datetime.strptime(case.institution_date, '%d-%m-%Y').date()
-                        days_old = (date.today() - case_date).days
-                        
-                        # Exponential decay: newer cases get higher scores
-                        if days_old > 0:
-                            decay_factor = self.default_config['recency_decay_factor']
-                            recency_score = math.exp(-decay_factor * days_old / 365.0)  # Normalize to years
-                        else:
-                            recency_score = 1.0  # Future dates get max score
-                            
-                    except Exception as e:
-                        logger.warning(f"Error parsing date for case {case_id}: {str(e)}")
-                        recency_score = 0.5  # Default score for parsing errors
+                case = self._get_case_fields(case_id)
+                if case and case['institution_date_normalized']:
+                    days_old = (date.today() - case['institution_date_normalized']).days
+                    
+                    # Exponential decay: newer cases get higher scores
+                    if days_old > 0:
+                        decay_factor = self.default_config['recency_decay_factor']
+                        recency_score = math.exp(-decay_factor * days_old / 365.0)  # Normalize to years
+                    else:
+                        recency_score = 1.0  # Future dates get max score
+                elif case and case['institution_date']:
+                    recency_score = 0.5  # Default score for unparseable dates
                 
                 recency_result = result.copy()
                 recency_result['recency_score'] = recency_score
@@ -601,121 +591,76 @@ class AdvancedRankingService:
             if len(results) <= top_k:
                 return results
             
-            # Sort by base score for initial ranking
-            sorted_results = sorted(results, key=lambda x: x['vector_score'] + x['keyword_score'], reverse=True)
+            relevance = np.array([r['vector_score'] + r['keyword_score'] for r in results], dtype=np.float64)
+            similarity = case_similarity_matrix(*self._case_similarity_features([r['case_id'] for r in results]))
+            selected = mmr_select(relevance, similarity, top_k, self.default_config['mmr_lambda'])
             
-            # MMR selection
-            selected = [sorted_results[0]]  # Start with highest scoring result
-            remaining = sorted_results[1:]
-            
-            lambda_param = self.default_config['mmr_lambda']
-            
-            while len(selected) < top_k and remaining:
-                mmr_scores = []
-                
-                for candidate in remaining:
-                    # Relevance score
-                    relevance = candidate['vector_score'] + candidate['keyword_score']
-                    
-                    # Diversity score (average similarity to already selected)
-                    diversity = 0.0
-                    if selected:
-                        similarities = []
-                        for selected_result in selected:
-                            similarity = self._calculate_case_similarity(
-                                candidate['case_id'], 
-                                selected_result['case_id']
-                            )
-                            similarities.append(similarity)
-                        diversity = 1.0 - (sum(similarities) / len(similarities))
-                    
-                    # MMR score
-                    mmr_score = lambda_param * relevance + (1 - lambda_param) * diversity
-                    mmr_scores.append((candidate, mmr_score))
-                
-                # Select candidate with highest MMR score
-                best_candidate, _ = max(mmr_scores, key=lambda x: x[1])
-                selected.append(best_candidate)
-                remaining.remove(best_candidate)
-            
-            return selected
+            return [results[i] for i in selected]
             
         except Exception as e:
             logger.error(f"Error applying diversity control: {str(e)}")
             return results[:top_k]
     
-    def _calculate_case_similarity(self, case_id_1: int, case_id_2: int) -> float:
-        """Calculate similarity between two cases (simplified)"""
-        try:
-            # Simple similarity based on court and status
-            case1 = Case.objects.filter(id=case_id_1).first()
-            case2 = Case.objects.filter(id=case_id_2).first()
-            
-            if not case1 or not case2:
-                return 0.0
-            
-            similarity = 0.0
-            
-            # Court similarity
-            if case1.court and case2.court:
-                if case1.court.id == case2.court.id:
-                    similarity += 0.5
-            
-            # Status similarity
-            if case1.status and case2.status:
-                if case1.status.lower() == case2.status.lower():
-                    similarity += 0.3
-            
-            # Year similarity
-            if case1.institution_date and case2.institution_date:
-                try:
-                    year1 = datetime.strptime(case1.institution_date, '%d-%m-%Y').year
-                    year2 = datetime.strptime(case2.institution_date, '%d-%m-%Y').year
-                    year_diff = abs(year1 - year2)
-                    if year_diff <= 1:
-                        similarity += 0.2
-                    elif year_diff <= 5:
-                        similarity += 0.1
-                except:
-                    pass
-            
-            return similarity
-            
-        except Exception as e:
-            logger.error(f"Error calculating case similarity: {str(e)}")
-            return 0.0
+    def _case_similarity_features(self, case_ids: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Court code, status code, institution year and presence per case"""
+        if self.feature_store.ensure_loaded():
+            columns = self.feature_store.columns
+            rows = columns.rows(case_ids)
+            present = rows >= 0
+            rows = np.where(present, rows, 0)
+            if not len(columns.case_ids):
+                return (np.full(len(case_ids), -1), np.full(len(case_ids), -1),
+                        np.zeros(len(case_ids), dtype=np.int16), present)
+            return (np.where(present, columns.court_codes[rows], -1),
+                    np.where(present, columns.status_codes[rows], -1),
+                    np.where(present, columns.institution_year[rows], 0),
+                    present)
+        
+        # Database fallback: one lookup per case rather than per pair
+        statuses: Dict[str, int] = {}
+        court_codes, status_codes, years, present = [], [], [], []
+        for case_id in case_ids:
+            case = self._get_case_fields(case_id)
+            present.append(case is not None)
+            case = case or {}
+            court_codes.append(case.get('court_id') or -1)
+            status_key = (case.get('status') or '').lower()
+            status_codes.append(statuses.setdefault(status_key, len(statuses)) if status_key else -1)
+            years.append(case.get('institution_year') or 0)
+        return (np.asarray(court_codes), np.asarray(status_codes),
+                np.asarray(years), np.asarray(present, dtype=bool))
     
     def _final_score_fusion(self, results: List[Dict], top_k: int, query_info: Dict) -> List[Dict]:
         """Final score fusion and normalization"""
         try:
-            fused_results = []
+            if not results:
+                return []
             
             semantic_weight, lexical_weight = self._determine_score_weights(query_info)
             
-            for result in results:
-                # Calculate base hybrid score                
-                base_score = (
-                    result['vector_score'] * semantic_weight +
-                    result['keyword_score'] * lexical_weight
-                )
-                
-                # Add boosts
-                boosted_score = base_score + result.get('total_boost', 0)
-                
-                # Add recency
-                final_score = boosted_score + (result.get('recency_score', 0) * 0.1)
-                
-                fused_result = result.copy()
-                fused_result['base_score'] = base_score
-                fused_result['boosted_score'] = boosted_score
-                fused_result['final_score'] = final_score
-                
-                fused_results.append(fused_result)
+            # Calculate base hybrid score
+            base_scores = weighted_linear_fusion(
+                [np.array([r['vector_score'] for r in results], dtype=np.float64),
+                 np.array([r['keyword_score'] for r in results], dtype=np.float64)],
+                [semantic_weight, lexical_weight]
+            )
+            
+            # Add boosts
+            boosted_scores = base_scores + np.array([r.get('total_boost', 0) for r in results], dtype=np.float64)
             
-            # Sort by final score
-            fused_results.sort(key=lambda x: x['final_score'], reverse=True)
+            # Add recency
+            final_scores = boosted_scores + np.array([r.get('recency_score', 0) for r in results], dtype=np.float64) * 0.1
+            
+            # Sort by final score; only the returned rows are copied
+            fused_results = []
+            for row in top_k_indices(final_scores, top_k):
+                fused_result = results[row].copy()
+                fused_result['base_score'] = float(base_scores[row])
+                fused_result['boosted_score'] = float(boosted_scores[row])
+                fused_result['final_score'] = float(final_scores[row])
+                fused_results.append(fused_result)
             
-            return fused_results[:top_k]
+            return fused_results
             
         except Exception as e:
             logger.error(f"Error in final score fusion: {str(e)}")
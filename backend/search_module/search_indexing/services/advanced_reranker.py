@@ -9,8 +9,12 @@ import re
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Avg
 from apps.cases.models import Case, CaseSearchProfile
+from apps.cases.services.data_cleaner import parse_case_date
+from .case_feature_store import get_case_feature_store
+from . import lexical_features as lexical
+from .lexical_features import get_lexical_feature_extractor
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,10 @@ class AdvancedReranker:
         if config:
             self.default_config.update(config)
         
+        # Shared case features; the profile cache backs the database fallback
+        self.feature_store = get_case_feature_store()
         self._profile_cache: Dict[int, Optional[Dict[str, Any]]] = {}
+        self.lexical_features = get_lexical_feature_extractor()
         
         # Court hierarchy scoring
         self.court_hierarchy = {
@@ -66,7 +73,8 @@ class AdvancedReranker:
                       search_results: List[Dict[str, Any]], 
                       query: str,
                       query_analysis: Dict[str, Any] = None,
-                      user_context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                      user_context: Dict[str, Any] = None,
+                      query_terms: List[str] = None) -> List[Dict[str, Any]]:
         """
         Advanced multi-stage re-ranking of search results
         
@@ -75,6 +83,8 @@ class AdvancedReranker:
             query: Original search query
             query_analysis: Query analysis from expansion service
             user_context: User context for personalization
+            query_terms: Precomputed ``extract_query_terms`` output (from the
+                request's QueryPlan); extracted here when omitted
             
         Returns:
             Re-ranked search results
@@ -89,7 +99,7 @@ class AdvancedReranker:
             quality_filtered = self._filter_by_quality(search_results)
             
             # Stage 2: Legal relevance scoring
-            relevance_scored = self._score_legal_relevance(quality_filtered, query, query_analysis)
+            relevance_scored = self._score_legal_relevance(quality_filtered, query, query_analysis, query_terms)
             
             # Stage 3: Authority and importance scoring
             authority_scored = self._score_authority_importance(relevance_scored)
@@ -159,11 +169,14 @@ class AdvancedReranker:
     def _score_legal_relevance(self, 
                               results: List[Dict[str, Any]], 
                               query: str,
-                              query_analysis: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                              query_analysis: Dict[str, Any] = None,
+                              query_terms: List[str] = None) -> List[Dict[str, Any]]:
         """Score results based on legal relevance"""
         query_lower = query.lower()
         query_compact = re.sub(r'[^a-z0-9]', '', query_lower)
-        query_terms = self._extract_query_terms(query, query_analysis)
+        if query_terms is None:
+            query_terms = self.extract_query_terms(query, query_analysis)
+        lexicon = self.lexical_features.lexicon(query, query_analysis=query_analysis)
         
         for result in results:
             relevance_score = result.get('similarity', result.get('rank', 0.5))
@@ -182,12 +195,14 @@ class AdvancedReranker:
                     case_data['case_profile'] = fetched_profile
                     result['case_profile'] = fetched_profile
             
+            features = self.lexical_features.features(lexicon, case_data)
+            
             # Citation matching boost
-            if self._has_citation_match(query, case_data):
+            if features[lexical.CITATION_MATCH]:
                 relevance_score *= self.default_config['citation_boost']
             
             # Exact term matching
-            exact_matches = self._count_exact_matches(query_lower, case_data)
+            exact_matches = features[lexical.EXACT_TERM_MATCHES]
             if exact_matches > 0:
                 boost = 1.0 + (exact_matches * 0.2)
                 relevance_score *= min(boost, self.default_config['exact_match_boost'])
@@ -256,15 +271,14 @@ class AdvancedReranker:
                         break
             
             # Legal term relevance
-            legal_term_score = self._calculate_legal_term_relevance(query, case_data)
+            legal_term_score = features[lexical.LEGAL_TERM_RELEVANCE]
             relevance_score *= (1.0 + legal_term_score * self.default_config['legal_term_boost'])
             
             # Query type specific boosting
             if query_analysis:
-                type_boost = self._get_query_type_boost(query_analysis, case_data)
-                relevance_score *= type_boost
+                relevance_score *= features[lexical.QUERY_TYPE_BOOST]
             
-            result['legal_relevance_score'] = relevance_score
+            result['legal_relevance_score'] = float(relevance_score)
         
         return results
     
@@ -302,30 +316,23 @@ class AdvancedReranker:
     def _apply_temporal_scoring(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply temporal relevance scoring"""
         current_date = timezone.now().date()
+        store_loaded = self.feature_store.ensure_loaded()
         
         for result in results:
             case_data = result.get('result_data', result)
             temporal_score = 1.0
             
-            # Recency scoring
-            institution_date = case_data.get('institution_date')
-            if institution_date:
-                try:
-                    if isinstance(institution_date, str):
-                        case_date = datetime.strptime(institution_date[:10], '%Y-%m-%d').date()
-                    else:
-                        case_date = institution_date
-                    
-                    days_old = (current_date - case_date).days
-                    
-                    # Recency boost (more recent cases get slight preference)
-                    if days_old < 365:  # Less than 1 year
-                        temporal_score *= (1.0 + self.default_config['recency_weight'])
-                    elif days_old < 1825:  # Less than 5 years
-                        temporal_score *= (1.0 + self.default_config['recency_weight'] * 0.5)
-                    
-                except (ValueError, TypeError):
-                    pass  # Skip temporal scoring for invalid dates
+            # Recency scoring, from the parsed column when the feature store has the case
+            case = self.feature_store.get_case(result.get('case_id')) if store_loaded else None
+            case_date = case['institution_date_normalized'] if case else parse_case_date(case_data.get('institution_date'))
+            if case_date:
+                days_old = (current_date - case_date).days
+                
+                # Recency boost (more recent cases get slight preference)
+                if days_old < 365:  # Less than 1 year
+                    temporal_score *= (1.0 + self.default_config['recency_weight'])
+                elif days_old < 1825:  # Less than 5 years
+                    temporal_score *= (1.0 + self.default_config['recency_weight'] * 0.5)
             
             result['temporal_score'] = temporal_score
         
@@ -441,28 +448,7 @@ class AdvancedReranker:
         
         return results
     
-    def _has_citation_match(self, query: str, case_data: Dict[str, Any]) -> bool:
-        """Check for citation matches"""
-        import re
-        
-        citation_patterns = [
-            r'\b\d{4}\s*[A-Z]+\s*\d+\b',
-            r'\b[A-Z]+\s*\d{4}\s*\d+\b',
-            r'\b\d+\s*of\s*\d{4}\b'
-        ]
-        
-        query_citations = []
-        case_citations = []
-        
-        case_text = f"{case_data.get('case_number', '')} {case_data.get('case_title', '')}"
-        
-        for pattern in citation_patterns:
-            query_citations.extend(re.findall(pattern, query, re.IGNORECASE))
-            case_citations.extend(re.findall(pattern, case_text, re.IGNORECASE))
-        
-        return bool(set(query_citations).intersection(set(case_citations)))
-
-    def _extract_query_terms(self, query: str, query_analysis: Optional[Dict[str, Any]] = None) -> List[str]:
+    def extract_query_terms(self, query: str, query_analysis: Optional[Dict[str, Any]] = None) -> List[str]:
         tokens = set(re.findall(r"[a-z0-9]{3,}", query.lower()))
         if query_analysis:
             candidate_keys = [
@@ -481,6 +467,8 @@ class AdvancedReranker:
     def _get_case_profile(self, case_id: Optional[int]) -> Optional[Dict[str, Any]]:
         if not case_id:
             return None
+        if self.feature_store.ensure_loaded():
+            return self.feature_store.get_profile(case_id)
         if case_id in self._profile_cache:
             return self._profile_cache[case_id]
 
@@ -503,74 +491,9 @@ class AdvancedReranker:
             'metadata': profile.metadata or {},
         }
     
-    def _count_exact_matches(self, query: str, case_data: Dict[str, Any]) -> int:
-        """Count exact word matches between query and case data"""
-        query_words = set(query.lower().split())
-        case_text = f"{case_data.get('case_title', '')} {case_data.get('case_number', '')}".lower()
-        case_words = set(case_text.split())
-        
-        # Remove common stop words
-        stop_words = {'the', 'and', 'or', 'of', 'in', 'at', 'to', 'for', 'vs', 'versus'}
-        query_words -= stop_words
-        case_words -= stop_words
-        
-        return len(query_words.intersection(case_words))
-    
-    def _calculate_legal_term_relevance(self, query: str, case_data: Dict[str, Any]) -> float:
-        """Calculate legal term relevance score"""
-        legal_terms = [
-            'appeal', 'petition', 'bail', 'writ', 'civil', 'criminal',
-            'constitutional', 'contract', 'property', 'family',
-            'commercial', 'tax', 'court', 'judge', 'justice'
-        ]
-        
-        query_lower = query.lower()
-        case_text = f"{case_data.get('case_title', '')} {case_data.get('case_number', '')}".lower()
-        
-        relevance_score = 0.0
-        for term in legal_terms:
-            if term in query_lower and term in case_text:
-                relevance_score += 0.1
-        
-        return min(1.0, relevance_score)
-    
-    def _get_query_type_boost(self, query_analysis: Dict[str, Any], case_data: Dict[str, Any]) -> float:
-        """Get boost based on query type analysis"""
-        query_type = query_analysis.get('type', 'general')
-        boost = 1.0
-        
-        case_text = f"{case_data.get('case_title', '')} {case_data.get('case_number', '')}".lower()
-        
-        if query_type == 'citation':
-            # Boost cases with citation patterns
-            import re
-            if re.search(r'\b\d{4}\s*[A-Z]+\s*\d+\b', case_text):
-                boost = 1.3
-        elif query_type == 'case_parties':
-            # Boost cases with party names
-            if ' vs ' in case_text or ' v ' in case_text:
-                boost = 1.2
-        elif query_type == 'legal_concept':
-            # Boost based on legal concepts
-            legal_concepts = query_analysis.get('legal_concepts', [])
-            for concept in legal_concepts:
-                if concept in case_text:
-                    boost *= 1.1
-        
-        return boost
-    
     def _calculate_title_similarity(self, title1: str, title2: str) -> float:
         """Calculate similarity between case titles"""
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        return intersection / union if union > 0 else 0.0
+        return self.lexical_features.title_similarity(title1, title2)
     
     def _calculate_confidence(self, result: Dict[str, Any]) -> float:
         """Calculate confidence score for the ranking"""
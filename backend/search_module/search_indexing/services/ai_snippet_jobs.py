@@ -0,0 +1,258 @@
+"""
+AI Snippet Jobs
+Concurrent, cached and coalesced AI snippet generation for result pages
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from .index_version import get_index_version
+from .pair_scoring import normalize_pair_query
+from .search_cache import SearchResultCache
+from .simple_ai_snippet_service import SimpleAISnippetService
+
+logger = logging.getLogger(__name__)
+
+# Bump when the provider prompts change so cached snippets are regenerated
+AI_SNIPPET_PROMPT_VERSION = 1
+
+
+@dataclass
+class AISnippetJob:
+    """Inputs of one case's AI snippets"""
+    case_id: int
+    case_data: Dict[str, Any]
+    query: str
+    document_chunks: List[str] = field(default_factory=list)
+    max_snippets: int = 3
+
+
+class StubSnippetProvider:
+    """
+    Local provider with the ``generate_ai_snippet`` interface of the real
+    providers. It answers from the case data after an optional delay, for
+    tests and for development without API keys.
+    """
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay_ms = delay_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_ai_snippet(self,
+                            case_data: Dict[str, Any],
+                            query: str,
+                            document_chunks: List[str] = None,
+                            max_snippets: int = 3) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        if self.delay_ms:
+            time.sleep(self.delay_ms / 1000)
+
+        text = f"{case_data.get('case_title', 'Unknown Case')} is relevant to '{query}'"
+        return [{
+            'text': text,
+            'type': 'ai_generated',
+            'relevance_score': 0.9,
+            'matched_term': query,
+            'length': len(text),
+            'source': 'stub'
+        }][:max_snippets]
+
+
+def build_snippet_provider(name: str):
+    """Snippet provider for a ``SEARCH_AI_SNIPPET_PROVIDER`` name"""
+    if name == 'stub':
+        return StubSnippetProvider()
+    if name in ('openai', 'anthropic', 'google', 'local'):
+        # Pulls in the API clients and transformers only when configured
+        from .ai_snippet_service import AISnippetService
+        if name == 'local':
+            return AISnippetService({'model_type': 'local'})
+        return AISnippetService({'api_provider': name})
+    return SimpleAISnippetService()
+
+
+class AISnippetJobService:
+    """
+    Runs the AI snippet jobs of a result page.
+
+    Cached snippets are served from a two-tier cache keyed by case id,
+    normalized query and prompt version (namespaced by the index version).
+    Misses become provider calls on a bounded pool, so at most
+    ``max_concurrency`` calls run at once. A job already in flight for the
+    same key, from this or another request, is joined instead of started
+    again. Jobs still running when the timeout expires are answered by
+    ``SimpleAISnippetService``; they keep running and cache their result
+    for later requests.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None, provider=None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'provider': getattr(settings, 'SEARCH_AI_SNIPPET_PROVIDER', 'simple'),
+            'max_concurrency': getattr(settings, 'SEARCH_AI_SNIPPET_CONCURRENCY', 4),
+            'timeout_ms': getattr(settings, 'SEARCH_AI_SNIPPET_TIMEOUT_MS', 3000),
+            'cache_enabled': getattr(settings, 'SEARCH_AI_SNIPPET_CACHE_ENABLED', True),
+            'cache_ttl': getattr(settings, 'SEARCH_AI_SNIPPET_CACHE_TTL', 86400),  # 1 day
+            'cache_local_size': 2048,
+            'prompt_version': AI_SNIPPET_PROMPT_VERSION,
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self.provider = provider or build_snippet_provider(self.default_config['provider'])
+        self.fallback = SimpleAISnippetService()
+        self.cache = SearchResultCache({
+            'enabled': self.default_config['cache_enabled'],
+            'key_prefix': 'ai_snippets',
+            'shared_ttl': self.default_config['cache_ttl'],
+            'local_max_entries': self.default_config['cache_local_size'],
+        })
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, self.default_config['max_concurrency']), thread_name_prefix='ai-snippet'
+        )
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'jobs': 0,
+            'cache_hits': 0,
+            'provider_calls': 0,
+            'coalesced': 0,
+            'fallbacks': 0,
+            'errors': 0,
+        }
+
+    def cache_key(self, case_id: Any, query: str) -> str:
+        """Versioned cache key of a (case, query) pair"""
+        digest = hashlib.sha256(normalize_pair_query(query).encode()).hexdigest()[:32]
+        return (
+            f"{self.cache.default_config['key_prefix']}:v{get_index_version()}"
+            f":p{self.default_config['prompt_version']}:{case_id}:{digest}"
+        )
+
+    def generate(self, job: AISnippetJob, timeout_ms: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Snippets of a single job"""
+        return self.generate_many([job], timeout_ms).get(job.case_id, [])
+
+    def generate_many(self, jobs: List[AISnippetJob], timeout_ms: Optional[float] = None) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Snippets of every job, keyed by case id
+
+        Args:
+            jobs: One job per case
+            timeout_ms: Time to wait for provider calls; defaults to the
+                configured timeout
+        """
+        if not jobs:
+            return {}
+
+        timeout_ms = self.default_config['timeout_ms'] if timeout_ms is None else max(0.0, timeout_ms)
+        snippets: Dict[Any, List[Dict[str, Any]]] = {}
+        futures: Dict[Any, Future] = {}
+
+        for job in jobs:
+            key = self.cache_key(job.case_id, job.query)
+            cached = self.cache.get(key)
+            if cached is not None:
+                snippets[job.case_id] = cached[:job.max_snippets]
+                with self._lock:
+                    self._stats['jobs'] += 1
+                    self._stats['cache_hits'] += 1
+                continue
+            futures[job.case_id] = self._submit(key, job)
+
+        if futures:
+            wait(futures.values(), timeout=timeout_ms / 1000)
+
+        for job in jobs:
+            future = futures.get(job.case_id)
+            if future is None:
+                continue
+            if future.done() and future.exception() is None:
+                snippets[job.case_id] = copy.deepcopy(future.result())[:job.max_snippets]
+                continue
+
+            with self._lock:
+                self._stats['fallbacks'] += 1
+            if not future.done():
+                logger.info(f"AI snippets for case {job.case_id} not ready in {timeout_ms:.0f}ms, using fallback")
+            snippets[job.case_id] = self.fallback.generate_ai_snippet(
+                case_data=job.case_data,
+                query=job.query,
+                document_chunks=job.document_chunks,
+                max_snippets=job.max_snippets
+            )
+
+        return snippets
+
+    def _submit(self, key: str, job: AISnippetJob) -> Future:
+        """Start a provider call for ``key`` or join the one in flight"""
+        with self._lock:
+            self._stats['jobs'] += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future
+            self._stats['provider_calls'] += 1
+            future = self._pool.submit(self._run, key, job)
+            self._inflight[key] = future
+        return future
+
+    def _run(self, key: str, job: AISnippetJob) -> List[Dict[str, Any]]:
+        try:
+            snippets = self.provider.generate_ai_snippet(
+                case_data=job.case_data,
+                query=job.query,
+                document_chunks=job.document_chunks,
+                max_snippets=job.max_snippets
+            ) or []
+            # Empty answers are usually provider errors; retry them next time
+            if snippets:
+                self.cache.set(key, snippets)
+            return snippets
+        except Exception as e:
+            logger.error(f"Error generating AI snippets for case {job.case_id}: {str(e)}")
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['inflight'] = len(self._inflight)
+        stats['provider'] = type(self.provider).__name__
+        stats['max_concurrency'] = self.default_config['max_concurrency']
+        stats['cache_hit_rate'] = round(stats['cache_hits'] / stats['jobs'], 4) if stats['jobs'] else 0.0
+        return stats
+
+
+_ai_snippet_jobs: Optional[AISnippetJobService] = None
+_ai_snippet_jobs_lock = threading.Lock()
+
+
+def get_ai_snippet_jobs() -> AISnippetJobService:
+    """Return the process-wide AI snippet job service"""
+    global _ai_snippet_jobs
+
+    if _ai_snippet_jobs is None:
+        with _ai_snippet_jobs_lock:
+            if _ai_snippet_jobs is None:
+                _ai_snippet_jobs = AISnippetJobService()
+    return _ai_snippet_jobs
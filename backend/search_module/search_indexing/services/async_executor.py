@@ -0,0 +1,107 @@
+"""
+Async Executor
+Bounded thread pool used by the async views to run blocking search work
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor already has ``max_pending`` jobs in flight"""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a cap on queued work.
+
+    Async views await ``run`` so the event loop stays free while model
+    inference or synchronous ORM calls execute on a worker thread. Once
+    ``max_pending`` jobs are queued or running, new jobs are rejected with
+    ``ExecutorSaturated`` instead of growing the queue without bound.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, thread_name_prefix: str = 'search-worker'):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._stats = {
+            'pending': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+        }
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` on a worker thread and await its result"""
+        with self._lock:
+            if self._stats['pending'] >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise ExecutorSaturated(f"{self._stats['pending']} jobs already in flight")
+            self._stats['pending'] += 1
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        try:
+            result = await loop.run_in_executor(
+                self._executor, functools.partial(context.run, self._call, func, args, kwargs)
+            )
+            with self._lock:
+                self._stats['completed'] += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._stats['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats['pending'] -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['max_workers'] = self.max_workers
+        stats['max_pending'] = self.max_pending
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _call(func: Callable, args: tuple, kwargs: dict) -> Any:
+        # Worker threads keep their own DB connections; drop stale ones
+        # around each job the way Django does around each request.
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+
+_search_executor: Optional[BoundedExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def get_search_executor() -> BoundedExecutor:
+    """Return the process-wide executor for async search views"""
+    global _search_executor
+
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = BoundedExecutor(
+                    max_workers=getattr(settings, 'SEARCH_ASYNC_MAX_WORKERS', 8),
+                    max_pending=getattr(settings, 'SEARCH_ASYNC_MAX_PENDING', 64),
+                )
+    return _search_executor
@@ -585,6 +585,8 @@ class BM25IndexingService:
                     queryset = queryset.filter(court_normalized__icontains=filters['court'])
                 if 'status' in filters:
                     queryset = queryset.filter(status_normalized__icontains=filters['status'])
+                if 'year' in filters:
+                    queryset = queryset.filter(institution_year=filters['year'])
                 if 'date_from' in filters:
                     queryset = queryset.filter(institution_date__gte=filters['date_from'])
                 if 'date_to' in filters:
@@ -663,6 +665,8 @@ class BM25IndexingService:
                 queryset = queryset.filter(court_normalized__icontains=filters['court'])
             if 'status' in filters:
                 queryset = queryset.filter(status_normalized__icontains=filters['status'])
+            if 'year' in filters:
+                queryset = queryset.filter(institution_year=filters['year'])
             if 'date_from' in filters:
                 queryset = queryset.filter(institution_date__gte=filters['date_from'])
             if 'date_to' in filters:
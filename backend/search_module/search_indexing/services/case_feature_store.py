@@ -0,0 +1,427 @@
+"""
+Case Feature Store
+Read-only columnar copy of the case and search profile fields used by the rankers
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+# Same ordering as AdvancedReranker.court_hierarchy: the first match wins
+COURT_AUTHORITY = (
+    ('supreme court', 1.0),
+    ('high court', 0.8),
+    ('district court', 0.6),
+    ('sessions court', 0.4),
+    ('magistrate', 0.3),
+    ('tribunal', 0.5),
+)
+
+# Profile list fields, and metadata list fields, stored as token id ranges
+PROFILE_LIST_FIELDS = ('party_tokens', 'subject_tags', 'section_tags', 'case_number_tokens', 'keyword_highlights')
+METADATA_LIST_FIELDS = ('subject_labels', 'section_headers')
+
+CASE_FIELDS = (
+    'id', 'case_number', 'case_title', 'status', 'institution_date', 'hearing_date', 'institution_date_normalized',
+    'court_id', 'court__name',
+    'search_profile__id', 'search_profile__clean_case_title', 'search_profile__summary_text',
+    'search_profile__metadata',
+) + tuple(f'search_profile__{field}' for field in PROFILE_LIST_FIELDS)
+
+
+def court_authority(court_name: Optional[str]) -> float:
+    """Authority weight of a court from its name, 0.0 when unknown"""
+    court_lower = (court_name or '').lower()
+    for court_type, score in COURT_AUTHORITY:
+        if court_type in court_lower:
+            return score
+    return 0.0
+
+
+def parse_institution_date(value: Any) -> Tuple[int, int]:
+    """
+    Ordinal and year of an institution date: the cleaner's parsed date, or
+    a ``dd-mm-YYYY`` string for cases it hasn't normalized yet.
+
+    Returns:
+        (ordinal, year); ordinal is 0 when the date is missing and -1 when it
+        cannot be parsed, and year is 0 in both cases
+    """
+    if not value:
+        return 0, 0
+    if isinstance(value, date):
+        return value.toordinal(), value.year
+    try:
+        parsed = datetime.strptime(value, '%d-%m-%Y').date()
+    except (ValueError, TypeError):
+        return -1, 0
+    return parsed.toordinal(), parsed.year
+
+
+class _TokenColumn:
+    """Variable-length string lists as CSR offsets into a shared vocabulary"""
+
+    __slots__ = ('offsets', 'token_ids')
+
+    def __init__(self, offsets: np.ndarray, token_ids: np.ndarray):
+        self.offsets = offsets
+        self.token_ids = token_ids
+
+    def get(self, row: int, vocab: Tuple[str, ...]) -> List[str]:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return [vocab[token_id] for token_id in self.token_ids[start:end]]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.offsets.nbytes + self.token_ids.nbytes)
+
+
+class _FeatureColumns:
+    """One immutable snapshot of the store; replaced wholesale on refresh"""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.case_ids = np.zeros(0, dtype=np.int64)
+        self.has_profile = np.zeros(0, dtype=bool)
+        self.court_codes = np.zeros(0, dtype=np.int32)      # -1 = no court
+        self.status_codes = np.zeros(0, dtype=np.int32)     # -1 = no status; codes are case-insensitive
+        self.institution_ordinal = np.zeros(0, dtype=np.int32)
+        self.institution_year = np.zeros(0, dtype=np.int16)
+        self.authority = np.zeros(0, dtype=np.float32)
+        self.courts: Tuple[Tuple[int, str], ...] = ()
+        self.statuses: Tuple[str, ...] = ()
+        self.vocab: Tuple[str, ...] = ()
+        self.token_columns: Dict[str, _TokenColumn] = {}
+        self.text_columns: Dict[str, List[str]] = {}
+
+    def row(self, case_id: Any) -> int:
+        try:
+            case_id = int(case_id)
+        except (TypeError, ValueError):
+            return -1
+        position = int(np.searchsorted(self.case_ids, case_id))
+        if position < len(self.case_ids) and self.case_ids[position] == case_id:
+            return position
+        return -1
+
+    def rows(self, case_ids: Iterable[Any]) -> np.ndarray:
+        ids = np.fromiter((_as_int(case_id) for case_id in case_ids), dtype=np.int64)
+        if not len(self.case_ids) or not len(ids):
+            return np.full(len(ids), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.case_ids, ids), len(self.case_ids) - 1)
+        return np.where(self.case_ids[positions] == ids, positions, -1)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.case_ids, self.has_profile, self.court_codes, self.status_codes,
+                  self.institution_ordinal, self.institution_year, self.authority)
+        return int(sum(array.nbytes for array in arrays)
+                   + sum(column.nbytes for column in self.token_columns.values()))
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+class CaseFeatureStore:
+    """
+    Preloaded, read-only features of every case for the ranking stages.
+
+    LearnedReranker, AdvancedReranker and AdvancedRankingService used to
+    fetch CaseSearchProfile (and Case) rows per result while ranking. The
+    store loads them once into arrays indexed by case id - token lists as
+    ids into an interned vocabulary, court and status as integer codes,
+    dates as ordinals - and reloads when the index version changes, so
+    ranking itself issues no database queries.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_FEATURE_STORE_ENABLED', True),
+            'chunk_size': getattr(settings, 'SEARCH_FEATURE_STORE_CHUNK_SIZE', 2000),
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._columns: Optional[_FeatureColumns] = None
+        self._attempted_version: Optional[int] = None
+        self._load_lock = threading.Lock()
+        self._stats = {'loads': 0, 'load_errors': 0, 'last_load_ms': 0.0}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._columns is not None
+
+    def ensure_loaded(self) -> bool:
+        """
+        Make sure the store reflects the current index version.
+
+        While a reload is in progress other threads keep reading the
+        previous snapshot; only the very first load blocks them.
+
+        Returns:
+            True if features are available, False if the store is disabled
+            or could not be loaded (callers then query the database)
+        """
+        if not self.default_config['enabled']:
+            return False
+
+        columns = self._columns
+        version = get_index_version()
+        if version == self._attempted_version and (columns is None or columns.version != version):
+            # Loading this version already failed; don't retry on every request
+            return columns is not None
+        if columns is not None and columns.version == version:
+            return True
+
+        if columns is not None:
+            if not self._load_lock.acquire(blocking=False):
+                return True
+        else:
+            self._load_lock.acquire()
+        try:
+            if self._columns is None or self._columns.version != version:
+                self._attempted_version = version
+                self._load(version)
+        finally:
+            self._load_lock.release()
+        return self._columns is not None
+
+    def refresh(self) -> bool:
+        """Reload from the database regardless of the index version"""
+        with self._load_lock:
+            version = get_index_version(force_refresh=True)
+            self._attempted_version = version
+            self._load(version)
+        return self._columns is not None
+
+    def get_profile(self, case_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Search profile of a case in the shape the rankers serialize it to,
+        or None if the case has no profile.
+        """
+        columns = self._columns
+        if columns is None:
+            return None
+        row = columns.row(case_id)
+        if row < 0 or not columns.has_profile[row]:
+            return None
+
+        vocab = columns.vocab
+        profile = {field: columns.token_columns[field].get(row, vocab) for field in PROFILE_LIST_FIELDS}
+        profile['clean_case_title'] = columns.text_columns['clean_case_title'][row]
+        profile['summary_text'] = columns.text_columns['summary_text'][row]
+        metadata = {field: columns.token_columns[field].get(row, vocab) for field in METADATA_LIST_FIELDS}
+        abstract = columns.text_columns['abstract_text'][row]
+        if abstract:
+            metadata['abstract_text'] = abstract
+        profile['metadata'] = metadata
+        return profile
+
+    def get_case(self, case_id: Any) -> Optional[Dict[str, Any]]:
+        """Case fields used by the rankers, or None for an unknown case"""
+        columns = self._columns
+        if columns is None:
+            return None
+        row = columns.row(case_id)
+        if row < 0:
+            return None
+
+        court_code = columns.court_codes[row]
+        court_id, court_name = columns.courts[court_code] if court_code >= 0 else (None, None)
+        ordinal = int(columns.institution_ordinal[row])
+        text = columns.text_columns
+        return {
+            'case_id': int(columns.case_ids[row]),
+            'case_number': text['case_number'][row],
+            'case_title': text['case_title'][row],
+            'status': text['status'][row],
+            'institution_date': text['institution_date'][row],
+            'hearing_date': text['hearing_date'][row],
+            'institution_date_normalized': date.fromordinal(ordinal) if ordinal > 0 else None,
+            'institution_year': int(columns.institution_year[row]),
+            'court_id': court_id,
+            'court': court_name,
+            'authority': float(columns.authority[row]),
+        }
+
+    def rows(self, case_ids: Iterable[Any]) -> np.ndarray:
+        """Row index of each case id in the column arrays, -1 where missing"""
+        columns = self._columns
+        if columns is None:
+            return np.full(len(list(case_ids)), -1, dtype=np.int64)
+        return columns.rows(case_ids)
+
+    def date_mask(self, case_ids: Iterable[Any], date_from: Optional[date] = None,
+                  date_to: Optional[date] = None) -> Optional[np.ndarray]:
+        """
+        Whether each case was instituted within ``[date_from, date_to]``
+
+        Returns:
+            Boolean mask (False for unknown cases and missing dates), or None
+            when the store isn't loaded
+        """
+        columns = self._columns
+        if columns is None:
+            return None
+        rows = columns.rows(case_ids)
+        if not len(columns.case_ids):
+            return np.zeros(len(rows), dtype=bool)
+        ordinals = np.where(rows >= 0, columns.institution_ordinal[np.maximum(rows, 0)], 0)
+        mask = ordinals > 0
+        if date_from:
+            mask &= ordinals >= date_from.toordinal()
+        if date_to:
+            mask &= ordinals <= date_to.toordinal()
+        return mask
+
+    @property
+    def columns(self) -> Optional[_FeatureColumns]:
+        """Current snapshot, for vectorized access together with ``rows``"""
+        return self._columns
+
+    def get_stats(self) -> Dict[str, Any]:
+        columns = self._columns
+        stats = dict(self._stats)
+        stats.update({
+            'enabled': self.default_config['enabled'],
+            'loaded': columns is not None,
+            'version': columns.version if columns else None,
+            'cases': int(len(columns.case_ids)) if columns else 0,
+            'profiles': int(columns.has_profile.sum()) if columns else 0,
+            'vocab_size': len(columns.vocab) if columns else 0,
+            'array_bytes': columns.nbytes if columns else 0,
+        })
+        return stats
+
+    def _load(self, version: int) -> None:
+        # Called with the load lock held
+        from apps.cases.models import Case
+
+        start_time = time.time()
+        try:
+            rows = (
+                Case.objects.order_by('id')
+                .values_list(*CASE_FIELDS)
+                .iterator(chunk_size=self.default_config['chunk_size'])
+            )
+            columns = self._build_columns(rows, version)
+        except Exception as e:
+            self._stats['load_errors'] += 1
+            logger.error(f"Error loading case feature store: {str(e)}")
+            return
+
+        self._columns = columns
+        self._stats['loads'] += 1
+        self._stats['last_load_ms'] = round((time.time() - start_time) * 1000, 2)
+        logger.info(
+            f"Case feature store loaded {len(columns.case_ids)} cases "
+            f"(index version {version}) in {self._stats['last_load_ms']} ms"
+        )
+
+    def _build_columns(self, rows: Iterable[tuple], version: int) -> _FeatureColumns:
+        """Build a snapshot from ``CASE_FIELDS`` tuples ordered by case id"""
+        vocab: Dict[str, int] = {}
+        courts: Dict[Any, int] = {}
+        statuses: Dict[str, int] = {}
+        token_fields = PROFILE_LIST_FIELDS + METADATA_LIST_FIELDS
+        offsets = {field: [0] for field in token_fields}
+        token_ids = {field: [] for field in token_fields}
+        text_fields = ('case_number', 'case_title', 'status', 'institution_date', 'hearing_date',
+                       'clean_case_title', 'summary_text', 'abstract_text')
+        text = {field: [] for field in text_fields}
+        case_ids, has_profile, court_codes, status_codes = [], [], [], []
+        ordinals, years, authority = [], [], []
+
+        def add_tokens(field: str, values: Any) -> None:
+            ids = token_ids[field]
+            for value in values or []:
+                if isinstance(value, str) and value:
+                    ids.append(vocab.setdefault(value, len(vocab)))
+            offsets[field].append(len(ids))
+
+        for row in rows:
+            (case_id, case_number, case_title, status, institution_date, hearing_date, institution_date_normalized,
+             court_id, court_name, profile_id, clean_case_title, summary_text, metadata, *profile_lists) = row
+
+            case_ids.append(case_id)
+            text['case_number'].append(case_number or '')
+            text['case_title'].append(case_title or '')
+            text['status'].append(status or '')
+            text['institution_date'].append(institution_date or '')
+            text['hearing_date'].append(hearing_date or '')
+
+            court_codes.append(courts.setdefault((court_id, court_name), len(courts)) if court_id else -1)
+            authority.append(court_authority(court_name))
+            status_key = (status or '').lower()
+            status_codes.append(statuses.setdefault(status_key, len(statuses)) if status_key else -1)
+            ordinal, year = parse_institution_date(institution_date_normalized or institution_date)
+            ordinals.append(ordinal)
+            years.append(year)
+
+            has_profile.append(profile_id is not None)
+            metadata = metadata if isinstance(metadata, dict) else {}
+            for field, values in zip(PROFILE_LIST_FIELDS, profile_lists):
+                add_tokens(field, values)
+            for field in METADATA_LIST_FIELDS:
+                add_tokens(field, metadata.get(field))
+            text['clean_case_title'].append(clean_case_title or '')
+            text['summary_text'].append(summary_text or '')
+            abstract = metadata.get('abstract_text')
+            if not abstract and metadata.get('abstract_sentences'):
+                abstract = " ".join(metadata['abstract_sentences'])
+            text['abstract_text'].append(abstract or '')
+
+        columns = _FeatureColumns(version)
+        columns.case_ids = np.asarray(case_ids, dtype=np.int64)
+        columns.has_profile = np.asarray(has_profile, dtype=bool)
+        columns.court_codes = np.asarray(court_codes, dtype=np.int32)
+        columns.status_codes = np.asarray(status_codes, dtype=np.int32)
+        columns.institution_ordinal = np.asarray(ordinals, dtype=np.int32)
+        columns.institution_year = np.asarray(years, dtype=np.int16)
+        columns.authority = np.asarray(authority, dtype=np.float32)
+        columns.courts = tuple(courts)
+        columns.statuses = tuple(statuses)
+        columns.vocab = tuple(vocab)
+        columns.token_columns = {
+            field: _TokenColumn(np.asarray(offsets[field], dtype=np.int64), np.asarray(token_ids[field], dtype=np.int32))
+            for field in token_fields
+        }
+        columns.text_columns = text
+
+        # Lookups binary-search the ids, so they must be strictly increasing
+        if len(columns.case_ids) > 1 and np.any(np.diff(columns.case_ids) <= 0):
+            raise ValueError("case feature rows must be ordered by unique case id")
+        return columns
+
+
+_feature_store: Optional[CaseFeatureStore] = None
+_feature_store_lock = threading.Lock()
+
+
+def get_case_feature_store() -> CaseFeatureStore:
+    """Return the process-wide case feature store shared by the rankers"""
+    global _feature_store
+
+    if _feature_store is None:
+        with _feature_store_lock:
+            if _feature_store is None:
+                _feature_store = CaseFeatureStore()
+    return _feature_store
@@ -0,0 +1,393 @@
+"""
+Completion Index
+In-memory prefix index with precomputed popularity ranking for typeahead suggestions
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .index_version import get_index_version
+from .static_priors import get_static_priors
+
+logger = logging.getLogger(__name__)
+
+COMPLETION_TYPES = ('case', 'party', 'citation', 'section', 'judge')
+
+NON_WORD = re.compile(r'[^0-9a-z]+')
+
+# Tokens that never start a completion key ("ali vs state" is found by "ali" and "state")
+SKIP_TOKENS = frozenset({'v', 'vs', 'versus', 'the', 'of', 'and'})
+
+# Term types that are not citations
+NON_CITATION_TERMS = ('petitioner', 'party', 'advocate')
+
+
+def normalize_completion(text: str) -> str:
+    """Lowercase alphanumeric tokens separated by single spaces ("Crl.A-12/2020" -> "crl a 12 2020")"""
+    return NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def completion_keys(text: str, max_tokens: int = 8, max_chars: int = 64) -> List[str]:
+    """
+    Keys of a completion text: its normalized form and its suffixes starting
+    at each of the first ``max_tokens`` tokens, so a prefix of any word
+    boundary completes it.
+    """
+    normalized = normalize_completion(text)
+    if not normalized:
+        return []
+
+    keys = []
+    position = 0
+    for index, token in enumerate(normalized.split(' ')):
+        if index >= max_tokens:
+            break
+        if index == 0 or token not in SKIP_TOKENS:
+            keys.append(normalized[position:position + max_chars])
+        position += len(token) + 1
+    return keys
+
+
+@dataclass
+class _CompletionTable:
+    """
+    Sorted completion keys of one suggestion type.
+
+    Every trie node is a contiguous range of the sorted keys, so the trie
+    is implicit: a prefix lookup is two binary searches. ``ranks`` holds the
+    popularity rank of each key's entry (entries are numbered best first),
+    making a node's top-k the k smallest distinct ranks in its range.
+    Nodes spanning more than ``heavy_threshold`` keys, the short prefixes,
+    carry their top-k precomputed.
+    """
+    keys: List[str]
+    ranks: np.ndarray                 # int32, aligned with keys
+    entries: List[Dict[str, Any]]     # by rank
+    heavy: Dict[str, np.ndarray]      # prefix -> top ranks
+
+    def top(self, prefix: str, limit: int, heavy_threshold: int) -> List[Dict[str, Any]]:
+        low = bisect_left(self.keys, prefix)
+        high = bisect_left(self.keys, prefix + '\uffff', low)
+        if high <= low:
+            return []
+
+        if high - low > heavy_threshold and prefix in self.heavy:
+            ranks = self.heavy[prefix]
+        else:
+            ranks = np.unique(self.ranks[low:high])
+        return [self.entries[rank] for rank in ranks[:limit].tolist()]
+
+
+def build_table(entries: Iterable[Tuple[Tuple, Dict[str, Any], List[str]]],
+                top_k: int = 10,
+                heavy_threshold: int = 1024,
+                max_tokens: int = 8) -> _CompletionTable:
+    """
+    Completion table of ``(sort_key, entry, texts)`` items; entries with a
+    smaller sort key rank first and are completed from each of their texts.
+    """
+    ordered = sorted(entries, key=lambda item: item[0])
+
+    pairs = set()
+    for rank, (_, _, texts) in enumerate(ordered):
+        for text in texts:
+            for key in completion_keys(text, max_tokens):
+                pairs.add((key, rank))
+    pairs = sorted(pairs)
+
+    keys = [key for key, _ in pairs]
+    ranks = np.fromiter((rank for _, rank in pairs), dtype=np.int32, count=len(pairs))
+
+    # Top-k of the nodes too large to rank per request, level by level
+    heavy: Dict[str, np.ndarray] = {}
+    ranges = [(0, len(keys))] if len(keys) > heavy_threshold else []
+    depth = 0
+    while ranges:
+        depth += 1
+        next_ranges = []
+        for low, high in ranges:
+            start = low
+            while start < high:
+                prefix = keys[start][:depth]
+                end = bisect_left(keys, prefix + '\uffff', start, high)
+                # Keys equal to the prefix sort first; only longer keys branch further
+                if end - start > heavy_threshold:
+                    heavy[prefix] = np.unique(ranks[start:end])[:top_k]
+                    if len(keys[end - 1]) > depth:
+                        next_ranges.append((start, end))
+                start = end
+        ranges = next_ranges
+
+    return _CompletionTable(
+        keys=keys,
+        ranks=ranks,
+        entries=[entry for _, entry, _ in ordered],
+        heavy=heavy,
+    )
+
+
+class CompletionIndex:
+    """
+    Typeahead index over case numbers and titles, party names, statute
+    sections, citations and judges.
+
+    Each suggestion type gets a table of normalized keys (every word
+    boundary of a text starts a key) with entries ranked by a precomputed
+    popularity weight: static priors and recency for cases, occurrence
+    counts for terms and case counts for parties and judges. A keystroke
+    is a binary search plus, for short prefixes, a precomputed top-k, so
+    suggestions don't scan tables.
+
+    The index is built in a background thread on first use and rebuilt
+    after an index build or every ``refresh_interval`` seconds; callers fall
+    back to database lookups while nothing is loaded.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_SUGGEST_INDEX_ENABLED', True),
+            'refresh_interval': getattr(settings, 'SEARCH_SUGGEST_REFRESH_SECONDS', 300),
+            'chunk_size': getattr(settings, 'SEARCH_FEATURE_STORE_CHUNK_SIZE', 2000),
+            'top_k': 10,
+            'heavy_threshold': 1024,  # keys per node above which top-k is precomputed
+            'max_tokens': 8,          # word boundaries completed per text
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._tables: Optional[Dict[str, _CompletionTable]] = None
+        self._version: Optional[int] = None
+        self._attempted_version: Optional[int] = None
+        self._built_at = 0.0
+        self._building = False
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'lookups': 0, 'errors': 0, 'build_time_ms': 0.0}
+
+    def ensure_fresh(self) -> bool:
+        """
+        Start a background (re)build when nothing is loaded, after an index
+        build or once ``refresh_interval`` has passed.
+
+        Returns:
+            True if suggestions can be served from memory
+        """
+        if not self.default_config['enabled']:
+            return False
+
+        version = get_index_version()
+        stale = (
+            self._attempted_version != version
+            or time.time() - self._built_at >= self.default_config['refresh_interval']
+        )
+        if stale:
+            with self._lock:
+                if not self._building:
+                    self._building = True
+                    self._attempted_version = version
+                    threading.Thread(target=self._build_in_background, name='completion-index', daemon=True).start()
+        return self._tables is not None
+
+    def suggest(self, suggestion_type: str, query: str, limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Best entries of a type completing ``query``
+
+        Returns:
+            Suggestion dicts (copies), or None when the index is not loaded
+        """
+        if not self.ensure_fresh():
+            return None
+        table = self._tables.get(suggestion_type)
+        if table is None:
+            return None
+
+        prefix = normalize_completion(query)[:64]
+        if not prefix:
+            return []
+        with self._lock:
+            self._stats['lookups'] += 1
+        return [dict(entry) for entry in table.top(prefix, limit, self.default_config['heavy_threshold'])]
+
+    def build(self) -> Dict[str, Any]:
+        """Build every table from the database and swap them in"""
+        start_time = time.time()
+        stats = {'built': False, 'entries': {}, 'keys': {}, 'errors': []}
+        try:
+            version = get_index_version()
+            tables = {
+                suggestion_type: self._table(items)
+                for suggestion_type, items in (
+                    ('case', self._case_entries()),
+                    ('party', self._party_entries()),
+                    ('citation', self._term_entries('citation')),
+                    ('section', self._term_entries('section')),
+                    ('judge', self._judge_entries()),
+                )
+            }
+            self.load_tables(tables, version)
+            stats['built'] = True
+            stats['entries'] = {name: len(table.entries) for name, table in tables.items()}
+            stats['keys'] = {name: len(table.keys) for name, table in tables.items()}
+        except Exception as e:
+            error_msg = f"Error building completion index: {str(e)}"
+            logger.error(error_msg)
+            stats['errors'].append(error_msg)
+            self._stats['errors'] += 1
+
+        stats['processing_time'] = time.time() - start_time
+        self._stats['build_time_ms'] = round(stats['processing_time'] * 1000, 1)
+        return stats
+
+    def load_tables(self, tables: Dict[str, _CompletionTable], version: Optional[int] = None) -> None:
+        """Swap in built tables"""
+        self._tables = tables
+        self._version = get_index_version() if version is None else version
+        self._attempted_version = self._version
+        self._built_at = time.time()
+        self._stats['builds'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        tables = self._tables
+        stats = dict(self._stats)
+        stats.update({
+            'enabled': self.default_config['enabled'],
+            'loaded': tables is not None,
+            'version': self._version,
+            'building': self._building,
+            'entries': {name: len(table.entries) for name, table in tables.items()} if tables else {},
+            'keys': {name: len(table.keys) for name, table in tables.items()} if tables else {},
+            'heavy_nodes': sum(len(table.heavy) for table in tables.values()) if tables else 0,
+        })
+        return stats
+
+    def _build_in_background(self) -> None:
+        try:
+            self.build()
+        finally:
+            # The build thread exits here; release the connection it opened
+            connection.close()
+            with self._lock:
+                self._building = False
+            # Failed builds are retried after the refresh interval
+            self._built_at = time.time()
+
+    def _table(self, items) -> _CompletionTable:
+        return build_table(
+            items,
+            top_k=self.default_config['top_k'],
+            heavy_threshold=self.default_config['heavy_threshold'],
+            max_tokens=self.default_config['max_tokens'],
+        )
+
+    def _case_entries(self):
+        from apps.cases.models import Case
+
+        rows = list(
+            Case.objects.exclude(case_number__isnull=True).exclude(case_number='')
+            .order_by('id').values_list('id', 'case_number', 'case_title')
+            .iterator(chunk_size=self.default_config['chunk_size'])
+        )
+
+        # Weight: authority and precedential priors, then newest first
+        priors = get_static_priors().get_many([case_id for case_id, _, _ in rows])
+        for (case_id, case_number, case_title), prior in zip(rows, priors):
+            weight = prior['authority'] + prior['precedential_value'] if prior else 0.0
+            yield (
+                (-weight, -case_id),
+                {
+                    'value': case_number,
+                    'type': 'case',
+                    'canonical_key': case_number,
+                    'additional_info': case_title[:100] if case_title else ''
+                },
+                [case_number, case_title or '']
+            )
+
+    def _party_entries(self):
+        from django.db.models import Count
+        from apps.cases.models import PartiesDetailData
+
+        parties = (
+            PartiesDetailData.objects.exclude(party_name__isnull=True).exclude(party_name='')
+            .values('party_name').annotate(count=Count('case', distinct=True))
+        )
+        for party in parties:
+            yield (
+                (-party['count'], party['party_name']),
+                {
+                    'value': party['party_name'],
+                    'type': 'party',
+                    'canonical_key': party['party_name'],
+                    'additional_info': f"Party in {party['count']} cases"
+                },
+                [party['party_name']]
+            )
+
+    def _term_entries(self, suggestion_type: str):
+        from apps.cases.models import Term
+
+        terms = Term.objects.all()
+        if suggestion_type == 'section':
+            terms = terms.filter(type='section')
+        else:
+            terms = terms.exclude(type__in=NON_CITATION_TERMS)
+
+        for canonical, occurrence_count in terms.values_list('canonical', 'occurrence_count'):
+            yield (
+                (-occurrence_count, canonical),
+                {
+                    'value': canonical,
+                    'type': suggestion_type,
+                    'canonical_key': canonical,
+                    'additional_info': f"Found in {occurrence_count} cases"
+                },
+                [canonical]
+            )
+
+    def _judge_entries(self):
+        from django.db.models import Count
+        from apps.cases.models import Case
+
+        benches = (
+            Case.objects.exclude(bench__isnull=True).exclude(bench='')
+            .values('bench').annotate(count=Count('id'))
+        )
+        for bench in benches:
+            yield (
+                (-bench['count'], bench['bench']),
+                {
+                    'value': bench['bench'],
+                    'type': 'judge',
+                    'canonical_key': bench['bench'],
+                    'additional_info': f"Presided over {bench['count']} cases"
+                },
+                [bench['bench']]
+            )
+
+
+_completion_index: Optional[CompletionIndex] = None
+_completion_index_lock = threading.Lock()
+
+
+def get_completion_index() -> CompletionIndex:
+    """Return the process-wide completion index"""
+    global _completion_index
+
+    if _completion_index is None:
+        with _completion_index_lock:
+            if _completion_index is None:
+                _completion_index = CompletionIndex()
+    return _completion_index
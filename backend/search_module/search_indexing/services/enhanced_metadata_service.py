@@ -682,17 +682,18 @@ class EnhancedMetadataService:
         # Recent cases get boost
         if case.institution_date:
             try:
-                # Simple year extraction
-                year_match = re.search(r'\b(20\d{2})\b', case.institution_date)
-                if year_match:
-                    year = int(year_match.group())
-                    if year >= 2020:
-                        boosters.append({
-                            'type': 'recency',
-                            'factor': 'recent_case',
-                            'boost': 1.2,
-                            'reason': f'Case from {year}'
-                        })
+                # Parsed year from the cleaner, else simple year extraction
+                year = case.institution_year
+                if not year:
+                    year_match = re.search(r'\b(20\d{2})\b', case.institution_date)
+                    year = int(year_match.group()) if year_match else None
+                if year and year >= 2020:
+                    boosters.append({
+                        'type': 'recency',
+                        'factor': 'recent_case',
+                        'boost': 1.2,
+                        'reason': f'Case from {year}'
+                    })
             except:
                 pass
         
@@ -0,0 +1,443 @@
+"""
+Facet Engine
+In-memory facet counting over the case id space
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+FACETS = ('court', 'status', 'year', 'case_type')
+
+UNKNOWN = 'Unknown'
+YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+
+CASE_FIELDS = ('id', 'court_id', 'status', 'institution_date', 'institution_year', 'updated_at')
+
+
+def extract_year(date_value) -> str:
+    """Year of a date value, handling both datetime and string formats"""
+    if not date_value:
+        return UNKNOWN
+
+    try:
+        # If it's already a datetime object
+        if hasattr(date_value, 'year'):
+            return str(date_value.year)
+
+        # If it's a string, try to parse it
+        if isinstance(date_value, str):
+            for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%m/%d/%Y']:
+                try:
+                    return str(datetime.strptime(date_value, fmt).year)
+                except ValueError:
+                    continue
+
+            # If all parsing fails, try to extract year from string
+            year_match = YEAR_PATTERN.search(date_value)
+            if year_match:
+                return year_match.group()
+
+        return UNKNOWN
+    except Exception:
+        return UNKNOWN
+
+
+def _facet_values(court_id: Optional[int], status: Optional[str], institution_date: Optional[str],
+                  institution_year: Optional[int] = None) -> Dict[str, Any]:
+    """Facet value of each facet for one case (None = no value)"""
+    return {
+        'court': court_id,
+        'status': status or None,
+        # The cleaner's parsed year; cases it hasn't normalized yet parse the string
+        'year': str(institution_year) if institution_year else extract_year(institution_date),
+        'case_type': status or UNKNOWN,
+    }
+
+
+class _FacetColumn:
+    """
+    Value codes of one facet, one per case row.
+
+    A single-valued facet's per-value bitmaps are the level sets of this
+    column (``codes == code``), so one int32 array stands in for all of
+    them: selections become ``np.isin`` masks and counting every value of
+    a result set is a single ``bincount``.
+    """
+
+    __slots__ = ('codes', 'values', 'lookup')
+
+    def __init__(self, codes: np.ndarray, values: List[Any]):
+        self.codes = codes
+        self.values = values
+        self.lookup = {value: code for code, value in enumerate(values)}
+
+    def copy(self) -> '_FacetColumn':
+        return _FacetColumn(self.codes.copy(), list(self.values))
+
+    def code(self, value: Any) -> int:
+        """Code of a value, adding it to the dictionary when new (None = -1)"""
+        if value is None:
+            return -1
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.lookup[value] = code
+        return code
+
+
+@dataclass
+class _FacetSnapshot:
+    """Immutable view served to readers; refreshes build a new one"""
+    version: int
+    case_ids: np.ndarray           # sorted
+    columns: Dict[str, _FacetColumn]
+    courts: Dict[int, str]         # court id -> name
+    watermark: Optional[datetime]  # latest Case.updated_at seen
+    loaded_at: float
+
+    def rows(self, case_ids: Iterable[Any]) -> np.ndarray:
+        """Row of each known case id (unknown ids are dropped)"""
+        ids = np.fromiter((_as_int(case_id) for case_id in case_ids), dtype=np.int64)
+        if not len(ids) or not len(self.case_ids):
+            return np.empty(0, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.case_ids, ids), len(self.case_ids) - 1)
+        return positions[self.case_ids[positions] == ids]
+
+
+class FacetEngine:
+    """
+    Facet counts from in-memory value columns instead of per-request
+    ``values().annotate(Count)`` queries.
+
+    The engine loads the court, status and institution year of every case
+    once (years are parsed at load time), then counts a result set's facets
+    by intersecting it with the value columns. Selections are applied
+    disjunctively: each facet is counted over the cases matching the
+    selections of every *other* facet, so several values of one facet can
+    be selected at once and the counts of the alternatives stay visible.
+
+    ``refresh`` applies the cases changed since the last load (by
+    ``Case.updated_at``) to a copy of the columns; deletions and index
+    rebuilds trigger a full reload. Requests refresh at most every
+    ``refresh_interval`` seconds, so facet latency does not depend on the
+    database.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_FACET_ENGINE_ENABLED', True),
+            'refresh_interval': getattr(settings, 'SEARCH_FACET_REFRESH_SECONDS', 30),
+            'chunk_size': getattr(settings, 'SEARCH_FEATURE_STORE_CHUNK_SIZE', 2000),
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._snapshot: Optional[_FacetSnapshot] = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'refreshes': 0, 'refreshed_cases': 0, 'errors': 0, 'counts': 0}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def ensure_fresh(self) -> bool:
+        """
+        Load on first use, reload after an index build and apply case
+        changes once ``refresh_interval`` has passed. While a refresh runs,
+        other threads keep counting on the previous snapshot.
+
+        Returns:
+            True if facets can be counted in memory
+        """
+        if not self.default_config['enabled']:
+            return False
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            stale = time.time() - snapshot.loaded_at >= self.default_config['refresh_interval']
+            if snapshot.version == get_index_version() and not stale:
+                return True
+            if not self._lock.acquire(blocking=False):
+                return True
+        elif time.time() - self._failed_at < self.default_config['refresh_interval']:
+            # Loading failed recently; don't retry on every request
+            return False
+        else:
+            self._lock.acquire()
+
+        try:
+            snapshot = self._snapshot
+            version = get_index_version()
+            if snapshot is None or snapshot.version != version:
+                self._load(version)
+            elif time.time() - snapshot.loaded_at >= self.default_config['refresh_interval']:
+                self._refresh(snapshot)
+        finally:
+            self._lock.release()
+        return self._snapshot is not None
+
+    def refresh(self) -> bool:
+        """Apply case changes now (full load if nothing is loaded yet)"""
+        with self._lock:
+            if self._snapshot is None:
+                self._load(get_index_version())
+            else:
+                self._refresh(self._snapshot)
+        return self._snapshot is not None
+
+    def count(self,
+              case_ids: Optional[Sequence[Any]] = None,
+              selections: Optional[Dict[str, Any]] = None,
+              max_values: int = 50,
+              min_count: int = 1) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Facet counts of a case set
+
+        Args:
+            case_ids: Cases to count (e.g. a result set); None counts every case
+            selections: Selected values per facet; a value or a list of values
+                (courts by id or name; names and statuses match case-insensitively
+                by substring)
+            max_values: Maximum values returned per facet
+            min_count: Minimum count of a returned value
+
+        Returns:
+            Facet lists of ``{'value', 'count', 'selected'}``, or None when the
+            engine is not loaded
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+
+        if case_ids is None:
+            base = np.ones(len(snapshot.case_ids), dtype=bool)
+        else:
+            base = np.zeros(len(snapshot.case_ids), dtype=bool)
+            base[snapshot.rows(case_ids)] = True
+        selected_codes = {
+            facet: self._selected_codes(snapshot, facet, values)
+            for facet, values in (selections or {}).items()
+            if facet in FACETS and values not in (None, '', [])
+        }
+        # A selection matching no value constrains nothing (the retrieval
+        # filters have already narrowed the result set)
+        masks = {
+            facet: np.isin(snapshot.columns[facet].codes, codes)
+            for facet, codes in selected_codes.items()
+            if codes
+        }
+
+        facets = {}
+        for facet in FACETS:
+            # Disjunctive counting: every selection except this facet's own
+            mask = base.copy()
+            for other, other_mask in masks.items():
+                if other != facet:
+                    mask &= other_mask
+            column = snapshot.columns[facet]
+            codes = column.codes[mask]
+            counts = np.bincount(codes[codes >= 0], minlength=len(column.values))
+            facets[facet] = self._format(snapshot, facet, counts, selected_codes.get(facet, ()), max_values, min_count)
+
+        self._stats['counts'] += 1
+        return facets
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        stats = dict(self._stats)
+        stats.update({
+            'enabled': self.default_config['enabled'],
+            'loaded': snapshot is not None,
+            'version': snapshot.version if snapshot else None,
+            'cases': int(len(snapshot.case_ids)) if snapshot else 0,
+            'values': {facet: len(column.values) for facet, column in snapshot.columns.items()} if snapshot else {},
+            'array_bytes': int(
+                snapshot.case_ids.nbytes
+                + sum(column.codes.nbytes for column in snapshot.columns.values())
+            ) if snapshot else 0,
+        })
+        return stats
+
+    @staticmethod
+    def _selected_codes(snapshot: _FacetSnapshot, facet: str, values: Any) -> List[int]:
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+
+        # Matched like the keyword filters: court names and statuses by
+        # case-insensitive substring, years exactly
+        column = snapshot.columns[facet]
+        codes = set()
+        for value in values:
+            if facet == 'court' and isinstance(value, int):
+                matches = [value]
+            elif facet == 'court':
+                needle = str(value).casefold()
+                matches = [court_id for court_id, name in snapshot.courts.items() if needle in str(name).casefold()]
+            elif facet == 'year':
+                matches = [str(value)]
+            else:
+                needle = str(value).casefold()
+                matches = [candidate for candidate in column.values if needle in str(candidate).casefold()]
+            codes.update(column.lookup[match] for match in matches if match in column.lookup)
+        return sorted(codes)
+
+    @staticmethod
+    def _format(snapshot: _FacetSnapshot, facet: str, counts: np.ndarray, selected: Sequence[int],
+                max_values: int, min_count: int) -> List[Dict[str, Any]]:
+        column = snapshot.columns[facet]
+        selected = set(selected)
+        codes = [code for code in range(len(counts)) if counts[code] >= min_count or code in selected]
+
+        if facet == 'year':
+            # Newest first, unknown years last
+            codes.sort(key=lambda code: (column.values[code] == UNKNOWN, -int(column.values[code]) if column.values[code] != UNKNOWN else 0))
+        else:
+            codes.sort(key=lambda code: -int(counts[code]))
+
+        entries = []
+        for code in codes[:max_values]:
+            value = column.values[code]
+            if facet == 'court':
+                value = snapshot.courts.get(value, str(value))
+            entries.append({'value': value, 'count': int(counts[code]), 'selected': code in selected})
+        return entries
+
+    def _load(self, version: int) -> None:
+        # Called with the lock held
+        from apps.cases.models import Case, Court
+
+        start_time = time.time()
+        try:
+            courts = dict(Court.objects.values_list('id', 'name'))
+            rows = (
+                Case.objects.order_by('id')
+                .values_list(*CASE_FIELDS)
+                .iterator(chunk_size=self.default_config['chunk_size'])
+            )
+
+            self._snapshot = self._build(version, courts, rows)
+            self._stats['loads'] += 1
+            logger.info(f"Facet engine loaded {len(self._snapshot.case_ids)} cases in {(time.time() - start_time) * 1000:.1f} ms")
+        except Exception as e:
+            self._failed_at = time.time()
+            self._stats['errors'] += 1
+            logger.error(f"Error loading facet engine: {str(e)}")
+
+    @staticmethod
+    def _build(version: int, courts: Dict[int, str], rows: Iterable[tuple]) -> _FacetSnapshot:
+        """Snapshot of ``CASE_FIELDS`` rows in id order"""
+        case_ids = []
+        columns = {facet: _FacetColumn(np.empty(0, dtype=np.int32), []) for facet in FACETS}
+        codes = {facet: [] for facet in FACETS}
+        watermark = None
+        for case_id, court_id, status, institution_date, institution_year, updated_at in rows:
+            case_ids.append(case_id)
+            for facet, value in _facet_values(court_id, status, institution_date, institution_year).items():
+                codes[facet].append(columns[facet].code(value))
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+        for facet in FACETS:
+            columns[facet].codes = np.asarray(codes[facet], dtype=np.int32)
+        return _FacetSnapshot(
+            version=version,
+            case_ids=np.asarray(case_ids, dtype=np.int64),
+            columns=columns,
+            courts=courts,
+            watermark=watermark,
+            loaded_at=time.time(),
+        )
+
+    def _refresh(self, snapshot: _FacetSnapshot) -> None:
+        # Called with the lock held
+        from apps.cases.models import Case, Court
+
+        try:
+            changed = Case.objects.order_by('id').values_list(*CASE_FIELDS)
+            if snapshot.watermark is not None:
+                changed = changed.filter(updated_at__gt=snapshot.watermark)
+            changed = list(changed)
+            new_rows = [row for row in changed if not len(snapshot.rows([row[0]]))]
+
+            # Deleted cases leave no updated_at trail; fall back to a full load
+            if len(snapshot.case_ids) + len(new_rows) != Case.objects.count():
+                self._load(snapshot.version)
+                return
+
+            case_ids = snapshot.case_ids
+            columns = {facet: column.copy() for facet, column in snapshot.columns.items()}
+            watermark = snapshot.watermark
+
+            if new_rows:
+                case_ids = np.concatenate([case_ids, np.asarray([row[0] for row in new_rows], dtype=np.int64)])
+                for column in columns.values():
+                    column.codes = np.concatenate([column.codes, np.full(len(new_rows), -1, dtype=np.int32)])
+                if not np.all(case_ids[:-1] <= case_ids[1:]):
+                    order = np.argsort(case_ids, kind='stable')
+                    case_ids = case_ids[order]
+                    for column in columns.values():
+                        column.codes = column.codes[order]
+
+            rows = np.searchsorted(case_ids, [row[0] for row in changed])
+            for row, (case_id, court_id, status, institution_date, institution_year, updated_at) in zip(rows.tolist(), changed):
+                for facet, value in _facet_values(court_id, status, institution_date, institution_year).items():
+                    columns[facet].codes[row] = columns[facet].code(value)
+                if updated_at and (watermark is None or updated_at > watermark):
+                    watermark = updated_at
+
+            self._snapshot = _FacetSnapshot(
+                version=snapshot.version,
+                case_ids=case_ids,
+                columns=columns,
+                courts=dict(Court.objects.values_list('id', 'name')),
+                watermark=watermark,
+                loaded_at=time.time(),
+            )
+            self._stats['refreshes'] += 1
+            self._stats['refreshed_cases'] += len(changed)
+        except Exception as e:
+            # Keep serving the previous snapshot until the next interval
+            snapshot.loaded_at = time.time()
+            self._stats['errors'] += 1
+            logger.error(f"Error refreshing facet engine: {str(e)}")
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+_facet_engine: Optional[FacetEngine] = None
+_facet_engine_lock = threading.Lock()
+
+
+def get_facet_engine() -> FacetEngine:
+    """Return the process-wide facet engine"""
+    global _facet_engine
+
+    if _facet_engine is None:
+        with _facet_engine_lock:
+            if _facet_engine is None:
+                _facet_engine = FacetEngine()
+    return _facet_engine
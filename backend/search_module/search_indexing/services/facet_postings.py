@@ -0,0 +1,229 @@
+"""
+Facet Postings
+Delta-encoded case id postings of the facet indexes, kept in memory for facet search and filtering
+"""
+
+import logging
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+# magic, delta item size, term count, delta count
+HEADER = struct.Struct('<4sB3xQQ')
+MAGIC = b'FPX1'
+
+
+def encode_postings(term_mappings: Dict[str, Iterable[int]]) -> bytes:
+    """
+    Binary postings of ``term -> case ids``.
+
+    Layout (little endian, 8-byte aligned sections): header, first case id
+    per term (int64), delta offsets per term (int64, one extra), the gaps
+    between consecutive sorted case ids in the narrowest unsigned type that
+    holds the largest gap, then the NUL-separated UTF-8 terms. Terms without
+    cases are dropped.
+    """
+    terms = []
+    firsts = []
+    gaps = []
+    offsets = [0]
+    for term in sorted(term_mappings):
+        case_ids = np.unique(np.fromiter((int(case_id) for case_id in term_mappings[term]), dtype=np.int64))
+        if not len(case_ids):
+            continue
+        terms.append(term)
+        firsts.append(case_ids[0])
+        gaps.append(np.diff(case_ids))
+        offsets.append(offsets[-1] + len(case_ids) - 1)
+
+    deltas = np.concatenate(gaps) if gaps else np.empty(0, dtype=np.int64)
+    largest = int(deltas.max()) if len(deltas) else 0
+    dtype = next(dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64) if largest <= np.iinfo(dtype).max)
+
+    body = [
+        HEADER.pack(MAGIC, np.dtype(dtype).itemsize, len(terms), len(deltas)),
+        np.asarray(firsts, dtype='<i8').tobytes(),
+        np.asarray(offsets, dtype='<i8').tobytes(),
+        deltas.astype(np.dtype(dtype).newbyteorder('<')).tobytes(),
+    ]
+    body.append(b'\0' * (-sum(len(part) for part in body) % 8))
+    body.append('\0'.join(terms).encode('utf-8'))
+    return b''.join(body)
+
+
+class FacetPostings:
+    """
+    Read-only view of encoded postings.
+
+    The id arrays are ``np.frombuffer`` views of the stored bytes, so
+    loading copies nothing but the term list; a term's case ids are
+    decoded on demand with one cumulative sum.
+    """
+
+    def __init__(self, buffer):
+        buffer = memoryview(buffer)
+        magic, itemsize, term_count, delta_count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a facet postings buffer")
+
+        position = HEADER.size
+        self.firsts = np.frombuffer(buffer, dtype='<i8', count=term_count, offset=position)
+        position += 8 * term_count
+        self.offsets = np.frombuffer(buffer, dtype='<i8', count=term_count + 1, offset=position)
+        position += 8 * (term_count + 1)
+        self.deltas = np.frombuffer(buffer, dtype=f'<u{itemsize}', count=delta_count, offset=position)
+        position += itemsize * delta_count
+        position += -position % 8
+
+        self.terms: List[str] = bytes(buffer[position:]).decode('utf-8').split('\0') if term_count else []
+        self.lookup = {term: index for index, term in enumerate(self.terms)}
+        self._buffer = buffer
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.lookup
+
+    def case_count(self, term: str) -> int:
+        """Number of cases of a term, without decoding"""
+        index = self.lookup.get(term)
+        return 0 if index is None else int(self.offsets[index + 1] - self.offsets[index]) + 1
+
+    def get(self, term: str) -> np.ndarray:
+        """Sorted case ids of a term (empty for unknown terms)"""
+        index = self.lookup.get(term)
+        if index is None:
+            return np.empty(0, dtype=np.int64)
+        case_ids = np.empty(int(self.offsets[index + 1] - self.offsets[index]) + 1, dtype=np.int64)
+        case_ids[0] = self.firsts[index]
+        np.cumsum(self.deltas[self.offsets[index]:self.offsets[index + 1]], dtype=np.int64, out=case_ids[1:])
+        case_ids[1:] += self.firsts[index]
+        return case_ids
+
+    def union(self, terms: Iterable[str]) -> np.ndarray:
+        """Sorted case ids having any of ``terms``"""
+        arrays = [self.get(term) for term in terms]
+        return np.unique(np.concatenate(arrays)) if arrays else np.empty(0, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+
+class FacetPostingsStore:
+    """
+    Memory-resident postings of every active facet index.
+
+    Postings are loaded from ``FacetIndex.postings`` on first use of a facet
+    type (indexes built before the binary format are encoded from their
+    JSON ``term_mappings``) and dropped when the index version changes or
+    the facet index is rebuilt, so facet search and filtering don't touch
+    the database.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Optional[FacetPostings]] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'errors': 0}
+
+    def get(self, facet_type: str) -> Optional[FacetPostings]:
+        """Postings of a facet type, or None when it has no built index"""
+        version = get_index_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._postings = {}
+                    self._version = version
+
+        postings = self._postings
+        if facet_type not in postings:
+            with self._lock:
+                if facet_type not in self._postings:
+                    self._postings = dict(self._postings, **{facet_type: self._load(facet_type)})
+            postings = self._postings
+        return postings.get(facet_type)
+
+    def invalidate(self, facet_type: Optional[str] = None) -> None:
+        """Drop loaded postings (of one facet type, or all)"""
+        with self._lock:
+            if facet_type is None:
+                self._postings = {}
+            else:
+                self._postings = {key: value for key, value in self._postings.items() if key != facet_type}
+
+    def filter_case_ids(self, facet_type: str, terms: Any, case_ids: Iterable[Any]) -> Optional[List[int]]:
+        """
+        The ``case_ids`` having any of ``terms`` in a facet, in their order
+
+        Returns:
+            Filtered case ids, or None when the facet has no built index
+        """
+        postings = self.get(facet_type)
+        if postings is None:
+            return None
+        if isinstance(terms, str):
+            terms = [terms]
+
+        case_ids = list(case_ids)
+        ids = np.fromiter(
+            (-1 if case_id is None else int(case_id) for case_id in case_ids), dtype=np.int64, count=len(case_ids)
+        )
+        keep = np.isin(ids, postings.union(terms), assume_unique=False)
+        return [case_id for case_id, kept in zip(case_ids, keep.tolist()) if kept]
+
+    def get_stats(self) -> Dict[str, Any]:
+        postings = self._postings
+        stats = dict(self._stats)
+        stats.update({
+            'version': self._version,
+            'facet_types': sorted(facet_type for facet_type, value in postings.items() if value is not None),
+            'terms': sum(len(value) for value in postings.values() if value is not None),
+            'bytes': sum(value.nbytes for value in postings.values() if value is not None),
+        })
+        return stats
+
+    def _load(self, facet_type: str) -> Optional[FacetPostings]:
+        # Called with the lock held
+        from ..models import FacetIndex
+
+        try:
+            facet_index = FacetIndex.objects.filter(
+                index_name=f"facet_{facet_type}",
+                is_active=True,
+                is_built=True
+            ).values('postings', 'term_mappings').first()
+            if not facet_index:
+                return None
+
+            buffer = facet_index['postings']
+            if not buffer:
+                buffer = encode_postings(facet_index['term_mappings'] or {})
+            self._stats['loads'] += 1
+            return FacetPostings(buffer)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Error loading facet postings for {facet_type}: {str(e)}")
+            return None
+
+
+_facet_postings: Optional[FacetPostingsStore] = None
+_facet_postings_lock = threading.Lock()
+
+
+def get_facet_postings() -> FacetPostingsStore:
+    """Return the process-wide facet postings store"""
+    global _facet_postings
+
+    if _facet_postings is None:
+        with _facet_postings_lock:
+            if _facet_postings is None:
+                _facet_postings = FacetPostingsStore()
+    return _facet_postings
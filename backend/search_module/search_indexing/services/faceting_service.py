@@ -5,8 +5,10 @@ Provides faceted search capabilities and suggestions
 
 import logging
 from typing import Dict, List, Optional, Any
+from django.conf import settings
 from django.db.models import Q, Count
 from apps.cases.models import Case, Court
+from .facet_engine import extract_year, get_facet_engine
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +24,15 @@ class FacetingService:
             'max_facet_values': 50,
             'min_facet_count': 1,
             'cache_ttl': 300,  # 5 minutes
+            'count_within_results': getattr(settings, 'SEARCH_FACETS_WITHIN_RESULTS', False),
         }
         
         # Update with custom config
         if config:
             self.default_config.update(config)
+        
+        # In-memory facet counts; the ORM queries below are the fallback
+        self.facet_engine = get_facet_engine()
     
     def compute_facets(self, 
                        result_case_ids: List[int] = None,
@@ -42,6 +48,16 @@ class FacetingService:
             Dictionary of facet types with their values and counts
         """
         try:
+            if self.facet_engine.ensure_fresh():
+                facets = self.facet_engine.count(
+                    result_case_ids if self.default_config['count_within_results'] else None,
+                    selections=filters,
+                    max_values=self.default_config['max_facet_values'],
+                    min_count=self.default_config['min_facet_count']
+                )
+                if facets is not None:
+                    return facets
+            
             facets = {}
             
             # Court facets - show all available courts
@@ -128,24 +144,24 @@ class FacetingService:
     def _get_year_facets(self, case_ids: List[int] = None, filters: Dict = None) -> List[Dict]:
         """Get year facets"""
         try:
-            queryset = Case.objects.values('institution_date').annotate(
-                count=Count('id')
-            ).filter(
-                count__gte=self.default_config['min_facet_count']
-            )
+            queryset = Case.objects.filter(institution_year__isnull=False)
             
             if case_ids:
                 queryset = queryset.filter(id__in=case_ids)
             
             if filters and 'year' in filters:
                 # Exclude currently selected year
-                queryset = queryset.exclude(institution_date__year=filters['year'])
+                queryset = queryset.exclude(institution_year=filters['year'])
             
-            year_facets = queryset.order_by('-institution_date')[:self.default_config['max_facet_values']]
+            year_facets = queryset.values('institution_year').annotate(
+                count=Count('id')
+            ).filter(
+                count__gte=self.default_config['min_facet_count']
+            ).order_by('-institution_year')[:self.default_config['max_facet_values']]
             
             return [
                 {
-                    'value': self._extract_year_from_date(year['institution_date']),
+                    'value': str(year['institution_year']),
                     'count': year['count'],
                     'selected': False
                 }
@@ -158,34 +174,7 @@ class FacetingService:
     
     def _extract_year_from_date(self, date_value) -> str:
         """Extract year from date value, handling both datetime and string formats"""
-        if not date_value:
-            return 'Unknown'
-        
-        try:
-            # If it's already a datetime object
-            if hasattr(date_value, 'year'):
-                return str(date_value.year)
-            
-            # If it's a string, try to parse it
-            if isinstance(date_value, str):
-                from datetime import datetime
-                # Try different date formats
-                for fmt in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y', '%m/%d/%Y']:
-                    try:
-                        parsed_date = datetime.strptime(date_value, fmt)
-                        return str(parsed_date.year)
-                    except ValueError:
-                        continue
-                
-                # If all parsing fails, try to extract year from string
-                import re
-                year_match = re.search(r'\b(19|20)\d{2}\b', date_value)
-                if year_match:
-                    return year_match.group()
-            
-            return 'Unknown'
-        except Exception:
-            return 'Unknown'
+        return extract_year(date_value)
     
     def _get_case_type_facets(self, case_ids: List[int] = None, filters: Dict = None) -> List[Dict]:
         """Get case type facets - using status field since case_type doesn't exist"""
@@ -359,12 +348,11 @@ class FacetingService:
             from datetime import datetime, timedelta
             current_year = datetime.now().year
             
-            for year in range(current_year - 9, current_year + 1):
-                year_count = Case.objects.filter(
-                    institution_date__year=year
-                ).count()
-                if year_count > 0:
-                    stats['year_distribution'][str(year)] = year_count
+            year_counts = Case.objects.filter(
+                institution_year__range=(current_year - 9, current_year)
+            ).values('institution_year').annotate(count=Count('id')).order_by('institution_year')
+            for year in year_counts:
+                stats['year_distribution'][str(year['institution_year'])] = year['count']
             
             return stats
             
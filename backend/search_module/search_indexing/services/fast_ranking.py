@@ -4,9 +4,15 @@ Simplified ranking for high-performance search
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import numpy as np
+
+from . import lexical_features as lexical
+from .lexical_features import get_lexical_feature_extractor
+from .score_fusion import FusedScores, fuse, top_k_indices, weighted_linear_fusion
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +33,8 @@ class FastRankingService:
         # Update with custom config
         if config:
             self.default_config.update(config)
+        
+        self.lexical_features = get_lexical_feature_extractor()
     
     def rank_results(self, 
                     vector_results: List[Dict], 
@@ -51,18 +59,12 @@ class FastRankingService:
         try:
             logger.info(f"Starting fast ranking for {len(vector_results)} vector + {len(keyword_results)} keyword results")
             
-            # Step 1: Combine results by case ID (fast in-memory operation)
-            combined_results = self._combine_results_fast(vector_results, keyword_results)
-            
-            # Step 2: Calculate simple scores (no database queries)
-            scored_results = self._calculate_simple_scores(combined_results, query)
+            # Step 1: Align vector and keyword scores by case ID (vectorized)
+            fused = self._combine_results_fast(vector_results, keyword_results)
             
-            # Step 3: Sort by final score
-            ranked_results = sorted(scored_results, key=lambda x: x['final_score'], reverse=True)
-            
-            # Step 4: Limit to top results (use provided top_k or reasonable default)
+            # Step 2-4: Score, boost and select the top results (no database queries)
             limit = top_k if top_k is not None else 10
-            final_results = ranked_results[:limit]
+            final_results = self._calculate_simple_scores(fused, query, limit)
             
             # Step 5: Add ranking metadata
             for i, result in enumerate(final_results):
@@ -81,166 +83,134 @@ class FastRankingService:
             limit = top_k if top_k is not None else 10
             return self._fallback_ranking(vector_results, keyword_results, limit)
     
-    def _combine_results_fast(self, vector_results: List[Dict], keyword_results: List[Dict]) -> Dict[int, Dict]:
-        """Combine results by case ID - fast in-memory operation"""
-        combined = {}
+    def _combine_results_fast(self, vector_results: List[Dict], keyword_results: List[Dict]) -> FusedScores:
+        """Combine results by case ID - vectorized, keeping the best score per retriever"""
+        return FusedScores(vector_results, keyword_results)
+    
+    def _merge_result_data(self, sources: List[Dict]) -> Dict:
+        """Merge result_data to preserve all fields, especially dates"""
+        result_data = sources[0]
+        for result in sources[1:]:
+            result_data.update(result)
+        return result_data
+    
+    def _calculate_simple_scores(self, fused: FusedScores, query: str, limit: int) -> List[Dict]:
+        """Calculate simple scores without database queries and return the top ``limit`` results"""
+        if not len(fused):
+            return []
         
-        # Process vector results
-        for result in vector_results:
-            case_id = result.get('case_id')
-            if case_id:
-                if case_id not in combined:
-                    combined[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': result.get('similarity', 0),
-                        'keyword_score': 0,
-                        'result_data': result
-                    }
-                else:
-                    # Take the best vector score
-                    combined[case_id]['vector_score'] = max(
-                        combined[case_id]['vector_score'],
-                        result.get('similarity', 0)
-                    )
-                    # Merge result_data to preserve all fields, especially dates
-                    combined[case_id]['result_data'].update(result)
-                    # Ensure date fields are preserved
-                    if result.get('institution_date'):
-                        combined[case_id]['result_data']['institution_date'] = result['institution_date']
-                    if result.get('hearing_date'):
-                        combined[case_id]['result_data']['hearing_date'] = result['hearing_date']
+        # Normalize scores to 0-1 range
+        vector_scores = np.minimum(1.0, fused.vector_scores)
         
-        # Process keyword results
-        for result in keyword_results:
-            case_id = result.get('case_id')
-            if case_id:
-                if case_id not in combined:
-                    combined[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': 0,
-                        'keyword_score': result.get('rank', 0),
-                        'result_data': result
-                    }
-                else:
-                    # Take the best keyword score
-                    combined[case_id]['keyword_score'] = max(
-                        combined[case_id]['keyword_score'],
-                        result.get('rank', 0)
-                    )
-                    # Merge result_data to preserve all fields, especially dates
-                    combined[case_id]['result_data'].update(result)
-                    # Ensure date fields are preserved
-                    if result.get('institution_date'):
-                        combined[case_id]['result_data']['institution_date'] = result['institution_date']
-                    if result.get('hearing_date'):
-                        combined[case_id]['result_data']['hearing_date'] = result['hearing_date']
+        # Keyword score normalization (PostgreSQL ranks are typically 0.001-1.0)
+        # Very small ranks (1e-20, etc.) are scaled up. A keyword rank of 0 means
+        # PostgreSQL found a match but couldn't calculate a meaningful rank, so it
+        # gets a minimal score.
+        raw_keyword = fused.keyword_scores
+        keyword_scores = np.where(
+            raw_keyword > 0,
+            np.where(raw_keyword < 0.01, np.minimum(1.0, raw_keyword * 100), np.minimum(1.0, raw_keyword)),
+            np.where(raw_keyword == 0, 0.01, 0.0)
+        )
         
-        return combined
-    
-    def _calculate_simple_scores(self, combined_results: Dict[int, Dict], query: str) -> List[Dict]:
-        """Calculate simple scores without database queries"""
-        scored_results = []
+        vector_weight = self.default_config['vector_weight']
+        keyword_weight = self.default_config['keyword_weight']
+        fusion_method = self.default_config.get('fusion_method', 'weighted')
+        score_normalization = self.default_config.get('score_normalization', 'legacy')
         
-        for case_id, result in combined_results.items():
-            # Normalize scores to 0-1 range
-            vector_score = min(1.0, result['vector_score'])
-            
-            # Keyword score normalization (PostgreSQL ranks are typically 0.001-1.0)
-            # Use logarithmic scaling for very small ranks
-            if result['keyword_score'] > 0:
-                if result['keyword_score'] < 0.01:  # Very small ranks (1e-20, etc.)
-                    keyword_score = min(1.0, result['keyword_score'] * 100)  # Scale up small ranks
-                else:
-                    keyword_score = min(1.0, result['keyword_score'])  # Use ranks as-is for larger values
-            else:
-                # FIXED: Handle zero-rank results from PostgreSQL full-text search
-                # If we have a keyword result with rank 0, it means PostgreSQL found a match
-                # but couldn't calculate a meaningful rank. Give it a minimal score.
-                keyword_score = 0.01 if result['keyword_score'] == 0 and 'keyword_score' in result else 0
-            
-            # Calculate weighted base score
-            vector_weight = self.default_config['vector_weight']
-            keyword_weight = self.default_config['keyword_weight']
-            
-            # IMPROVED: For semantic search mode, if keyword_score is very low (0.01), 
+        if fusion_method == 'weighted' and score_normalization == 'legacy':
+            # IMPROVED: For semantic search mode, if keyword_score is very low (0.01),
             # treat it as pure semantic search and use vector_score as the primary score
-            if keyword_score <= 0.01 and vector_score > 0:
-                # Pure semantic search - use vector score as primary with minimal keyword contribution
-                base_score = vector_score * 0.9 + keyword_score * 0.1
-            else:
-                # Hybrid search - use normal weighting
-                base_score = (vector_score * vector_weight) + (keyword_score * keyword_weight)
-            
+            base_scores = np.where(
+                (keyword_scores <= 0.01) & (vector_scores > 0),
+                vector_scores * 0.9 + keyword_scores * 0.1,
+                weighted_linear_fusion([vector_scores, keyword_scores], [vector_weight, keyword_weight])
+            )
+        else:
+            base_scores = fuse(fused, vector_weight, keyword_weight, fusion_method, score_normalization)
+        
+        # Only include results with meaningful scores (adjusted for lexical search)
+        # FIXED: Be more inclusive for lexical search results with zero ranks
+        always_included = (vector_scores > 0.05) | (keyword_scores > 0.01) | (raw_keyword == 0)
+        
+        # Boosts are bounded by max_boost, so a row whose best possible score is
+        # below the limit-th guaranteed score can never make the cut; skip the
+        # string matching for those rows entirely.
+        upper_bounds = base_scores * (1 + self.default_config['max_boost'])
+        guaranteed = base_scores[always_included]
+        if len(guaranteed) >= limit:
+            threshold = np.partition(guaranteed, len(guaranteed) - limit)[len(guaranteed) - limit]
+        else:
+            threshold = -np.inf
+        candidate_rows = np.flatnonzero(upper_bounds >= threshold)
+        lexicon = self.lexical_features.lexicon(query)
+        
+        final_scores = np.full(len(fused), -np.inf)
+        total_boosts = np.zeros(len(fused))
+        result_data_by_row = {}
+        for row in candidate_rows:
+            result_data = self._merge_result_data(fused.source_results(row))
             # Apply simple boosting based on query (no database queries)
-            total_boost = self._calculate_simple_boost(result, query)
-            
-            # Calculate final score
-            final_score = base_score * (1 + total_boost)
-            
-            # Only include results with meaningful scores (adjusted for lexical search)
-            # FIXED: Be more inclusive for lexical search results with zero ranks
-            if (final_score > 0.01 or vector_score > 0.05 or keyword_score > 0.01 or 
-                (result['keyword_score'] == 0 and 'keyword_score' in result)):  # Include zero-rank keyword results
-                scored_result = {
-                    'case_id': case_id,
-                    'vector_score': vector_score,
-                    'keyword_score': keyword_score,
-                    'base_score': base_score,
-                    'total_boost': total_boost,
-                    'final_score': final_score,
-                    'result_data': result['result_data']
-                }
-                
-                scored_results.append(scored_result)
+            total_boost = self._calculate_simple_boost({'result_data': result_data}, query, lexicon)
+            final_score = base_scores[row] * (1 + total_boost)
+            if always_included[row] or final_score > 0.01:
+                final_scores[row] = final_score
+                total_boosts[row] = total_boost
+                result_data_by_row[row] = result_data
         
-        return scored_results
+        # Sort by final score, keeping retrieval order for ties
+        included = len(result_data_by_row)
+        top_rows = top_k_indices(final_scores, min(limit, included), fused.first_seen)
+        
+        return [
+            {
+                'case_id': fused.case_id(row),
+                'vector_score': float(vector_scores[row]),
+                'keyword_score': float(keyword_scores[row]),
+                'base_score': float(base_scores[row]),
+                'total_boost': float(total_boosts[row]),
+                'final_score': float(final_scores[row]),
+                'result_data': result_data_by_row[row]
+            }
+            for row in top_rows
+        ]
     
-    def _calculate_simple_boost(self, result: Dict, query: str) -> float:
+    def _calculate_simple_boost(self, result: Dict, query: str,
+                                lexicon: Optional[lexical.QueryLexicon] = None) -> float:
         """Calculate boost without database queries - IMPROVED for partial matches"""
         total_boost = 0
+        features = self.lexical_features.features(lexicon or self.lexical_features.lexicon(query), result['result_data'])
         
-        # Check if case number contains query terms (fast string operation)
-        case_number = result['result_data'].get('case_number', '').upper()
-        query_upper = query.upper()
-        
-        if query_upper in case_number:
+        # Check if case number contains the query (fast string operation)
+        if features[lexical.NUMBER_CONTAINS_QUERY]:
             total_boost += self.default_config['exact_match_boost']
         
-        # IMPROVED: Check if case title contains query terms with better scoring
-        case_title = result['result_data'].get('case_title', '').upper()
-        if case_title and query_upper:
-            # Split query into individual terms for partial matching
-            query_terms = [term.strip() for term in query_upper.split() if len(term.strip()) > 2]
+        # IMPROVED: Count how many query terms (longer than 2 characters) appear in the title
+        matching_terms = features[lexical.TITLE_TERM_MATCHES]
+        
+        # Calculate boost based on term matches
+        if matching_terms > 0:
+            # Base boost for any title match
+            title_boost = 1.0
+            
+            # Additional boost for multiple term matches
+            if matching_terms > 1:
+                title_boost += (matching_terms - 1) * 0.5
+            
+            # Extra boost for exact phrase match
+            if features[lexical.TITLE_PHRASE_MATCH]:
+                title_boost += 1.5
             
-            # Count how many query terms appear in the title
-            matching_terms = 0
-            for term in query_terms:
-                if term in case_title:
-                    matching_terms += 1
+            # Boost for query terms at the beginning of title (more important)
+            if features[lexical.TITLE_PREFIX_MATCH]:
+                title_boost += 1.0
             
-            # Calculate boost based on term matches
-            if matching_terms > 0:
-                # Base boost for any title match
-                title_boost = 1.0
-                
-                # Additional boost for multiple term matches
-                if matching_terms > 1:
-                    title_boost += (matching_terms - 1) * 0.5
-                
-                # Extra boost for exact phrase match
-                if query_upper in case_title:
-                    title_boost += 1.5
-                
-                # Boost for query terms at the beginning of title (more important)
-                if case_title.startswith(query_upper):
-                    title_boost += 1.0
-                
-                total_boost += title_boost
+            total_boost += title_boost
         
         # Cap total boost
         total_boost = min(total_boost, self.default_config['max_boost'])
         
-        return total_boost
+        return float(total_boost)
     
     def _fallback_ranking(self, vector_results: List[Dict], keyword_results: List[Dict], top_k: int) -> List[Dict]:
         """Simple fallback ranking"""
@@ -0,0 +1,358 @@
+"""
+Fuzzy Name Index
+In-memory character trigram index over party names and case titles for misspelled queries
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+# Tokens carrying no identity in party names and titles
+STOP_TOKENS = frozenset({'vs', 'versus', 'the', 'and', 'through', 'others', 'etc'})
+
+# Abbreviations edit distance can't bridge; both spellings index as the long form
+TOKEN_VARIANTS = {
+    'govt': 'government',
+    'gov': 'government',
+    'mohd': 'muhammad',
+    'muhd': 'muhammad',
+    'pvt': 'private',
+    'ltd': 'limited',
+    'corp': 'corporation',
+    'deptt': 'department',
+    'dept': 'department',
+    'secy': 'secretary',
+    'addl': 'additional',
+    'distt': 'district',
+    'fed': 'federation',
+    'prov': 'province',
+}
+
+# Similarity of a token matched through TOKEN_VARIANTS
+VARIANT_SIMILARITY = 0.95
+
+
+def name_tokens(text: str) -> List[str]:
+    """Canonical tokens of a party name or title (lowercase, abbreviations expanded)"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall((text or '').lower()):
+        token = TOKEN_VARIANTS.get(token, token)
+        if len(token) >= 3 and token not in STOP_TOKENS:
+            tokens.append(token)
+    return tokens
+
+
+def trigrams(token: str) -> List[str]:
+    """Distinct trigrams of a token padded with boundary markers"""
+    padded = f"${token}$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance of ``a`` and ``b`` (edits plus
+    adjacent transpositions), or ``max_distance + 1`` once it is exceeded.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class _CSR:
+    """Integer postings lists stored as one array plus offsets"""
+
+    __slots__ = ('offsets', 'values')
+
+    def __init__(self, lists: List[List[int]]):
+        self.offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(values) for values in lists])
+        self.values = np.fromiter(
+            (value for values in lists for value in values), dtype=np.int32, count=int(self.offsets[-1])
+        )
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.values[self.offsets[index]:self.offsets[index + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.offsets.nbytes + self.values.nbytes)
+
+
+class _FuzzySnapshot:
+    """Vocabulary, trigram postings and case postings of one build"""
+
+    def __init__(self, version: int, case_ids: List[int], token_rows: Dict[str, List[int]]):
+        self.version = version
+        self.case_ids = np.asarray(case_ids, dtype=np.int64)
+        self.tokens = sorted(token_rows)
+        self.vocabulary = {token: token_id for token_id, token in enumerate(self.tokens)}
+        self.token_lengths = np.fromiter((len(token) for token in self.tokens), dtype=np.int16, count=len(self.tokens))
+        self.token_rows = _CSR([token_rows[token] for token in self.tokens])
+
+        gram_tokens: Dict[str, List[int]] = defaultdict(list)
+        for token_id, token in enumerate(self.tokens):
+            for gram in trigrams(token):
+                gram_tokens[gram].append(token_id)
+        self.grams = {gram: gram_id for gram_id, gram in enumerate(gram_tokens)}
+        self.gram_tokens = _CSR(list(gram_tokens.values()))
+        self.loaded_at = time.time()
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.case_ids.nbytes + self.token_lengths.nbytes + self.token_rows.nbytes + self.gram_tokens.nbytes)
+
+
+class FuzzyNameIndex:
+    """
+    Finds cases whose party names or titles match a query within a bounded
+    edit distance ("Mohammad" finds "Muhammad", "Govt" finds "Government").
+
+    The vocabulary of ``SearchMetadata.parties_normalized`` and
+    ``case_title_normalized`` is indexed by character trigrams. A query
+    token's candidates are the vocabulary tokens sharing enough trigrams
+    with it (a token within ``d`` edits keeps all but ``4 * d`` of the query
+    trigrams), verified with a bounded edit distance; their case postings
+    are then scored with numpy. Only cases that needed at least one
+    approximate match are returned, since exact matches are the keyword
+    retriever's job.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_FUZZY_INDEX_ENABLED', True),
+            'max_edit_distance': getattr(settings, 'SEARCH_FUZZY_MAX_EDIT_DISTANCE', 2),
+            'min_score': getattr(settings, 'SEARCH_FUZZY_MIN_SCORE', 0.6),
+            'max_candidates': 200,   # vocabulary tokens verified per query token
+            'chunk_size': getattr(settings, 'SEARCH_FEATURE_STORE_CHUNK_SIZE', 2000),
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._snapshot: Optional[_FuzzySnapshot] = None
+        self._attempted_version: Optional[int] = None
+        self._building = False
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'searches': 0, 'errors': 0, 'build_time_ms': 0.0}
+
+    def ensure_fresh(self) -> bool:
+        """
+        Start a background build on first use and after every index build.
+
+        Returns:
+            True if the index can be searched
+        """
+        if not self.default_config['enabled']:
+            return False
+
+        version = get_index_version()
+        if self._attempted_version != version:
+            with self._lock:
+                if not self._building and self._attempted_version != version:
+                    self._building = True
+                    self._attempted_version = version
+                    threading.Thread(target=self._build_in_background, name='fuzzy-index', daemon=True).start()
+        return self._snapshot is not None
+
+    def build(self) -> Dict[str, Any]:
+        """Index the party names and titles of every indexed case"""
+        from ..models import SearchMetadata
+
+        start_time = time.time()
+        stats = {'built': False, 'cases': 0, 'tokens': 0, 'errors': []}
+        try:
+            version = get_index_version()
+            rows = (
+                SearchMetadata.objects.filter(is_indexed=True).order_by('case_id')
+                .values_list('case_id', 'case_title_normalized', 'parties_normalized')
+                .iterator(chunk_size=self.default_config['chunk_size'])
+            )
+            self.load(version, rows)
+            stats['built'] = True
+            stats['cases'] = int(len(self._snapshot.case_ids))
+            stats['tokens'] = len(self._snapshot.tokens)
+        except Exception as e:
+            error_msg = f"Error building fuzzy name index: {str(e)}"
+            logger.error(error_msg)
+            stats['errors'].append(error_msg)
+            self._stats['errors'] += 1
+
+        stats['processing_time'] = time.time() - start_time
+        self._stats['build_time_ms'] = round(stats['processing_time'] * 1000, 1)
+        return stats
+
+    def load(self, version: int, rows: Iterable[Tuple[int, str, str]]) -> None:
+        """Index ``(case_id, title, parties)`` rows and swap the index in"""
+        case_ids: List[int] = []
+        token_rows: Dict[str, List[int]] = defaultdict(list)
+        for case_id, title, parties in rows:
+            row = len(case_ids)
+            case_ids.append(case_id)
+            for token in set(name_tokens(title)) | set(name_tokens(parties)):
+                token_rows[token].append(row)
+
+        self._snapshot = _FuzzySnapshot(version, case_ids, token_rows)
+        self._attempted_version = version
+        self._stats['builds'] += 1
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Cases matching the query's name tokens approximately
+
+        Returns:
+            ``{'case_id', 'fuzzy_score', 'corrections'}`` dicts, best first;
+            the score is the mean similarity of the query tokens and
+            ``corrections`` maps query tokens to the indexed spellings used
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not len(snapshot.case_ids):
+            return []
+
+        query_tokens = list(dict.fromkeys(TOKEN_PATTERN.findall((query or '').lower())))
+        query_tokens = [token for token in query_tokens if len(token) >= 3 and token not in STOP_TOKENS]
+        if not query_tokens:
+            return []
+
+        self._stats['searches'] += 1
+        total = np.zeros(len(snapshot.case_ids), dtype=np.float32)
+        approximate = np.zeros(len(snapshot.case_ids), dtype=bool)
+        corrections: Dict[str, List[str]] = {}
+
+        for query_token in query_tokens:
+            matches = self._match_token(snapshot, query_token)
+            if not matches:
+                continue
+            # Best similarity of this token per case: assign in ascending order
+            best = np.zeros(len(snapshot.case_ids), dtype=np.float32)
+            for token_id, similarity in sorted(matches, key=lambda match: match[1]):
+                best[snapshot.token_rows[token_id]] = similarity
+            total += best
+            approximate |= (best > 0) & (best < 1)
+            corrections[query_token] = [snapshot.tokens[token_id] for token_id, similarity in matches if similarity < 1]
+
+        scores = total / len(query_tokens)
+        rows = np.flatnonzero(approximate & (scores >= self.default_config['min_score']))
+        if not len(rows):
+            return []
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+        rows = rows[np.lexsort((rows, -scores[rows]))]
+
+        corrections = {token: spellings for token, spellings in corrections.items() if spellings}
+        return [
+            {
+                'case_id': int(snapshot.case_ids[row]),
+                'fuzzy_score': round(float(scores[row]), 6),
+                'corrections': corrections,
+            }
+            for row in rows.tolist()
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        stats = dict(self._stats)
+        stats.update({
+            'enabled': self.default_config['enabled'],
+            'loaded': snapshot is not None,
+            'building': self._building,
+            'version': snapshot.version if snapshot else None,
+            'cases': int(len(snapshot.case_ids)) if snapshot else 0,
+            'tokens': len(snapshot.tokens) if snapshot else 0,
+            'array_bytes': snapshot.nbytes if snapshot else 0,
+        })
+        return stats
+
+    def _match_token(self, snapshot: _FuzzySnapshot, query_token: str) -> List[Tuple[int, float]]:
+        """``(token_id, similarity)`` of the vocabulary tokens within the edit bound"""
+        canonical = TOKEN_VARIANTS.get(query_token, query_token)
+        if canonical != query_token:
+            token_id = snapshot.vocabulary.get(canonical)
+            return [(token_id, VARIANT_SIMILARITY)] if token_id is not None else []
+
+        # Short tokens are matched exactly; longer ones allow more edits
+        max_distance = min(self.default_config['max_edit_distance'], 0 if len(query_token) < 5 else len(query_token) // 4)
+        matches = []
+        exact_id = snapshot.vocabulary.get(query_token)
+        if exact_id is not None:
+            matches.append((exact_id, 1.0))
+        if max_distance == 0:
+            return matches
+
+        gram_ids = [snapshot.grams[gram] for gram in trigrams(query_token) if gram in snapshot.grams]
+        if not gram_ids:
+            return matches
+        shared = np.bincount(
+            np.concatenate([snapshot.gram_tokens[gram_id] for gram_id in gram_ids]),
+            minlength=len(snapshot.tokens)
+        )
+
+        # An edit removes at most three of the query's trigrams, a transposition four
+        required = max(1, len(query_token) - 4 * max_distance)
+        length_ok = np.abs(snapshot.token_lengths.astype(np.int32) - len(query_token)) <= max_distance
+        candidates = np.flatnonzero((shared >= required) & length_ok)
+        if len(candidates) > self.default_config['max_candidates']:
+            order = np.argsort(-shared[candidates], kind='stable')[:self.default_config['max_candidates']]
+            candidates = candidates[order]
+
+        for token_id in candidates.tolist():
+            if token_id == exact_id:
+                continue
+            token = snapshot.tokens[token_id]
+            distance = bounded_edit_distance(query_token, token, max_distance)
+            if distance <= max_distance:
+                matches.append((token_id, 1.0 - distance / max(len(query_token), len(token))))
+        return matches
+
+    def _build_in_background(self) -> None:
+        try:
+            self.build()
+        finally:
+            # The build thread exits here; release the connection it opened
+            connection.close()
+            with self._lock:
+                self._building = False
+
+
+_fuzzy_index: Optional[FuzzyNameIndex] = None
+_fuzzy_index_lock = threading.Lock()
+
+
+def get_fuzzy_index() -> FuzzyNameIndex:
+    """Return the process-wide fuzzy name index"""
+    global _fuzzy_index
+
+    if _fuzzy_index is None:
+        with _fuzzy_index_lock:
+            if _fuzzy_index is None:
+                _fuzzy_index = FuzzyNameIndex()
+    return _fuzzy_index
@@ -5,12 +5,14 @@ Combines vector and keyword indexing for comprehensive search
 
 import logging
 import time
+import numpy as np
 from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime
+from datetime import date, datetime
 
 from django.utils import timezone
 from django.db import transaction
 from apps.cases.models import CaseSearchProfile
+from apps.cases.services.data_cleaner import parse_case_date
 from django.conf import settings
 
 from ..models import IndexingConfig, IndexingLog, SearchMetadata
@@ -26,6 +28,16 @@ from .precision_optimizer import PrecisionOptimizerService
 from .query_expansion import QueryExpansionService
 from .legal_semantic_matcher import LegalSemanticMatcher
 from .advanced_reranker import AdvancedReranker
+from .case_feature_store import get_case_feature_store
+from .facet_postings import get_facet_postings
+from .fuzzy_index import get_fuzzy_index
+from .sentence_index import SentenceIndex
+from .static_priors import get_static_priors
+from .rerank_cascade import CascadeDecision, RerankCascade, TIER_EXACT, rerank_head
+from .search_tracing import SearchTrace
+from .search_deadline import SearchDeadline
+from .query_plan import QueryPlan
+from .score_fusion import FusedScores, fuse, top_k_indices, weighted_linear_fusion
 try:
     from .learned_reranker import LearnedReranker
 except Exception:  # pragma: no cover - safe guard if optional deps missing
@@ -64,6 +76,10 @@ class HybridIndexingService:
         self.query_expander = QueryExpansionService()
         self.semantic_matcher = LegalSemanticMatcher()
         self.advanced_reranker = AdvancedReranker(config)
+        self.feature_store = get_case_feature_store()
+        self.fuzzy_index = get_fuzzy_index()
+        self.facet_postings = get_facet_postings()
+        self.cascade = RerankCascade(config)
         self.learned_reranker = None
 
         model_path = getattr(settings, "LEARNED_RERANKER_MODEL_PATH", None)
@@ -113,6 +129,8 @@ class HybridIndexingService:
             'total_chunks': 0,
             'total_vectors': 0,
             'total_metadata': 0,
+            'priors_built': False,
+            'sentence_indexes_built': 0,
             'processing_time': 0,
             'errors': []
         }
@@ -162,6 +180,18 @@ class HybridIndexingService:
                     logger.error(error_msg)
                     stats['errors'].append(error_msg)
             
+            # Materialize query-independent ranking priors next to the indexes
+            if stats['vector_indexed'] or stats['keyword_indexed']:
+                priors_stats = get_static_priors().build()
+                stats['priors_built'] = priors_stats['built']
+                stats['errors'].extend(priors_stats['errors'])
+            
+            # Backfill snippet sentence tables for cases cleaned before they existed
+            if not vector_only:
+                sentence_stats = SentenceIndex().build_missing(force=force)
+                stats['sentence_indexes_built'] = sentence_stats['cases']
+                stats['errors'].extend(sentence_stats['errors'])
+            
             # Mark as hybrid indexed if both components succeeded
             if stats['vector_indexed'] and stats['keyword_indexed']:
                 stats['hybrid_indexed'] = True
@@ -199,105 +229,403 @@ class HybridIndexingService:
             stats['errors'].append(error_msg)
             return stats
     
-    def hybrid_search(self, query: str, filters: Dict[str, any] = None, top_k: int = 10, enable_advanced_features: bool = True) -> List[Dict[str, any]]:
+    def hybrid_search(self, query: str, filters: Dict[str, any] = None, top_k: int = 10, enable_advanced_features: bool = True,
+                      trace: Optional[SearchTrace] = None, deadline: Optional[SearchDeadline] = None,
+                      query_plan: Optional[QueryPlan] = None) -> List[Dict[str, any]]:
         """Perform hybrid search combining vector and keyword results with exact matching boost - OPTIMIZED VERSION"""
+        # Stage timings are recorded on the caller's trace when one is given;
+        # optional reranking stages are skipped when the deadline cannot fit them
+        trace = trace or SearchTrace()
         try:
             logger.info(f"Performing hybrid search for: {query} (advanced: {enable_advanced_features})")
             
-            # Step 1: Query expansion and analysis (if advanced features enabled)
-            query_analysis = None
-            expanded_query_info = None
-            if enable_advanced_features:
-                expanded_query_info = self.query_expander.enhance_query_with_legal_knowledge(query)
-                query_analysis = expanded_query_info['query_analysis']
-                logger.info(f"Query type detected: {query_analysis.get('type', 'general')}")
-            
-            # OPTIMIZATION: Adaptive fetch size based on query complexity
-            if query_analysis and query_analysis.get('query_complexity') == 'high':
-                fetch_multiplier = 3  # More results for complex queries
-            else:
-                fetch_multiplier = min(2, max(1, 20 // top_k))  # Standard multiplier
-            fetch_size = top_k * fetch_multiplier
-            
-            # Check for exact case number match first (highest priority)
-            exact_case_match = self._find_exact_case_match(query)
+            # Step 1: Query expansion and analysis, exact case number match
+            query_analysis, fetch_size, exact_case_match = self._prepare_query(
+                query, top_k, enable_advanced_features, trace, query_plan
+            )
             
             # OPTIMIZATION: Fetch results in parallel or with reduced size
             # Get vector search results
-            vector_results = self.vector_service.search(query, top_k=fetch_size)
+            with trace.stage('retrieval_vector'):
+                vector_results = self.vector_service.search(query, top_k=fetch_size)
             
             # Get keyword search results
-            keyword_results = self.keyword_service.search(query, filters=filters, top_k=fetch_size)
-            
-            # OPTIMIZATION: Early return if we have enough exact matches
-            if exact_case_match and len(vector_results) == 0 and len(keyword_results) == 0:
-                # If we have an exact match but no other results, return just the exact match
-                return [{
-                    'case_id': exact_case_match['case_id'],
-                    'case_number': exact_case_match['case_number'],
-                    'case_title': exact_case_match['case_title'],
-                    'court': exact_case_match['court'],
-                    'status': exact_case_match['status'],
-                    'institution_date': exact_case_match.get('institution_date', ''),
-                    'hearing_date': exact_case_match.get('hearing_date', ''),
-                    'vector_score': 0,
-                    'keyword_score': 0,
-                    'final_score': exact_case_match['exact_score'],
-                    'exact_match': True
-                }]
-            
-            # Combine and rerank results
-            combined_results = self._combine_and_rerank(
-                vector_results, 
-                keyword_results, 
-                query, 
-                top_k,
-                exact_case_match
-            )
+            with trace.stage('retrieval_keyword'):
+                keyword_results = self.keyword_service.search(query, filters=filters, top_k=fetch_size)
             
-            # Apply precision optimization for better relevance
-            optimized_results = self.precision_optimizer.optimize_search_results(
-                combined_results, 
-                query, 
-                search_mode='hybrid', 
-                filters=filters
-            )
+            # Misspelled party names and titles
+            with trace.stage('retrieval_fuzzy'):
+                keyword_results = self._add_fuzzy_candidates(query, keyword_results, filters, fetch_size)
             
-            # Apply advanced re-ranking (if enabled)
-            if enable_advanced_features and len(optimized_results) > 1:
-                final_results = self.advanced_reranker.rerank_results(
-                    optimized_results,
-                    query,
-                    query_analysis=query_analysis
-                )
-                logger.info(f"Advanced re-ranking applied: {len(optimized_results)} -> {len(final_results)} results")
-            else:
-                final_results = optimized_results
+            final_results, cascade = self._rank_candidates(
+                query, vector_results, keyword_results, exact_case_match, filters, top_k,
+                query_analysis, enable_advanced_features, trace, deadline, query_plan
+            )
 
             if (
                 enable_advanced_features
                 and self.learned_reranker
+                and cascade.learned_k
                 and final_results
                 and len(final_results) > 1
+                and (deadline is None or deadline.fits('learned_reranker'))
             ):
-                final_results = self.learned_reranker.rerank_results(
-                    query,
-                    final_results,
-                    query_analysis=query_analysis,
-                    top_k=top_k
-                )
+                with trace.stage('learned_reranker'):
+                    final_results = self.learned_reranker.rerank_results(
+                        query,
+                        final_results,
+                        query_analysis=query_analysis,
+                        top_k=cascade.learned_k
+                    )
                 logger.info("Learned reranker applied to %d results", len(final_results))
             
             # Limit to requested top_k
             final_results = final_results[:top_k]
             
-            logger.info(f"Hybrid search completed: {len(combined_results)} -> {len(final_results)} results")
+            logger.info(f"Hybrid search completed: {len(final_results)} results")
             return final_results
             
         except Exception as e:
             logger.error(f"Error in hybrid search: {str(e)}")
             return []
     
+    def batch_hybrid_search(self, queries: List[str], filters: Dict[str, any] = None, top_k: int = 10,
+                            enable_advanced_features: bool = True,
+                            trace: Optional[SearchTrace] = None,
+                            query_plans: Optional[List[QueryPlan]] = None) -> List[List[Dict[str, any]]]:
+        """
+        Run hybrid search for many queries at once
+        
+        Query embeddings are encoded in one forward pass, BM25 runs per query
+        against the already loaded index, and the learned reranker scores every
+        (query, candidate) pair of the batch in shared model batches.
+        
+        Returns:
+            One result list per query, in the order of ``queries``
+        """
+        trace = trace or SearchTrace()
+        try:
+            logger.info(f"Performing batch hybrid search for {len(queries)} queries")
+            
+            query_plans = query_plans or [None] * len(queries)
+            prepared = [
+                self._prepare_query(query, top_k, enable_advanced_features, trace, query_plan)
+                for query, query_plan in zip(queries, query_plans)
+            ]
+            
+            # One embedding pass and one vector index lookup for the whole batch
+            with trace.stage('retrieval_vector'):
+                max_fetch_size = max((fetch_size for _, fetch_size, _ in prepared), default=top_k)
+                if hasattr(self.vector_service, 'search_batch'):
+                    batch_vector_results = self.vector_service.search_batch(queries, top_k=max_fetch_size)
+                else:
+                    batch_vector_results = [self.vector_service.search(query, top_k=max_fetch_size) for query in queries]
+                # Vector results are ordered by similarity, so a shorter fetch is a prefix
+                batch_vector_results = [
+                    vector_results[:fetch_size]
+                    for vector_results, (_, fetch_size, _) in zip(batch_vector_results, prepared)
+                ]
+            
+            with trace.stage('retrieval_keyword'):
+                batch_keyword_results = [
+                    self.keyword_service.search(query, filters=filters, top_k=fetch_size)
+                    for query, (_, fetch_size, _) in zip(queries, prepared)
+                ]
+            
+            with trace.stage('retrieval_fuzzy'):
+                batch_keyword_results = [
+                    self._add_fuzzy_candidates(query, keyword_results, filters, fetch_size)
+                    for query, keyword_results, (_, fetch_size, _) in zip(queries, batch_keyword_results, prepared)
+                ]
+            
+            batch_results = []
+            batch_learned_k = []
+            for query, query_plan, (query_analysis, _, exact_case_match), vector_results, keyword_results in zip(
+                queries, query_plans, prepared, batch_vector_results, batch_keyword_results
+            ):
+                try:
+                    results, cascade = self._rank_candidates(
+                        query, vector_results, keyword_results, exact_case_match, filters, top_k,
+                        query_analysis, enable_advanced_features, trace, query_plan=query_plan
+                    )
+                except Exception as e:
+                    logger.error(f"Error ranking batch query '{query}': {str(e)}")
+                    results, cascade = [], None
+                batch_results.append(results)
+                batch_learned_k.append(cascade.learned_k if cascade else 0)
+            
+            if enable_advanced_features and self.learned_reranker:
+                # Queries the cascade resolved early skip the cross-encoder;
+                # the rest all rerank their leading top_k candidates
+                rerank_positions = [
+                    i for i, results in enumerate(batch_results)
+                    if len(results) > 1 and batch_learned_k[i]
+                ]
+                if rerank_positions:
+                    with trace.stage('learned_reranker'):
+                        reranked = self.learned_reranker.rerank_batch(
+                            [queries[i] for i in rerank_positions],
+                            [batch_results[i] for i in rerank_positions],
+                            top_k=top_k
+                        )
+                    for i, results in zip(rerank_positions, reranked):
+                        batch_results[i] = results
+            
+            return [results[:top_k] for results in batch_results]
+            
+        except Exception as e:
+            logger.error(f"Error in batch hybrid search: {str(e)}")
+            return [[] for _ in queries]
+    
+    def _prepare_query(self, query: str, top_k: int, enable_advanced_features: bool,
+                       trace: SearchTrace, query_plan: Optional[QueryPlan] = None) -> Tuple[Optional[Dict], int, Optional[Dict]]:
+        """Query expansion, adaptive fetch size and exact case number match for a query"""
+        query_analysis = None
+        if enable_advanced_features:
+            if query_plan is not None and query_plan.legal_expansion is not None:
+                query_analysis = query_plan.legal_analysis
+            else:
+                with trace.stage('query_expansion'):
+                    expanded_query_info = self.query_expander.enhance_query_with_legal_knowledge(query)
+                query_analysis = expanded_query_info['query_analysis']
+            logger.info(f"Query type detected: {query_analysis.get('type', 'general')}")
+        
+        # OPTIMIZATION: Adaptive fetch size based on query complexity
+        if query_analysis and query_analysis.get('query_complexity') == 'high':
+            fetch_multiplier = 3  # More results for complex queries
+        else:
+            fetch_multiplier = min(2, max(1, 20 // top_k))  # Standard multiplier
+        fetch_size = top_k * fetch_multiplier
+        
+        # Check for exact case number match first (highest priority)
+        with trace.stage('retrieval_exact_match'):
+            exact_case_match = self._find_exact_case_match(query)
+        
+        return query_analysis, fetch_size, exact_case_match
+    
+    def _add_fuzzy_candidates(self, query: str, keyword_results: List[Dict], filters: Dict[str, any],
+                              fetch_size: int) -> List[Dict]:
+        """
+        Append the fuzzy name index's cases missing from the keyword results
+        
+        They join the keyword branch with a rank scaled by ``fuzzy_weight``, so
+        fusion treats them as weaker lexical hits. Filtered searches skip the
+        branch; the keyword retrievers apply the filters themselves.
+        """
+        if filters or not self.fuzzy_index.ensure_fresh():
+            return keyword_results
+        
+        try:
+            seen = {result.get('case_id') for result in keyword_results}
+            matches = [
+                match for match in self.fuzzy_index.search(query, limit=fetch_size)
+                if match['case_id'] not in seen
+            ]
+            if not matches:
+                return keyword_results
+            
+            metadata = {
+                row.case_id: row
+                for row in SearchMetadata.objects.filter(case_id__in=[match['case_id'] for match in matches], is_indexed=True)
+            }
+            fuzzy_weight = self.config.get('fuzzy_weight', 0.6)
+            fuzzy_results = []
+            for match in matches:
+                row = metadata.get(match['case_id'])
+                if row is None:
+                    continue
+                fuzzy_results.append({
+                    'case_id': row.case_id,
+                    'case_number': row.case_number_normalized,
+                    'case_title': row.case_title_normalized,
+                    'court': row.court_normalized,
+                    'status': row.status_normalized,
+                    'parties': row.parties_normalized,
+                    'institution_date': row.institution_date,
+                    'hearing_date': row.disposal_date,
+                    'rank': match['fuzzy_score'] * fuzzy_weight,
+                    'fuzzy_score': match['fuzzy_score'],
+                    'fuzzy_corrections': match['corrections'],
+                })
+            
+            if fuzzy_results:
+                logger.info(f"Fuzzy name index added {len(fuzzy_results)} candidates")
+            return list(keyword_results) + fuzzy_results
+            
+        except Exception as e:
+            logger.error(f"Error adding fuzzy candidates: {str(e)}")
+            return keyword_results
+    
+    def apply_result_filters(self, results: List[Dict], filters: Dict[str, any]) -> List[Dict]:
+        """
+        Apply the filters retrieval can't push down to candidate results
+        
+        Vector retrieval takes no filters, and the section and judge filters
+        have no metadata column, so these run in memory on the candidates.
+        """
+        return self._apply_date_filters(self._apply_facet_filters(results, filters), filters)
+    
+    def _apply_date_filters(self, results: List[Dict], filters: Dict[str, any]) -> List[Dict]:
+        """
+        Keep the results instituted within the year and date range filters
+        
+        Dates come from the feature store's parsed column, or from the
+        result's own institution date when the store isn't loaded; results
+        without a date are dropped once a date filter is set.
+        """
+        date_from, date_to = self._date_filter_range(filters)
+        if not (date_from or date_to) or not results:
+            return results
+        
+        try:
+            if self.feature_store.ensure_loaded():
+                mask = self.feature_store.date_mask([result.get('case_id') for result in results], date_from, date_to)
+                return [result for result, kept in zip(results, mask.tolist()) if kept]
+            
+            filtered = []
+            for result in results:
+                institution_date = parse_case_date(result.get('institution_date'))
+                if (institution_date
+                        and (date_from is None or institution_date >= date_from)
+                        and (date_to is None or institution_date <= date_to)):
+                    filtered.append(result)
+            return filtered
+            
+        except Exception as e:
+            logger.error(f"Error applying date filters: {str(e)}")
+            return results
+    
+    @staticmethod
+    def _date_filter_range(filters: Dict[str, any]) -> Tuple[Optional[date], Optional[date]]:
+        """Institution date bounds of the year, date_from and date_to filters"""
+        if not filters:
+            return None, None
+        date_from = parse_case_date(filters.get('date_from'))
+        date_to = parse_case_date(filters.get('date_to'))
+        if filters.get('year'):
+            year = int(filters['year'])
+            date_from = max(date_from, date(year, 1, 1)) if date_from else date(year, 1, 1)
+            date_to = min(date_to, date(year, 12, 31)) if date_to else date(year, 12, 31)
+        return date_from, date_to
+    
+    def _apply_facet_filters(self, results: List[Dict], filters: Dict[str, any]) -> List[Dict]:
+        """
+        Keep the results in the facet postings of the section and judge filters
+        
+        Filtering is done against the memory-resident facet postings; a filter
+        whose facet has no built index, or whose term the index doesn't know,
+        is left unapplied.
+        """
+        if not filters or not results:
+            return results
+        
+        try:
+            for facet_type in ('section', 'judge'):
+                term = filters.get(facet_type)
+                if not term:
+                    continue
+                postings = self.facet_postings.get(facet_type)
+                if postings is None or term not in postings:
+                    continue
+                kept = set(self.facet_postings.filter_case_ids(
+                    facet_type, term, [result.get('case_id') for result in results]
+                ))
+                results = [result for result in results if result.get('case_id') in kept]
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error applying facet filters: {str(e)}")
+            return results
+    
+    def _rank_candidates(self, query: str, vector_results: List[Dict], keyword_results: List[Dict],
+                         exact_case_match: Optional[Dict], filters: Dict[str, any], top_k: int,
+                         query_analysis: Optional[Dict], enable_advanced_features: bool,
+                         trace: SearchTrace, deadline: Optional[SearchDeadline] = None,
+                         query_plan: Optional[QueryPlan] = None) -> Tuple[List[Dict[str, any]], CascadeDecision]:
+        """
+        Fuse retrieved candidates, then apply precision optimization and advanced re-ranking
+        
+        Returns:
+            Ranked results and the cascade decision, whose ``learned_k`` tells
+            the caller how many candidates the learned reranker should see
+        """
+        # Filter the candidates of every branch before fusion cuts to top_k,
+        # so the filtered-out cases don't take the places of matching ones
+        if filters:
+            with trace.stage('result_filters'):
+                vector_results = self.apply_result_filters(vector_results, filters)
+                keyword_results = self.apply_result_filters(keyword_results, filters)
+                if exact_case_match and not self.apply_result_filters([exact_case_match], filters):
+                    exact_case_match = None
+        
+        # OPTIMIZATION: Early return if we have enough exact matches
+        if exact_case_match and len(vector_results) == 0 and len(keyword_results) == 0:
+            # If we have an exact match but no other results, return just the exact match
+            return [{
+                'case_id': exact_case_match['case_id'],
+                'case_number': exact_case_match['case_number'],
+                'case_title': exact_case_match['case_title'],
+                'court': exact_case_match['court'],
+                'status': exact_case_match['status'],
+                'institution_date': exact_case_match.get('institution_date', ''),
+                'hearing_date': exact_case_match.get('hearing_date', ''),
+                'vector_score': 0,
+                'keyword_score': 0,
+                'final_score': exact_case_match['exact_score'],
+                'exact_match': True
+            }], CascadeDecision(TIER_EXACT, False, 0, 0)
+        
+        # Combine and rerank results
+        with trace.stage('fusion'):
+            combined_results = self._combine_and_rerank(
+                vector_results, 
+                keyword_results, 
+                query, 
+                top_k,
+                exact_case_match
+            )
+        
+        # Decide from cheap signals which further stages this query needs
+        specificity = getattr(query_plan.analysis, 'specificity_score', None) if query_plan else None
+        cascade = self.cascade.decide(combined_results, top_k, exact_case_match, specificity)
+        
+        # Apply precision optimization for better relevance
+        if cascade.run_precision:
+            with trace.stage('precision_optimizer'):
+                optimized_results = self.precision_optimizer.optimize_search_results(
+                    combined_results, 
+                    query, 
+                    search_mode='hybrid', 
+                    filters=filters,
+                    query_understanding=query_plan.precision_info if query_plan else None
+                )
+        else:
+            optimized_results = combined_results
+        
+        # Apply advanced re-ranking (if enabled) to the candidates the cascade selected
+        if (
+            enable_advanced_features
+            and cascade.advanced_k != 0
+            and len(optimized_results) > 1
+            and (deadline is None or deadline.fits('advanced_reranker'))
+        ):
+            with trace.stage('advanced_reranker'):
+                final_results = rerank_head(
+                    optimized_results,
+                    cascade.advanced_k,
+                    lambda candidates: self.advanced_reranker.rerank_results(
+                        candidates,
+                        query,
+                        query_analysis=query_analysis,
+                        query_terms=query_plan.rerank_terms if query_plan else None
+                    )
+                )
+            logger.info(f"Advanced re-ranking applied: {len(optimized_results)} -> {len(final_results)} results")
+        else:
+            final_results = optimized_results
+        
+        return final_results, cascade
+    
     def _find_exact_case_match(self, query: str) -> Optional[Dict]:
         """Find exact case number match for highest priority ranking - OPTIMIZED VERSION"""
         try:
@@ -377,116 +705,69 @@ class HybridIndexingService:
                            query: str, top_k: int, exact_case_match: Optional[Dict] = None) -> List[Dict]:
         """Combine and rerank vector and keyword search results"""
         try:
-            # Create case ID to result mapping
-            case_results = {}
-            
-            # Process vector results
-            for result in vector_results:
-                case_id = result['case_id']
-                if case_id not in case_results:
-                    case_results[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': result.get('similarity', 0),
-                        'keyword_score': 0,
-                        'combined_score': 0,
-                        'result_data': result
-                    }
-                else:
-                    case_results[case_id]['vector_score'] = max(
-                        case_results[case_id]['vector_score'], 
-                        result.get('similarity', 0)
-                    )
-                    # Merge date fields from vector results
-                    if result.get('institution_date'):
-                        case_results[case_id]['result_data']['institution_date'] = result['institution_date']
-                    if result.get('hearing_date'):
-                        case_results[case_id]['result_data']['hearing_date'] = result['hearing_date']
-            
-            # Process keyword results
-            for result in keyword_results:
-                case_id = result['case_id']
-                if case_id not in case_results:
-                    case_results[case_id] = {
-                        'case_id': case_id,
-                        'vector_score': 0,
-                        'keyword_score': result.get('rank', 0),
-                        'combined_score': 0,
-                        'result_data': result
-                    }
-                else:
-                    case_results[case_id]['keyword_score'] = max(
-                        case_results[case_id]['keyword_score'], 
-                        result.get('rank', 0)
-                    )
-                    # Merge date fields from keyword results
-                    if result.get('institution_date'):
-                        case_results[case_id]['result_data']['institution_date'] = result['institution_date']
-                    if result.get('hearing_date'):
-                        case_results[case_id]['result_data']['hearing_date'] = result['hearing_date']
+            # Align vector and keyword scores on case ids (vectorized)
+            fused = FusedScores(vector_results, keyword_results)
+            if not len(fused):
+                return []
             
             # Calculate combined scores
             vector_weight = self.config.get('vector_weight', 0.6)
             keyword_weight = self.config.get('keyword_weight', 0.4)
+            fusion_method = self.config.get('fusion_method', 'weighted')
+            score_normalization = self.config.get('score_normalization', 'legacy')
             
-            for case_id, result in case_results.items():
+            if fusion_method == 'weighted' and score_normalization == 'legacy':
                 # Normalize scores to 0-1 range
-                normalized_vector = min(1.0, result['vector_score'])
+                normalized_vector = np.minimum(1.0, fused.vector_scores)
                 
                 # IMPROVED: Better keyword score normalization
-                # Handle very small PostgreSQL ranks and convert to meaningful scores
-                keyword_score = result['keyword_score']
-                if keyword_score > 0:
-                    # For PostgreSQL ranks, use logarithmic scaling to make small ranks meaningful
-                    if keyword_score < 0.001:
-                        # Very small ranks get a base score
-                        normalized_keyword = 0.3 + (keyword_score * 100)  # Scale up small ranks
-                    else:
-                        # Normal ranks get standard normalization
-                        normalized_keyword = min(1.0, keyword_score)
-                else:
-                    # If keyword score is 0 but case was found, give it a small boost
-                    normalized_keyword = 0.1 if case_id in [r['case_id'] for r in keyword_results] else 0.0
+                # Very small PostgreSQL ranks get a base score and are scaled up; a case
+                # found by keyword search with a zero rank still gets a small boost
+                keyword_scores = fused.keyword_scores
+                normalized_keyword = np.where(
+                    keyword_scores > 0,
+                    np.where(keyword_scores < 0.001, 0.3 + keyword_scores * 100, np.minimum(1.0, keyword_scores)),
+                    np.where(fused.has_keyword, 0.1, 0.0)
+                )
                 
                 # Calculate weighted combined score
-                result['combined_score'] = (
-                    normalized_vector * vector_weight + 
-                    normalized_keyword * keyword_weight
+                combined_scores = weighted_linear_fusion(
+                    [normalized_vector, normalized_keyword],
+                    [vector_weight, keyword_weight]
                 )
+            else:
+                combined_scores = fuse(fused, vector_weight, keyword_weight, fusion_method, score_normalization)
             
             # Add exact match boost if found
+            exact_row = None
             if exact_case_match:
-                case_id = exact_case_match['case_id']
-                if case_id in case_results:
-                    case_results[case_id]['exact_match'] = True
-                    case_results[case_id]['exact_score'] = exact_case_match['exact_score']
-                    case_results[case_id]['combined_score'] = (
-                        case_results[case_id]['combined_score'] * 1.5 + # Apply a boost factor
-                        case_results[case_id]['exact_score'] * 2.0 # Add a higher boost for exact matches
+                rows = np.flatnonzero(fused.case_ids == int(exact_case_match['case_id']))
+                if rows.size:
+                    exact_row = int(rows[0])
+                    combined_scores[exact_row] = (
+                        combined_scores[exact_row] * 1.5 + # Apply a boost factor
+                        exact_case_match['exact_score'] * 2.0 # Add a higher boost for exact matches
                     )
             
-            # Sort by combined score and return top results
-            sorted_results = sorted(
-                case_results.values(), 
-                key=lambda x: x['combined_score'], 
-                reverse=True
-            )[:top_k]
+            # Select top results; dicts are only built for these rows
+            top_rows = top_k_indices(combined_scores, top_k, fused.first_seen)
             
             # Format final results
             final_results = []
-            for i, result in enumerate(sorted_results):
+            for i, row in enumerate(top_rows):
+                result_data = self._merge_result_data(fused.source_results(row))
                 final_result = {
                     'rank': i + 1,
-                    'case_id': result['case_id'],
-                    'combined_score': result['combined_score'],
-                    'vector_score': result['vector_score'],
-                    'keyword_score': result['keyword_score'],
+                    'case_id': fused.case_id(row),
+                    'combined_score': float(combined_scores[row]),
+                    'vector_score': float(fused.vector_scores[row]),
+                    'keyword_score': float(fused.keyword_scores[row]),
                     'search_type': 'hybrid',
-                    'exact_match': result.get('exact_match', False),
-                    'result_data': result['result_data'],
+                    'exact_match': bool(exact_row is not None and row == exact_row),
+                    'result_data': result_data,
                 }
                 
                 # Merge result data
-                result_data = result['result_data']
                 final_result.update({
                     'case_number': result_data.get('case_number', ''),
                     'case_title': result_data.get('case_title', ''),
@@ -502,16 +783,7 @@ class HybridIndexingService:
             # Attach search profile metadata for downstream ranking
             case_ids = [res['case_id'] for res in final_results]
             if case_ids:
-                profiles = CaseSearchProfile.objects.filter(case_id__in=case_ids).values(
-                    'case_id',
-                    'clean_case_title',
-                    'party_tokens',
-                    'subject_tags',
-                    'keyword_highlights',
-                    'case_number_tokens',
-                    'section_tags'
-                )
-                profile_map = {p['case_id']: p for p in profiles}
+                profile_map = self._get_result_profiles(case_ids)
                 for res in final_results:
                     profile = profile_map.get(res['case_id'])
                     if not profile:
@@ -547,6 +819,37 @@ class HybridIndexingService:
             logger.error(f"Error combining and reranking results: {str(e)}")
             return []
     
+    def _get_result_profiles(self, case_ids: List[int]) -> Dict[int, Dict]:
+        """Search profiles of the result cases, from the feature store when loaded"""
+        if self.feature_store.ensure_loaded():
+            profile_map = {}
+            for case_id in case_ids:
+                profile = self.feature_store.get_profile(case_id)
+                if profile:
+                    profile_map[case_id] = profile
+            return profile_map
+
+        profiles = CaseSearchProfile.objects.filter(case_id__in=case_ids).values(
+            'case_id',
+            'clean_case_title',
+            'party_tokens',
+            'subject_tags',
+            'keyword_highlights',
+            'case_number_tokens',
+            'section_tags'
+        )
+        return {p['case_id']: p for p in profiles}
+
+    def _merge_result_data(self, sources: List[Dict]) -> Dict:
+        """Use the first hit as result data, taking date fields from later hits"""
+        result_data = sources[0]
+        for result in sources[1:]:
+            if result.get('institution_date'):
+                result_data['institution_date'] = result['institution_date']
+            if result.get('hearing_date'):
+                result_data['hearing_date'] = result['hearing_date']
+        return result_data
+    
     def search_by_facet(self, facet_type: str, term: str, top_k: int = 10) -> List[Dict[str, any]]:
         """Search using facet index"""
         try:
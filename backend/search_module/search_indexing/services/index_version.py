@@ -0,0 +1,48 @@
+"""
+Index Version Tracking
+Derives a monotonically increasing index version from the indexing logs
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from ..models import IndexingLog
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached_version = None
+_checked_at = 0.0
+
+
+def get_index_version(force_refresh: bool = False) -> int:
+    """
+    Return the current index version.
+
+    Every index build (vector, keyword, BM25, Pinecone, hybrid) writes an
+    IndexingLog row, so the latest log id changes whenever any index is
+    rebuilt. The value is re-read from the database at most once per
+    SEARCH_INDEX_VERSION_CHECK_SECONDS per process.
+    """
+    global _cached_version, _checked_at
+
+    interval = getattr(settings, 'SEARCH_INDEX_VERSION_CHECK_SECONDS', 30)
+    now = time.time()
+    if not force_refresh and _cached_version is not None and now - _checked_at < interval:
+        return _cached_version
+
+    with _lock:
+        if not force_refresh and _cached_version is not None and now - _checked_at < interval:
+            return _cached_version
+        try:
+            latest_id = IndexingLog.objects.order_by('-id').values_list('id', flat=True).first()
+            _cached_version = latest_id or 0
+        except Exception as e:
+            logger.error(f"Error reading index version: {str(e)}")
+            if _cached_version is None:
+                _cached_version = 0
+        _checked_at = now
+        return _cached_version
@@ -7,7 +7,6 @@ import re
 import hashlib
 import logging
 from typing import List, Dict, Optional, Set, Any
-from datetime import datetime
 import time
 
 from django.db import connection
@@ -15,8 +14,11 @@ from django.utils import timezone
 from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
 from django.db.models import Q, F
 
+from apps.cases.services.data_cleaner import parse_case_date
 from ..models import KeywordIndex, FacetIndex, SearchMetadata, IndexingLog
 from .enhanced_metadata_service import EnhancedMetadataService
+from .case_feature_store import get_case_feature_store
+from .facet_postings import encode_postings, get_facet_postings
 
 logger = logging.getLogger(__name__)
 
@@ -106,8 +108,8 @@ class KeywordIndexingService:
                         'case_title': case_title,
                         'court': getattr(case_obj.court, 'name', '') if case_obj.court else '',
                         'status': case_obj.status or '',
-                        'institution_date': case_obj.institution_date,
-                        'hearing_date': getattr(case_obj, 'hearing_date', None),
+                        'institution_date': case_obj.institution_date_normalized or case_obj.institution_date,
+                        'hearing_date': case_obj.hearing_date_normalized or getattr(case_obj, 'hearing_date', None),
                         'party_tokens': profile.party_tokens if profile else [],
                         'subject_tags': profile.subject_tags if profile else [],
                         'summary_text': profile.summary_text if profile else '',
@@ -150,28 +152,11 @@ class KeywordIndexingService:
                     parties.append(token)
             parties_normalized = " | ".join(parties) if parties else ""
             
-            # Parse dates
-            institution_date = None
-            hearing_date = None
-            disposal_date = None
-            
-            try:
-                if case_data.get('institution_date'):
-                    institution_date = datetime.strptime(case_data['institution_date'], '%d-%m-%Y').date()
-            except:
-                pass
-            
-            try:
-                if case_data.get('hearing_date'):
-                    hearing_date = datetime.strptime(case_data['hearing_date'], '%d-%m-%Y').date()
-            except:
-                pass
-            
-            try:
-                if case_data.get('disposal_date'):
-                    disposal_date = datetime.strptime(case_data['disposal_date'], '%d-%m-%Y').date()
-            except:
-                pass
+            # Parse dates (the cleaner's parsed columns when the case has them)
+            institution_date = parse_case_date(case_data.get('institution_date'))
+            hearing_date = parse_case_date(case_data.get('hearing_date'))
+            disposal_date = parse_case_date(case_data.get('disposal_date'))
+            institution_year = institution_date.year if institution_date else None
             
             # TIER 1 INTEGRATION: Extract enhanced metadata from case
             from apps.cases.models import Case
@@ -289,6 +274,7 @@ class KeywordIndexingService:
                     'institution_date': institution_date,
                     'hearing_date': hearing_date,
                     'disposal_date': disposal_date,
+                    'institution_year': institution_year,
                     'content_hash': content_hash,
                     'text_hash': text_hash,
                     'metadata_hash': metadata_hash,
@@ -326,6 +312,7 @@ class KeywordIndexingService:
                 search_metadata.institution_date = institution_date
                 search_metadata.hearing_date = hearing_date
                 search_metadata.disposal_date = disposal_date
+                search_metadata.institution_year = institution_year
                 search_metadata.content_hash = content_hash
                 search_metadata.text_hash = text_hash
                 search_metadata.metadata_hash = metadata_hash
@@ -410,31 +397,39 @@ class KeywordIndexingService:
                 stats['index_built'] = True  # Mark as successful even if no terms
                 return stats
             
-            # Create term mappings
+            # Case ids of every term in one grouped query
             term_mappings = {}
+            occurrences = TermOccurrence.objects.filter(
+                term__type=facet_type
+            ).values_list('term_id', 'case_id').distinct().order_by()
+            for term_id, case_id in occurrences.iterator(chunk_size=10000):
+                term_mappings.setdefault(term_id, set()).add(case_id)
+            
+            postings_mappings = {}
             boost_config = {}
+            for term_id, canonical, occurrence_count in terms.values_list('id', 'canonical', 'occurrence_count'):
+                case_ids = term_mappings.get(term_id)
+                if not case_ids:
+                    continue
+                # Terms sharing a canonical form share a posting list
+                postings_mappings.setdefault(canonical, set()).update(case_ids)
+                boost_config[canonical] = {
+                    'occurrence_count': occurrence_count,
+                    'case_count': len(postings_mappings[canonical]),
+                    'boost_factor': min(2.0, 1.0 + (len(postings_mappings[canonical]) / 100.0))
+                }
             
-            for term in terms:
-                # Get case IDs where this term appears
-                case_ids = TermOccurrence.objects.filter(term=term).values_list('case_id', flat=True).distinct()
-                
-                if case_ids:
-                    term_mappings[term.canonical] = list(case_ids)
-                    boost_config[term.canonical] = {
-                        'occurrence_count': term.occurrence_count,
-                        'case_count': len(case_ids),
-                        'boost_factor': min(2.0, 1.0 + (len(case_ids) / 100.0))
-                    }
-                    
-                    stats['terms_processed'] += 1
-                    stats['mappings_created'] += len(case_ids)
+            stats['terms_processed'] = len(postings_mappings)
+            stats['mappings_created'] = sum(len(case_ids) for case_ids in postings_mappings.values())
+            postings = encode_postings(postings_mappings)
             
             # Create or update facet index
             facet_index, created = FacetIndex.objects.get_or_create(
                 index_name=f"facet_{facet_type}",
                 defaults={
                     'facet_type': facet_type,
-                    'term_mappings': term_mappings,
+                    'term_mappings': {},
+                    'postings': postings,
                     'boost_config': boost_config,
                     'total_terms': stats['terms_processed'],
                     'total_mappings': stats['mappings_created'],
@@ -445,7 +440,8 @@ class KeywordIndexingService:
             
             if not created:
                 # Update existing index
-                facet_index.term_mappings = term_mappings
+                facet_index.term_mappings = {}
+                facet_index.postings = postings
                 facet_index.boost_config = boost_config
                 facet_index.total_terms = stats['terms_processed']
                 facet_index.total_mappings = stats['mappings_created']
@@ -453,8 +449,10 @@ class KeywordIndexingService:
                 facet_index.updated_at = timezone.now()
                 facet_index.save()
             
+            get_facet_postings().invalidate(facet_type)
+            
             stats['index_built'] = True
-            logger.info(f"Built facet index for {facet_type}: {stats['terms_processed']} terms, {stats['mappings_created']} mappings")
+            logger.info(f"Built facet index for {facet_type}: {stats['terms_processed']} terms, {stats['mappings_created']} mappings, {len(postings)} bytes")
             
             return stats
             
@@ -508,8 +506,8 @@ class KeywordIndexingService:
                         'case_title': unified_view.case.case_title or '',
                         'status': unified_view.case.status or '',
                         'bench': unified_view.case.bench or '',
-                        'institution_date': unified_view.case.institution_date,
-                        'hearing_date': unified_view.case.hearing_date,
+                        'institution_date': unified_view.case.institution_date_normalized or unified_view.case.institution_date,
+                        'hearing_date': unified_view.case.hearing_date_normalized or unified_view.case.hearing_date,
                         'disposal_date': None,
                         'pdf_content': ''
                     }
@@ -661,7 +659,11 @@ class KeywordIndexingService:
                     elif key == 'status':
                         search_query &= Q(status_normalized__icontains=value)
                     elif key == 'year':
-                        search_query &= Q(institution_date__year=value)
+                        search_query &= Q(institution_year=value)
+                    elif key == 'date_from':
+                        search_query &= Q(institution_date__gte=value)
+                    elif key == 'date_to':
+                        search_query &= Q(institution_date__lte=value)
         
         return search_query
     
@@ -761,6 +763,8 @@ class KeywordIndexingService:
                     queryset = queryset.filter(court_normalized__icontains=filters['court'])
                 if 'status' in filters:
                     queryset = queryset.filter(status_normalized__icontains=filters['status'])
+                if 'year' in filters:
+                    queryset = queryset.filter(institution_year=filters['year'])
                 if 'date_from' in filters:
                     queryset = queryset.filter(institution_date__gte=filters['date_from'])
                 if 'date_to' in filters:
@@ -949,35 +953,49 @@ class KeywordIndexingService:
     def search_by_facet(self, facet_type: str, term: str, top_k: int = 10) -> List[Dict[str, any]]:
         """Search using facet index"""
         try:
-            # Get facet index
-            facet_index = FacetIndex.objects.filter(
-                index_name=f"facet_{facet_type}",
-                is_active=True,
-                is_built=True
-            ).first()
+            # Get memory-resident postings of the facet index
+            postings = get_facet_postings().get(facet_type)
             
-            if not facet_index:
+            if postings is None:
                 logger.error(f"No active facet index found for {facet_type}")
                 return []
             
             # Get case IDs for the term
-            case_ids = facet_index.term_mappings.get(term, [])
+            case_ids = postings.get(term)
             
-            if not case_ids:
+            if not len(case_ids):
                 return []
             
-            # Get search metadata for these cases
-            search_metadata = SearchMetadata.objects.filter(case_id__in=case_ids)
+            # Case fields from the memory-resident feature store when loaded,
+            # else from the cases table; both give the raw case values
+            feature_store = get_case_feature_store()
+            if feature_store.ensure_loaded():
+                cases = {}
+                for case_id in case_ids.tolist():
+                    case = feature_store.get_case(case_id)
+                    if case:
+                        cases[case_id] = (case['case_number'], case['case_title'], case['status'], case['court'])
+            else:
+                from apps.cases.models import Case
+                cases = {
+                    case_id: (case_number or '', case_title or '', status or '', court)
+                    for case_id, case_number, case_title, status, court in Case.objects.filter(
+                        id__in=case_ids.tolist()
+                    ).values_list('id', 'case_number', 'case_title', 'status', 'court__name')
+                }
             
-            # Format results
+            # Format results, in posting order
             results = []
-            for metadata in search_metadata:
+            for case_id in case_ids.tolist():
+                if case_id not in cases:
+                    continue
+                case_number, case_title, status, court = cases[case_id]
                 results.append({
-                    'case_id': metadata.case_id,
-                    'case_number': metadata.case_number_normalized,
-                    'case_title': metadata.case_title_normalized,
-                    'status': metadata.status_normalized,
-                    'court': metadata.court_normalized,
+                    'case_id': case_id,
+                    'case_number': case_number,
+                    'case_title': case_title,
+                    'status': status,
+                    'court': court,
                     'facet_type': facet_type,
                     'facet_term': term
                 })
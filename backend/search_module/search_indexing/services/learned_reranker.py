@@ -17,6 +17,8 @@ except ImportError:  # pragma: no cover - optional dependency
     CrossEncoder = None  # type: ignore
 
 from apps.cases.models import CaseSearchProfile
+from .case_feature_store import get_case_feature_store
+from .pair_scoring import MicroBatchScheduler, PairScoreCache, normalize_pair_query, text_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,33 @@ class LearnedReranker:
         logger.info("Loading learned reranker model from %s", self.model_path)
         self.model = CrossEncoder(str(self.model_path), max_length=self.config.get("learned_reranker_max_length", 512))
 
-        self._profile_cache: Dict[int, Optional[CaseSearchProfile]] = {}
+        # Profiles come from the shared feature store; the per-instance cache
+        # is only used when the store is disabled or failed to load.
+        self.feature_store = get_case_feature_store()
+        self._profile_cache: Dict[int, Optional[Dict[str, Any]]] = {}
+
+        # Scores only change with the model or the candidate text, so repeat
+        # (query, case) pairs are served from cache; the rest are merged with
+        # concurrent requests' pairs into shared predict calls.
+        stat = self.model_path.stat()
+        self.model_version = f"{self.model_path.name}:{int(stat.st_mtime)}"
+        self.score_cache = PairScoreCache(
+            int(self.config.get(
+                "learned_reranker_score_cache_size",
+                getattr(settings, "LEARNED_RERANKER_SCORE_CACHE_SIZE", 20000),
+            ))
+        )
+        self.scheduler = MicroBatchScheduler(
+            self._predict,
+            max_batch_pairs=int(self.config.get(
+                "learned_reranker_max_batch_pairs",
+                getattr(settings, "LEARNED_RERANKER_MAX_BATCH_PAIRS", 256),
+            )),
+            max_wait_ms=float(self.config.get(
+                "learned_reranker_batch_wait_ms",
+                getattr(settings, "LEARNED_RERANKER_BATCH_WAIT_MS", 0.0),
+            )),
+        )
 
     def rerank_results(
         self,
@@ -60,44 +88,116 @@ class LearnedReranker:
             query_analysis: Optional query metadata (unused for now, kept for future features).
             top_k: Optional limit on the number of results to score; defaults to configured max.
         """
-        if not results or len(results) <= 1:
-            return results
+        return self.rerank_batch([query], [results], top_k=top_k)[0]
 
-        limit = min(top_k or len(results), self.max_candidates, len(results))
-        candidates = results[:limit]
+    def rerank_batch(
+        self,
+        queries: List[str],
+        results_per_query: List[List[Dict[str, Any]]],
+        top_k: Optional[int] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Rerank the results of several queries with a single model call.
 
+        The (query, candidate) pairs of every query are scored together so the
+        cross-encoder runs in full ``batch_size`` batches, and candidate
+        profiles are loaded with one database query.
+        """
+        spans: List[Optional[tuple]] = []
         model_inputs: List[List[str]] = []
-        for result in candidates:
-            case_text = self._build_candidate_text(result)
-            if not case_text:
-                case_text = result.get("case_title") or ""
-            model_inputs.append(
-                [
-                    f"Query: {query}",
-                    f"Candidate: {case_text}",
-                ]
-            )
-
-        if not model_inputs:
-            return results
+        cache_keys: List[tuple] = []
+        batch_candidates: List[List[Dict[str, Any]]] = []
+
+        for results in results_per_query:
+            if not results or len(results) <= 1:
+                batch_candidates.append([])
+                continue
+            limit = min(top_k or len(results), self.max_candidates, len(results))
+            batch_candidates.append(results[:limit])
+
+        self._prefetch_profiles(
+            [result.get("case_id") for candidates in batch_candidates for result in candidates]
+        )
 
-        scores = self.model.predict(model_inputs, batch_size=self.batch_size, show_progress_bar=False)
+        for query, candidates in zip(queries, batch_candidates):
+            if not candidates:
+                spans.append(None)
+                continue
+            start = len(model_inputs)
+            normalized_query = normalize_pair_query(query)
+            for result in candidates:
+                case_text = self._build_candidate_text(result)
+                if not case_text:
+                    case_text = result.get("case_title") or ""
+                cache_keys.append(
+                    (self.model_version, normalized_query, result.get("case_id"), text_fingerprint(case_text))
+                )
+                model_inputs.append(
+                    [
+                        f"Query: {query}",
+                        f"Candidate: {case_text}",
+                    ]
+                )
+            spans.append((start, len(model_inputs)))
 
-        for result, score in zip(candidates, scores):
-            base_score = (
-                result.get("final_rerank_score")
-                or result.get("final_score")
-                or result.get("combined_score")
-                or 0.0
+        if not model_inputs:
+            return list(results_per_query)
+
+        scores = self._score_pairs(model_inputs, cache_keys)
+
+        reranked_batch: List[List[Dict[str, Any]]] = []
+        for results, candidates, span in zip(results_per_query, batch_candidates, spans):
+            if span is None:
+                reranked_batch.append(results)
+                continue
+
+            for result, score in zip(candidates, scores[span[0]:span[1]]):
+                base_score = (
+                    result.get("final_rerank_score")
+                    or result.get("final_score")
+                    or result.get("combined_score")
+                    or 0.0
+                )
+                blended = (1.0 - self.blend_weight) * base_score + self.blend_weight * float(score)
+
+                result["learned_reranker_score"] = float(score)
+                result["final_score"] = blended
+                result["final_rerank_score"] = blended
+
+            reranked_batch.append(
+                sorted(results, key=lambda item: item.get("final_rerank_score", item.get("final_score", 0)), reverse=True)
             )
-            blended = (1.0 - self.blend_weight) * base_score + self.blend_weight * float(score)
-
-            result["learned_reranker_score"] = float(score)
-            result["final_score"] = blended
-            result["final_rerank_score"] = blended
-
-        reranked = sorted(results, key=lambda item: item.get("final_rerank_score", item.get("final_score", 0)), reverse=True)
-        return reranked
+        return reranked_batch
+
+    def _score_pairs(self, model_inputs: List[List[str]], cache_keys: List[tuple]) -> List[float]:
+        """Cross-encoder scores for the pairs, scoring only uncached ones."""
+        scores = self.score_cache.get_many(cache_keys)
+
+        # Duplicate pairs within the batch are scored once
+        missing: Dict[tuple, List[int]] = {}
+        for position, (key, score) in enumerate(zip(cache_keys, scores)):
+            if score is None:
+                missing.setdefault(key, []).append(position)
+
+        if missing:
+            positions = list(missing.values())
+            fresh = self.scheduler.score([model_inputs[group[0]] for group in positions])
+            for group, score in zip(positions, fresh):
+                for position in group:
+                    scores[position] = score
+            self.score_cache.set_many(list(zip(missing.keys(), fresh)))
+        return scores
+
+    def _predict(self, model_inputs: List[List[str]]) -> List[float]:
+        return self.model.predict(model_inputs, batch_size=self.batch_size, show_progress_bar=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Score cache and batching counters."""
+        return {
+            "model_version": self.model_version,
+            "score_cache": self.score_cache.get_stats(),
+            "batching": self.scheduler.get_stats(),
+        }
 
     def _build_candidate_text(self, result: Dict[str, Any]) -> str:
         """Compose a textual representation for the candidate case."""
@@ -105,10 +205,10 @@ class LearnedReranker:
         profile = self._get_profile(case_id)
 
         parts: List[str] = []
-        case_title = result.get("case_title") or (profile.case.case_title if profile and profile.case else None)
-        case_number = result.get("case_number") or (profile.case.case_number if profile and profile.case else None)
-        court = result.get("court") or (profile.case.court.name if profile and profile.case and profile.case.court else None)
-        status = result.get("status") or (profile.case.status if profile and profile.case else None)
+        case_title = result.get("case_title") or (profile.get("case_title") if profile else None)
+        case_number = result.get("case_number") or (profile.get("case_number") if profile else None)
+        court = result.get("court") or (profile.get("court") if profile else None)
+        status = result.get("status") or (profile.get("status") if profile else None)
 
         if case_title:
             parts.append(f"Title: {case_title}")
@@ -120,42 +220,64 @@ class LearnedReranker:
             parts.append(f"Status: {status}")
 
         if profile:
-            if profile.summary_text:
-                parts.append(f"Summary: {profile.summary_text}")
-            metadata = profile.metadata or {}
+            if profile.get("summary_text"):
+                parts.append(f"Summary: {profile['summary_text']}")
+            metadata = profile.get("metadata") or {}
             abstract = metadata.get("abstract_text")
             if abstract:
                 parts.append(f"Abstract: {abstract}")
             elif metadata.get("abstract_sentences"):
                 parts.append("Abstract: " + " ".join(metadata["abstract_sentences"]))
 
-            if profile.subject_tags:
-                parts.append("Subjects: " + ", ".join(profile.subject_tags[:6]))
-            if profile.section_tags:
-                parts.append("Sections: " + ", ".join(profile.section_tags[:6]))
-            if profile.party_tokens:
-                parts.append("Parties: " + ", ".join(profile.party_tokens[:6]))
+            if profile.get("subject_tags"):
+                parts.append("Subjects: " + ", ".join(profile["subject_tags"][:6]))
+            if profile.get("section_tags"):
+                parts.append("Sections: " + ", ".join(profile["section_tags"][:6]))
+            if profile.get("party_tokens"):
+                parts.append("Parties: " + ", ".join(profile["party_tokens"][:6]))
 
         return " | ".join(parts)
 
-    def _get_profile(self, case_id: Optional[int]) -> Optional[CaseSearchProfile]:
+    def _get_profile(self, case_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Search profile plus case fields for a candidate, None without a profile."""
         if case_id is None:
             return None
-        if case_id in self._profile_cache:
-            return self._profile_cache[case_id]
-
-        profile = (
-            CaseSearchProfile.objects.select_related("case", "case__court")
-            .filter(case_id=case_id)
-            .first()
-        )
-        self._profile_cache[case_id] = profile
-        return profile
-
-
-
-
-
-
-
-
+        if self.feature_store.ensure_loaded():
+            profile = self.feature_store.get_profile(case_id)
+            if profile is None:
+                return None
+            return {**(self.feature_store.get_case(case_id) or {}), **profile}
+
+        if case_id not in self._profile_cache:
+            self._prefetch_profiles([case_id])
+        return self._profile_cache[case_id]
+
+    def _prefetch_profiles(self, case_ids: Iterable[Optional[int]]) -> None:
+        """Load the profiles of every uncached case with a single query."""
+        if self.feature_store.ensure_loaded():
+            return
+
+        missing = {case_id for case_id in case_ids if case_id is not None and case_id not in self._profile_cache}
+        if not missing:
+            return
+
+        profiles = CaseSearchProfile.objects.select_related("case", "case__court").filter(case_id__in=missing)
+        for profile in profiles:
+            self._profile_cache[profile.case_id] = self._serialize_profile(profile)
+        for case_id in missing:
+            self._profile_cache.setdefault(case_id, None)
+
+    @staticmethod
+    def _serialize_profile(profile: CaseSearchProfile) -> Dict[str, Any]:
+        case = profile.case
+        return {
+            "case_title": case.case_title if case else None,
+            "case_number": case.case_number if case else None,
+            "court": case.court.name if case and case.court else None,
+            "status": case.status if case else None,
+            "summary_text": profile.summary_text or "",
+            "metadata": profile.metadata or {},
+            "subject_tags": profile.subject_tags or [],
+            "section_tags": profile.section_tags or [],
+            "party_tokens": profile.party_tokens or [],
+        }
@@ -0,0 +1,360 @@
+"""
+Lexical Feature Extractor
+Single-pass lexical match features for (query, candidate) pairs shared by the rankers
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Feature vector layout
+CITATION_MATCH = 0            # query and candidate share a citation (AdvancedReranker)
+EXACT_TERM_MATCHES = 1        # shared non-stop words of title + case number
+LEGAL_TERM_RELEVANCE = 2      # 0.1 per legal term in both, capped at 1.0
+QUERY_TYPE_BOOST = 3          # multiplier from the legal query analysis type
+CASE_NUMBER_CITATION = 4      # a precision citation occurs in the case number
+KEY_TERM_MATCHES = 5          # precision key terms found in title + case number
+CASE_TYPE_ALIGNMENT = 6       # legal concept query with a key term in the title
+NUMBER_CONTAINS_QUERY = 7     # whole query inside the case number (FastRankingService)
+TITLE_TERM_MATCHES = 8        # query terms longer than two characters in the title
+TITLE_PHRASE_MATCH = 9        # whole query inside the title
+TITLE_PREFIX_MATCH = 10       # title starts with the query
+TITLE_TERM_FRACTION = 11      # fraction of quality query terms in the title (ResultQualityEngine)
+ENTITY_FRACTION = 12          # fraction of legal entities in title + case number
+TITLE_CLARITY = 13            # clarity of title, case number and court
+
+FEATURE_NAMES = (
+    'citation_match', 'exact_term_matches', 'legal_term_relevance', 'query_type_boost',
+    'case_number_citation', 'key_term_matches', 'case_type_alignment',
+    'number_contains_query', 'title_term_matches', 'title_phrase_match', 'title_prefix_match',
+    'title_term_fraction', 'entity_fraction', 'title_clarity',
+)
+NUM_FEATURES = len(FEATURE_NAMES)
+
+CITATION_PATTERNS = (
+    re.compile(r'\b\d{4}\s*[A-Z]+\s*\d+\b', re.IGNORECASE),
+    re.compile(r'\b[A-Z]+\s*\d{4}\s*\d+\b', re.IGNORECASE),
+    re.compile(r'\b\d+\s*of\s*\d{4}\b', re.IGNORECASE),
+)
+# Matched case-sensitively against lowercased text, as the reranker always has
+CITATION_TYPE_PATTERN = re.compile(r'\b\d{4}\s*[A-Z]+\s*\d+\b')
+CASE_NUMBER_PATTERN = re.compile(r'\b\w+\s*\d+/\d{4}\b')
+
+STOP_WORDS = frozenset({'the', 'and', 'or', 'of', 'in', 'at', 'to', 'for', 'vs', 'versus'})
+
+LEGAL_TERMS = (
+    'appeal', 'petition', 'bail', 'writ', 'civil', 'criminal',
+    'constitutional', 'contract', 'property', 'family',
+    'commercial', 'tax', 'court', 'judge', 'justice'
+)
+
+GARBLED_MARKERS = ('�', '???', '***')
+
+
+def _citations(text: str) -> frozenset:
+    found = []
+    for pattern in CITATION_PATTERNS:
+        found.extend(pattern.findall(text))
+    return frozenset(found)
+
+
+@dataclass(frozen=True, eq=False)
+class QueryLexicon:
+    """
+    Query-side inputs of the lexical features, derived once per query.
+
+    Each ranker fills the parts it has (legal analysis, precision query
+    info, quality analysis); features of the missing parts are 0.
+    Lexicons are cached by their inputs, so equal queries share one
+    instance and compare by identity.
+    """
+    query_lower: str
+    query_upper: str
+    words: frozenset
+    citations: frozenset
+    legal_terms: Tuple[str, ...]
+    analysis_type: Optional[str]
+    legal_concepts: Tuple[str, ...]
+    precision_query_type: Optional[str]
+    precision_citations: Tuple[str, ...]
+    key_terms: Tuple[str, ...]
+    upper_terms: Tuple[str, ...]
+    quality_terms: Tuple[str, ...]
+    entities: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CandidateView:
+    """Query-independent parse of one candidate's title, case number and court"""
+    title_lower: str
+    title_upper: str
+    number_lower: str
+    number_upper: str
+    text_lower: str
+    words: frozenset
+    title_words: frozenset
+    citations: frozenset
+    has_party_marker: bool
+    has_citation_pattern: bool
+    clarity: float
+
+
+class LexicalFeatureExtractor:
+    """
+    Computes every lexical match feature of a (query, candidate) pair in one pass.
+
+    Candidates are parsed once into a ``CandidateView`` (lowercased text,
+    word sets, citations, clarity) that is cached across queries; the pair
+    features are then set intersections and substring checks against a
+    ``QueryLexicon`` and are cached as read-only vectors of ``NUM_FEATURES``
+    floats. AdvancedReranker, PrecisionOptimizerService, FastRankingService
+    and ResultQualityEngine read their signals from these vectors instead
+    of each rescanning the case text.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'cache_size': getattr(settings, 'SEARCH_LEXICAL_FEATURE_CACHE_SIZE', 20000),
+            'lexicon_cache_size': 512,
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        cache_size = self.default_config['cache_size']
+        self._lexicon = lru_cache(maxsize=self.default_config['lexicon_cache_size'])(self._build_lexicon)
+        self._view = lru_cache(maxsize=cache_size)(self._build_view)
+        self._pair = lru_cache(maxsize=cache_size)(self._build_features)
+        self._title_words = lru_cache(maxsize=cache_size)(lambda title: frozenset(title.lower().split()))
+
+    def lexicon(self, query: str = '', query_analysis: Optional[Dict[str, Any]] = None,
+                precision_info: Optional[Dict[str, Any]] = None,
+                quality_analysis: Optional[Dict[str, Any]] = None) -> QueryLexicon:
+        """
+        Query lexicon from the inputs a ranker has
+
+        Args:
+            query: Raw query text
+            query_analysis: Legal analysis with ``type`` and ``legal_concepts``
+                (AdvancedReranker)
+            precision_info: ``enhance_query_understanding`` output
+                (PrecisionOptimizerService / QueryPlan.precision_info)
+            quality_analysis: Quality engine query analysis with optional
+                ``query`` and ``legal_entities``
+        """
+        analysis_type = None
+        legal_concepts: Tuple[str, ...] = ()
+        if query_analysis:
+            analysis_type = query_analysis.get('type', 'general')
+            legal_concepts = tuple(
+                concept for concept in query_analysis.get('legal_concepts', []) or []
+                if isinstance(concept, str)
+            )
+
+        precision_query_type = None
+        precision_citations: Tuple[str, ...] = ()
+        key_terms: Tuple[str, ...] = ()
+        if precision_info:
+            precision_query_type = precision_info.get('query_type')
+            precision_citations = tuple(str(citation).lower() for citation in precision_info.get('citations', []))
+            key_terms = tuple(term for term in precision_info.get('key_terms', []) if isinstance(term, str))
+
+        quality_query = None
+        entities: Tuple[str, ...] = ()
+        if quality_analysis:
+            if 'query' in quality_analysis:
+                quality_query = quality_analysis['query'] or ''
+            entities = tuple(
+                (entity.get('normalized', '') or '').lower()
+                for entity in quality_analysis.get('legal_entities', []) or []
+                if isinstance(entity, dict)
+            )
+
+        return self._lexicon(query or '', analysis_type, legal_concepts, precision_query_type,
+                             precision_citations, key_terms, quality_query, entities)
+
+    def features(self, lexicon: QueryLexicon, case_data: Dict[str, Any]) -> np.ndarray:
+        """Read-only feature vector of one candidate (result data or case dict)"""
+        return self._pair(lexicon, self._view_key(case_data))
+
+    def feature_matrix(self, lexicon: QueryLexicon, candidates: Iterable[Dict[str, Any]]) -> np.ndarray:
+        """Feature vectors of several candidates as an ``n x NUM_FEATURES`` matrix"""
+        rows = [self.features(lexicon, case_data) for case_data in candidates]
+        if not rows:
+            return np.zeros((0, NUM_FEATURES))
+        return np.vstack(rows)
+
+    def title_words(self, title: str) -> frozenset:
+        """Lowercased word set of a title"""
+        return self._title_words(title or '')
+
+    def title_similarity(self, title1: str, title2: str) -> float:
+        """Jaccard similarity of two titles' word sets"""
+        words1 = self.title_words(title1)
+        words2 = self.title_words(title2)
+
+        if not words1 or not words2:
+            return 0.0
+
+        union = len(words1 | words2)
+        return len(words1 & words2) / union if union > 0 else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, cache in (('lexicons', self._lexicon), ('candidates', self._view), ('pairs', self._pair)):
+            info = cache.cache_info()
+            lookups = info.hits + info.misses
+            stats[name] = {
+                'size': info.currsize,
+                'hits': info.hits,
+                'misses': info.misses,
+                'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+            }
+        stats['num_features'] = NUM_FEATURES
+        return stats
+
+    @staticmethod
+    def _view_key(case_data: Dict[str, Any]) -> Tuple[str, str, str]:
+        return (
+            case_data.get('case_title') or '',
+            case_data.get('case_number') or '',
+            case_data.get('court') or '',
+        )
+
+    @staticmethod
+    def _build_lexicon(query: str, analysis_type: Optional[str], legal_concepts: Tuple[str, ...],
+                       precision_query_type: Optional[str], precision_citations: Tuple[str, ...],
+                       key_terms: Tuple[str, ...], quality_query: Optional[str],
+                       entities: Tuple[str, ...]) -> QueryLexicon:
+        query_lower = query.lower()
+        query_upper = query.upper()
+        return QueryLexicon(
+            query_lower=query_lower,
+            query_upper=query_upper,
+            words=frozenset(query_lower.split()) - STOP_WORDS,
+            citations=_citations(query),
+            legal_terms=tuple(term for term in LEGAL_TERMS if term in query_lower),
+            analysis_type=analysis_type,
+            legal_concepts=legal_concepts,
+            precision_query_type=precision_query_type,
+            precision_citations=precision_citations,
+            key_terms=key_terms,
+            upper_terms=tuple(term.strip() for term in query_upper.split() if len(term.strip()) > 2),
+            quality_terms=tuple(quality_query.lower().split()) if quality_query is not None else (),
+            entities=entities,
+        )
+
+    @staticmethod
+    def _build_view(key: Tuple[str, str, str]) -> CandidateView:
+        title, number, court = key
+        title_lower = title.lower()
+        text_lower = f"{title} {number}".lower()
+
+        # Clarity of the case record
+        clarity = 0.5
+        if title:
+            if ' vs ' in title_lower or ' v. ' in title_lower:
+                clarity += 0.2
+            if 10 <= len(title) <= 200:
+                clarity += 0.1
+            if not any(marker in title for marker in GARBLED_MARKERS):
+                clarity += 0.1
+        if number and CASE_NUMBER_PATTERN.search(number):
+            clarity += 0.15
+        if court and len(court) > 5:
+            clarity += 0.05
+
+        return CandidateView(
+            title_lower=title_lower,
+            title_upper=title.upper(),
+            number_lower=number.lower(),
+            number_upper=number.upper(),
+            text_lower=text_lower,
+            words=frozenset(text_lower.split()) - STOP_WORDS,
+            title_words=frozenset(title_lower.split()),
+            citations=_citations(f"{number} {title}"),
+            has_party_marker=' vs ' in text_lower or ' v ' in text_lower,
+            has_citation_pattern=CITATION_TYPE_PATTERN.search(text_lower) is not None,
+            clarity=min(clarity, 1.0),
+        )
+
+    def _build_features(self, lexicon: QueryLexicon, key: Tuple[str, str, str]) -> np.ndarray:
+        view = self._view(key)
+        text = view.text_lower
+        features = np.zeros(NUM_FEATURES)
+
+        # Legal relevance (AdvancedReranker)
+        features[CITATION_MATCH] = bool(lexicon.citations & view.citations)
+        features[EXACT_TERM_MATCHES] = len(lexicon.words & view.words)
+        legal_term_score = 0.0
+        for term in lexicon.legal_terms:
+            if term in text:
+                legal_term_score += 0.1
+        features[LEGAL_TERM_RELEVANCE] = min(1.0, legal_term_score)
+
+        type_boost = 1.0
+        if lexicon.analysis_type == 'citation':
+            if view.has_citation_pattern:
+                type_boost = 1.3
+        elif lexicon.analysis_type == 'case_parties':
+            if view.has_party_marker:
+                type_boost = 1.2
+        elif lexicon.analysis_type == 'legal_concept':
+            for concept in lexicon.legal_concepts:
+                if concept in text:
+                    type_boost *= 1.1
+        features[QUERY_TYPE_BOOST] = type_boost
+
+        # Precision scoring (PrecisionOptimizerService)
+        features[CASE_NUMBER_CITATION] = any(citation in view.number_lower for citation in lexicon.precision_citations)
+        features[KEY_TERM_MATCHES] = sum(1 for term in lexicon.key_terms if term in text)
+        features[CASE_TYPE_ALIGNMENT] = (
+            lexicon.precision_query_type == 'legal_concept'
+            and any(term in view.title_lower for term in lexicon.key_terms)
+        )
+
+        # Title and case number boosts (FastRankingService)
+        title_upper = view.title_upper
+        features[NUMBER_CONTAINS_QUERY] = lexicon.query_upper in view.number_upper
+        features[TITLE_TERM_MATCHES] = sum(1 for term in lexicon.upper_terms if term in title_upper)
+        features[TITLE_PHRASE_MATCH] = lexicon.query_upper in title_upper
+        features[TITLE_PREFIX_MATCH] = title_upper.startswith(lexicon.query_upper)
+
+        # Relevance and clarity (ResultQualityEngine)
+        if lexicon.quality_terms:
+            title_matches = sum(1 for term in lexicon.quality_terms if term in view.title_lower)
+            features[TITLE_TERM_FRACTION] = title_matches / len(lexicon.quality_terms)
+        if lexicon.entities:
+            entity_matches = sum(1 for entity in lexicon.entities if entity in text)
+            features[ENTITY_FRACTION] = entity_matches / len(lexicon.entities)
+        features[TITLE_CLARITY] = view.clarity
+
+        features.setflags(write=False)
+        return features
+
+
+_lexical_feature_extractor: Optional[LexicalFeatureExtractor] = None
+_lexical_feature_extractor_lock = threading.Lock()
+
+
+def get_lexical_feature_extractor() -> LexicalFeatureExtractor:
+    """Return the process-wide lexical feature extractor"""
+    global _lexical_feature_extractor
+
+    if _lexical_feature_extractor is None:
+        with _lexical_feature_extractor_lock:
+            if _lexical_feature_extractor is None:
+                _lexical_feature_extractor = LexicalFeatureExtractor()
+    return _lexical_feature_extractor
@@ -4,6 +4,8 @@ Optimized service for handling normalized facet tables
 """
 
 import logging
+import time
+from collections import defaultdict
 from typing import List, Dict, Optional, Set
 from django.db import transaction
 from django.db.models import Count, Q
@@ -18,7 +20,18 @@ logger = logging.getLogger(__name__)
 class NormalizedFacetService:
     """Service for optimized facet operations using normalized tables"""
     
-    def __init__(self):
+    def __init__(self, config: Dict[str, any] = None):
+        self.config = config or {}
+        
+        # Default configuration
+        self.default_config = {
+            'batch_size': 5000,  # rows per bulk insert/update/delete statement
+        }
+        
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+        
         self.facet_types = [
             'section', 'judge', 'court', 'party', 'advocate',
             'case_type', 'year', 'status', 'bench_type', 'appeal', 
@@ -26,11 +39,26 @@ class NormalizedFacetService:
         ]
     
     def build_normalized_facets(self, facet_type: str = None) -> Dict[str, any]:
-        """Build normalized facet tables from existing Term data"""
+        """
+        Build normalized facet tables from existing Term data
+        
+        Set-based rebuild: per facet type, the (term, case) occurrence counts
+        come from one grouped query and are diffed in memory against the
+        existing facet terms and mappings. Only the differences are written,
+        with bulk inserts, updates and deletes in one transaction. Terms that
+        no longer occur are deactivated and lose their mappings.
+        """
+        start_time = time.time()
         stats = {
             'facet_type': facet_type or 'all',
             'terms_processed': 0,
+            'terms_created': 0,
+            'terms_updated': 0,
+            'terms_deactivated': 0,
             'mappings_created': 0,
+            'mappings_updated': 0,
+            'mappings_deleted': 0,
+            'by_type': {},
             'errors': [],
             'success': False
         }
@@ -42,62 +70,14 @@ class NormalizedFacetService:
                 
                 for ft in types_to_process:
                     logger.info(f"Building normalized facets for: {ft}")
-                    
-                    # Get terms for this facet type
-                    terms = Term.objects.filter(type=ft)
-                    
-                    for term in terms:
-                        # Get case IDs where this term appears
-                        case_ids = TermOccurrence.objects.filter(
-                            term=term
-                        ).values_list('case_id', flat=True).distinct()
-                        
-                        if case_ids:
-                            # Create or update FacetTerm
-                            facet_term, created = FacetTerm.objects.get_or_create(
-                                facet_type=ft,
-                                canonical_term=term.canonical,
-                                defaults={
-                                    'occurrence_count': term.occurrence_count,
-                                    'case_count': len(case_ids),
-                                    'boost_factor': min(2.0, 1.0 + (len(case_ids) / 100.0)),
-                                    'is_active': True
-                                }
-                            )
-                            
-                            if not created:
-                                # Update existing term
-                                facet_term.occurrence_count = term.occurrence_count
-                                facet_term.case_count = len(case_ids)
-                                facet_term.boost_factor = min(2.0, 1.0 + (len(case_ids) / 100.0))
-                                facet_term.updated_at = timezone.now()
-                                facet_term.save()
-                            
-                            # Create mappings
-                            mappings_created = 0
-                            for case_id in case_ids:
-                                # Get occurrence count for this case
-                                case_occurrence_count = TermOccurrence.objects.filter(
-                                    term=term, case_id=case_id
-                                ).count()
-                                
-                                # Create or update mapping
-                                mapping, mapping_created = FacetMapping.objects.get_or_create(
-                                    facet_term=facet_term,
-                                    case_id=case_id,
-                                    defaults={'occurrence_count': case_occurrence_count}
-                                )
-                                
-                                if not mapping_created:
-                                    # Update existing mapping
-                                    mapping.occurrence_count = case_occurrence_count
-                                    mapping.save()
-                                
-                                mappings_created += 1
-                            
-                            stats['terms_processed'] += 1
-                            stats['mappings_created'] += mappings_created
+                    type_stats = self._rebuild_facet_type(ft)
+                    for key, value in type_stats.items():
+                        stats[key] += value
+                    stats['by_type'][ft] = type_stats['terms_processed']
                 
+                stats['total_terms'] = FacetTerm.objects.filter(is_active=True).count()
+                stats['total_mappings'] = FacetMapping.objects.count()
+                stats['facet_types'] = sum(1 for count in stats['by_type'].values() if count)
                 stats['success'] = True
                 logger.info(f"Normalized facets built successfully: {stats}")
                 
@@ -106,6 +86,112 @@ class NormalizedFacetService:
             logger.error(error_msg)
             stats['errors'].append(error_msg)
         
+        stats['processing_time'] = time.time() - start_time
+        return stats
+    
+    def _rebuild_facet_type(self, facet_type: str) -> Dict[str, int]:
+        """Diff and apply the facet terms and mappings of one facet type"""
+        batch_size = self.default_config['batch_size']
+        stats = {
+            'terms_processed': 0, 'terms_created': 0, 'terms_updated': 0, 'terms_deactivated': 0,
+            'mappings_created': 0, 'mappings_updated': 0, 'mappings_deleted': 0,
+        }
+        now = timezone.now()
+        
+        terms = {
+            term_id: (canonical, occurrence_count)
+            for term_id, canonical, occurrence_count in Term.objects.filter(type=facet_type).values_list(
+                'id', 'canonical', 'occurrence_count'
+            )
+        }
+        
+        # Occurrences per (term, case), in one grouped query
+        case_counts: Dict[int, Dict[int, int]] = defaultdict(dict)
+        occurrences = TermOccurrence.objects.filter(term__type=facet_type).values_list(
+            'term_id', 'case_id'
+        ).annotate(count=Count('id')).order_by()
+        for term_id, case_id, count in occurrences.iterator(chunk_size=batch_size):
+            case_counts[term_id][case_id] = count
+        
+        # Desired facet terms, by canonical form
+        desired = {}
+        for term_id, cases in case_counts.items():
+            if term_id in terms and cases:
+                canonical, occurrence_count = terms[term_id]
+                desired[canonical] = (occurrence_count, cases)
+        
+        existing_terms = {term.canonical_term: term for term in FacetTerm.objects.filter(facet_type=facet_type)}
+        new_terms = []
+        changed_terms = []
+        for canonical, (occurrence_count, cases) in desired.items():
+            values = {
+                'occurrence_count': occurrence_count,
+                'case_count': len(cases),
+                'boost_factor': min(2.0, 1.0 + (len(cases) / 100.0)),
+                'is_active': True,
+            }
+            facet_term = existing_terms.get(canonical)
+            if facet_term is None:
+                new_terms.append(FacetTerm(facet_type=facet_type, canonical_term=canonical, **values))
+            elif any(getattr(facet_term, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(facet_term, field, value)
+                facet_term.updated_at = now
+                changed_terms.append(facet_term)
+        
+        stale_terms = [
+            facet_term for canonical, facet_term in existing_terms.items()
+            if canonical not in desired and (facet_term.is_active or facet_term.case_count)
+        ]
+        for facet_term in stale_terms:
+            facet_term.is_active = False
+            facet_term.case_count = 0
+            facet_term.updated_at = now
+        
+        FacetTerm.objects.bulk_create(new_terms, batch_size=batch_size)
+        FacetTerm.objects.bulk_update(
+            changed_terms + stale_terms,
+            ['occurrence_count', 'case_count', 'boost_factor', 'is_active', 'updated_at'],
+            batch_size=batch_size
+        )
+        stats['terms_processed'] = len(desired)
+        stats['terms_created'] = len(new_terms)
+        stats['terms_updated'] = len(changed_terms)
+        stats['terms_deactivated'] = len(stale_terms)
+        
+        # Ids of the inserted terms (bulk_create only returns them on some backends)
+        facet_term_ids = dict(
+            FacetTerm.objects.filter(facet_type=facet_type).values_list('canonical_term', 'id')
+        )
+        
+        existing_mappings = {
+            (facet_term_id, case_id): (mapping_id, occurrence_count)
+            for mapping_id, facet_term_id, case_id, occurrence_count in FacetMapping.objects.filter(
+                facet_term__facet_type=facet_type
+            ).values_list('id', 'facet_term_id', 'case_id', 'occurrence_count').iterator(chunk_size=batch_size)
+        }
+        
+        new_mappings = []
+        changed_mappings = []
+        for canonical, (_, cases) in desired.items():
+            facet_term_id = facet_term_ids[canonical]
+            for case_id, count in cases.items():
+                current = existing_mappings.pop((facet_term_id, case_id), None)
+                if current is None:
+                    new_mappings.append(FacetMapping(facet_term_id=facet_term_id, case_id=case_id, occurrence_count=count))
+                elif current[1] != count:
+                    changed_mappings.append(FacetMapping(id=current[0], occurrence_count=count))
+        
+        # What is left no longer occurs
+        stale_mapping_ids = [mapping_id for mapping_id, _ in existing_mappings.values()]
+        for offset in range(0, len(stale_mapping_ids), batch_size):
+            FacetMapping.objects.filter(id__in=stale_mapping_ids[offset:offset + batch_size]).delete()
+        FacetMapping.objects.bulk_create(new_mappings, batch_size=batch_size)
+        FacetMapping.objects.bulk_update(changed_mappings, ['occurrence_count'], batch_size=batch_size)
+        
+        stats['mappings_created'] = len(new_mappings)
+        stats['mappings_updated'] = len(changed_mappings)
+        stats['mappings_deleted'] = len(stale_mapping_ids)
         return stats
     
     def search_by_facet(self, facet_type: str, term: str, top_k: int = 10) -> List[Dict]:
@@ -262,14 +348,18 @@ class NormalizedFacetService:
     def _update_case_counts(self):
         """Update case counts for all facet terms"""
         try:
-            for facet_term in FacetTerm.objects.all():
-                actual_count = FacetMapping.objects.filter(
-                    facet_term=facet_term
-                ).count()
-                
+            # One grouped count, then only the terms whose count changed
+            actual_counts = dict(
+                FacetMapping.objects.values_list('facet_term_id').annotate(count=Count('id')).order_by()
+            )
+            changed = []
+            for facet_term in FacetTerm.objects.only('id', 'case_count'):
+                actual_count = actual_counts.get(facet_term.id, 0)
                 if facet_term.case_count != actual_count:
                     facet_term.case_count = actual_count
-                    facet_term.save()
+                    changed.append(facet_term)
+            
+            FacetTerm.objects.bulk_update(changed, ['case_count'], batch_size=self.default_config['batch_size'])
                     
         except Exception as e:
             logger.error(f"Error updating case counts: {str(e)}")
@@ -0,0 +1,200 @@
+"""
+Pair Scoring
+Score cache and cross-request micro-batching for cross-encoder rerankers
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_pair_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query for cache keys"""
+    return " ".join(query.lower().split())
+
+
+def text_fingerprint(text: str) -> str:
+    """Short stable hash of a candidate text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class PairScoreCache:
+    """
+    Bounded LRU cache of cross-encoder scores.
+
+    Keys are ``(model_version, normalized query, case id, text hash)`` so a
+    new model or a changed candidate text (e.g. a rebuilt case profile) never
+    reuses a stale score.
+    """
+
+    def __init__(self, max_size: int = 20000):
+        self.max_size = max_size
+        self._scores: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get_many(self, keys: Sequence[Hashable]) -> List[Optional[float]]:
+        """Cached score for each key, or None where it is missing"""
+        if not self.enabled:
+            return [None] * len(keys)
+
+        scores: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is None:
+                    self._stats["misses"] += 1
+                else:
+                    self._scores.move_to_end(key)
+                    self._stats["hits"] += 1
+                scores.append(score)
+        return scores
+
+    def set_many(self, items: Sequence[Tuple[Hashable, float]]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            for key, score in items:
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._scores)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class _PendingPairs:
+    """Pairs submitted by one caller, filled in by whichever thread runs the batch"""
+
+    __slots__ = ("pairs", "scores", "error", "done")
+
+    def __init__(self, pairs: List[Any]):
+        self.pairs = pairs
+        self.scores: Optional[List[float]] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class MicroBatchScheduler:
+    """
+    Merges scoring requests from concurrent threads into shared predict calls.
+
+    Callers block in ``score``. When no batch is running the caller runs one
+    immediately with everything queued so far; pairs submitted while a
+    batch is running are merged into the next one. A single request
+    therefore never waits, and under concurrency the model sees fewer,
+    larger batches. ``max_wait_ms`` optionally holds a batch open briefly
+    to collect more pairs.
+    """
+
+    def __init__(self, predict: Callable[[List[Any]], Sequence[float]], max_batch_pairs: int = 256,
+                 max_wait_ms: float = 0.0):
+        self.predict = predict
+        self.max_batch_pairs = max(1, max_batch_pairs)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._cond = threading.Condition()
+        self._queue: List[_PendingPairs] = []
+        self._queued_pairs = 0
+        self._busy = False
+        self._stats = {"batches": 0, "pairs": 0, "requests": 0, "merged_batches": 0}
+
+    def score(self, pairs: List[Any]) -> List[float]:
+        """Score ``pairs``, possibly together with other callers' pairs"""
+        if not pairs:
+            return []
+
+        pending = _PendingPairs(pairs)
+        with self._cond:
+            self._queue.append(pending)
+            self._queued_pairs += len(pairs)
+            self._cond.notify_all()
+
+        while True:
+            with self._cond:
+                while self._busy and not pending.done:
+                    self._cond.wait()
+                if pending.done:
+                    break
+                self._busy = True
+                if self.max_wait:
+                    deadline = time.monotonic() + self.max_wait
+                    while self._queued_pairs < self.max_batch_pairs:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                batch = self._take_batch()
+
+            try:
+                self._run(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.scores
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+        stats["avg_batch_pairs"] = round(stats["pairs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def _take_batch(self) -> List[_PendingPairs]:
+        # Called with the condition held; always takes at least one request
+        batch: List[_PendingPairs] = []
+        batch_pairs = 0
+        while self._queue:
+            size = len(self._queue[0].pairs)
+            if batch and batch_pairs + size > self.max_batch_pairs:
+                break
+            batch.append(self._queue.pop(0))
+            batch_pairs += size
+        self._queued_pairs -= batch_pairs
+        return batch
+
+    def _run(self, batch: List[_PendingPairs]) -> None:
+        pairs = [pair for pending in batch for pair in pending.pairs]
+        error = None
+        try:
+            scores = [float(score) for score in self.predict(pairs)]
+        except Exception as e:
+            logger.error(f"Error scoring pair batch: {str(e)}")
+            error, scores = e, None
+
+        with self._cond:
+            start = 0
+            for pending in batch:
+                end = start + len(pending.pairs)
+                if scores is None:
+                    pending.error = error
+                else:
+                    pending.scores = scores[start:end]
+                pending.done = True
+                start = end
+            self._stats["batches"] += 1
+            self._stats["pairs"] += len(pairs)
+            self._stats["requests"] += len(batch)
+            if len(batch) > 1:
+                self._stats["merged_batches"] += 1
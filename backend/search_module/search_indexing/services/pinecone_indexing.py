@@ -8,7 +8,7 @@ import hashlib
 import numpy as np
 import logging
 import threading
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime
 import time
 
@@ -584,107 +584,178 @@ class PineconeIndexingService:
     
     def search(self, query: str, top_k: int = 10, filters: Dict = None) -> List[Dict[str, any]]:
         """Search for similar documents using Pinecone"""
+        return self.search_batch([query], top_k=top_k, filters=filters)[0]
+    
+    def search_batch(self, queries: List[str], top_k: int = 10, filters: Dict = None) -> List[List[Dict[str, any]]]:
+        """
+        Search for several queries, encoding every query embedding in one
+        forward pass before issuing the Pinecone lookups
+        
+        Returns:
+            One result list per query, in the order of ``queries``
+        """
         try:
-            # FIXED: Thread-safe initialization with better error handling
-            with self._lock:
-                # Initialize Pinecone if not already done
-                if not self.index:
-                    logger.info("Initializing Pinecone connection...")
-                    if not self.initialize_pinecone():
-                        logger.error("Failed to initialize Pinecone")
-                        return []
-                    
-                    if not self.create_or_get_index():
-                        logger.error("Failed to get Pinecone index")
-                        return []
-                
-                # Initialize model if not already done
-                if not self.model:
-                    logger.info("Loading sentence transformer model...")
-                    if not self.initialize_model():
-                        logger.error("Failed to initialize model")
-                        return []
-            
-            # Create query embedding
-            query_embedding = self.model.encode([query])
-            
-            # Prepare filter for Pinecone
-            pinecone_filter = None
-            if filters:
-                pinecone_filter = {}
-                if 'court' in filters:
-                    pinecone_filter['court'] = {'$eq': filters['court']}
-                if 'judge' in filters:
-                    pinecone_filter['bench'] = {'$eq': filters['judge']}
-                if 'status' in filters:
-                    pinecone_filter['status'] = {'$eq': filters['status']}
-                if 'case_id' in filters:
-                    pinecone_filter['case_id'] = {'$eq': filters['case_id']}
-            
-            # Search in Pinecone
-            results = self.index.query(
-                vector=query_embedding[0].tolist(),
-                top_k=top_k,
-                include_metadata=True,
-                filter=pinecone_filter
-            )
+            if not queries:
+                return []
+            
+            if not self._ensure_ready():
+                return [[] for _ in queries]
+            
+            # Create query embeddings in one pass
+            query_embeddings = self.model.encode(list(queries), show_progress_bar=False)
+            pinecone_filter = self._build_filter(filters)
+            
+            batch_results = []
+            for query, query_embedding in zip(queries, query_embeddings):
+                # Search in Pinecone
+                results = self.index.query(
+                    vector=query_embedding.tolist(),
+                    top_k=top_k,
+                    include_metadata=True,
+                    filter=pinecone_filter
+                )
+                search_results = self._format_matches(query, results)
+                logger.info(f"Pinecone search returned {len(search_results)} results")
+                batch_results.append(search_results)
             
-            # FIXED: Format results with semantic similarity focus
-            search_results = []
-            min_similarity_threshold = 0.1  # Lower threshold for semantic search
+            return batch_results
             
-            for i, match in enumerate(results.matches):
-                if match.score >= min_similarity_threshold:
-                    metadata = match.metadata
-                    
-                    # For semantic search, trust the vector similarity scores
-                    # Only apply basic validation for obvious mismatches
-                    case_number = metadata.get('case_number', '').lower()
-                    case_title = metadata.get('case_title', '').lower()
-                    query_lower = query.lower()
-                    
-                    # Only filter out completely irrelevant results (e.g., year queries matching wrong years)
-                    is_relevant = True
-                    if len(query.split()) == 1 and query.isdigit():
-                        # For year queries, check if it's a reasonable match
-                        year = query.strip()
-                        if len(year) == 4:  # Full year
-                            is_relevant = year in case_number or year in case_title
-                    
-                    if is_relevant:
-                        # IMPROVED: Normalize similarity score to make it more meaningful
-                        # Pinecone cosine similarity ranges from 0 to 1, but we can enhance it
-                        normalized_similarity = match.score
-                        
-                        # Apply slight boost for very good matches to make scores more distinguishable
-                        if normalized_similarity > 0.6:
-                            normalized_similarity = min(1.0, normalized_similarity * 1.1)
-                        elif normalized_similarity > 0.4:
-                            normalized_similarity = min(1.0, normalized_similarity * 1.05)
-                        
-                        search_results.append({
-                            'rank': i + 1,
-                            'similarity': normalized_similarity,
-                            'case_id': metadata.get('case_id'),
-                            'chunk_id': metadata.get('chunk_id'),
-                            'chunk_text': metadata.get('chunk_text_preview', ''),
-                            'chunk_index': metadata.get('chunk_index'),
-                            'case_number': metadata.get('case_number', ''),
-                            'case_title': metadata.get('case_title', ''),
-                            'court': metadata.get('court', ''),
-                            'status': metadata.get('status', ''),
-                            'bench': metadata.get('bench', ''),
-                            'institution_date': metadata.get('institution_date'),
-                            'hearing_date': metadata.get('hearing_date'),
-                            'search_type': 'pinecone'
-                        })
+        except Exception as e:
+            logger.error(f"Error in Pinecone search: {str(e)}")
+            return [[] for _ in queries]
+    
+    def chunk_similarities(self, query: str, chunk_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Cosine similarity between ``query`` and the stored vectors of chunks
+        
+        The vectors are fetched back from Pinecone by ID in batches, so no
+        chunk text is re-encoded. Chunks missing from the index are left out.
+        """
+        try:
+            chunk_ids = list(dict.fromkeys(chunk_ids))
+            if not query or not chunk_ids or not self._ensure_ready():
+                return {}
             
-            logger.info(f"Pinecone search returned {len(search_results)} results")
-            return search_results
+            query_embedding = np.asarray(self.model.encode([query], show_progress_bar=False)[0], dtype=np.float32)
+            query_norm = np.linalg.norm(query_embedding)
+            if query_norm == 0:
+                return {}
+            query_embedding = query_embedding / query_norm
+            
+            batch_size = self.config.get('batch_size', 100)
+            similarities = {}
+            for i in range(0, len(chunk_ids), batch_size):
+                batch = chunk_ids[i:i + batch_size]
+                response = self.index.fetch(ids=[f"chunk_{chunk_id}" for chunk_id in batch])
+                vectors = response.vectors or {}
+                for chunk_id in batch:
+                    vector = vectors.get(f"chunk_{chunk_id}")
+                    if vector is None:
+                        continue
+                    values = np.asarray(vector.values, dtype=np.float32)
+                    norm = np.linalg.norm(values)
+                    if norm:
+                        similarities[chunk_id] = float(values @ query_embedding / norm)
+            
+            return similarities
             
         except Exception as e:
-            logger.error(f"Error in Pinecone search: {str(e)}")
-            return []
+            logger.error(f"Error scoring Pinecone chunk vectors: {str(e)}")
+            return {}
+    
+    def _ensure_ready(self) -> bool:
+        """Connect to Pinecone and load the model on first use"""
+        # FIXED: Thread-safe initialization with better error handling
+        with self._lock:
+            # Initialize Pinecone if not already done
+            if not self.index:
+                logger.info("Initializing Pinecone connection...")
+                if not self.initialize_pinecone():
+                    logger.error("Failed to initialize Pinecone")
+                    return False
+                
+                if not self.create_or_get_index():
+                    logger.error("Failed to get Pinecone index")
+                    return False
+            
+            # Initialize model if not already done
+            if not self.model:
+                logger.info("Loading sentence transformer model...")
+                if not self.initialize_model():
+                    logger.error("Failed to initialize model")
+                    return False
+        
+        return True
+    
+    def _build_filter(self, filters: Dict = None) -> Optional[Dict]:
+        """Prepare filter for Pinecone"""
+        pinecone_filter = None
+        if filters:
+            pinecone_filter = {}
+            if 'court' in filters:
+                pinecone_filter['court'] = {'$eq': filters['court']}
+            if 'judge' in filters:
+                pinecone_filter['bench'] = {'$eq': filters['judge']}
+            if 'status' in filters:
+                pinecone_filter['status'] = {'$eq': filters['status']}
+            if 'case_id' in filters:
+                pinecone_filter['case_id'] = {'$eq': filters['case_id']}
+        
+        return pinecone_filter
+    
+    def _format_matches(self, query: str, results) -> List[Dict[str, any]]:
+        """Format Pinecone matches for a query"""
+        # FIXED: Format results with semantic similarity focus
+        search_results = []
+        min_similarity_threshold = 0.1  # Lower threshold for semantic search
+        
+        for i, match in enumerate(results.matches):
+            if match.score >= min_similarity_threshold:
+                metadata = match.metadata
+                
+                # For semantic search, trust the vector similarity scores
+                # Only apply basic validation for obvious mismatches
+                case_number = metadata.get('case_number', '').lower()
+                case_title = metadata.get('case_title', '').lower()
+                query_lower = query.lower()
+                
+                # Only filter out completely irrelevant results (e.g., year queries matching wrong years)
+                is_relevant = True
+                if len(query.split()) == 1 and query.isdigit():
+                    # For year queries, check if it's a reasonable match
+                    year = query.strip()
+                    if len(year) == 4:  # Full year
+                        is_relevant = year in case_number or year in case_title
+                
+                if is_relevant:
+                    # IMPROVED: Normalize similarity score to make it more meaningful
+                    # Pinecone cosine similarity ranges from 0 to 1, but we can enhance it
+                    normalized_similarity = match.score
+                    
+                    # Apply slight boost for very good matches to make scores more distinguishable
+                    if normalized_similarity > 0.6:
+                        normalized_similarity = min(1.0, normalized_similarity * 1.1)
+                    elif normalized_similarity > 0.4:
+                        normalized_similarity = min(1.0, normalized_similarity * 1.05)
+                    
+                    search_results.append({
+                        'rank': i + 1,
+                        'similarity': normalized_similarity,
+                        'case_id': metadata.get('case_id'),
+                        'chunk_id': metadata.get('chunk_id'),
+                        'chunk_text': metadata.get('chunk_text_preview', ''),
+                        'chunk_index': metadata.get('chunk_index'),
+                        'case_number': metadata.get('case_number', ''),
+                        'case_title': metadata.get('case_title', ''),
+                        'court': metadata.get('court', ''),
+                        'status': metadata.get('status', ''),
+                        'bench': metadata.get('bench', ''),
+                        'institution_date': metadata.get('institution_date'),
+                        'hearing_date': metadata.get('hearing_date'),
+                        'search_type': 'pinecone'
+                    })
+        
+        return search_results
     
     def get_index_stats(self) -> Dict[str, any]:
         """Get Pinecone index statistics"""
@@ -12,6 +12,9 @@ import math
 from django.db.models import Q
 from apps.cases.models import Case, Term, TermOccurrence
 from ..models import SearchMetadata
+from . import lexical_features as lexical
+from .lexical_features import get_lexical_feature_extractor
+from .static_priors import court_boost_prior, get_static_priors
 
 logger = logging.getLogger(__name__)
 
@@ -44,12 +47,17 @@ class PrecisionOptimizerService:
         # Update with custom config
         if config:
             self.default_config.update(config)
+        
+        # Court hierarchy boosts precomputed per case at index time
+        self.static_priors = get_static_priors()
+        self.lexical_features = get_lexical_feature_extractor()
     
     def optimize_search_results(self, 
                                search_results: List[Dict[str, Any]], 
                                query: str,
                                search_mode: str = 'hybrid',
-                               filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                               filters: Dict[str, Any] = None,
+                               query_understanding: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """
         Optimize search results for better precision
         
@@ -58,6 +66,8 @@ class PrecisionOptimizerService:
             query: Original search query
             search_mode: Search mode used
             filters: Applied filters
+            query_understanding: Precomputed ``enhance_query_understanding`` output
+                (from the request's QueryPlan); computed here when omitted
             
         Returns:
             Optimized and filtered search results
@@ -66,7 +76,7 @@ class PrecisionOptimizerService:
             logger.info(f"Optimizing {len(search_results)} search results for precision")
             
             # Step 1: Enhance query understanding
-            enhanced_query_info = self._enhance_query_understanding(query)
+            enhanced_query_info = query_understanding or self.enhance_query_understanding(query)
             
             # Step 2: Apply relevance scoring
             scored_results = self._apply_precision_scoring(search_results, enhanced_query_info)
@@ -94,7 +104,7 @@ class PrecisionOptimizerService:
             # Return original results if optimization fails
             return search_results[:self.default_config['max_results']]
     
-    def _enhance_query_understanding(self, query: str) -> Dict[str, Any]:
+    def enhance_query_understanding(self, query: str) -> Dict[str, Any]:
         """Enhanced query analysis for legal domain"""
         query_info = {
             'original_query': query,
@@ -240,16 +250,22 @@ class PrecisionOptimizerService:
     def _apply_precision_scoring(self, results: List[Dict[str, Any]], query_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply precision-focused scoring to results"""
         scored_results = []
+        lexicon = self._query_lexicon(query_info)
         
         for result in results:
-            precision_score = self._calculate_precision_score(result, query_info)
+            precision_score = self._calculate_precision_score(result, query_info, lexicon)
             result['precision_score'] = precision_score
             result['original_score'] = result.get('similarity', result.get('rank', 0))
             scored_results.append(result)
         
         return scored_results
     
-    def _calculate_precision_score(self, result: Dict[str, Any], query_info: Dict[str, Any]) -> float:
+    def _query_lexicon(self, query_info: Dict[str, Any]) -> lexical.QueryLexicon:
+        """Lexical feature inputs of the enhanced query"""
+        return self.lexical_features.lexicon(query_info.get('original_query', ''), precision_info=query_info)
+    
+    def _calculate_precision_score(self, result: Dict[str, Any], query_info: Dict[str, Any],
+                                   lexicon: Optional[lexical.QueryLexicon] = None) -> float:
         """Calculate precision-focused relevance score"""
         base_score = result.get('similarity', result.get('rank', 0))
         
@@ -261,9 +277,10 @@ class PrecisionOptimizerService:
         
         # Check for exact matches in case data
         case_data = result.get('result_data', result)
+        features = self.lexical_features.features(lexicon or self._query_lexicon(query_info), case_data)
         
         # Exact case number match
-        if self._has_exact_case_number_match(case_data, query_info):
+        if features[lexical.CASE_NUMBER_CITATION]:
             precision_score *= self.default_config['exact_match_boost']
         
         # Citation match
@@ -271,7 +288,7 @@ class PrecisionOptimizerService:
             precision_score *= self.default_config['citation_boost']
         
         # Legal term matches
-        legal_term_matches = self._count_legal_term_matches(case_data, query_info)
+        legal_term_matches = features[lexical.KEY_TERM_MATCHES]
         if legal_term_matches > 0:
             precision_score *= (1.0 + legal_term_matches * 0.2)
         
@@ -283,47 +300,18 @@ class PrecisionOptimizerService:
         recency_boost = self._get_recency_boost(case_data)
         precision_score *= recency_boost
         
-        return precision_score
-    
-    def _has_exact_case_number_match(self, case_data: Dict[str, Any], query_info: Dict[str, Any]) -> bool:
-        """Check for exact case number match"""
-        case_number = case_data.get('case_number', '').lower()
-        query = query_info['normalized_query']
-        
-        # Extract potential case numbers from query
-        for citation in query_info['citations']:
-            if citation.lower() in case_number:
-                return True
-        
-        return False
+        return float(precision_score)
     
     def _has_citation_match(self, case_data: Dict[str, Any], query_info: Dict[str, Any]) -> bool:
         """Check for citation match"""
         return len(query_info['citations']) > 0
     
-    def _count_legal_term_matches(self, case_data: Dict[str, Any], query_info: Dict[str, Any]) -> int:
-        """Count legal term matches in case data"""
-        case_text = f"{case_data.get('case_title', '')} {case_data.get('case_number', '')}".lower()
-        matches = 0
-        
-        for term in query_info['key_terms']:
-            if term in case_text:
-                matches += 1
-        
-        return matches
-    
     def _get_court_hierarchy_boost(self, case_data: Dict[str, Any]) -> float:
         """Get boost based on court hierarchy"""
-        court = case_data.get('court', '').lower()
-        
-        if 'supreme' in court:
-            return 1.5
-        elif 'high' in court:
-            return 1.3
-        elif 'district' in court:
-            return 1.1
-        else:
-            return 1.0
+        priors = self.static_priors.get(case_data.get('case_id'))
+        if priors is not None:
+            return priors['court_boost']
+        return court_boost_prior(case_data)
     
     def _get_recency_boost(self, case_data: Dict[str, Any]) -> float:
         """Get boost based on case recency"""
@@ -344,29 +332,17 @@ class PrecisionOptimizerService:
     
     def _apply_legal_domain_boosting(self, results: List[Dict[str, Any]], query_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply legal domain-specific boosting"""
+        lexicon = self._query_lexicon(query_info)
         for result in results:
             # Additional legal domain boosts
             case_data = result.get('result_data', result)
             
-            # Boost based on case type alignment
-            if self._has_case_type_alignment(case_data, query_info):
+            # Boost based on case type alignment (legal concept query with a key term in the title)
+            if self.lexical_features.features(lexicon, case_data)[lexical.CASE_TYPE_ALIGNMENT]:
                 result['precision_score'] *= 1.2
         
         return results
     
-    def _has_case_type_alignment(self, case_data: Dict[str, Any], query_info: Dict[str, Any]) -> bool:
-        """Check if case type aligns with query intent"""
-        case_title = case_data.get('case_title', '').lower()
-        query_type = query_info['query_type']
-        
-        if query_type == 'legal_concept':
-            # Check if case title contains legal concepts from query
-            for term in query_info['key_terms']:
-                if term in case_title:
-                    return True
-        
-        return False
-    
     def _filter_low_quality_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove low-quality results"""
         quality_results = []
@@ -418,16 +394,7 @@ class PrecisionOptimizerService:
     
     def _calculate_title_similarity(self, title1: str, title2: str) -> float:
         """Calculate simple title similarity"""
-        words1 = set(title1.split())
-        words2 = set(title2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        return intersection / union if union > 0 else 0.0
+        return self.lexical_features.title_similarity(title1, title2)
     
     def _final_precision_ranking(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Final ranking with intelligent relevance-based cutoff"""
@@ -0,0 +1,225 @@
+"""
+Query Plan Service
+Analyzes a search query once and shares the result with every pipeline stage
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{3,}")
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of nested dicts and lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable copy of a frozen value"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Everything the pipeline derives from the query string alone.
+
+    Plans are cached and shared across requests, so every field is
+    read-only; ``query_info`` hands out a fresh mutable dict for the
+    per-request bookkeeping the views add on top.
+    """
+    query: str
+    normalized_query: str
+    tokens: Tuple[str, ...]
+    citations: Tuple[Mapping[str, Any], ...]
+    entities: Tuple[Mapping[str, Any], ...]
+    intent: str
+    expansions: Tuple[str, ...]
+    boost_terms: Tuple[str, ...]
+    # Stage outputs, each computed once per query string
+    normalization: Mapping[str, Any]
+    analysis: Optional[Any] = None                       # AdvancedQueryIntelligence.analyze_query
+    intelligent_expansion: Optional[Mapping[str, Any]] = None  # ...expand_query_intelligently
+    legal_expansion: Optional[Mapping[str, Any]] = None  # QueryExpansionService
+    precision_info: Optional[Mapping[str, Any]] = None   # PrecisionOptimizerService
+    rerank_terms: Optional[Tuple[str, ...]] = None        # AdvancedReranker
+
+    @property
+    def legal_analysis(self) -> Optional[Mapping[str, Any]]:
+        """The ``query_analysis`` block of the legal expansion, if it ran"""
+        return self.legal_expansion['query_analysis'] if self.legal_expansion else None
+
+    @property
+    def has_intelligence(self) -> bool:
+        return self.analysis is not None and self.intelligent_expansion is not None
+
+    def query_info(self, include_intelligence: bool = True) -> Dict[str, Any]:
+        """
+        Mutable query info dict in the shape the views and rankers expect.
+
+        The dict holds plain values only (it is echoed in debug responses);
+        the plan itself is passed down the pipeline separately.
+
+        Args:
+            include_intelligence: Add intent, specificity and strategy from the
+                query analysis; without it (or when analysis failed) the
+                basic fallback values are used
+        """
+        query_info = _thaw(self.normalization)
+        if include_intelligence and self.has_intelligence:
+            query_info.update({
+                'query_analysis': self.analysis.to_dict() if hasattr(self.analysis, 'to_dict') else {},
+                'expanded_query': _thaw(self.intelligent_expansion),
+                'intent': self.intent,
+                'specificity_score': getattr(self.analysis, 'specificity_score', 0.5),
+                'search_strategy': getattr(self.analysis, 'search_strategy', 'balanced_hybrid')
+            })
+        else:
+            query_info.update({
+                'intent': 'unknown',
+                'specificity_score': 0.5,
+                'search_strategy': 'balanced_hybrid',
+                'query_expansion_applied': False
+            })
+        query_info['query_tokens'] = list(self.tokens)
+        return query_info
+
+
+class QueryPlanner:
+    """
+    Builds and caches QueryPlans keyed by query string.
+
+    Normalization, query intelligence, legal expansion, precision query
+    understanding and reranker term extraction each tokenize the query and
+    run their own regexes. The planner runs them once per distinct query
+    and the plan is passed down the pipeline instead of the raw string.
+    The last three only feed the hybrid pipeline, so they run for hybrid
+    plans only and those are cached apart from lexical/semantic plans.
+    """
+
+    def __init__(self, query_normalizer, query_intelligence=None, hybrid_service=None,
+                 config: Dict[str, Any] = None):
+        self.config = config or {}
+        self.query_normalizer = query_normalizer
+        self.query_intelligence = query_intelligence
+        self.hybrid_service = hybrid_service
+
+        # Default configuration
+        self.default_config = {
+            'cache_size': getattr(settings, 'SEARCH_QUERY_PLAN_CACHE_SIZE', 1024),
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._plans: 'OrderedDict[Tuple[str, bool], QueryPlan]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def plan(self, query: str, mode: str = 'hybrid') -> QueryPlan:
+        """Return the plan for ``query`` in a search ``mode``, building it on first use"""
+        hybrid = mode == 'hybrid' and self.hybrid_service is not None
+        key = (query, hybrid)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self._stats['hits'] += 1
+                return plan
+            self._stats['misses'] += 1
+
+        plan = self._build_plan(query, hybrid)
+
+        cache_size = self.default_config['cache_size']
+        if cache_size > 0:
+            with self._lock:
+                self._plans[key] = plan
+                self._plans.move_to_end(key)
+                while len(self._plans) > cache_size:
+                    self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._plans)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _build_plan(self, query: str, hybrid: bool = False) -> QueryPlan:
+        normalization = self.query_normalizer.normalize_query(query)
+
+        # TIER 1: query intelligence (falls back to basic analysis on failure)
+        analysis = intelligent_expansion = None
+        if self.query_intelligence is not None:
+            try:
+                analysis = self.query_intelligence.analyze_query(query)
+                intelligent_expansion = self.query_intelligence.expand_query_intelligently(query, analysis)
+            except Exception as e:
+                logger.warning(f"Query intelligence failed, falling back to basic analysis: {e}")
+                analysis = intelligent_expansion = None
+
+        # Hybrid pipeline stages: legal expansion, precision understanding, rerank terms
+        legal_expansion = precision_info = rerank_terms = None
+        if hybrid:
+            try:
+                legal_expansion = self.hybrid_service.query_expander.enhance_query_with_legal_knowledge(query)
+            except Exception as e:
+                logger.error(f"Error expanding query for plan: {str(e)}")
+            try:
+                precision_info = self.hybrid_service.precision_optimizer.enhance_query_understanding(query)
+            except Exception as e:
+                logger.error(f"Error analyzing query for plan: {str(e)}")
+            try:
+                rerank_terms = tuple(self.hybrid_service.advanced_reranker.extract_query_terms(
+                    query, legal_expansion['query_analysis'] if legal_expansion else None
+                ))
+            except Exception as e:
+                logger.error(f"Error extracting rerank terms for plan: {str(e)}")
+
+        tokens = set()
+        for source in (normalization.get('normalized_query') or '', normalization.get('original_query') or ''):
+            tokens.update(TOKEN_PATTERN.findall(source.lower()))
+
+        intent = getattr(analysis, 'intent', None) if intelligent_expansion is not None else None
+        intent = intent.value if hasattr(intent, 'value') else (str(intent) if intent else 'unknown')
+
+        return QueryPlan(
+            query=query,
+            normalized_query=normalization.get('normalized_query', ''),
+            tokens=tuple(sorted(tokens)),
+            citations=_freeze(normalization.get('citations', [])),
+            entities=_freeze(getattr(analysis, 'legal_entities', None) or []),
+            intent=intent,
+            expansions=tuple(getattr(analysis, 'expansion_terms', None) or []),
+            boost_terms=tuple((intelligent_expansion or {}).get('boost_terms', [])),
+            normalization=_freeze(normalization),
+            analysis=analysis,
+            intelligent_expansion=_freeze(intelligent_expansion) if intelligent_expansion is not None else None,
+            legal_expansion=_freeze(legal_expansion) if legal_expansion is not None else None,
+            precision_info=_freeze(precision_info) if precision_info is not None else None,
+            rerank_terms=rerank_terms,
+        )
@@ -0,0 +1,139 @@
+"""
+Rerank Cascade
+Decides per query how many candidates go through each reranking stage
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TIER_EXACT = 'exact'
+TIER_CONFIDENT = 'confident'
+TIER_SPECIFIC = 'specific'
+TIER_FULL = 'full'
+
+
+@dataclass(frozen=True)
+class CascadeDecision:
+    """
+    Stage plan for one query.
+
+    ``advanced_k`` and ``learned_k`` are the number of leading candidates
+    sent to the advanced and learned rerankers: 0 skips the stage and None
+    sends every candidate.
+    """
+    tier: str
+    run_precision: bool
+    advanced_k: Optional[int]
+    learned_k: Optional[int]
+    margin: float = 0.0
+    specificity: Optional[float] = None
+
+
+class RerankCascade:
+    """
+    Early-exit controller for the hybrid reranking stages.
+
+    After fusion it looks at cheap signals - an exact case number hit, the
+    relative score margin between the first two candidates and the query
+    specificity from AdvancedQueryIntelligence - and picks a tier:
+
+    * ``exact``: exact case number match, no further stages
+    * ``confident``: a clear lexical/semantic winner, precision optimizer only
+    * ``specific``: a specific query with a fair margin, the advanced
+      reranker on the leading candidates, no cross-encoder
+    * ``full``: everything else, all stages as before
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_CASCADE_ENABLED', True),
+            'confident_margin': getattr(settings, 'SEARCH_CASCADE_CONFIDENT_MARGIN', 0.5),
+            'specific_margin': getattr(settings, 'SEARCH_CASCADE_SPECIFIC_MARGIN', 0.2),
+            'high_specificity': getattr(settings, 'SEARCH_CASCADE_HIGH_SPECIFICITY', 0.8),
+            'specific_advanced_factor': 2,   # candidates = top_k * factor
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._lock = threading.Lock()
+        self._tier_counts = {tier: 0 for tier in (TIER_EXACT, TIER_CONFIDENT, TIER_SPECIFIC, TIER_FULL)}
+
+    def decide(self, results: List[Dict[str, Any]], top_k: int, exact_case_match: Optional[Dict] = None,
+               specificity: Optional[float] = None) -> CascadeDecision:
+        """
+        Plan the reranking stages for fused ``results``
+
+        Args:
+            results: Fused candidates in rank order
+            top_k: Number of results the caller will return
+            exact_case_match: Exact case number hit for the query, if any
+            specificity: Query specificity score (0-1), if the query was analyzed
+        """
+        margin = self.score_margin(results)
+
+        if not self.default_config['enabled']:
+            decision = CascadeDecision(TIER_FULL, True, None, top_k, margin, specificity)
+        elif exact_case_match and results and results[0].get('exact_match'):
+            decision = CascadeDecision(TIER_EXACT, False, 0, 0, margin, specificity)
+        elif len(results) > 1 and margin >= self.default_config['confident_margin']:
+            decision = CascadeDecision(TIER_CONFIDENT, True, 0, 0, margin, specificity)
+        elif (
+            specificity is not None
+            and specificity >= self.default_config['high_specificity']
+            and margin >= self.default_config['specific_margin']
+        ):
+            advanced_k = top_k * self.default_config['specific_advanced_factor']
+            decision = CascadeDecision(TIER_SPECIFIC, True, advanced_k, 0, margin, specificity)
+        else:
+            decision = CascadeDecision(TIER_FULL, True, None, top_k, margin, specificity)
+
+        with self._lock:
+            self._tier_counts[decision.tier] += 1
+        logger.info(f"Rerank cascade tier '{decision.tier}' (margin {margin:.3f}, specificity {specificity})")
+        return decision
+
+    @staticmethod
+    def score_margin(results: List[Dict[str, Any]]) -> float:
+        """Relative gap between the first and second fused scores (0-1)"""
+        if len(results) < 2:
+            return 1.0 if results else 0.0
+        first = float(results[0].get('combined_score', results[0].get('final_score', 0)) or 0)
+        second = float(results[1].get('combined_score', results[1].get('final_score', 0)) or 0)
+        if first <= 0:
+            return 0.0
+        return max(0.0, min(1.0, (first - second) / first))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._tier_counts)
+        total = sum(counts.values())
+        return {
+            'enabled': self.default_config['enabled'],
+            'decisions': total,
+            'tiers': counts,
+            'early_exit_rate': round((total - counts[TIER_FULL]) / total, 4) if total else 0.0,
+        }
+
+
+def rerank_head(results: List[Dict[str, Any]], k: Optional[int], rerank) -> List[Dict[str, Any]]:
+    """
+    Apply ``rerank`` to the first ``k`` results and keep the rest after them.
+
+    ``k`` of None reranks everything; 0 returns the results unchanged.
+    """
+    if k is None or k >= len(results):
+        return rerank(results)
+    if k <= 0:
+        return results
+    return rerank(results[:k]) + results[k:]
@@ -10,6 +10,10 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
+from . import lexical_features as lexical
+from .lexical_features import get_lexical_feature_extractor
+from .static_priors import completeness_prior, compute_case_priors, get_static_priors, recency_prior
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,30 +43,44 @@ class ResultQualityEngine:
         self.quality_weights = self._load_quality_weights()
         self.authority_hierarchy = self._load_authority_hierarchy()
         self.quality_indicators = self._load_quality_indicators()
+        # Query-independent dimensions precomputed per case at index time
+        self.static_priors = get_static_priors()
+        self.lexical_features = get_lexical_feature_extractor()
     
-    def assess_result_quality(self, result: Dict[str, Any], query_analysis: Dict = None) -> QualityScore:
+    def assess_result_quality(self, result: Dict[str, Any], query_analysis: Dict = None,
+                              priors: Optional[Dict[str, Any]] = None,
+                              lexicon: Optional[lexical.QueryLexicon] = None) -> QualityScore:
         """Assess comprehensive quality of a search result"""
         try:
+            if lexicon is None:
+                lexicon = self.lexical_features.lexicon(quality_analysis=query_analysis)
+            features = self.lexical_features.features(lexicon, result)
+            
+            # Static dimensions come from the index-time priors; results
+            # without them are scored from their own fields
+            if priors is None:
+                priors = compute_case_priors(result)
+            
             # Calculate individual dimension scores
             dimension_scores = {}
             
             # 1. Relevance Assessment
-            dimension_scores[QualityDimension.RELEVANCE] = self._assess_relevance(result, query_analysis)
+            dimension_scores[QualityDimension.RELEVANCE] = self._assess_relevance(result, features)
             
             # 2. Authority Assessment
-            dimension_scores[QualityDimension.AUTHORITY] = self._assess_authority(result)
+            dimension_scores[QualityDimension.AUTHORITY] = priors['authority']
             
             # 3. Recency Assessment
-            dimension_scores[QualityDimension.RECENCY] = self._assess_recency(result)
+            dimension_scores[QualityDimension.RECENCY] = recency_prior(priors['institution_year'], priors['recent_hearing'])
             
             # 4. Completeness Assessment
-            dimension_scores[QualityDimension.COMPLETENESS] = self._assess_completeness(result)
+            dimension_scores[QualityDimension.COMPLETENESS] = self._assess_completeness(result, priors['completeness'])
             
             # 5. Clarity Assessment
-            dimension_scores[QualityDimension.CLARITY] = self._assess_clarity(result)
+            dimension_scores[QualityDimension.CLARITY] = float(features[lexical.TITLE_CLARITY])
             
             # 6. Precedential Value Assessment
-            dimension_scores[QualityDimension.PRECEDENTIAL_VALUE] = self._assess_precedential_value(result)
+            dimension_scores[QualityDimension.PRECEDENTIAL_VALUE] = priors['precedential_value']
             
             # Calculate overall score
             overall_score = self._calculate_overall_score(dimension_scores)
@@ -93,9 +111,11 @@ class ResultQualityEngine:
         try:
             # Assess quality for all results
             quality_assessed_results = []
+            case_priors = self.static_priors.get_many([result.get('case_id') for result in results])
+            lexicon = self.lexical_features.lexicon(quality_analysis=query_analysis)
             
-            for result in results:
-                quality_score = self.assess_result_quality(result, query_analysis)
+            for result, priors in zip(results, case_priors):
+                quality_score = self.assess_result_quality(result, query_analysis, priors, lexicon)
                 result['quality_score'] = quality_score.overall_score
                 result['quality_dimensions'] = {dim.value: score for dim, score in quality_score.dimension_scores.items()}
                 result['quality_indicators'] = quality_score.quality_indicators
@@ -120,8 +140,8 @@ class ResultQualityEngine:
             logger.error(f"Error in quality optimization: {str(e)}")
             return results[:max_results]  # Fallback
     
-    def _assess_relevance(self, result: Dict, query_analysis: Dict = None) -> float:
-        """Assess relevance quality dimension"""
+    def _assess_relevance(self, result: Dict, features) -> float:
+        """Assess relevance quality dimension from the result's lexical features"""
         score = 0.0
         
         # Base relevance from search scores
@@ -129,25 +149,10 @@ class ResultQualityEngine:
             score += min(result['final_score'] * 2, 0.4)  # Max 0.4 from search score
         
         # Title relevance
-        case_title = result.get('case_title', '').lower()
-        if query_analysis and 'query' in query_analysis:
-            query_terms = query_analysis['query'].lower().split()
-            title_matches = sum(1 for term in query_terms if term in case_title)
-            if query_terms:
-                score += (title_matches / len(query_terms)) * 0.3
+        score += features[lexical.TITLE_TERM_FRACTION] * 0.3
         
         # Legal entity matching
-        if query_analysis and 'legal_entities' in query_analysis:
-            entities = query_analysis['legal_entities']
-            case_content = f"{case_title} {result.get('case_number', '')}".lower()
-            
-            entity_matches = 0
-            for entity in entities:
-                if entity.get('normalized', '').lower() in case_content:
-                    entity_matches += 1
-            
-            if entities:
-                score += (entity_matches / len(entities)) * 0.2
+        score += features[lexical.ENTITY_FRACTION] * 0.2
         
         # Status relevance (decided cases often more relevant)
         status = result.get('status', '').lower()
@@ -156,100 +161,12 @@ class ResultQualityEngine:
         elif 'pending' in status:
             score += 0.05
         
-        return min(score, 1.0)
-    
-    def _assess_authority(self, result: Dict) -> float:
-        """Assess authority quality dimension"""
-        score = 0.0
-        
-        # Court hierarchy scoring
-        court = result.get('court', '').lower()
-        
-        if 'supreme court' in court:
-            score += 0.5
-        elif 'high court' in court:
-            score += 0.4
-        elif 'district court' in court or 'sessions court' in court:
-            score += 0.3
-        else:
-            score += 0.2
-        
-        # Case type authority
-        case_number = result.get('case_number', '').lower()
-        if any(term in case_number for term in ['appeal', 'revision']):
-            score += 0.2  # Appellate decisions have higher authority
-        elif 'writ' in case_number:
-            score += 0.15  # Constitutional cases have good authority
-        
-        # Bench composition (if available)
-        bench = result.get('bench', '').lower()
-        if bench:
-            # Multiple judges indicate higher authority
-            judge_indicators = ['cj', 'chief justice', 'j.', 'justice']
-            judge_count = sum(1 for indicator in judge_indicators if indicator in bench)
-            score += min(judge_count * 0.05, 0.15)
-        
-        # Status authority
-        status = result.get('status', '').lower()
-        if 'decided' in status:
-            score += 0.15  # Decided cases have precedential authority
-        
-        return min(score, 1.0)
-    
-    def _assess_recency(self, result: Dict) -> float:
-        """Assess recency quality dimension"""
-        score = 0.5  # Default score
-        
-        # Institution date recency
-        institution_date = result.get('institution_date', '')
-        if institution_date:
-            try:
-                # Extract year from various date formats
-                import re
-                year_match = re.search(r'\b(20\d{2})\b', institution_date)
-                if year_match:
-                    year = int(year_match.group())
-                    current_year = datetime.now().year
-                    
-                    # Calculate recency score
-                    age = current_year - year
-                    if age <= 1:
-                        score = 1.0
-                    elif age <= 3:
-                        score = 0.8
-                    elif age <= 5:
-                        score = 0.6
-                    elif age <= 10:
-                        score = 0.4
-                    else:
-                        score = 0.2
-            except:
-                pass
-        
-        # Hearing date recency
-        hearing_date = result.get('hearing_date', '')
-        if hearing_date and 'recent' in hearing_date.lower():
-            score += 0.1
-        
-        return min(score, 1.0)
+        return float(min(score, 1.0))
     
-    def _assess_completeness(self, result: Dict) -> float:
+    def _assess_completeness(self, result: Dict, static_score: Optional[float] = None) -> float:
         """Assess completeness quality dimension"""
-        score = 0.0
-        completeness_factors = 0
-        
-        # Essential fields
-        essential_fields = ['case_title', 'case_number', 'court', 'status']
-        for field in essential_fields:
-            if result.get(field):
-                score += 0.15
-                completeness_factors += 1
-        
-        # Additional useful fields
-        useful_fields = ['bench', 'institution_date', 'hearing_date']
-        for field in useful_fields:
-            if result.get(field):
-                score += 0.1
+        # Fields of the case record (precomputed at index time when available)
+        score = completeness_prior(result) if static_score is None else static_score
         
         # Rich content indicators
         if result.get('snippets'):
@@ -259,81 +176,6 @@ class ResultQualityEngine:
         if result.get('result_data'):
             score += 0.1
         
-        # Quality indicators from content
-        case_title = result.get('case_title', '')
-        if len(case_title) > 20:  # Meaningful title length
-            score += 0.05
-        
-        return min(score, 1.0)
-    
-    def _assess_clarity(self, result: Dict) -> float:
-        """Assess clarity quality dimension"""
-        score = 0.5  # Default score
-        
-        # Case title clarity
-        case_title = result.get('case_title', '')
-        if case_title:
-            # Check for clear party names (VS pattern)
-            if ' vs ' in case_title.lower() or ' v. ' in case_title.lower():
-                score += 0.2
-            
-            # Check for reasonable length
-            if 10 <= len(case_title) <= 200:
-                score += 0.1
-            
-            # Check for non-garbled text
-            if not any(char in case_title for char in ['�', '???', '***']):
-                score += 0.1
-        
-        # Case number clarity
-        case_number = result.get('case_number', '')
-        if case_number:
-            # Standard case number patterns
-            import re
-            if re.search(r'\b\w+\s*\d+/\d{4}\b', case_number):
-                score += 0.15
-        
-        # Court name clarity
-        court = result.get('court', '')
-        if court and len(court) > 5:
-            score += 0.05
-        
-        return min(score, 1.0)
-    
-    def _assess_precedential_value(self, result: Dict) -> float:
-        """Assess precedential value quality dimension"""
-        score = 0.0
-        
-        # Court level precedential value
-        court = result.get('court', '').lower()
-        if 'supreme court' in court:
-            score += 0.4  # Highest precedential value
-        elif 'high court' in court:
-            score += 0.3
-        elif 'district court' in court:
-            score += 0.2
-        
-        # Case type precedential value
-        case_number = result.get('case_number', '').lower()
-        if 'appeal' in case_number:
-            score += 0.2  # Appeals create precedents
-        elif 'revision' in case_number:
-            score += 0.15
-        elif 'writ' in case_number:
-            score += 0.25  # Constitutional precedents
-        
-        # Status precedential value
-        status = result.get('status', '').lower()
-        if 'decided' in status:
-            score += 0.15  # Only decided cases create precedents
-        
-        # Bench strength
-        bench = result.get('bench', '')
-        if bench:
-            # Larger benches create stronger precedents
-            if 'full bench' in bench.lower() or 'larger bench' in bench.lower():
-                score += 0.1
-        
         return min(score, 1.0)
     
     def _calculate_overall_score(self, dimension_scores: Dict[QualityDimension, float]) -> float:
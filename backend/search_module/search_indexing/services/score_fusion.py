@@ -0,0 +1,204 @@
+"""
+Score Fusion
+Vectorized merging, normalization and fusion of retriever scores
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RRF_K = 60
+
+
+class FusedScores:
+    """
+    Vector and keyword scores aligned on unique case ids.
+
+    Arrays are parallel: ``case_ids[i]`` has best vector score
+    ``vector_scores[i]`` and best keyword score ``keyword_scores[i]``
+    (0 when the retriever did not return it). ``first_seen`` keeps the
+    position of the first hit so ties keep the retriever order; the
+    original result dicts are grouped by row once, on the first lookup.
+    """
+
+    def __init__(self, vector_results: List[Dict], keyword_results: List[Dict],
+                 vector_key: str = 'similarity', keyword_key: str = 'rank'):
+        self.sources: List[Dict] = []
+        ids: List[int] = []
+        vector_scores: List[float] = []
+        keyword_scores: List[float] = []
+        is_keyword: List[bool] = []
+
+        for results, key, keyword in ((vector_results, vector_key, False), (keyword_results, keyword_key, True)):
+            for result in results or []:
+                case_id = result.get('case_id')
+                if not case_id:
+                    continue
+                try:
+                    ids.append(int(case_id))
+                except (TypeError, ValueError):
+                    continue
+                score = float(result.get(key, 0) or 0)
+                vector_scores.append(0.0 if keyword else score)
+                keyword_scores.append(score if keyword else 0.0)
+                is_keyword.append(keyword)
+                self.sources.append(result)
+
+        all_ids = np.asarray(ids, dtype=np.int64)
+        raw_vector = np.asarray(vector_scores, dtype=np.float64)
+        raw_keyword = np.asarray(keyword_scores, dtype=np.float64)
+        keyword_mask = np.asarray(is_keyword, dtype=bool)
+
+        self.case_ids, first_index, self._inverse = np.unique(all_ids, return_index=True, return_inverse=True)
+        size = len(self.case_ids)
+
+        self.vector_scores = np.zeros(size, dtype=np.float64)
+        self.keyword_scores = np.zeros(size, dtype=np.float64)
+        self.has_vector = np.zeros(size, dtype=bool)
+        self.has_keyword = np.zeros(size, dtype=bool)
+        if size:
+            np.maximum.at(self.vector_scores, self._inverse, raw_vector)
+            np.maximum.at(self.keyword_scores, self._inverse, raw_keyword)
+            self.has_vector[self._inverse[~keyword_mask]] = True
+            self.has_keyword[self._inverse[keyword_mask]] = True
+
+        # Rows ordered by first appearance, matching insertion-ordered dict merging
+        self.first_seen = first_index.astype(np.int64)
+        self._row_sources: Optional[List[List[Dict]]] = None
+
+    def __len__(self) -> int:
+        return len(self.case_ids)
+
+    def source_results(self, row: int) -> List[Dict]:
+        """Original result dicts for a row, in retriever order (vector first)"""
+        if self._row_sources is None:
+            row_sources: List[List[Dict]] = [[] for _ in range(len(self.case_ids))]
+            for source, source_row in zip(self.sources, self._inverse.tolist()):
+                row_sources[source_row].append(source)
+            self._row_sources = row_sources
+        return list(self._row_sources[row])
+
+    def case_id(self, row: int) -> int:
+        return int(self.case_ids[row])
+
+
+def normalize_scores(scores: np.ndarray, method: str = 'min_max', mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Normalize an array of scores.
+
+    Args:
+        scores: Raw scores
+        method: 'min_max', 'z_score' (squashed to 0-1 with a logistic), 'clip' or 'none'
+        mask: Optional boolean mask of rows the retriever actually returned;
+              other rows are left at 0
+
+    Returns:
+        Normalized scores as a new array
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    out = np.zeros_like(scores)
+    rows = np.ones(len(scores), dtype=bool) if mask is None else mask
+    values = scores[rows]
+    if values.size == 0:
+        return out
+
+    if method == 'min_max':
+        low, high = values.min(), values.max()
+        out[rows] = (values - low) / (high - low) if high > low else 1.0
+    elif method == 'z_score':
+        std = values.std()
+        z = (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+        out[rows] = 1.0 / (1.0 + np.exp(-z))
+    elif method == 'clip':
+        out[rows] = np.clip(values, 0.0, 1.0)
+    else:
+        out[rows] = values
+    return out
+
+
+def weighted_linear_fusion(score_arrays: Sequence[np.ndarray], weights: Sequence[float]) -> np.ndarray:
+    """Weighted sum of aligned score arrays"""
+    fused = np.zeros(len(score_arrays[0]), dtype=np.float64)
+    for scores, weight in zip(score_arrays, weights):
+        fused += weight * np.asarray(scores, dtype=np.float64)
+    return fused
+
+
+def ranks_from_scores(scores: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """1-based rank of each row by descending score; rows outside the mask get rank 0"""
+    scores = np.asarray(scores, dtype=np.float64)
+    rows = np.flatnonzero(np.ones(len(scores), dtype=bool) if mask is None else mask)
+    ranks = np.zeros(len(scores), dtype=np.int64)
+    order = rows[np.argsort(-scores[rows], kind='stable')]
+    ranks[order] = np.arange(1, len(order) + 1)
+    return ranks
+
+
+def reciprocal_rank_fusion(rank_arrays: Sequence[np.ndarray], weights: Optional[Sequence[float]] = None,
+                           k: int = RRF_K) -> np.ndarray:
+    """Reciprocal-rank fusion; a rank of 0 means the row was not retrieved by that list"""
+    weights = weights or [1.0] * len(rank_arrays)
+    fused = np.zeros(len(rank_arrays[0]), dtype=np.float64)
+    for ranks, weight in zip(rank_arrays, weights):
+        ranks = np.asarray(ranks, dtype=np.float64)
+        hit = ranks > 0
+        fused[hit] += weight / (k + ranks[hit])
+    return fused
+
+
+def top_k_indices(scores: np.ndarray, k: int, tie_breaker: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the ``k`` highest scores in descending order.
+
+    Uses ``argpartition`` so only the selected rows are fully sorted. Ties are
+    broken by ascending ``tie_breaker`` (e.g. first-seen position), which
+    reproduces the order of a stable Python sort.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if tie_breaker is None:
+        tie_breaker = np.arange(n)
+
+    if k < n:
+        partition = np.argpartition(-scores, k - 1)[:k]
+        threshold = scores[partition].min()
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((tie_breaker[candidates], -scores[candidates]))
+    return candidates[order][:k]
+
+
+def fuse(fused: FusedScores, vector_weight: float, keyword_weight: float,
+         method: str = 'weighted', normalization: str = 'clip') -> np.ndarray:
+    """
+    Fuse the aligned vector/keyword scores with one of the standard methods.
+
+    Args:
+        fused: Aligned retriever scores
+        vector_weight: Weight for the vector retriever
+        keyword_weight: Weight for the keyword retriever
+        method: 'weighted' (linear fusion of normalized scores) or 'rrf'
+        normalization: Normalization applied per retriever for linear fusion
+
+    Returns:
+        Fused score per row
+    """
+    if method == 'rrf':
+        return reciprocal_rank_fusion(
+            [ranks_from_scores(fused.vector_scores, fused.has_vector),
+             ranks_from_scores(fused.keyword_scores, fused.has_keyword)],
+            [vector_weight, keyword_weight],
+        )
+
+    return weighted_linear_fusion(
+        [normalize_scores(fused.vector_scores, normalization, fused.has_vector),
+         normalize_scores(fused.keyword_scores, normalization, fused.has_keyword)],
+        [vector_weight, keyword_weight],
+    )
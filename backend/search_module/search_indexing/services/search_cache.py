@@ -0,0 +1,148 @@
+"""
+Search Result Cache
+Two-tier (in-process LRU + shared Django cache) cache for search responses
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """
+    Cache of rendered search responses.
+
+    Keys are built from a canonical form of the normalized query and the
+    request parameters, and are namespaced by the current index version so
+    that rebuilding any index invalidates every cached entry automatically.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_RESULT_CACHE_ENABLED', True),
+            'local_max_entries': getattr(settings, 'SEARCH_RESULT_CACHE_LOCAL_SIZE', 512),
+            'shared_cache_alias': getattr(settings, 'SEARCH_RESULT_CACHE_ALIAS', 'default'),
+            'shared_ttl': getattr(settings, 'SEARCH_RESULT_CACHE_TTL', 600),  # 10 minutes
+            'key_prefix': 'search_results',
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._local: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'errors': 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.default_config['enabled'])
+
+    def build_key(self, normalized_query: str, params: Dict[str, Any]) -> str:
+        """Build a versioned cache key from the normalized query and request parameters"""
+        canonical = {
+            'q': re.sub(r'\s+', ' ', (normalized_query or '').lower()).strip(),
+            'mode': params.get('mode', 'hybrid'),
+            'filters': {k: str(v).lower() for k, v in sorted((params.get('filters') or {}).items()) if v not in (None, '')},
+            'limit': params.get('limit'),
+            'offset': params.get('offset'),
+            'facets': bool(params.get('return_facets')),
+            'highlight': bool(params.get('highlight')),
+        }
+        digest = hashlib.sha256(
+            json.dumps(canonical, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{self.default_config['key_prefix']}:v{get_index_version()}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response, checking the local tier before the shared tier"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                self._stats['local_hits'] += 1
+                return copy.deepcopy(self._local[key])
+
+        try:
+            value = caches[self.default_config['shared_cache_alias']].get(key)
+        except Exception as e:
+            logger.error(f"Error reading shared search cache: {str(e)}")
+            value = None
+            with self._lock:
+                self._stats['errors'] += 1
+
+        with self._lock:
+            if value is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['shared_hits'] += 1
+            self._store_local(key, value)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response in both tiers"""
+        if not self.enabled:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._store_local(key, value)
+            self._stats['stores'] += 1
+
+        try:
+            caches[self.default_config['shared_cache_alias']].set(
+                key, value, self.default_config['shared_ttl']
+            )
+        except Exception as e:
+            logger.error(f"Error writing shared search cache: {str(e)}")
+            with self._lock:
+                self._stats['errors'] += 1
+
+    def clear_local(self) -> None:
+        """Drop every entry from the in-process tier"""
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate metrics for both tiers"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._local)
+
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        hits = stats['local_hits'] + stats['shared_hits']
+        stats['lookups'] = lookups
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        stats['local_hit_rate'] = round(stats['local_hits'] / lookups, 4) if lookups else 0.0
+        stats['enabled'] = self.enabled
+        return stats
+
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        """Insert into the LRU tier; caller must hold the lock"""
+        self._local[key] = value
+        self._local.move_to_end(key)
+        while len(self._local) > self.default_config['local_max_entries']:
+            self._local.popitem(last=False)
@@ -0,0 +1,232 @@
+"""
+Search Cursor Store
+Cursor pagination over ranked result sets kept in the shared Django cache
+"""
+
+import base64
+import binascii
+import json
+import logging
+import secrets
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.cases.models import Case
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+# Per-result fields kept in a cursor; result_data and snippets are rebuilt per page
+SNAPSHOT_EXCLUDED_FIELDS = {'result_data', 'snippets'}
+
+# Query normalization fields the snippet service needs for later pages
+SNAPSHOT_QUERY_INFO_FIELDS = ('original_query', 'normalized_query', 'citations', 'exact_identifiers')
+
+
+class SearchCursorStore:
+    """
+    Stores the ranked case-id list of a search under an opaque cursor.
+
+    The first request runs the full pipeline for its page plus a lookahead
+    and snapshots the ranked ids with their scores. Later pages decode the
+    cursor, slice the snapshot and hydrate only that page's cases, so
+    paging costs one cache read plus one database query instead of a full
+    re-rank. Only a cursor followed past the end of a truncated snapshot
+    re-runs the search, ranking deeper.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_CURSOR_ENABLED', True),
+            'cache_alias': getattr(settings, 'SEARCH_CURSOR_CACHE_ALIAS', 'default'),
+            'ttl': getattr(settings, 'SEARCH_CURSOR_TTL', 900),  # 15 minutes
+            'lookahead_pages': getattr(settings, 'SEARCH_CURSOR_LOOKAHEAD_PAGES', 1),
+            'depth': getattr(settings, 'SEARCH_CURSOR_DEPTH', 100),
+            'key_prefix': 'search_cursor',
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.default_config['enabled'])
+
+    @property
+    def depth(self) -> int:
+        """How many results a search re-run for a followed cursor ranks at least"""
+        return int(self.default_config['depth'])
+
+    def ranking_depth(self, offset: int, limit: int, deepen: bool = False) -> int:
+        """
+        How many results to rank for the page at ``offset``.
+
+        The page itself plus ``lookahead_pages`` pages for the cursors; with
+        ``deepen`` (a cursor followed past its snapshot) at least ``depth``.
+        """
+        ranking_depth = offset + limit
+        if self.enabled:
+            ranking_depth += limit * max(int(self.default_config['lookahead_pages']), 0)
+            if deepen:
+                ranking_depth = max(ranking_depth, self.depth)
+        return min(ranking_depth, 1000)
+
+    def covers(self, snapshot: Dict[str, Any], offset: int, limit: int) -> bool:
+        """Whether a snapshot can serve the page at ``offset`` without ranking deeper"""
+        return snapshot.get('complete', True) or offset + limit < len(snapshot['results'])
+
+    def create(self, results: List[Dict], params: Dict[str, Any], query_info: Dict[str, Any],
+               response_query_info: Dict[str, Any] = None, facets: Dict[str, Any] = None,
+               complete: bool = True) -> Optional[str]:
+        """
+        Snapshot a ranked result list.
+
+        Args:
+            results: Final ranked results (after quality optimization and cutoff)
+            params: Parsed search parameters
+            query_info: Query normalization information
+            response_query_info: The ``query_info`` block of the first response
+            facets: Facets computed for the full result set, if any
+            complete: False when ranking stopped at its depth, so more results
+                may follow the last one
+
+        Returns:
+            Snapshot token, or None if the cursor could not be stored
+        """
+        if not self.enabled:
+            return None
+
+        token = secrets.token_urlsafe(12)
+        snapshot = {
+            'query': params['query'],
+            'mode': params['mode'],
+            'filters': params.get('filters') or {},
+            'index_version': get_index_version(),
+            'created_at': time.time(),
+            'complete': complete,
+            'query_info': {field: query_info.get(field) for field in SNAPSHOT_QUERY_INFO_FIELDS if field in query_info},
+            'response_query_info': response_query_info or {},
+            'facets': facets or {},
+            'results': [
+                {
+                    key: value for key, value in result.items()
+                    if key not in SNAPSHOT_EXCLUDED_FIELDS
+                    and (value is None or isinstance(value, (str, int, float, bool)))
+                }
+                for result in results
+            ],
+        }
+
+        try:
+            caches[self.default_config['cache_alias']].set(
+                self._cache_key(token), snapshot, self.default_config['ttl']
+            )
+            return token
+        except Exception as e:
+            logger.error(f"Error storing search cursor: {str(e)}")
+            return None
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Load a snapshot, or None if it expired or never existed"""
+        try:
+            return caches[self.default_config['cache_alias']].get(self._cache_key(token))
+        except Exception as e:
+            logger.error(f"Error reading search cursor: {str(e)}")
+            return None
+
+    def touch(self, token: str) -> bool:
+        """Extend a snapshot's TTL; False if it is no longer available"""
+        try:
+            return bool(caches[self.default_config['cache_alias']].touch(
+                self._cache_key(token), self.default_config['ttl']
+            ))
+        except Exception as e:
+            logger.error(f"Error refreshing search cursor: {str(e)}")
+            return False
+
+    def encode(self, token: str, offset: int) -> str:
+        """Build the opaque cursor string for a page starting at ``offset``"""
+        payload = json.dumps({'t': token, 'o': offset}, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def decode(self, cursor: str) -> Optional[Tuple[str, int]]:
+        """Decode a cursor into (token, offset), or None if it is malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            token, offset = payload['t'], int(payload['o'])
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+            return None
+        if not isinstance(token, str) or offset < 0:
+            return None
+        return token, offset
+
+    def page_cursors(self, token: Optional[str], offset: int, limit: int, total: int) -> Dict[str, Optional[str]]:
+        """Cursors for the pages after and before the one starting at ``offset``"""
+        if not token:
+            return {'next_cursor': None, 'previous_cursor': None}
+        return {
+            'next_cursor': self.encode(token, offset + limit) if offset + limit < total else None,
+            'previous_cursor': self.encode(token, max(offset - limit, 0)) if offset > 0 else None,
+        }
+
+    def hydrate(self, entries: List[Dict]) -> List[Dict]:
+        """
+        Attach case data to snapshot entries with a single query.
+
+        Cases deleted since the snapshot was taken are dropped.
+        """
+        try:
+            cases = Case.objects.select_related('court').in_bulk([entry['case_id'] for entry in entries])
+        except Exception as e:
+            logger.error(f"Error hydrating cursor page: {str(e)}")
+            return []
+        return self._attach_cases(entries, cases)
+
+    async def aget(self, token: str) -> Optional[Dict[str, Any]]:
+        """Async variant of ``get`` for the ASGI views"""
+        try:
+            return await caches[self.default_config['cache_alias']].aget(self._cache_key(token))
+        except Exception as e:
+            logger.error(f"Error reading search cursor: {str(e)}")
+            return None
+
+    async def ahydrate(self, entries: List[Dict]) -> List[Dict]:
+        """Async variant of ``hydrate`` for the ASGI views"""
+        try:
+            cases = await Case.objects.select_related('court').ain_bulk([entry['case_id'] for entry in entries])
+        except Exception as e:
+            logger.error(f"Error hydrating cursor page: {str(e)}")
+            return []
+        return self._attach_cases(entries, cases)
+
+    def _attach_cases(self, entries: List[Dict], cases: Dict[int, Case]) -> List[Dict]:
+        """Build page results from snapshot entries and their loaded cases"""
+        results = []
+        for entry in entries:
+            case = cases.get(entry['case_id'])
+            if case is None:
+                continue
+            result = dict(entry)
+            result['result_data'] = {
+                'case_id': case.id,
+                'case_number': case.case_number or '',
+                'case_title': case.case_title or '',
+                'court': case.court.name if case.court else '',
+                'status': case.status or '',
+                'bench': case.bench or '',
+                'institution_date': case.institution_date,
+                'hearing_date': case.hearing_date,
+            }
+            results.append(result)
+        return results
+
+    def _cache_key(self, token: str) -> str:
+        return f"{self.default_config['key_prefix']}:{token}"
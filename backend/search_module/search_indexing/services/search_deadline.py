@@ -0,0 +1,99 @@
+"""
+Search Deadline
+Latency budget tracking so optional pipeline stages can be skipped or capped
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from .search_tracing import get_stage_metrics
+
+logger = logging.getLogger(__name__)
+
+# Fallback cost estimates (ms) for optional stages before any samples exist
+DEFAULT_STAGE_ESTIMATES_MS = {
+    'advanced_reranker': 50.0,
+    'learned_reranker': 300.0,
+    'quality': 20.0,
+    'snippets': 200.0,
+    'snippet_per_result': 20.0,
+    'facets': 100.0,
+}
+
+DEFAULT_MODE_BUDGETS_MS = {
+    'lexical': 800,
+    'semantic': 1500,
+    'hybrid': 2500,
+}
+
+
+class SearchDeadline:
+    """
+    Tracks the remaining latency budget of a search request.
+
+    Before each optional stage the pipeline asks ``fits(stage)``; the answer
+    compares the remaining time with the stage's observed median latency
+    (or a default estimate) and records the stage as skipped when it no
+    longer fits.
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None, mode: str = 'hybrid'):
+        if budget_ms is None:
+            budgets = getattr(settings, 'SEARCH_LATENCY_BUDGETS_MS', DEFAULT_MODE_BUDGETS_MS)
+            budget_ms = budgets.get(mode, DEFAULT_MODE_BUDGETS_MS.get(mode, 2500))
+        self.budget_ms = float(budget_ms)
+        self.start_time = time.perf_counter()
+        self.degraded_stages: List[Dict[str, Any]] = []
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def remaining_ms(self) -> float:
+        return self.budget_ms - self.elapsed_ms()
+
+    def estimate_ms(self, stage: str) -> float:
+        """Expected cost of a stage from live metrics, falling back to defaults"""
+        observed = get_stage_metrics().estimate(stage)
+        if observed is not None:
+            return observed
+        return DEFAULT_STAGE_ESTIMATES_MS.get(stage, 0.0)
+
+    def fits(self, stage: str, estimate_ms: Optional[float] = None) -> bool:
+        """Return True if the stage fits in the remaining budget, else record it as skipped"""
+        estimate = self.estimate_ms(stage) if estimate_ms is None else estimate_ms
+        remaining = self.remaining_ms()
+        if remaining >= estimate:
+            return True
+
+        self.degraded_stages.append({
+            'stage': stage,
+            'action': 'skipped',
+            'remaining_ms': round(remaining, 2),
+            'estimated_ms': round(estimate, 2),
+        })
+        logger.info(f"Deadline: skipping {stage} ({remaining:.1f}ms left, needs ~{estimate:.1f}ms)")
+        return False
+
+    def record_capped(self, stage: str, completed: int, requested: int) -> None:
+        """Record a stage that ran on only part of its input"""
+        self.degraded_stages.append({
+            'stage': stage,
+            'action': 'capped',
+            'completed': completed,
+            'requested': requested,
+            'remaining_ms': round(self.remaining_ms(), 2),
+        })
+
+    @property
+    def is_degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'budget_ms': round(self.budget_ms, 2),
+            'remaining_ms': round(self.remaining_ms(), 2),
+            'degraded_stages': list(self.degraded_stages),
+        }
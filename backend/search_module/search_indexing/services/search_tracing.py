@@ -0,0 +1,111 @@
+"""
+Search Tracing
+Per-stage latency timing for the search pipeline and process-wide histograms
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SearchTrace:
+    """Collects wall-clock timings for the stages of a single search request"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stages: "OrderedDict[str, float]" = OrderedDict()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block and record it under ``name`` (milliseconds)"""
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - stage_start) * 1000)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        """Add a duration to a stage; repeated stages accumulate"""
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trace was started"""
+        return (time.perf_counter() - self.start_time) * 1000
+
+    def to_dict(self) -> Dict[str, float]:
+        """Stage timings rounded for JSON responses"""
+        return {name: round(duration, 2) for name, duration in self.stages.items()}
+
+
+class StageLatencyMetrics:
+    """Process-wide latency samples per stage with percentile summaries"""
+
+    def __init__(self, max_samples: int = 2048):
+        self.max_samples = max_samples
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record_trace(self, trace: SearchTrace, total_ms: Optional[float] = None) -> None:
+        """Add every stage of a finished trace, plus the request total"""
+        with self._lock:
+            for name, duration in trace.stages.items():
+                self._add(name, duration)
+            self._add('total', total_ms if total_ms is not None else trace.elapsed_ms())
+
+    def estimate(self, name: str, percentile: float = 50.0, min_samples: int = 10) -> Optional[float]:
+        """Observed latency percentile for a stage, or None if there are too few samples"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if not samples or len(samples) < min_samples:
+                return None
+            values = np.asarray(samples, dtype=np.float64)
+        return float(np.percentile(values, percentile))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99 summary for every stage seen so far"""
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for name, samples in snapshot.items():
+            values = np.asarray(samples, dtype=np.float64)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[name] = {
+                'count': counts.get(name, len(samples)),
+                'window': len(samples),
+                'mean_ms': round(float(values.mean()), 2),
+                'p50_ms': round(float(p50), 2),
+                'p95_ms': round(float(p95), 2),
+                'p99_ms': round(float(p99), 2),
+                'max_ms': round(float(values.max()), 2),
+            }
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def _add(self, name: str, duration: float) -> None:
+        """Append a sample; caller must hold the lock"""
+        if name not in self._samples:
+            self._samples[name] = deque(maxlen=self.max_samples)
+        self._samples[name].append(duration)
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+
+_stage_metrics = StageLatencyMetrics()
+
+
+def get_stage_metrics() -> StageLatencyMetrics:
+    """Return the process-wide stage latency metrics"""
+    return _stage_metrics
@@ -0,0 +1,289 @@
+"""
+Sentence Index
+Per-case sentence tables and term postings built at text-cleaning time for snippet highlighting
+"""
+
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends: terminal punctuation followed by whitespace, or line breaks
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Same filtering as SnippetService._extract_query_terms
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from', 'as', 'is', 'are', 'was', 'were'
+})
+
+
+def split_sentences(text: str, max_chars: int = 300) -> List[Tuple[int, int]]:
+    """
+    ``(start, end)`` character spans of the sentences of ``text``.
+
+    Spans exclude surrounding whitespace; sentences longer than
+    ``max_chars`` are split at the last space that keeps them under it.
+    """
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        _add_sentence(spans, text, start, match.start(), max_chars)
+        start = match.end()
+    _add_sentence(spans, text, start, len(text), max_chars)
+    return spans
+
+
+def _add_sentence(spans: List[Tuple[int, int]], text: str, start: int, end: int, max_chars: int) -> None:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+
+    while end - start > max_chars:
+        cut = text.rfind(' ', start + 1, start + max_chars)
+        if cut <= start:
+            cut = start + max_chars
+        spans.append((start, cut))
+        start = cut
+        while start < end and text[start].isspace():
+            start += 1
+
+    if end > start:
+        spans.append((start, end))
+
+
+def sentence_terms(text: str) -> set:
+    """Normalized index terms of a sentence"""
+    return {
+        token for token in (match.lower() for match in TOKEN_PATTERN.findall(text))
+        if len(token) > 2 and token not in STOP_WORDS
+    }
+
+
+def case_page_texts(case_ids: Iterable[int]) -> Dict[int, List[Tuple[int, int, str]]]:
+    """
+    ``(document_id, page_number, text)`` of each case's pages in page order,
+    with one query. The text is the clean text, or the raw text when the
+    page has not been cleaned.
+    """
+    from apps.cases.models import DocumentText
+
+    pages_by_case = defaultdict(list)
+    pages = DocumentText.objects.filter(
+        document__case_documents__case_id__in=list(case_ids),
+        has_text=True
+    ).annotate(
+        page_case_id=F('document__case_documents__case_id'),
+        page_text=Coalesce(NullIf('clean_text', Value('')), 'raw_text', output_field=TextField()),
+    ).order_by('page_number', 'id').values_list('page_case_id', 'id', 'document_id', 'page_number', 'page_text')
+
+    # A case can link the same document from several source rows
+    seen = set()
+    for case_id, page_id, document_id, page_number, text in pages:
+        if (case_id, page_id) not in seen:
+            seen.add((case_id, page_id))
+            pages_by_case[case_id].append((document_id, page_number, text))
+    return pages_by_case
+
+
+@dataclass(frozen=True)
+class SentenceHit:
+    """A sentence containing a query term"""
+    sentence_id: int
+    term: str     # query term
+    token: str    # indexed token it matched (the term or a word starting with it)
+
+
+@dataclass
+class CaseSentences:
+    """Loaded sentence table and postings of one case"""
+    sentences: List[List[int]]
+    terms: List[str]
+    postings: List[List[int]]
+
+    def find(self, query_terms: List[str], limit: int) -> List[SentenceHit]:
+        """
+        Sentences matching any query term, in page order.
+
+        A query term matches indexed tokens it is a prefix of ("bail"
+        finds "bailable"); each sentence is reported once, for the first
+        query term that matches it.
+        """
+        matches: Dict[int, SentenceHit] = {}
+        for term in query_terms:
+            position = bisect_left(self.terms, term)
+            while position < len(self.terms) and self.terms[position].startswith(term):
+                token = self.terms[position]
+                for sentence_id in self.postings[position]:
+                    if sentence_id not in matches:
+                        matches[sentence_id] = SentenceHit(sentence_id, term, token)
+                position += 1
+        return [matches[sentence_id] for sentence_id in sorted(matches)[:limit]]
+
+    def window(self, sentence_id: int, min_chars: int, max_chars: int) -> Tuple[int, int]:
+        """
+        First and last sentence ids of a window around a sentence: neighbouring
+        sentences of the same page are added (following ones first) until the
+        window spans ``min_chars`` or would exceed ``max_chars``.
+        """
+        document_id, page_number, start, end = self.sentences[sentence_id]
+        low = high = sentence_id
+
+        def same_page(index: int) -> bool:
+            return 0 <= index < len(self.sentences) and self.sentences[index][:2] == [document_id, page_number]
+
+        while end - start < min_chars:
+            if same_page(high + 1) and self.sentences[high + 1][3] - start <= max_chars:
+                high += 1
+                end = self.sentences[high][3]
+            elif same_page(low - 1) and end - self.sentences[low - 1][2] <= max_chars:
+                low -= 1
+                start = self.sentences[low][2]
+            else:
+                break
+        return low, high
+
+
+class SentenceIndex:
+    """
+    Builds and loads per-case sentence tables.
+
+    Each case gets one ``CaseSentenceIndex`` row: the sentences of all of its
+    pages as ``[document_id, page_number, start_char, end_char]`` and a
+    sorted term list with aligned sentence id postings. Rows are rebuilt
+    when a document's text is cleaned and backfilled by the hybrid index
+    build; snippet generation then looks terms up instead of scanning
+    every page.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'enabled': getattr(settings, 'SEARCH_SENTENCE_INDEX_ENABLED', True),
+            'max_sentence_chars': getattr(settings, 'SEARCH_SENTENCE_MAX_CHARS', 300),
+            'batch_size': 200,  # cases per build query
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+    def index_pages(self, pages: Iterable[Tuple[int, int, str]]) -> Dict[str, Any]:
+        """Sentence table and postings of ``(document_id, page_number, text)`` pages"""
+        sentences: List[List[int]] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        page_count = 0
+
+        for document_id, page_number, text in pages:
+            if not text:
+                continue
+            page_count += 1
+            for start, end in split_sentences(text, self.default_config['max_sentence_chars']):
+                sentence_id = len(sentences)
+                sentences.append([document_id, page_number, start, end])
+                for term in sentence_terms(text[start:end]):
+                    postings[term].append(sentence_id)
+
+        terms = sorted(postings)
+        return {
+            'sentences': sentences,
+            'terms': terms,
+            'postings': [postings[term] for term in terms],
+            'sentence_count': len(sentences),
+            'page_count': page_count,
+        }
+
+    def build_for_cases(self, case_ids: Iterable[int]) -> int:
+        """(Re)build the sentence index rows of ``case_ids``; returns the rows written"""
+        from ..models import CaseSentenceIndex
+
+        case_ids = list(dict.fromkeys(case_ids))
+        written = 0
+        batch_size = self.default_config['batch_size']
+        for offset in range(0, len(case_ids), batch_size):
+            batch = case_ids[offset:offset + batch_size]
+            pages = case_page_texts(batch)
+            rows = [CaseSentenceIndex(case_id=case_id, **self.index_pages(pages.get(case_id, []))) for case_id in batch]
+            with transaction.atomic():
+                CaseSentenceIndex.objects.filter(case_id__in=batch).delete()
+                CaseSentenceIndex.objects.bulk_create(rows)
+            written += len(rows)
+        return written
+
+    def build_for_document(self, document_id: int) -> int:
+        """Rebuild the rows of every case linked to a document"""
+        from apps.cases.models import CaseDocument
+
+        case_ids = CaseDocument.objects.filter(document_id=document_id).values_list('case_id', flat=True).distinct()
+        return self.build_for_cases(case_ids)
+
+    def build_missing(self, force: bool = False) -> Dict[str, Any]:
+        """Build rows for every case with documents (only the missing ones unless ``force``)"""
+        from apps.cases.models import CaseDocument
+        from ..models import CaseSentenceIndex
+
+        start_time = time.time()
+        stats = {'built': False, 'cases': 0, 'errors': []}
+        try:
+            case_ids = CaseDocument.objects.values_list('case_id', flat=True).distinct().order_by('case_id')
+            if not force:
+                case_ids = case_ids.exclude(case_id__in=CaseSentenceIndex.objects.values('case_id'))
+            stats['cases'] = self.build_for_cases(case_ids)
+            stats['built'] = True
+        except Exception as e:
+            error_msg = f"Error building sentence indexes: {str(e)}"
+            logger.error(error_msg)
+            stats['errors'].append(error_msg)
+
+        stats['processing_time'] = time.time() - start_time
+        return stats
+
+    def load(self, case_ids: Iterable[int]) -> Dict[int, CaseSentences]:
+        """Sentence tables of the cases that have one, with one query"""
+        from ..models import CaseSentenceIndex
+
+        if not self.default_config['enabled']:
+            return {}
+        try:
+            rows = CaseSentenceIndex.objects.filter(case_id__in=list(case_ids)).values_list(
+                'case_id', 'sentences', 'terms', 'postings'
+            )
+            return {
+                case_id: CaseSentences(sentences, terms, postings)
+                for case_id, sentences, terms, postings in rows
+            }
+        except Exception as e:
+            # Callers fall back to scanning the pages of unindexed cases
+            logger.error(f"Error loading sentence indexes: {str(e)}")
+            return {}
+
+
+def fetch_sentence_pages(keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+    """Texts of ``(document_id, page_number)`` pages, with one query"""
+    from apps.cases.models import DocumentText
+
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    condition = Q()
+    for document_id, page_number in keys:
+        condition |= Q(document_id=document_id, page_number=page_number)
+
+    pages = DocumentText.objects.filter(condition, has_text=True).annotate(
+        page_text=Coalesce(NullIf('clean_text', Value('')), 'raw_text', output_field=TextField()),
+    ).values_list('document_id', 'page_number', 'page_text')
+    return {(document_id, page_number): text for document_id, page_number, text in pages}
@@ -0,0 +1,123 @@
+"""
+Search Service Container
+Builds the search services once per process and shares them across API views
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_QUERY = "constitutional petition"
+
+
+class SearchServiceContainer:
+    """Process-wide holder for the search services used by the API views.
+
+    The services are expensive to construct (dictionaries, compiled regexes,
+    embedding models, reranker models), so they are built once and reused by
+    every request instead of being rebuilt in each view's ``__init__``.
+    """
+
+    def __init__(self):
+        # Imported lazily so importing this module never pulls in the
+        # heavy model dependencies before Django apps are ready.
+        from .query_normalization import QueryNormalizationService
+        from .hybrid_indexing import HybridIndexingService
+        from .fast_ranking import FastRankingService
+        from .snippet_service import SnippetService
+        from .faceting_service import FacetingService
+        from .advanced_query_intelligence import AdvancedQueryIntelligence
+        from .result_quality_engine import ResultQualityEngine
+        from .search_cache import SearchResultCache
+        from .search_cursor import SearchCursorStore
+        from .query_plan import QueryPlanner
+
+        start_time = time.time()
+
+        self.query_normalizer = QueryNormalizationService()
+        self.hybrid_service = HybridIndexingService(use_pinecone=True)  # Use Pinecone for better performance
+        self.ranking_service = FastRankingService()
+        self.snippet_service = SnippetService(vector_service=self.hybrid_service.vector_service)
+        self.faceting_service = FacetingService()
+
+        # TIER 1 INTEGRATION: Advanced services
+        self.query_intelligence = AdvancedQueryIntelligence()
+        self.quality_engine = ResultQualityEngine()
+
+        # Per-query analysis shared by every stage, cached by query string
+        self.query_planner = QueryPlanner(self.query_normalizer, self.query_intelligence, self.hybrid_service)
+
+        # Versioned response cache shared by all search requests
+        self.result_cache = SearchResultCache()
+
+        # Ranked result snapshots behind cursor pagination
+        self.cursor_store = SearchCursorStore()
+
+        self.build_time = time.time() - start_time
+        self.is_warm = False
+        self.warm_up_stats: Dict[str, Any] = {}
+
+        logger.info(f"Search service container built in {self.build_time:.2f} seconds")
+
+    def warm_up(self, query: str = WARM_UP_QUERY) -> Dict[str, Any]:
+        """
+        Run a throwaway query through each service so that lazily loaded
+        models and indexes are in memory before real traffic arrives.
+
+        Returns:
+            Dictionary mapping each warm-up step to its status and duration
+        """
+        steps = {
+            'query_intelligence': lambda: self.query_intelligence.analyze_query(query),
+            'query_normalizer': lambda: self.query_normalizer.normalize_query(query),
+            'vector_service': lambda: self.hybrid_service.vector_service.search(query, top_k=1),
+            'keyword_service': lambda: self.hybrid_service.keyword_service.search(query, top_k=1),
+            'case_feature_store': lambda: self.hybrid_service.feature_store.ensure_loaded(),
+        }
+
+        stats = {}
+        for name, step in steps.items():
+            step_start = time.time()
+            try:
+                step()
+                stats[name] = {'ok': True, 'time_ms': round((time.time() - step_start) * 1000, 2)}
+            except Exception as e:
+                logger.warning(f"Warm-up step '{name}' failed: {str(e)}")
+                stats[name] = {'ok': False, 'error': str(e)}
+
+        self.is_warm = True
+        self.warm_up_stats = stats
+        logger.info(f"Search service container warmed up: {stats}")
+        return stats
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get container build and warm-up information"""
+        return {
+            'build_time_ms': round(self.build_time * 1000, 2),
+            'is_warm': self.is_warm,
+            'warm_up': self.warm_up_stats,
+        }
+
+
+_container: Optional[SearchServiceContainer] = None
+_container_lock = threading.Lock()
+
+
+def get_search_services() -> SearchServiceContainer:
+    """Return the shared service container, building it on first use"""
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = SearchServiceContainer()
+    return _container
+
+
+def reset_search_services() -> None:
+    """Drop the shared container so the next access rebuilds it"""
+    global _container
+    with _container_lock:
+        _container = None
@@ -5,11 +5,16 @@ Creates relevant snippets with span information for search results
 
 import re
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple, Any
+from django.conf import settings
 from django.db.models import Q
-from apps.cases.models import Case, TermOccurrence, DocumentText
+from apps.cases.models import Case, TermOccurrence
 from ..models import DocumentChunk
-from .simple_ai_snippet_service import SimpleAISnippetService
+from .ai_snippet_jobs import AISnippetJob, get_ai_snippet_jobs
+from .search_deadline import SearchDeadline
+from .sentence_index import CaseSentences, SentenceHit, SentenceIndex, case_page_texts, fetch_sentence_pages
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +22,12 @@ logger = logging.getLogger(__name__)
 class SnippetService:
     """Service for generating search result snippets"""
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, vector_service=None, ai_snippet_jobs=None):
         self.config = config or {}
         
+        # FAISS vector service whose stored chunk vectors score semantic snippets
+        self.vector_service = vector_service
+        
         # Default configuration
         self.default_config = {
             'max_snippet_length': 300,
@@ -30,21 +38,32 @@ class SnippetService:
             'include_page_numbers': True,
             'highlight_terms': True,
             'use_ai_snippets': True,  # Enable AI-powered snippets
-            'ai_snippet_priority': True  # Prioritize AI snippets over traditional ones
+            'ai_snippet_priority': True,  # Prioritize AI snippets over traditional ones
+            'batch_workers': getattr(settings, 'SEARCH_SNIPPET_WORKERS', 4),  # Threads per result page
         }
         
         # Update with custom config
         if config:
             self.default_config.update(config)
         
-        # Initialize AI snippet service
-        self.ai_snippet_service = None
+        # AI snippet jobs (concurrent, cached and coalesced provider calls)
+        self.ai_snippet_jobs = None
         if self.default_config.get('use_ai_snippets', False):
             try:
-                self.ai_snippet_service = SimpleAISnippetService()
+                self.ai_snippet_jobs = ai_snippet_jobs or get_ai_snippet_jobs()
             except Exception as e:
                 logger.warning(f"Failed to initialize AI snippet service: {e}")
-                self.ai_snippet_service = None
+                self.ai_snippet_jobs = None
+        
+        # Precomputed sentence tables for lexical snippets
+        self.sentence_index = SentenceIndex()
+        
+        # Workers only run snippet building on prefetched rows, never ORM calls
+        self._pool = None
+        if self.default_config['batch_workers'] > 1:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.default_config['batch_workers'], thread_name_prefix='snippet-worker'
+            )
     
     def generate_snippets(self, 
                           case_id: int, 
@@ -63,36 +82,203 @@ class SnippetService:
         Returns:
             List of snippet objects with text and span information
         """
+        return self.generate_snippets_batch([case_id], query, query_info, max_snippets).get(case_id, [])
+    
+    def generate_snippets_batch(self, 
+                                case_ids: List[int], 
+                                query: str, 
+                                query_info: Dict[str, Any],
+                                max_snippets: int = None,
+                                deadline: Optional[SearchDeadline] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Generate snippets for a whole result page
+        
+        Cases and embedded chunks of every case are fetched with one query
+        each, and the AI snippets of all cases are generated as one set of
+        concurrent jobs. For the cases whose AI and semantic snippets fall short, the
+        sentence tables are loaded and only the pages holding term hits are
+        fetched; cases without a table get their pages scanned instead.
+        Snippets are then built per case on the worker pool from the
+        prefetched rows.
+        
+        Args:
+            case_ids: Case IDs of the page, in display order
+            query: Original search query
+            query_info: Query normalization information
+            max_snippets: Maximum number of snippets per case
+            deadline: Request deadline; AI snippet jobs still running when
+                it expires are replaced by the simple generator
+        
+        Returns:
+            Snippet lists keyed by case ID
+        """
+        case_ids = list(dict.fromkeys(case_ids))
+        if not case_ids:
+            return {}
+        
         try:
             max_snippets = max_snippets or self.default_config['max_snippets_per_result']
             
-            snippets = []
+            cases = self._fetch_cases(case_ids)
+            chunks = self._fetch_chunks(case_ids)
+            chunk_scores = self.score_chunks(query, [chunk for case_chunks in chunks.values() for chunk in case_chunks])
+            
+            # Most query-similar chunks first when their vectors were scored
+            if chunk_scores:
+                for case_chunks in chunks.values():
+                    case_chunks.sort(key=lambda chunk: chunk_scores.get(chunk.chunk_id, -1.0), reverse=True)
+            
+            # Strategy 1: AI snippets for every case at once (if enabled)
+            ai_snippets = {}
+            if self.ai_snippet_jobs and self.default_config.get('ai_snippet_priority', False):
+                ai_snippets = self._generate_ai_snippets(case_ids, cases, chunks, query, max_snippets, deadline)
+            
+            # Strategy 2: semantic chunks
+            snippets = self._map_cases(
+                lambda case_id: self._generate_content_snippets(
+                    case_id, ai_snippets.get(case_id, []), chunks.get(case_id, []), query_info, max_snippets
+                ),
+                case_ids
+            )
             
-            # Strategy 1: Try AI-powered snippet generation first (if enabled)
-            if (self.ai_snippet_service and 
-                self.default_config.get('ai_snippet_priority', False)):
-                
-                ai_snippets = self._generate_ai_snippets(case_id, query, query_info, max_snippets)
-                if ai_snippets:
-                    snippets.extend(ai_snippets)
-                    logger.info(f"Generated {len(ai_snippets)} AI snippets for case {case_id}")
+            # Strategy 3 and 4: lexical page matches, then case metadata
+            short_case_ids = [case_id for case_id in case_ids if len(snippets[case_id]) < max_snippets]
+            sentence_tables = self.sentence_index.load(short_case_ids) if short_case_ids else {}
+            
+            # Indexed cases: look the expanded terms up, then fetch only the hit pages
+            lexical_terms = self._extract_query_terms(self._expand_query_terms(query))
+            hits = {
+                case_id: table.find(lexical_terms, max_snippets * 3)
+                for case_id, table in sentence_tables.items()
+            }
+            hit_pages = fetch_sentence_pages(
+                tuple(sentence_tables[case_id].sentences[hit.sentence_id][:2])
+                for case_id, case_hits in hits.items() for hit in case_hits
+            )
+            
+            # Cases without a sentence table yet: scan their pages
+            unindexed_case_ids = [case_id for case_id in short_case_ids if case_id not in sentence_tables]
+            pages = self._fetch_pages(unindexed_case_ids) if unindexed_case_ids else {}
+            
+            snippets.update(self._map_cases(
+                lambda case_id: self._complete_snippets(
+                    case_id, cases.get(case_id), pages.get(case_id, []), snippets[case_id], query, max_snippets,
+                    sentence_tables.get(case_id), hits.get(case_id, []), hit_pages
+                ),
+                case_ids
+            ))
             
-            # Strategy 2: Fallback to traditional methods if AI snippets insufficient
+            return snippets
+            
+        except Exception as e:
+            logger.error(f"Error generating snippets for cases {case_ids}: {str(e)}")
+            return {case_id: [] for case_id in case_ids}
+    
+    def _map_cases(self, build: Callable[[int], List[Dict[str, Any]]], case_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """Run ``build`` for every case, on the worker pool when there are several"""
+        if self._pool is None or len(case_ids) < 2:
+            return {case_id: build(case_id) for case_id in case_ids}
+        return dict(zip(case_ids, self._pool.map(build, case_ids)))
+    
+    def _fetch_cases(self, case_ids: List[int]) -> Dict[int, Case]:
+        """Cases with their courts, keyed by ID"""
+        cases = Case.objects.select_related('court').filter(id__in=case_ids).only(
+            'id', 'case_title', 'case_number', 'status', 'bench',
+            'institution_date', 'hearing_date', 'court__name'
+        )
+        return {case.id: case for case in cases}
+    
+    def _fetch_chunks(self, case_ids: List[int]) -> Dict[int, List[DocumentChunk]]:
+        """Embedded chunks of each case in chunk order"""
+        chunks_by_case = defaultdict(list)
+        chunks = DocumentChunk.objects.filter(
+            case_id__in=case_ids,
+            is_embedded=True
+        ).only(
+            'case_id', 'chunk_id', 'chunk_index', 'chunk_text', 'page_number', 'start_char', 'end_char'
+        ).order_by('case_id', 'chunk_index')
+        
+        for chunk in chunks:
+            chunks_by_case[chunk.case_id].append(chunk)
+        return chunks_by_case
+    
+    def score_chunks(self, query: str, chunks: List[DocumentChunk]) -> Dict[str, float]:
+        """
+        Query similarity of chunks from their stored index vectors, keyed by chunk ID
+        
+        Empty when no vector service is attached or it cannot reach its
+        index; callers then keep their heuristic ordering.
+        """
+        chunk_similarities = getattr(self.vector_service, 'chunk_similarities', None)
+        if not chunk_similarities or not chunks or not query:
+            return {}
+        return chunk_similarities(query, [chunk.chunk_id for chunk in chunks])
+    
+    def _fetch_pages(self, case_ids: List[int]) -> Dict[int, List[Tuple[int, str]]]:
+        """(page number, text) of each case's document pages in page order"""
+        return {
+            case_id: [(page_number, text) for _, page_number, text in pages]
+            for case_id, pages in case_page_texts(case_ids).items()
+        }
+    
+    def _generate_content_snippets(self, 
+                                   case_id: int, 
+                                   ai_snippets: List[Dict[str, Any]], 
+                                   chunks: List[DocumentChunk], 
+                                   query_info: Dict[str, Any], 
+                                   max_snippets: int) -> List[Dict[str, Any]]:
+        """AI snippets first (if any), then semantic chunk snippets"""
+        try:
+            snippets = list(ai_snippets)
+            if ai_snippets:
+                logger.info(f"Generated {len(ai_snippets)} AI snippets for case {case_id}")
+            
+            # Fallback to traditional methods if AI snippets insufficient
             if len(snippets) < max_snippets:
                 # Generate snippets from semantic chunks (prioritize actual content)
-                semantic_snippets = self._generate_semantic_snippets(case_id, query_info, max_snippets - len(snippets))
+                semantic_snippets = self._generate_semantic_snippets(chunks, query_info, max_snippets - len(snippets))
                 snippets.extend(semantic_snippets)
-                
-                # Generate snippets from lexical matches with expanded terms
-                if len(snippets) < max_snippets:
+            
+            return snippets
+            
+        except Exception as e:
+            logger.error(f"Error generating snippets for case {case_id}: {str(e)}")
+            return []
+    
+    def _complete_snippets(self, 
+                           case_id: int, 
+                           case: Optional[Case], 
+                           pages: List[Tuple[int, str]], 
+                           snippets: List[Dict[str, Any]], 
+                           query: str, 
+                           max_snippets: int,
+                           sentences: Optional[CaseSentences] = None,
+                           hits: List[SentenceHit] = (),
+                           hit_pages: Dict[Tuple[int, int], str] = None) -> List[Dict[str, Any]]:
+        """
+        Fill up with lexical and metadata snippets, then rank and limit
+        
+        Lexical snippets come from the case's sentence table hits when it
+        has one and from a scan of ``pages`` otherwise.
+        """
+        try:
+            snippets = list(snippets)
+            
+            # Generate snippets from lexical matches with expanded terms
+            if len(snippets) < max_snippets:
+                if sentences is not None:
+                    lexical_snippets = self._generate_indexed_snippets(
+                        sentences, hits, hit_pages or {}, max_snippets - len(snippets)
+                    )
+                else:
                     expanded_query = self._expand_query_terms(query)
-                    lexical_snippets = self._generate_lexical_snippets(case_id, expanded_query, max_snippets - len(snippets))
-                    snippets.extend(lexical_snippets)
-                
-                # Generate snippets from case metadata (fallback only)
-                if len(snippets) < max_snippets:
-                    metadata_snippets = self._generate_metadata_snippets(case_id, query, max_snippets - len(snippets))
-                    snippets.extend(metadata_snippets)
+                    lexical_snippets = self._generate_lexical_snippets(pages, expanded_query, max_snippets - len(snippets))
+                snippets.extend(lexical_snippets)
+            
+            # Generate snippets from case metadata (fallback only)
+            if len(snippets) < max_snippets:
+                metadata_snippets = self._generate_metadata_snippets(case, query, max_snippets - len(snippets))
+                snippets.extend(metadata_snippets)
             
             # Sort snippets by relevance and limit
             sorted_snippets = sorted(snippets, key=lambda x: x['relevance_score'], reverse=True)
@@ -102,48 +288,49 @@ class SnippetService:
             logger.error(f"Error generating snippets for case {case_id}: {str(e)}")
             return []
     
-    def _generate_ai_snippets(self, case_id: int, query: str, query_info: Dict[str, Any], max_snippets: int) -> List[Dict[str, Any]]:
-        """Generate AI-powered snippets for a case"""
+    def _generate_ai_snippets(self, 
+                              case_ids: List[int], 
+                              cases: Dict[int, Case], 
+                              chunks: Dict[int, List[DocumentChunk]], 
+                              query: str, 
+                              max_snippets: int, 
+                              deadline: Optional[SearchDeadline] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """Generate AI-powered snippets for the cases of a page, keyed by case ID"""
         try:
-            # Get case data
-            case = Case.objects.filter(id=case_id).first()
-            if not case:
-                return []
-            
-            # Prepare case data
-            case_data = {
-                'case_title': case.case_title or 'Unknown Case',
-                'court': case.court.name if case.court else 'Unknown Court',
-                'status': case.status or 'Unknown Status',
-                'case_number': case.case_number or 'N/A',
-                'institution_date': case.institution_date,
-                'hearing_date': case.hearing_date
-            }
-            
-            # Get document chunks for context
-            document_chunks = []
-            chunks = DocumentChunk.objects.filter(
-                case_id=case_id,
-                is_embedded=True
-            ).order_by('chunk_index')[:5]  # Limit to first 5 chunks
+            jobs = []
+            for case_id in case_ids:
+                case = cases.get(case_id)
+                if not case:
+                    continue
+                
+                # Prepare case data
+                case_data = {
+                    'case_title': case.case_title or 'Unknown Case',
+                    'court': case.court.name if case.court else 'Unknown Court',
+                    'status': case.status or 'Unknown Status',
+                    'case_number': case.case_number or 'N/A',
+                    'institution_date': case.institution_date,
+                    'hearing_date': case.hearing_date
+                }
+                
+                # Document chunks for context, limited to the first 5 chunks
+                document_chunks = []
+                for chunk in chunks.get(case_id, [])[:5]:
+                    if chunk.chunk_text and len(chunk.chunk_text.strip()) > 50:
+                        document_chunks.append(chunk.chunk_text)
+                
+                jobs.append(AISnippetJob(case_id, case_data, query, document_chunks, max_snippets))
             
-            for chunk in chunks:
-                if chunk.chunk_text and len(chunk.chunk_text.strip()) > 50:
-                    document_chunks.append(chunk.chunk_text)
-            
-            # Generate AI snippets
-            ai_snippets = self.ai_snippet_service.generate_ai_snippet(
-                case_data=case_data,
-                query=query,
-                document_chunks=document_chunks,
-                max_snippets=max_snippets
-            )
+            # Wait no longer than the request has left
+            timeout_ms = None
+            if deadline is not None:
+                timeout_ms = min(self.ai_snippet_jobs.default_config['timeout_ms'], deadline.remaining_ms())
             
-            return ai_snippets
+            return self.ai_snippet_jobs.generate_many(jobs, timeout_ms)
             
         except Exception as e:
-            logger.error(f"Error generating AI snippets for case {case_id}: {str(e)}")
-            return []
+            logger.error(f"Error generating AI snippets for cases {case_ids}: {str(e)}")
+            return {}
     
     def _expand_query_terms(self, query: str) -> str:
         """Expand query terms to include related legal terms"""
@@ -173,25 +360,16 @@ class SnippetService:
         # Remove duplicates and return
         return ' '.join(list(set(expanded_terms)))
     
-    def _generate_lexical_snippets(self, case_id: int, query: str, max_snippets: int) -> List[Dict[str, Any]]:
-        """Generate snippets from lexical text matches"""
+    def _generate_lexical_snippets(self, pages: List[Tuple[int, str]], query: str, max_snippets: int) -> List[Dict[str, Any]]:
+        """Generate snippets from lexical text matches in (page number, text) pages"""
         try:
             snippets = []
             query_terms = self._extract_query_terms(query)
             
-            # Get document text for this case through CaseDocument relationship
-            from apps.cases.models import CaseDocument
-            case_documents = CaseDocument.objects.filter(case_id=case_id).values_list('document_id', flat=True)
-            document_texts = DocumentText.objects.filter(
-                document_id__in=case_documents,
-                has_text=True
-            ).order_by('page_number')
-            
-            for doc_text in document_texts:
+            for page_number, text_content in pages:
                 if len(snippets) >= max_snippets:
                     break
                 
-                text_content = doc_text.clean_text or doc_text.raw_text
                 if not text_content:
                     continue
                 
@@ -209,7 +387,7 @@ class SnippetService:
                             break
                         
                         snippet = self._create_snippet_from_match(
-                            text_content, match, doc_text.page_number, term, 'lexical'
+                            text_content, match, page_number, term, 'lexical'
                         )
                         
                         if snippet:
@@ -221,16 +399,80 @@ class SnippetService:
             logger.error(f"Error generating lexical snippets: {str(e)}")
             return []
     
-    def _generate_semantic_snippets(self, case_id: int, query_info: Dict[str, Any], max_snippets: int) -> List[Dict[str, Any]]:
-        """Generate snippets from semantic chunks"""
+    def _generate_indexed_snippets(self, 
+                                   sentences: CaseSentences, 
+                                   hits: List[SentenceHit], 
+                                   hit_pages: Dict[Tuple[int, int], str], 
+                                   max_snippets: int) -> List[Dict[str, Any]]:
+        """Generate lexical snippets from sentence windows around sentence index hits"""
         try:
             snippets = []
+            min_length = self.default_config['min_snippet_length']
+            max_length = self.default_config['max_snippet_length']
+            covered = set()
+            
+            for hit in hits:
+                if len(snippets) >= max_snippets:
+                    break
+                
+                # Sentences already shown in an earlier window
+                if hit.sentence_id in covered:
+                    continue
+                
+                document_id, page_number, sentence_start, sentence_end = sentences.sentences[hit.sentence_id]
+                text = hit_pages.get((document_id, page_number))
+                if not text:
+                    continue
+                
+                # Locate the token inside its sentence; skip stale entries
+                match = re.search(rf'\b{re.escape(hit.token)}\b', text[sentence_start:sentence_end], re.IGNORECASE)
+                if not match:
+                    continue
+                start_pos = sentence_start + match.start()
+                end_pos = sentence_start + match.end()
+                
+                first, last = sentences.window(hit.sentence_id, min_length, max_length)
+                window_start = sentences.sentences[first][2]
+                window_end = sentences.sentences[last][3]
+                if window_end - window_start > max_length:
+                    # A single over-long sentence: center on the match
+                    window_start = max(window_start, min(start_pos - max_length // 2, window_end - max_length))
+                    window_end = window_start + max_length
+                
+                snippet_text = text[window_start:window_end]
+                if len(snippet_text) < min_length:
+                    continue
+                covered.update(range(first, last + 1))
+                
+                relative_start = start_pos - window_start
+                relative_end = end_pos - window_start
+                
+                snippets.append({
+                    'text': self._highlight_term(snippet_text, hit.term, relative_start, relative_end),
+                    'original_text': snippet_text,
+                    'snippet_type': 'lexical',
+                    'matched_term': hit.term,
+                    'page_number': page_number if self.default_config['include_page_numbers'] else None,
+                    'char_spans': {
+                        'start_char': relative_start,
+                        'end_char': relative_end,
+                        'absolute_start': start_pos,
+                        'absolute_end': end_pos
+                    },
+                    'relevance_score': self._calculate_snippet_relevance('lexical', hit.term, len(snippet_text)),
+                    'length': len(snippet_text)
+                })
+            
+            return snippets
             
-            # Get document chunks for this case
-            chunks = DocumentChunk.objects.filter(
-                case_id=case_id,
-                is_embedded=True
-            ).order_by('chunk_index')
+        except Exception as e:
+            logger.error(f"Error generating indexed lexical snippets: {str(e)}")
+            return []
+    
+    def _generate_semantic_snippets(self, chunks: List[DocumentChunk], query_info: Dict[str, Any], max_snippets: int) -> List[Dict[str, Any]]:
+        """Generate snippets from a case's embedded chunks (in the given order)"""
+        try:
+            snippets = []
             
             # Extract query terms for matching
             original_query = query_info.get('original_query', '')
@@ -310,12 +552,11 @@ class SnippetService:
         # If more than 3 metadata indicators, likely metadata
         return metadata_count > 3
     
-    def _generate_metadata_snippets(self, case_id: int, query: str, max_snippets: int) -> List[Dict[str, Any]]:
+    def _generate_metadata_snippets(self, case: Optional[Case], query: str, max_snippets: int) -> List[Dict[str, Any]]:
         """Generate snippets from case metadata"""
         try:
             snippets = []
             
-            case = Case.objects.filter(id=case_id).first()
             if not case:
                 return snippets
             
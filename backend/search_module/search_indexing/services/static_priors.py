@@ -0,0 +1,338 @@
+"""
+Static Ranking Priors
+Query-independent per-case scores computed at index time and looked up at query time
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+from .index_version import get_index_version
+
+logger = logging.getLogger(__name__)
+
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+
+PRIOR_FIELDS = ('authority', 'precedential_value', 'completeness', 'court_boost')
+
+
+def _text(fields: Dict[str, Any], key: str) -> str:
+    return (fields.get(key) or '').lower()
+
+
+def authority_prior(fields: Dict[str, Any]) -> float:
+    """Authority from court level, case type, bench composition and status"""
+    score = 0.0
+
+    # Court hierarchy scoring
+    court = _text(fields, 'court')
+    if 'supreme court' in court:
+        score += 0.5
+    elif 'high court' in court:
+        score += 0.4
+    elif 'district court' in court or 'sessions court' in court:
+        score += 0.3
+    else:
+        score += 0.2
+
+    # Case type authority
+    case_number = _text(fields, 'case_number')
+    if any(term in case_number for term in ['appeal', 'revision']):
+        score += 0.2  # Appellate decisions have higher authority
+    elif 'writ' in case_number:
+        score += 0.15  # Constitutional cases have good authority
+
+    # Bench composition: multiple judges indicate higher authority
+    bench = _text(fields, 'bench')
+    if bench:
+        judge_indicators = ['cj', 'chief justice', 'j.', 'justice']
+        judge_count = sum(1 for indicator in judge_indicators if indicator in bench)
+        score += min(judge_count * 0.05, 0.15)
+
+    # Decided cases have precedential authority
+    if 'decided' in _text(fields, 'status'):
+        score += 0.15
+
+    return min(score, 1.0)
+
+
+def precedential_prior(fields: Dict[str, Any]) -> float:
+    """Precedential value from court level, case type, status and bench size"""
+    score = 0.0
+
+    court = _text(fields, 'court')
+    if 'supreme court' in court:
+        score += 0.4  # Highest precedential value
+    elif 'high court' in court:
+        score += 0.3
+    elif 'district court' in court:
+        score += 0.2
+
+    case_number = _text(fields, 'case_number')
+    if 'appeal' in case_number:
+        score += 0.2  # Appeals create precedents
+    elif 'revision' in case_number:
+        score += 0.15
+    elif 'writ' in case_number:
+        score += 0.25  # Constitutional precedents
+
+    # Only decided cases create precedents
+    if 'decided' in _text(fields, 'status'):
+        score += 0.15
+
+    # Larger benches create stronger precedents
+    bench = _text(fields, 'bench')
+    if 'full bench' in bench or 'larger bench' in bench:
+        score += 0.1
+
+    return min(score, 1.0)
+
+
+def completeness_prior(fields: Dict[str, Any]) -> float:
+    """
+    Completeness of the case record itself. Snippets and result data are
+    per-request and are added on top by ResultQualityEngine.
+    """
+    score = 0.0
+
+    for field in ('case_title', 'case_number', 'court', 'status'):
+        if fields.get(field):
+            score += 0.15
+
+    for field in ('bench', 'institution_date', 'hearing_date'):
+        if fields.get(field):
+            score += 0.1
+
+    # Meaningful title length
+    if len(fields.get('case_title') or '') > 20:
+        score += 0.05
+
+    return score
+
+
+def court_boost_prior(fields: Dict[str, Any]) -> float:
+    """Precision optimizer multiplier from the court hierarchy"""
+    court = _text(fields, 'court')
+    if 'supreme' in court:
+        return 1.5
+    elif 'high' in court:
+        return 1.3
+    elif 'district' in court:
+        return 1.1
+    return 1.0
+
+
+def institution_year(fields: Dict[str, Any]) -> int:
+    """Institution year parsed by the cleaner, else found in the date string; 0 when there is none"""
+    if fields.get('institution_year'):
+        return int(fields['institution_year'])
+    year_match = YEAR_PATTERN.search(fields.get('institution_date') or '')
+    return int(year_match.group()) if year_match else 0
+
+
+def recency_prior(year: int, recent_hearing: bool = False, current_year: Optional[int] = None) -> float:
+    """Recency score from the institution year (0 = unknown)"""
+    score = 0.5  # Default score
+    if year:
+        age = (current_year or datetime.now().year) - year
+        if age <= 1:
+            score = 1.0
+        elif age <= 3:
+            score = 0.8
+        elif age <= 5:
+            score = 0.6
+        elif age <= 10:
+            score = 0.4
+        else:
+            score = 0.2
+
+    if recent_hearing:
+        score += 0.1
+
+    return min(score, 1.0)
+
+
+def compute_case_priors(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """All static priors of one case (or result dict with the same keys)"""
+    return {
+        'authority': authority_prior(fields),
+        'precedential_value': precedential_prior(fields),
+        'completeness': completeness_prior(fields),
+        'court_boost': court_boost_prior(fields),
+        'institution_year': institution_year(fields),
+        'recent_hearing': 'recent' in _text(fields, 'hearing_date'),
+    }
+
+
+class StaticPriorsIndex:
+    """
+    Compact per-case prior arrays stored next to the search indexes.
+
+    ``build`` runs with the index builds and writes one ``.npz`` file of
+    case ids and float32 priors; serving processes load it and reload it
+    when the index version changes. Lookups are a binary search over the
+    sorted case ids, so the quality engine and precision optimizer only
+    compute their query-dependent signals per request.
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+        # Default configuration
+        self.default_config = {
+            'path': os.path.join(settings.BASE_DIR, 'data', 'indexes', 'case_priors.npz'),
+            'chunk_size': getattr(settings, 'SEARCH_FEATURE_STORE_CHUNK_SIZE', 2000),
+        }
+
+        # Update with custom config
+        if config:
+            self.default_config.update(config)
+
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def build(self) -> Dict[str, Any]:
+        """Compute the priors of every case and write them to disk"""
+        from apps.cases.models import Case
+
+        start_time = time.time()
+        stats = {'built': False, 'cases': 0, 'path': self.default_config['path'], 'errors': []}
+        try:
+            rows = (
+                Case.objects.order_by('id')
+                .values('id', 'case_number', 'case_title', 'status', 'bench',
+                        'institution_date', 'institution_year', 'hearing_date', 'court__name')
+                .iterator(chunk_size=self.default_config['chunk_size'])
+            )
+            arrays = self.compute_arrays(
+                dict(row, court=row['court__name']) for row in rows
+            )
+            self._save(arrays)
+            with self._lock:
+                self._arrays = arrays
+            stats['built'] = True
+            stats['cases'] = int(len(arrays['case_ids']))
+        except Exception as e:
+            error_msg = f"Error building static priors: {str(e)}"
+            logger.error(error_msg)
+            stats['errors'].append(error_msg)
+
+        stats['processing_time'] = time.time() - start_time
+        return stats
+
+    @staticmethod
+    def compute_arrays(cases: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Prior arrays for case field dicts ordered by id"""
+        case_ids: List[int] = []
+        columns: Dict[str, List[Any]] = {field: [] for field in PRIOR_FIELDS + ('institution_year', 'recent_hearing')}
+        for case in cases:
+            case_ids.append(case['id'])
+            for field, value in compute_case_priors(case).items():
+                columns[field].append(value)
+
+        arrays = {'case_ids': np.asarray(case_ids, dtype=np.int64)}
+        for field in PRIOR_FIELDS:
+            arrays[field] = np.asarray(columns[field], dtype=np.float32)
+        arrays['institution_year'] = np.asarray(columns['institution_year'], dtype=np.int16)
+        arrays['recent_hearing'] = np.asarray(columns['recent_hearing'], dtype=bool)
+        return arrays
+
+    def ensure_loaded(self) -> bool:
+        """Load (or reload after an index build) the priors file if present"""
+        version = get_index_version()
+        if self._version == version:
+            return self._arrays is not None
+
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._arrays = self._read()
+        return self._arrays is not None
+
+    def get(self, case_id: Any) -> Optional[Dict[str, Any]]:
+        """Priors of a single case, or None when it has none"""
+        return self.get_many([case_id])[0]
+
+    def get_many(self, case_ids: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Priors for each case id (None where unknown) with one vectorized lookup"""
+        if not case_ids or not self.ensure_loaded():
+            return [None] * len(case_ids)
+
+        arrays = self._arrays
+        known = arrays['case_ids']
+        ids = np.fromiter((_as_int(case_id) for case_id in case_ids), dtype=np.int64)
+        if not len(known):
+            return [None] * len(case_ids)
+        positions = np.minimum(np.searchsorted(known, ids), len(known) - 1)
+        found = known[positions] == ids
+
+        priors: List[Optional[Dict[str, Any]]] = []
+        for position, hit in zip(positions.tolist(), found.tolist()):
+            if not hit:
+                priors.append(None)
+                continue
+            entry = {field: round(float(arrays[field][position]), 6) for field in PRIOR_FIELDS}
+            entry['institution_year'] = int(arrays['institution_year'][position])
+            entry['recent_hearing'] = bool(arrays['recent_hearing'][position])
+            priors.append(entry)
+        return priors
+
+    def get_stats(self) -> Dict[str, Any]:
+        arrays = self._arrays
+        return {
+            'loaded': arrays is not None,
+            'version': self._version,
+            'cases': int(len(arrays['case_ids'])) if arrays else 0,
+            'array_bytes': int(sum(array.nbytes for array in arrays.values())) if arrays else 0,
+        }
+
+    def _save(self, arrays: Dict[str, np.ndarray]) -> None:
+        path = self.default_config['path']
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def _read(self) -> Optional[Dict[str, np.ndarray]]:
+        path = self.default_config['path']
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            logger.info(f"Loaded static priors for {len(arrays['case_ids'])} cases from {path}")
+            return arrays
+        except Exception as e:
+            logger.error(f"Error loading static priors: {str(e)}")
+            return None
+
+
+def _as_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+_static_priors: Optional[StaticPriorsIndex] = None
+_static_priors_lock = threading.Lock()
+
+
+def get_static_priors() -> StaticPriorsIndex:
+    """Return the process-wide static priors index"""
+    global _static_priors
+
+    if _static_priors is None:
+        with _static_priors_lock:
+            if _static_priors is None:
+                _static_priors = StaticPriorsIndex()
+    return _static_priors
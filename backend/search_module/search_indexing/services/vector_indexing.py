@@ -9,7 +9,9 @@ import numpy as np
 import faiss
 import pickle
 import logging
-from typing import List, Dict, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime
 import time
 
@@ -41,9 +43,15 @@ class VectorIndexingService:
             'chunk_size': 512,
             'chunk_overlap': 50,
             'embedding_model': 'all-mpnet-base-v2',
-            'batch_size': 32
+            'batch_size': 32,
+            'query_embedding_cache_size': getattr(settings, 'SEARCH_QUERY_EMBEDDING_CACHE_SIZE', 1024),
+            'reconstruct_gap': 32,  # Positions apart that still share one range read
         }
         
+        # Normalized query embeddings, shared by search and snippet scoring
+        self._query_embeddings = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        
     def initialize_model(self, model_name: str = "all-mpnet-base-v2"):
         """Initialize the sentence transformer model"""
         try:
@@ -571,6 +579,7 @@ class VectorIndexingService:
             except FileNotFoundError:
                 logger.error("Mapping file not found, falling back to old method")
                 self.index_to_chunk_mapping = []
+            self.chunk_mappings = {chunk_id: position for position, chunk_id in enumerate(self.index_to_chunk_mapping)}
             
             # Update timestamp
             self.last_index_update = vector_index.updated_at
@@ -585,64 +594,187 @@ class VectorIndexingService:
 
     def search(self, query: str, top_k: int = 10) -> List[Dict[str, any]]:
         """Search for similar documents"""
+        return self.search_batch([query], top_k=top_k)[0]
+    
+    def search_batch(self, queries: List[str], top_k: int = 10) -> List[List[Dict[str, any]]]:
+        """
+        Search for similar documents for several queries at once
+        
+        All query embeddings are computed in one forward pass and looked up
+        with a single FAISS call; chunks and cases for every hit are then
+        fetched with one query each instead of one query per result.
+        
+        Returns:
+            One result list per query, in the order of ``queries``
+        """
         try:
+            if not queries:
+                return []
+            
             # Initialize model if needed
             if not self.model:
                 if not self.initialize_model():
-                    return []
+                    return [[] for _ in queries]
             
             # Load cached index
             if not self._load_cached_index():
-                return []
+                return [[] for _ in queries]
             
-            # Create query embedding
-            query_embedding = self.model.encode([query])
-            # Normalize query embedding for cosine similarity
-            faiss.normalize_L2(query_embedding)
+            # Normalized query embeddings, uncached ones created in one pass
+            query_embeddings = self.encode_queries(queries)
             
             # Search using cached index
-            scores, indices = self.faiss_index.search(query_embedding, top_k)
+            scores, indices = self.faiss_index.search(query_embeddings, top_k)
             
             # FIXED: Get results with similarity threshold to prevent irrelevant results
-            results = []
             min_similarity_threshold = 0.3  # Threshold for normalized cosine similarity
+            hits = [
+                [(i, float(score), int(idx)) for i, (score, idx) in enumerate(zip(query_scores, query_indices))
+                 if idx != -1 and float(score) >= min_similarity_threshold]  # Valid result with meaningful similarity
+                for query_scores, query_indices in zip(scores, indices)
+            ]
+            
+            chunks_by_position = self._get_chunks_for_positions({idx for query_hits in hits for _, _, idx in query_hits})
+            cases = Case.objects.select_related('court').in_bulk(
+                {chunk.case_id for chunk in chunks_by_position.values()}
+            )
             
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx != -1 and float(score) >= min_similarity_threshold:  # Valid result with meaningful similarity
-                    try:
-                        # Use mapping to get chunk ID
-                        if self.index_to_chunk_mapping and idx < len(self.index_to_chunk_mapping):
-                            chunk_id = self.index_to_chunk_mapping[int(idx)]
-                            chunk = DocumentChunk.objects.get(chunk_id=chunk_id)
-                        else:
-                            # Fallback to old method
-                            chunk_idx = int(idx)
-                            chunk = DocumentChunk.objects.filter(is_embedded=True).order_by('id')[chunk_idx]
-                        
-                        # Get case information
-                        case = Case.objects.get(id=chunk.case_id)
-                        
-                        results.append({
-                            'rank': i + 1,
-                            'similarity': float(score),
-                            'case_id': chunk.case_id,
-                            'case_number': case.case_number,
-                            'case_title': case.case_title,
-                            'court': case.court.name if case.court else '',
-                            'status': case.status,
-                            'parties': '',  # Will be populated from related data if needed
-                            'institution_date': case.institution_date,
-                            'hearing_date': case.hearing_date,
-                            'chunk_text': chunk.chunk_text[:200] + "..." if len(chunk.chunk_text) > 200 else chunk.chunk_text,
-                            'chunk_index': chunk.chunk_index,
-                            'page_number': chunk.page_number
-                        })
-                    except (IndexError, DocumentChunk.DoesNotExist, UnifiedCaseView.DoesNotExist) as e:
-                        logger.warning(f"Chunk at index {idx} not found: {str(e)}")
+            batch_results = []
+            for query_hits in hits:
+                results = []
+                for i, score, idx in query_hits:
+                    chunk = chunks_by_position.get(idx)
+                    case = cases.get(chunk.case_id) if chunk else None
+                    if chunk is None or case is None:
+                        logger.warning(f"Chunk at index {idx} not found")
                         continue
-            
-            return results
+                    
+                    results.append({
+                        'rank': i + 1,
+                        'similarity': score,
+                        'case_id': chunk.case_id,
+                        'case_number': case.case_number,
+                        'case_title': case.case_title,
+                        'court': case.court.name if case.court else '',
+                        'status': case.status,
+                        'parties': '',  # Will be populated from related data if needed
+                        'institution_date': case.institution_date,
+                        'hearing_date': case.hearing_date,
+                        'chunk_text': chunk.chunk_text[:200] + "..." if len(chunk.chunk_text) > 200 else chunk.chunk_text,
+                        'chunk_index': chunk.chunk_index,
+                        'page_number': chunk.page_number
+                    })
+                batch_results.append(results)
+            
+            return batch_results
             
         except Exception as e:
             logger.error(f"Error in vector search: {str(e)}")
-            return []
+            return [[] for _ in queries]
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        L2-normalized embeddings of ``queries``, one row per query
+        
+        Embeddings are kept in a small LRU cache keyed by query text, so the
+        snippet and case context scoring of a search reuse the embedding
+        computed for its retrieval. Queries not in the cache are encoded in
+        one pass. The model must be initialized.
+        """
+        with self._query_embeddings_lock:
+            cached = {query: self._query_embeddings.get(query) for query in queries}
+            for query, embedding in cached.items():
+                if embedding is not None:
+                    self._query_embeddings.move_to_end(query)
+        
+        missing = [query for query, embedding in cached.items() if embedding is None]
+        if missing:
+            embeddings = np.asarray(
+                self.model.encode(missing, batch_size=self.config['batch_size'], show_progress_bar=False),
+                dtype=np.float32
+            )
+            # Normalize query embeddings for cosine similarity
+            faiss.normalize_L2(embeddings)
+            with self._query_embeddings_lock:
+                for query, embedding in zip(missing, embeddings):
+                    cached[query] = embedding
+                    self._query_embeddings[query] = embedding
+                while len(self._query_embeddings) > self.config['query_embedding_cache_size']:
+                    self._query_embeddings.popitem(last=False)
+        
+        return np.vstack([cached[query] for query in queries])
+    
+    def chunk_similarities(self, query: str, chunk_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Cosine similarity between ``query`` and the stored vectors of chunks
+        
+        The vectors are read back from the loaded FAISS index (a case's
+        chunks sit in one contiguous position range) and scored with a
+        single matrix-vector product, so no chunk text is re-encoded.
+        The index is loaded on first use, so scoring works before any
+        search has run. Chunks missing from the index are left out.
+        """
+        try:
+            if not query or not self._load_cached_index() or not self.chunk_mappings:
+                return {}
+            
+            positions = {
+                chunk_id: self.chunk_mappings[chunk_id]
+                for chunk_id in chunk_ids if chunk_id in self.chunk_mappings
+            }
+            if not positions:
+                return {}
+            
+            if not self.model and not self.initialize_model():
+                return {}
+            query_embedding = self.encode_queries([query])[0]
+            
+            vectors = self._reconstruct(list(positions.values()))
+            scores = vectors @ query_embedding
+            return {chunk_id: float(score) for chunk_id, score in zip(positions, scores)}
+            
+        except Exception as e:
+            logger.error(f"Error scoring chunk vectors: {str(e)}")
+            return {}
+    
+    def _reconstruct(self, positions: List[int]) -> np.ndarray:
+        """Stored vectors at ``positions``, read as a few contiguous ranges"""
+        order = sorted(set(positions))
+        rows = {}
+        run_start = 0
+        for i in range(1, len(order) + 1):
+            if i < len(order) and order[i] - order[i - 1] <= self.config['reconstruct_gap']:
+                continue
+            run = order[run_start:i]
+            block = self.faiss_index.reconstruct_n(run[0], run[-1] - run[0] + 1)
+            for position in run:
+                rows[position] = block[position - run[0]]
+            run_start = i
+        return np.vstack([rows[position] for position in positions])
+    
+    def _get_chunks_for_positions(self, positions) -> Dict[int, DocumentChunk]:
+        """Resolve FAISS index positions to their chunks"""
+        chunks_by_position = {}
+        
+        # Use mapping to get chunk IDs, then fetch every mapped chunk in one query
+        chunk_ids = {
+            position: self.index_to_chunk_mapping[position]
+            for position in positions
+            if self.index_to_chunk_mapping and position < len(self.index_to_chunk_mapping)
+        }
+        if chunk_ids:
+            chunks = {
+                chunk.chunk_id: chunk
+                for chunk in DocumentChunk.objects.filter(chunk_id__in=set(chunk_ids.values()))
+            }
+            for position, chunk_id in chunk_ids.items():
+                if chunk_id in chunks:
+                    chunks_by_position[position] = chunks[chunk_id]
+        
+        # Fallback to old method
+        for position in set(positions) - set(chunk_ids):
+            try:
+                chunks_by_position[position] = DocumentChunk.objects.filter(is_embedded=True).order_by('id')[position]
+            except IndexError as e:
+                logger.warning(f"Chunk at index {position} not found: {str(e)}")
+        return chunks_by_position
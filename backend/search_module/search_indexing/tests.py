@@ -1,3 +1,1305 @@
-from django.test import TestCase
+"""
+Tests for search indexing services
+"""
 
-# Create your tests here.
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+import numpy as np
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from unittest.mock import MagicMock, patch
+
+from search_indexing.services.ai_snippet_jobs import AISnippetJob, AISnippetJobService, StubSnippetProvider
+from search_indexing.services.async_executor import BoundedExecutor, ExecutorSaturated
+from search_indexing.services.case_feature_store import CaseFeatureStore
+from search_indexing.services.completion_index import CompletionIndex, build_table, completion_keys
+from search_indexing.services.facet_engine import FacetEngine
+from search_indexing.services.facet_postings import FacetPostings, FacetPostingsStore, encode_postings
+from search_indexing.services.keyword_indexing import KeywordIndexingService
+from search_indexing.services.fuzzy_index import FuzzyNameIndex, bounded_edit_distance, name_tokens
+from search_indexing.services.advanced_query_intelligence import AdvancedQueryIntelligence
+from search_indexing.services import lexical_features as lexical
+from search_indexing.services.lexical_features import LexicalFeatureExtractor
+from search_indexing.services.normalized_facet_service import NormalizedFacetService
+from search_indexing.services.query_normalization import QueryNormalizationService
+from search_indexing.services.pair_scoring import MicroBatchScheduler, PairScoreCache
+from search_indexing.services.query_plan import QueryPlanner
+from search_indexing.services.rerank_cascade import RerankCascade, rerank_head
+from search_indexing.services.result_diversity import case_similarity_matrix, mmr_select
+from search_indexing.services.result_quality_engine import ResultQualityEngine
+from search_indexing.services.search_cache import SearchResultCache
+from search_indexing.services.sentence_index import CaseSentences, SentenceIndex, split_sentences
+from search_indexing.services.search_cursor import SearchCursorStore
+from search_indexing.services.service_container import SearchServiceContainer, get_search_services, reset_search_services
+from search_indexing.services.snippet_service import SnippetService
+from search_indexing.services.search_tracing import SearchTrace, StageLatencyMetrics
+from search_indexing.services.search_deadline import SearchDeadline
+from search_indexing.services.static_priors import StaticPriorsIndex, compute_case_priors
+from search_indexing.services.score_fusion import (
+    FusedScores, normalize_scores, reciprocal_rank_fusion, ranks_from_scores, top_k_indices
+)
+from search_indexing.models import FacetMapping, FacetTerm
+from apps.cases.models import Case, Court, Term, TermOccurrence
+
+
+@patch('search_indexing.services.search_cache.get_index_version', return_value=3)
+class SearchResultCacheTest(SimpleTestCase):
+    """Test cases for the versioned search result cache"""
+
+    def setUp(self):
+        self.cache = SearchResultCache({'local_max_entries': 2, 'shared_cache_alias': 'default'})
+        self.params = {'mode': 'hybrid', 'filters': {'court': 'LHC'}, 'limit': 10, 'offset': 0}
+
+    def test_key_is_canonical(self, mock_version):
+        """Whitespace, case and empty filters do not change the key"""
+        key_a = self.cache.build_key('Bail  Petition', self.params)
+        key_b = self.cache.build_key('bail petition', dict(self.params, filters={'court': 'lhc', 'year': None}))
+        self.assertEqual(key_a, key_b)
+        self.assertIn(':v3:', key_a)
+
+    def test_key_changes_with_index_version(self, mock_version):
+        """Bumping the index version moves to a new key namespace"""
+        key_a = self.cache.build_key('bail', self.params)
+        mock_version.return_value = 4
+        self.assertNotEqual(key_a, self.cache.build_key('bail', self.params))
+
+    def test_hit_rate_metrics(self, mock_version):
+        """Hits and misses are counted across both tiers"""
+        key = self.cache.build_key('bail', self.params)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, {'results': [1]})
+        self.assertEqual(self.cache.get(key), {'results': [1]})
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_local_tier_is_bounded(self, mock_version):
+        """The in-process tier evicts least recently used entries"""
+        for i in range(3):
+            self.cache.set(f'key-{i}', {'i': i})
+        self.assertEqual(self.cache.get_stats()['local_entries'], 2)
+
+
+class SearchTracingTest(SimpleTestCase):
+    """Test cases for per-stage latency tracing"""
+
+    def test_stage_timings_accumulate(self):
+        trace = SearchTrace()
+        trace.record('ranking', 2.0)
+        trace.record('ranking', 3.0)
+        with trace.stage('facets'):
+            pass
+        timings = trace.to_dict()
+        self.assertEqual(timings['ranking'], 5.0)
+        self.assertIn('facets', timings)
+
+    def test_percentile_summary(self):
+        metrics = StageLatencyMetrics(max_samples=100)
+        for value in range(1, 101):
+            trace = SearchTrace()
+            trace.record('ranking', float(value))
+            metrics.record_trace(trace, total_ms=float(value))
+
+        summary = metrics.summary()
+        self.assertEqual(summary['ranking']['count'], 100)
+        self.assertAlmostEqual(summary['ranking']['p50_ms'], 50.5, places=1)
+        self.assertGreaterEqual(summary['ranking']['p99_ms'], summary['ranking']['p95_ms'])
+        self.assertIn('total', summary)
+
+
+class SearchDeadlineTest(SimpleTestCase):
+    """Test cases for latency budget tracking"""
+
+    def test_stage_fits_within_budget(self):
+        deadline = SearchDeadline(budget_ms=10000)
+        self.assertTrue(deadline.fits('facets', estimate_ms=5.0))
+        self.assertFalse(deadline.is_degraded)
+
+    def test_exhausted_budget_skips_stage(self):
+        deadline = SearchDeadline(budget_ms=1)
+        self.assertFalse(deadline.fits('learned_reranker', estimate_ms=500.0))
+        deadline.record_capped('snippets', 2, 10)
+
+        stages = deadline.to_dict()['degraded_stages']
+        self.assertEqual([s['stage'] for s in stages], ['learned_reranker', 'snippets'])
+        self.assertEqual(stages[1]['action'], 'capped')
+
+
+class ScoreFusionTest(SimpleTestCase):
+    """Test cases for vectorized score fusion"""
+
+    def test_scores_are_aligned_by_case_id(self):
+        fused = FusedScores(
+            [{'case_id': 7, 'similarity': 0.4}, {'case_id': 3, 'similarity': 0.9}, {'case_id': 7, 'similarity': 0.6}],
+            [{'case_id': 3, 'rank': 2.0}, {'case_id': 5, 'rank': 0}],
+        )
+        rows = {fused.case_id(i): i for i in range(len(fused))}
+        self.assertEqual(fused.vector_scores[rows[7]], 0.6)
+        self.assertEqual(fused.keyword_scores[rows[3]], 2.0)
+        self.assertTrue(fused.has_keyword[rows[5]])
+        self.assertFalse(fused.has_vector[rows[5]])
+        self.assertEqual(fused.source_results(rows[3]), [{'case_id': 3, 'similarity': 0.9}, {'case_id': 3, 'rank': 2.0}])
+        self.assertEqual([result['similarity'] for result in fused.source_results(rows[7])], [0.4, 0.6])
+        self.assertEqual(fused.source_results(rows[5]), [{'case_id': 5, 'rank': 0}])
+
+    def test_normalization(self):
+        np.testing.assert_allclose(normalize_scores(np.array([1.0, 3.0, 5.0]), 'min_max'), [0.0, 0.5, 1.0])
+        z = normalize_scores(np.array([1.0, 3.0, 5.0]), 'z_score')
+        self.assertAlmostEqual(z[1], 0.5)
+        self.assertEqual(normalize_scores(np.array([2.0, 4.0]), 'min_max', np.array([True, False]))[1], 0.0)
+
+    def test_reciprocal_rank_fusion(self):
+        ranks_a = ranks_from_scores(np.array([0.9, 0.1, 0.5]))
+        ranks_b = np.array([0, 1, 2])
+        fused = reciprocal_rank_fusion([ranks_a, ranks_b], k=60)
+        self.assertAlmostEqual(fused[0], 1 / 61)
+        self.assertAlmostEqual(fused[2], 1 / 62 + 1 / 62)
+
+    def test_top_k_keeps_stable_tie_order(self):
+        scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1])
+        self.assertEqual(list(top_k_indices(scores, 3)), [1, 0, 2])
+        self.assertEqual(list(top_k_indices(scores, 3, np.array([4, 3, 2, 1, 0]))), [1, 3, 2])
+
+
+class SearchCursorStoreTest(SimpleTestCase):
+    """Test cases for cursor pagination snapshots"""
+
+    def setUp(self):
+        self.store = SearchCursorStore({'key_prefix': 'test_search_cursor'})
+
+    def test_cursor_round_trip(self):
+        cursor = self.store.encode('abc', 20)
+        self.assertEqual(self.store.decode(cursor), ('abc', 20))
+        self.assertIsNone(self.store.decode('not-a-cursor'))
+        self.assertIsNone(self.store.decode(self.store.encode('abc', -5)))
+
+    def test_ranking_depth_covers_the_page_and_its_lookahead(self):
+        self.assertEqual(self.store.ranking_depth(0, 10), 20)
+        self.assertEqual(self.store.ranking_depth(30, 10), 50)
+        # Only a followed cursor ranks to the full depth
+        self.assertEqual(self.store.ranking_depth(20, 10, deepen=True), 100)
+        self.assertEqual(self.store.ranking_depth(200, 10, deepen=True), 220)
+        self.assertEqual(SearchCursorStore({'enabled': False}).ranking_depth(0, 10, deepen=True), 10)
+
+    def test_truncated_snapshots_cover_only_their_own_pages(self):
+        results = [{'case_id': case_id} for case_id in range(20)]
+        self.assertTrue(self.store.covers({'results': results, 'complete': False}, 0, 10))
+        self.assertFalse(self.store.covers({'results': results, 'complete': False}, 10, 10))
+        self.assertTrue(self.store.covers({'results': results, 'complete': True}, 10, 10))
+
+    def test_page_cursors(self):
+        cursors = self.store.page_cursors('abc', 0, 10, 25)
+        self.assertEqual(self.store.decode(cursors['next_cursor']), ('abc', 10))
+        self.assertIsNone(cursors['previous_cursor'])
+        cursors = self.store.page_cursors('abc', 20, 10, 25)
+        self.assertIsNone(cursors['next_cursor'])
+        self.assertEqual(self.store.decode(cursors['previous_cursor']), ('abc', 10))
+
+    @patch('search_indexing.services.search_cursor.get_index_version', return_value=3)
+    def test_snapshot_keeps_ids_and_scores_only(self, _version):
+        results = [
+            {'case_id': 5, 'final_score': 0.9, 'rank': 1, 'result_data': {'case_title': 'A'}, 'snippets': []},
+            {'case_id': 2, 'final_score': 0.4, 'rank': 2, 'result_data': {'case_title': 'B'}},
+        ]
+        params = {'query': 'bail', 'mode': 'hybrid', 'filters': {}}
+        token = self.store.create(results, params, {'normalized_query': 'bail', 'boost_signals': {}})
+
+        snapshot = self.store.get(token)
+        self.assertEqual(snapshot['results'], [
+            {'case_id': 5, 'final_score': 0.9, 'rank': 1},
+            {'case_id': 2, 'final_score': 0.4, 'rank': 2},
+        ])
+        self.assertEqual(snapshot['query_info'], {'normalized_query': 'bail'})
+        self.assertEqual(snapshot['index_version'], 3)
+        self.assertTrue(self.store.touch(token))
+        self.assertIsNone(self.store.get('missing'))
+
+
+class BoundedExecutorTest(SimpleTestCase):
+    """Test cases for the executor behind the async views"""
+
+    def setUp(self):
+        self.executor = BoundedExecutor(max_workers=1, max_pending=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_runs_off_the_event_loop(self):
+        async def run():
+            return await self.executor.run(threading.current_thread)
+
+        worker = asyncio.run(run())
+        self.assertIsNot(worker, threading.current_thread())
+        self.assertEqual(self.executor.get_stats()['completed'], 1)
+
+    def test_rejects_work_beyond_max_pending(self):
+        release = threading.Event()
+
+        async def run():
+            first = asyncio.ensure_future(self.executor.run(release.wait, 5))
+            await asyncio.sleep(0)
+            with self.assertRaises(ExecutorSaturated):
+                await self.executor.run(int)
+            release.set()
+            return await first
+
+        self.assertTrue(asyncio.run(run()))
+        stats = self.executor.get_stats()
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['pending'], 0)
+
+
+class QueryPlannerTest(SimpleTestCase):
+    """Test cases for the shared per-query plan"""
+
+    def setUp(self):
+        self.normalizer = QueryNormalizationService()
+        self.planner = QueryPlanner(self.normalizer, AdvancedQueryIntelligence(), config={'cache_size': 2})
+
+    def test_plan_is_built_once_per_query(self):
+        with patch.object(self.normalizer, 'normalize_query', wraps=self.normalizer.normalize_query) as normalize:
+            first = self.planner.plan('murder PPC 302 appeal')
+            second = self.planner.plan('murder PPC 302 appeal')
+
+        self.assertIs(first, second)
+        self.assertEqual(normalize.call_count, 1)
+        self.assertEqual(self.planner.get_stats()['hits'], 1)
+        self.assertIn('murder', first.tokens)
+        self.assertEqual(first.citations[0]['canonical'], 'ppc:302')
+
+    def test_plan_is_read_only_and_query_info_is_a_copy(self):
+        plan = self.planner.plan('bail petition')
+        with self.assertRaises(Exception):
+            plan.query = 'other'
+        with self.assertRaises(TypeError):
+            plan.normalization['normalized_query'] = 'other'
+
+        query_info = plan.query_info()
+        query_info['citations'].append({'canonical': 'x'})
+        self.assertEqual(plan.query_info()['citations'], [])
+        self.assertNotIn('query_plan', query_info)
+        self.assertEqual(query_info['query_tokens'], list(plan.tokens))
+        self.assertNotEqual(query_info['intent'], 'unknown')
+        self.assertEqual(plan.query_info(include_intelligence=False)['intent'], 'unknown')
+
+    def test_cache_evicts_least_recently_used(self):
+        self.planner.plan('a query')
+        self.planner.plan('b query')
+        self.planner.plan('a query')
+        self.planner.plan('c query')
+        self.assertEqual([query for query, _ in self.planner._plans], ['a query', 'c query'])
+
+    def test_query_info_renders_in_the_debug_response(self):
+        query_info = self.planner.plan('murder PPC 302 appeal').query_info()
+        rendered = JSONRenderer().render({'debug_signals': {'query_normalization': query_info}})
+        self.assertIn(b'"query_tokens"', rendered)
+
+    def test_hybrid_stage_outputs_are_precomputed(self):
+        hybrid_service = MagicMock()
+        hybrid_service.query_expander.enhance_query_with_legal_knowledge.return_value = {
+            'query_analysis': {'type': 'general', 'expanded_terms': ['homicide']}
+        }
+        hybrid_service.precision_optimizer.enhance_query_understanding.return_value = {'key_terms': ['murder']}
+        hybrid_service.advanced_reranker.extract_query_terms.return_value = ['murder', 'homicide']
+        planner = QueryPlanner(self.normalizer, hybrid_service=hybrid_service)
+
+        plan = planner.plan('murder')
+        self.assertEqual(plan.legal_analysis['expanded_terms'], ('homicide',))
+        self.assertEqual(plan.precision_info['key_terms'], ('murder',))
+        self.assertEqual(plan.rerank_terms, ('murder', 'homicide'))
+        hybrid_service.advanced_reranker.extract_query_terms.assert_called_once_with(
+            'murder', {'type': 'general', 'expanded_terms': ['homicide']}
+        )
+
+    def test_hybrid_stages_run_for_hybrid_plans_only(self):
+        hybrid_service = MagicMock()
+        planner = QueryPlanner(self.normalizer, hybrid_service=hybrid_service)
+
+        for mode in ('lexical', 'semantic'):
+            plan = planner.plan('murder', mode)
+            self.assertIsNone(plan.legal_expansion)
+            self.assertIsNone(plan.precision_info)
+            self.assertIsNone(plan.rerank_terms)
+        hybrid_service.query_expander.enhance_query_with_legal_knowledge.assert_not_called()
+        hybrid_service.precision_optimizer.enhance_query_understanding.assert_not_called()
+        hybrid_service.advanced_reranker.extract_query_terms.assert_not_called()
+
+        self.assertIsNot(planner.plan('murder', 'hybrid'), planner.plan('murder', 'lexical'))
+        hybrid_service.query_expander.enhance_query_with_legal_knowledge.assert_called_once_with('murder')
+
+
+class PairScoringTest(SimpleTestCase):
+    """Test cases for the cross-encoder score cache and micro-batching"""
+
+    def test_score_cache_is_bounded(self):
+        cache = PairScoreCache(max_size=2)
+        cache.set_many([('a', 0.1), ('b', 0.2)])
+        self.assertEqual(cache.get_many(['a', 'x']), [0.1, None])
+        cache.set_many([('c', 0.3)])
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), [0.1, None, 0.3])
+        self.assertEqual(cache.get_stats()['hits'], 3)
+
+    def test_concurrent_requests_share_predict_calls(self):
+        running = threading.Event()
+        release = threading.Event()
+        batches = []
+
+        def predict(pairs):
+            batches.append(list(pairs))
+            running.set()
+            release.wait(5)
+            return [len(pair) for pair in pairs]
+
+        scheduler = MicroBatchScheduler(predict)
+        results = {}
+
+        def submit(name, pairs):
+            results[name] = scheduler.score(pairs)
+
+        first = threading.Thread(target=submit, args=('first', ['a']))
+        first.start()
+        running.wait(5)
+        # Both arrive while the first batch is running and share the next one
+        waiting = [
+            threading.Thread(target=submit, args=('second', ['bb', 'ccc'])),
+            threading.Thread(target=submit, args=('third', ['dddd'])),
+        ]
+        for thread in waiting:
+            thread.start()
+        while scheduler._queued_pairs < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in [first] + waiting:
+            thread.join(5)
+
+        self.assertEqual(results, {'first': [1.0], 'second': [2.0, 3.0], 'third': [4.0]})
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(scheduler.get_stats()['merged_batches'], 1)
+
+
+class CaseFeatureStoreTest(SimpleTestCase):
+    """Test cases for the columnar case feature store"""
+
+    ROWS = [
+        (3, 'WP 3/2020', 'Ali v State', 'Decided', '15-03-2020', '', date(2020, 3, 15), 1, 'Islamabad High Court',
+         30, 'ali v state', 'Bail granted', {'subject_labels': ['Bail'], 'abstract_sentences': ['One.', 'Two.']},
+         ['ali', 'state'], ['bail'], ['section 497'], ['wp32020'], []),
+        (7, 'CR 7/2021', 'Khan v Bank', 'pending', 'not a date', '', None, None, None,
+         None, None, None, None, None, None, None, None, None),
+        (9, 'WP 9/2019', 'State v Ali', 'DECIDED', '', '', None, 1, 'Islamabad High Court',
+         90, 'state v ali', '', {}, ['state', 'ali'], [], [], [], []),
+    ]
+
+    def build_store(self, version=1):
+        store = CaseFeatureStore({'enabled': True})
+        store._columns = store._build_columns(iter(self.ROWS), version)
+        return store
+
+    def test_profiles_match_serialized_shape(self):
+        store = self.build_store()
+        profile = store.get_profile(3)
+        self.assertEqual(profile['party_tokens'], ['ali', 'state'])
+        self.assertEqual(profile['section_tags'], ['section 497'])
+        self.assertEqual(profile['summary_text'], 'Bail granted')
+        self.assertEqual(profile['metadata']['subject_labels'], ['Bail'])
+        self.assertEqual(profile['metadata']['abstract_text'], 'One. Two.')
+        # Tokens are interned across cases
+        self.assertEqual(store.get_stats()['vocab_size'], 6)
+        self.assertIsNone(store.get_profile(7))
+        self.assertIsNone(store.get_profile(4))
+
+    def test_case_columns(self):
+        store = self.build_store()
+        case = store.get_case('3')
+        self.assertEqual(case['court'], 'Islamabad High Court')
+        self.assertAlmostEqual(case['authority'], 0.8, places=6)
+        self.assertEqual(store.get_case(7)['court_id'], None)
+
+        columns = store.columns
+        rows = store.rows([9, 4, 3, 7])
+        self.assertEqual(rows.tolist(), [2, -1, 0, 1])
+        self.assertEqual(columns.institution_year[rows[2]], 2020)
+        self.assertEqual(columns.institution_ordinal[[1, 2]].tolist(), [-1, 0])
+        # Status codes ignore case
+        self.assertEqual(columns.status_codes[0], columns.status_codes[2])
+
+    def test_dates_come_from_normalized_column(self):
+        store = self.build_store()
+        case = store.get_case(3)
+        self.assertEqual(case['institution_date_normalized'], date(2020, 3, 15))
+        self.assertEqual(case['institution_year'], 2020)
+        self.assertIsNone(store.get_case(7)['institution_date_normalized'])
+
+        # Unknown cases and cases without a parsed date never match a range
+        mask = store.date_mask([3, 7, 9, 4], date_from=date(2020, 1, 1))
+        self.assertEqual(mask.tolist(), [True, False, False, False])
+        self.assertEqual(store.date_mask([3], date_to=date(2020, 3, 14)).tolist(), [False])
+        self.assertIsNone(CaseFeatureStore({'enabled': True}).date_mask([3]))
+
+    @patch('search_indexing.services.case_feature_store.get_index_version')
+    def test_reloads_when_index_version_changes(self, get_index_version):
+        store = self.build_store(version=1)
+        store._load = MagicMock()
+
+        get_index_version.return_value = 1
+        self.assertTrue(store.ensure_loaded())
+        store._load.assert_not_called()
+
+        get_index_version.return_value = 2
+        self.assertTrue(store.ensure_loaded())
+        store._load.assert_called_once_with(2)
+        # A failed reload keeps serving the old snapshot without retrying
+        self.assertTrue(store.ensure_loaded())
+        store._load.assert_called_once_with(2)
+
+    def test_disabled_store_is_never_loaded(self):
+        store = CaseFeatureStore({'enabled': False})
+        self.assertFalse(store.ensure_loaded())
+        self.assertIsNone(store.get_profile(3))
+
+
+class ResultDiversityTest(SimpleTestCase):
+    """Test cases for vectorized case similarity and MMR selection"""
+
+    def test_similarity_matrix(self):
+        similarity = case_similarity_matrix(
+            court_codes=np.array([0, 0, 1, -1]),
+            status_codes=np.array([2, 2, 2, -1]),
+            years=np.array([2020, 2024, 2021, 2020]),
+            present=np.array([True, True, True, False]),
+        )
+        self.assertAlmostEqual(similarity[0, 1], 0.5 + 0.3 + 0.1)
+        self.assertAlmostEqual(similarity[0, 2], 0.3 + 0.2)
+        self.assertAlmostEqual(similarity[1, 2], 0.3 + 0.1)
+        self.assertEqual(similarity[3].tolist(), [0.0] * 4)
+
+    def test_mmr_matches_greedy_reference(self):
+        rng = np.random.default_rng(3)
+        for _ in range(20):
+            n = int(rng.integers(2, 30))
+            relevance = rng.random(n).round(2)
+            features = [rng.integers(-1, 3, n), rng.integers(-1, 2, n), rng.integers(2015, 2024, n)]
+            similarity = case_similarity_matrix(*features)
+            k = int(rng.integers(1, n + 1))
+
+            order = sorted(range(n), key=lambda i: relevance[i], reverse=True)
+            expected, remaining = [order[0]], order[1:]
+            while len(expected) < k and remaining:
+                def mmr(i):
+                    diversity = 1.0 - sum(similarity[i, j] for j in expected) / len(expected)
+                    return 0.5 * relevance[i] + 0.5 * diversity
+                best = max(remaining, key=mmr)
+                expected.append(best)
+                remaining.remove(best)
+
+            self.assertEqual(mmr_select(relevance, similarity, k).tolist(), expected)
+
+    def test_mmr_prefers_diverse_candidates(self):
+        similarity = np.array([[0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+        self.assertEqual(mmr_select(np.array([1.0, 0.9, 0.8]), similarity, 2).tolist(), [0, 2])
+
+
+class StaticPriorsTest(SimpleTestCase):
+    """Test cases for index-time static ranking priors"""
+
+    CASES = [
+        {'id': 4, 'case_number': 'Criminal Appeal 4/2019', 'case_title': 'Ali vs State of Punjab',
+         'court': 'Supreme Court', 'status': 'Decided', 'bench': 'Full Bench, Justice A',
+         'institution_date': '12-01-2019', 'hearing_date': ''},
+        {'id': 8, 'case_number': 'W.P. 8/2023', 'case_title': 'Khan v Bank',
+         'court': 'Islamabad High Court', 'status': 'Pending', 'bench': '',
+         'institution_date': '', 'hearing_date': 'recent listing'},
+    ]
+
+    def build_index(self, directory):
+        index = StaticPriorsIndex({'path': os.path.join(directory, 'case_priors.npz')})
+        index._save(index.compute_arrays(self.CASES))
+        return index
+
+    @patch('search_indexing.services.static_priors.get_index_version', return_value=1)
+    def test_saved_priors_round_trip(self, get_index_version):
+        with tempfile.TemporaryDirectory() as directory:
+            index = self.build_index(directory)
+            priors = index.get_many([8, '4', 5])
+
+        self.assertIsNone(priors[2])
+        self.assertEqual(priors[0]['court_boost'], np.float32(1.3))
+        self.assertTrue(priors[0]['recent_hearing'])
+        self.assertEqual(priors[1]['institution_year'], 2019)
+        expected = compute_case_priors(self.CASES[0])
+        self.assertAlmostEqual(priors[1]['authority'], expected['authority'], places=6)
+        self.assertAlmostEqual(priors[1]['precedential_value'], expected['precedential_value'], places=6)
+
+    @patch('search_indexing.services.static_priors.get_index_version', return_value=1)
+    def test_quality_scores_match_per_result_assessment(self, get_index_version):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = ResultQualityEngine()
+            engine.static_priors = self.build_index(directory)
+            results = [dict(case, case_id=case['id'], snippets=['...']) for case in self.CASES]
+
+            with_priors = engine.optimize_results_by_quality([dict(r) for r in results])
+            engine.static_priors = StaticPriorsIndex({'path': os.path.join(directory, 'missing.npz')})
+            without_priors = engine.optimize_results_by_quality([dict(r) for r in results])
+
+        for a, b in zip(with_priors, without_priors):
+            self.assertEqual(a['case_id'], b['case_id'])
+            self.assertAlmostEqual(a['quality_score'], b['quality_score'], places=5)
+
+
+class RerankCascadeTest(SimpleTestCase):
+    """Test cases for the adaptive reranking cascade"""
+
+    def results(self, *scores):
+        return [{'case_id': i, 'combined_score': score} for i, score in enumerate(scores, 1)]
+
+    def test_tiers(self):
+        cascade = RerankCascade({'enabled': True})
+
+        exact = self.results(5.0, 1.0)
+        exact[0]['exact_match'] = True
+        decision = cascade.decide(exact, 10, exact_case_match={'case_id': 1})
+        self.assertEqual((decision.tier, decision.run_precision, decision.learned_k), ('exact', False, 0))
+
+        decision = cascade.decide(self.results(0.9, 0.3, 0.2), 10)
+        self.assertEqual((decision.tier, decision.advanced_k, decision.learned_k), ('confident', 0, 0))
+
+        decision = cascade.decide(self.results(0.9, 0.6), 10, specificity=0.9)
+        self.assertEqual((decision.tier, decision.advanced_k, decision.learned_k), ('specific', 20, 0))
+
+        decision = cascade.decide(self.results(0.9, 0.85), 10, specificity=0.9)
+        self.assertEqual((decision.tier, decision.advanced_k, decision.learned_k), ('full', None, 10))
+
+        stats = cascade.get_stats()
+        self.assertEqual(stats['decisions'], 4)
+        self.assertEqual(stats['early_exit_rate'], 0.75)
+
+    def test_disabled_cascade_runs_every_stage(self):
+        decision = RerankCascade({'enabled': False}).decide(self.results(0.9, 0.1), 10)
+        self.assertEqual((decision.tier, decision.run_precision, decision.advanced_k), ('full', True, None))
+
+    def test_rerank_head_keeps_tail_in_place(self):
+        reverse = lambda items: list(reversed(items))
+        self.assertEqual(rerank_head([1, 2, 3, 4], 2, reverse), [2, 1, 3, 4])
+        self.assertEqual(rerank_head([1, 2, 3], None, reverse), [3, 2, 1])
+        self.assertEqual(rerank_head([1, 2, 3], 0, reverse), [1, 2, 3])
+
+
+class LexicalFeatureExtractorTest(SimpleTestCase):
+    """Test cases for the shared lexical feature extractor"""
+
+    CASE = {'case_title': 'Muhammad Ali vs The State', 'case_number': 'Crl.A 45/2020 bail', 'court': 'Supreme Court'}
+
+    def test_features_of_one_pair(self):
+        extractor = LexicalFeatureExtractor()
+        lexicon = extractor.lexicon(
+            'ali bail appeal',
+            query_analysis={'type': 'case_parties'},
+            precision_info={'citations': ['45/2020'], 'key_terms': ['bail', 'state'], 'query_type': 'legal_concept'},
+            quality_analysis={'query': 'ali state', 'legal_entities': [{'normalized': 'Muhammad Ali'}, {'normalized': 'X'}]},
+        )
+        features = extractor.features(lexicon, self.CASE)
+
+        self.assertEqual(features.shape, (lexical.NUM_FEATURES,))
+        self.assertEqual(features[lexical.EXACT_TERM_MATCHES], 2)
+        self.assertAlmostEqual(features[lexical.LEGAL_TERM_RELEVANCE], 0.1)
+        self.assertEqual(features[lexical.QUERY_TYPE_BOOST], 1.2)
+        self.assertEqual(features[lexical.CASE_NUMBER_CITATION], 1)
+        self.assertEqual(features[lexical.KEY_TERM_MATCHES], 2)
+        self.assertEqual(features[lexical.CASE_TYPE_ALIGNMENT], 1)
+        self.assertEqual(features[lexical.TITLE_TERM_MATCHES], 1)
+        self.assertEqual(features[lexical.TITLE_TERM_FRACTION], 1.0)
+        self.assertEqual(features[lexical.ENTITY_FRACTION], 0.5)
+        self.assertAlmostEqual(features[lexical.TITLE_CLARITY], 1.0)
+        self.assertFalse(features.flags.writeable)
+
+    def test_missing_query_inputs_give_zero_features(self):
+        extractor = LexicalFeatureExtractor()
+        features = extractor.features(extractor.lexicon('ali'), self.CASE)
+
+        self.assertEqual(features[lexical.QUERY_TYPE_BOOST], 1.0)
+        self.assertEqual(features[lexical.KEY_TERM_MATCHES], 0)
+        self.assertEqual(features[lexical.ENTITY_FRACTION], 0)
+
+    def test_candidates_and_pairs_are_cached(self):
+        extractor = LexicalFeatureExtractor()
+        first = extractor.lexicon('ali')
+        self.assertIs(extractor.lexicon('ali'), first)
+
+        extractor.features(first, self.CASE)
+        extractor.features(first, dict(self.CASE))
+        extractor.features(extractor.lexicon('state'), self.CASE)
+        stats = extractor.get_stats()
+        self.assertEqual(stats['candidates']['misses'], 1)
+        self.assertEqual(stats['pairs']['hits'], 1)
+        self.assertEqual(extractor.feature_matrix(first, [self.CASE, {}]).shape, (2, lexical.NUM_FEATURES))
+
+    def test_title_similarity(self):
+        extractor = LexicalFeatureExtractor()
+        self.assertAlmostEqual(extractor.title_similarity('Ali vs State', 'ali vs khan'), 0.5)
+        self.assertEqual(extractor.title_similarity('', 'ali'), 0.0)
+
+
+class SnippetBatchTest(SimpleTestCase):
+    """Test cases for page-batched snippet generation"""
+
+    LONG_TEXT = 'The petitioner sought bail in a murder appeal before the court. ' * 4
+
+    def build_service(self):
+        service = SnippetService({'use_ai_snippets': False, 'batch_workers': 2})
+        chunk = MagicMock(chunk_text=self.LONG_TEXT, page_number=2, start_char=0, end_char=len(self.LONG_TEXT))
+        case = MagicMock(case_title='Ali vs State', case_number='Crl.A 1/2020', bench='')
+        service._fetch_cases = MagicMock(return_value={1: case, 2: case})
+        service._fetch_chunks = MagicMock(return_value={1: [chunk, chunk, chunk]})
+        service._fetch_pages = MagicMock(return_value={2: [(1, self.LONG_TEXT)]})
+        service.sentence_index.load = MagicMock(return_value={})
+        return service
+
+    def test_pages_are_fetched_only_for_short_cases(self):
+        service = self.build_service()
+        snippets = service.generate_snippets_batch([1, 2, 2], 'ali bail', {'original_query': 'ali bail'})
+
+        self.assertEqual(list(snippets), [1, 2])
+        service._fetch_cases.assert_called_once_with([1, 2])
+        service._fetch_pages.assert_called_once_with([2])
+        self.assertEqual([s['snippet_type'] for s in snippets[1]], ['semantic_exact_match'] * 3)
+        self.assertEqual([s['snippet_type'] for s in snippets[2]], ['metadata_title'])
+
+    def test_stored_chunk_vectors_order_semantic_snippets(self):
+        header = MagicMock(chunk_id='h', chunk_text='Case Number: 1. ' * 10, page_number=1, start_char=0, end_char=160)
+        body = MagicMock(chunk_id='b', chunk_text=self.LONG_TEXT, page_number=3, start_char=0, end_char=len(self.LONG_TEXT))
+        vector_service = MagicMock()
+        vector_service.chunk_similarities.return_value = {'h': 0.1, 'b': 0.9}
+        service = SnippetService({'use_ai_snippets': False, 'batch_workers': 1}, vector_service=vector_service)
+        service._fetch_cases = MagicMock(return_value={})
+        service._fetch_chunks = MagicMock(return_value={1: [header, body]})
+
+        snippets = service.generate_snippets_batch([1], 'zzz', {'original_query': 'zzz'}, max_snippets=1)
+
+        vector_service.chunk_similarities.assert_called_once_with('zzz', ['h', 'b'])
+        self.assertEqual(snippets[1][0]['page_number'], 3)
+        self.assertEqual(SnippetService({'use_ai_snippets': False}).score_chunks('appeal', [body]), {})
+
+    def test_single_case_matches_batch(self):
+        service = self.build_service()
+        query_info = {'original_query': 'bail'}
+        batch = service.generate_snippets_batch([1, 2], 'bail', query_info)
+
+        self.assertEqual(service.generate_snippets(2, 'bail', query_info), batch[2])
+        self.assertEqual(service.generate_snippets_batch([], 'bail', query_info), {})
+
+
+class SentenceIndexTest(SimpleTestCase):
+    """Test cases for the per-case sentence index and indexed lexical snippets"""
+
+    PAGE = (
+        'The petitioner sought bail before the court. The learned counsel argued at length on the facts.\n'
+        'Bail was refused by the trial court in the murder case. The prosecution produced three witnesses '
+        'who supported the charge.'
+    )
+
+    def test_split_sentences(self):
+        spans = split_sentences('One sentence here.  Two here!\nThird line', max_chars=300)
+        self.assertEqual(spans, [(0, 18), (20, 29), (30, 40)])
+
+        long_spans = split_sentences('word ' * 30, max_chars=40)
+        self.assertTrue(all(end - start <= 40 for start, end in long_spans))
+
+    def test_index_pages_and_prefix_lookup(self):
+        entry = SentenceIndex().index_pages([(7, 1, self.PAGE), (7, 2, '')])
+
+        self.assertEqual(entry['page_count'], 1)
+        self.assertEqual(entry['sentence_count'], 4)
+        self.assertEqual(entry['terms'], sorted(entry['terms']))
+        self.assertNotIn('the', entry['terms'])
+
+        table = CaseSentences(entry['sentences'], entry['terms'], entry['postings'])
+        hits = table.find(['bai', 'murder'], limit=10)
+        self.assertEqual([hit.sentence_id for hit in hits], [0, 2])
+        self.assertEqual((hits[0].term, hits[0].token), ('bai', 'bail'))
+        self.assertEqual(table.find(['zzz'], limit=10), [])
+
+    def test_indexed_lexical_snippets(self):
+        entry = SentenceIndex().index_pages([(7, 1, self.PAGE)])
+        table = CaseSentences(entry['sentences'], entry['terms'], entry['postings'])
+        service = SnippetService({'use_ai_snippets': False, 'batch_workers': 1})
+
+        hits = table.find(['bail'], limit=10)
+        snippets = service._generate_indexed_snippets(table, hits, {(7, 1): self.PAGE}, 3)
+
+        # The second hit falls inside the first window
+        self.assertEqual(len(snippets), 1)
+        snippet = snippets[0]
+        self.assertEqual(snippet['snippet_type'], 'lexical')
+        self.assertTrue(snippet['original_text'].startswith('The petitioner sought bail'))
+        self.assertGreaterEqual(snippet['length'], service.default_config['min_snippet_length'])
+        self.assertIn('**bail**', snippet['text'])
+        spans = snippet['char_spans']
+        self.assertEqual(self.PAGE[spans['absolute_start']:spans['absolute_end']], 'bail')
+
+        # Stale entries (page text changed since indexing) are skipped
+        self.assertEqual(service._generate_indexed_snippets(table, hits, {(7, 1): 'x' * 400}, 3), [])
+
+    def test_batch_uses_index_before_page_scan(self):
+        entry = SentenceIndex().index_pages([(7, 1, self.PAGE)])
+        service = SnippetService({'use_ai_snippets': False, 'batch_workers': 1})
+        service._fetch_cases = MagicMock(return_value={})
+        service._fetch_chunks = MagicMock(return_value={})
+        service._fetch_pages = MagicMock(return_value={})
+        service.sentence_index.load = MagicMock(
+            return_value={1: CaseSentences(entry['sentences'], entry['terms'], entry['postings'])}
+        )
+
+        with patch('search_indexing.services.snippet_service.fetch_sentence_pages',
+                   return_value={(7, 1): self.PAGE}) as fetch:
+            snippets = service.generate_snippets_batch([1, 2], 'murder', {'original_query': 'murder'})
+
+        self.assertEqual(set(fetch.call_args[0][0]), {(7, 1)})
+        service._fetch_pages.assert_called_once_with([2])
+        self.assertEqual([s['snippet_type'] for s in snippets[1]], ['lexical'])
+        self.assertEqual(snippets[2], [])
+
+
+@patch('search_indexing.services.ai_snippet_jobs.get_index_version', return_value=1)
+class AISnippetJobServiceTest(SimpleTestCase):
+    """Test cases for concurrent, cached and coalesced AI snippet jobs"""
+
+    def build(self, delay_ms=0.0, **config):
+        provider = StubSnippetProvider(delay_ms=delay_ms)
+        service = AISnippetJobService(dict({'max_concurrency': 4, 'timeout_ms': 2000}, **config), provider=provider)
+        return service, provider
+
+    def job(self, case_id, query):
+        return AISnippetJob(case_id, {'case_title': f'Case {case_id}'}, query, ['chunk text ' * 10], 3)
+
+    def test_jobs_run_concurrently_and_are_cached(self, mock_version):
+        service, provider = self.build(delay_ms=100)
+        jobs = [self.job(case_id, 'concurrent bail') for case_id in range(4)]
+
+        start = time.perf_counter()
+        snippets = service.generate_many(jobs)
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(provider.calls, 4)
+        self.assertEqual(snippets[2][0]['source'], 'stub')
+
+        # Same pairs again, with a differently spaced query: served from the cache
+        self.assertEqual(service.generate_many([self.job(2, 'Concurrent  BAIL')]), {2: snippets[2]})
+        self.assertEqual(provider.calls, 4)
+        self.assertEqual(service.get_stats()['cache_hits'], 1)
+
+    def test_duplicate_inflight_requests_are_coalesced(self, mock_version):
+        service, provider = self.build(delay_ms=100)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.generate(self.job(7, 'coalesced murder'))))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(service.get_stats()['coalesced'], 2)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_deadline_falls_back_to_simple_snippets(self, mock_version):
+        service, provider = self.build(delay_ms=150)
+
+        snippets = service.generate(self.job(9, 'slow habeas'), timeout_ms=10)
+
+        self.assertTrue(snippets)
+        self.assertNotEqual(snippets[0]['source'], 'stub')
+        self.assertEqual(service.get_stats()['fallbacks'], 1)
+
+        # The provider call finishes in the background and fills the cache
+        time.sleep(0.3)
+        self.assertEqual(service.generate(self.job(9, 'slow habeas'), timeout_ms=10)[0]['source'], 'stub')
+        self.assertEqual(provider.calls, 1)
+
+
+class FacetEngineTest(SimpleTestCase):
+    """In-memory facet counting"""
+
+    def build(self):
+        engine = FacetEngine({'enabled': True})
+        rows = [
+            (1, 10, 'Decided', '01-03-2021', 2021, None),
+            (2, 10, 'Pending', '2020-05-01', 2020, None),
+            (3, 20, 'Decided', '12/07/2021', None, None),
+            (4, 20, 'Decided', None, None, None),
+            (5, None, '', 'filed 2019', None, None),
+        ]
+        engine._snapshot = FacetEngine._build(1, {10: 'LHC', 20: 'SHC'}, rows)
+        return engine
+
+    @staticmethod
+    def counts(facets, facet):
+        return {entry['value']: entry['count'] for entry in facets[facet]}
+
+    def test_counts_whole_collection_and_result_sets(self):
+        engine = self.build()
+
+        facets = engine.count()
+        self.assertEqual(self.counts(facets, 'court'), {'LHC': 2, 'SHC': 2})
+        self.assertEqual(self.counts(facets, 'status'), {'Decided': 3, 'Pending': 1})
+        self.assertEqual(self.counts(facets, 'case_type'), {'Decided': 3, 'Pending': 1, 'Unknown': 1})
+        self.assertEqual(
+            [entry['value'] for entry in facets['year']], ['2021', '2020', '2019', 'Unknown']
+        )
+
+        facets = engine.count([2, 3, '4', 99])
+        self.assertEqual(self.counts(facets, 'court'), {'LHC': 1, 'SHC': 2})
+        self.assertEqual(self.counts(facets, 'year'), {'2021': 1, '2020': 1, 'Unknown': 1})
+
+    def test_selections_are_disjunctive(self):
+        engine = self.build()
+
+        facets = engine.count(selections={'court': 'SHC', 'status': ['Decided', 'Pending']})
+
+        # Each facet is counted under the selections of the other facets
+        self.assertEqual(self.counts(facets, 'court'), {'LHC': 2, 'SHC': 2})
+        # Selected values stay listed even when nothing matches them
+        self.assertEqual(self.counts(facets, 'status'), {'Decided': 2, 'Pending': 0})
+        self.assertEqual(self.counts(facets, 'year'), {'2021': 1, 'Unknown': 1})
+        self.assertEqual([entry['value'] for entry in facets['court'] if entry['selected']], ['SHC'])
+
+        facets = engine.count(selections={'court': 10, 'year': 2021})
+        self.assertEqual(self.counts(facets, 'status'), {'Decided': 1})
+        self.assertEqual(self.counts(facets, 'year'), {'2021': 1, '2020': 1})
+
+    def test_selections_match_like_the_retrieval_filters(self):
+        engine = self.build()
+
+        facets = engine.count(None, {'status': 'decided'})
+        self.assertEqual(self.counts(facets, 'court'), {'LHC': 1, 'SHC': 2})
+        self.assertEqual(self.counts(facets, 'year'), {'2021': 2, 'Unknown': 1})
+        self.assertEqual([entry['value'] for entry in facets['status'] if entry['selected']], ['Decided'])
+
+        facets = engine.count(None, {'court': 'lh'})
+        self.assertEqual(self.counts(facets, 'status'), {'Decided': 1, 'Pending': 1})
+
+        # Selections matching nothing leave the other facets' counts alone
+        facets = engine.count(None, {'status': 'withdrawn', 'court': 'Federal'})
+        self.assertEqual(self.counts(facets, 'court'), {'LHC': 2, 'SHC': 2})
+        self.assertEqual(self.counts(facets, 'case_type'), {'Decided': 3, 'Pending': 1, 'Unknown': 1})
+
+    def test_disabled_or_unloaded_engine_is_skipped(self):
+        self.assertFalse(FacetEngine({'enabled': False}).ensure_fresh())
+        self.assertIsNone(FacetEngine({'enabled': True}).count())
+
+
+class CompletionIndexTest(SimpleTestCase):
+    """Typeahead prefix index"""
+
+    @staticmethod
+    def item(weight, value, *texts):
+        return ((-weight, value), {'value': value, 'type': 'case'}, list(texts) or [value])
+
+    def test_keys_start_at_word_boundaries(self):
+        self.assertEqual(
+            completion_keys('Ali vs. The State'),
+            ['ali vs the state', 'state']
+        )
+        self.assertEqual(completion_keys('Crl.A-12/2020')[:2], ['crl a 12 2020', 'a 12 2020'])
+
+    def test_prefix_top_k_is_ranked_by_weight(self):
+        table = build_table([
+            self.item(1, 'Crl.A 12/2020', 'Crl.A 12/2020', 'Ali vs State'),
+            self.item(5, 'Crl.A 13/2020', 'Crl.A 13/2020', 'Bashir vs State'),
+            self.item(3, 'W.P 1/2021'),
+        ], heavy_threshold=1024)
+
+        self.assertEqual([entry['value'] for entry in table.top('crl a 1', 5, 1024)], ['Crl.A 13/2020', 'Crl.A 12/2020'])
+        self.assertEqual([entry['value'] for entry in table.top('stat', 1, 1024)], ['Crl.A 13/2020'])
+        self.assertEqual([entry['value'] for entry in table.top('ali', 5, 1024)], ['Crl.A 12/2020'])
+        self.assertEqual(table.top('zzz', 5, 1024), [])
+
+    def test_precomputed_heavy_nodes_match_range_ranking(self):
+        items = [self.item(i % 17, f'Case {i}', f'crl {i}') for i in range(300)]
+        table = build_table(items, top_k=5, heavy_threshold=20)
+        plain = build_table(items, top_k=5, heavy_threshold=10 ** 6)
+
+        self.assertIn('crl 1', table.heavy)
+        for prefix in ('c', 'crl', 'crl 1', 'crl 12', 'crl 299'):
+            self.assertEqual(table.top(prefix, 5, 20), plain.top(prefix, 5, 10 ** 6))
+
+    def test_suggest_is_skipped_until_loaded(self):
+        self.assertIsNone(CompletionIndex({'enabled': False}).suggest('case', 'crl'))
+
+        index = CompletionIndex({'enabled': True})
+        with patch('search_indexing.services.completion_index.get_index_version', return_value=2):
+            index.load_tables({'case': build_table([self.item(1, 'Crl.A 1/2020')])})
+            suggestions = index.suggest('case', 'CRL.A')
+            # Outside the patch the version would differ and start a database build
+            missing = index.suggest('judge', 'crl')
+        self.assertEqual(suggestions, [{'value': 'Crl.A 1/2020', 'type': 'case'}])
+        self.assertIsNone(missing)
+        self.assertEqual(index.get_stats()['lookups'], 1)
+        self.assertFalse(index.get_stats()['building'])
+
+    def test_background_build_closes_its_connection(self):
+        index = CompletionIndex({'enabled': True})
+        index._building = True
+        index.build = MagicMock(side_effect=RuntimeError('database unavailable'))
+
+        with patch('search_indexing.services.completion_index.connection') as db_connection:
+            with self.assertRaises(RuntimeError):
+                index._build_in_background()
+        db_connection.close.assert_called_once_with()
+        self.assertFalse(index.get_stats()['building'])
+
+
+class FuzzyNameIndexTest(SimpleTestCase):
+    """Fuzzy party name and title matching"""
+
+    def build(self):
+        index = FuzzyNameIndex({'enabled': True})
+        index.load(1, [
+            (1, 'muhammad ali vs state', 'muhammad ali | state'),
+            (2, 'mohammad ali vs state', 'mohammad ali'),
+            (3, 'government of punjab vs bashir ahmed', 'government of punjab | bashir ahmed'),
+            (4, 'zahid hussain vs federation', ''),
+        ])
+        return index
+
+    def test_edit_distance_is_bounded(self):
+        self.assertEqual(bounded_edit_distance('muhammad', 'mohammad', 2), 1)
+        self.assertEqual(bounded_edit_distance('hussain', 'hussian', 2), 1)
+        self.assertEqual(bounded_edit_distance('federation', 'fed', 2), 3)
+        self.assertEqual(name_tokens('Govt. of the Punjab vs Mohd Ali'), ['government', 'punjab', 'muhammad', 'ali'])
+
+    def test_misspelled_names_find_other_spellings(self):
+        index = self.build()
+
+        results = index.search('Mohammad Ali')
+        # Case 2 spells it the same way and is left to the keyword retriever
+        self.assertEqual([result['case_id'] for result in results], [1])
+        self.assertEqual(results[0]['corrections'], {'mohammad': ['muhammad']})
+        self.assertGreater(results[0]['fuzzy_score'], 0.9)
+
+        self.assertEqual([result['case_id'] for result in index.search('zahid hussian')], [4])
+        self.assertEqual([result['case_id'] for result in index.search('govt punjab')], [3])
+
+    def test_unrelated_or_short_queries_find_nothing(self):
+        index = self.build()
+
+        self.assertEqual(index.search('bail murder'), [])
+        self.assertEqual(index.search('aly'), [])
+        self.assertEqual(FuzzyNameIndex({'enabled': True}).search('muhammad'), [])
+        self.assertFalse(FuzzyNameIndex({'enabled': False}).ensure_fresh())
+
+    def test_background_build_closes_its_connection(self):
+        index = FuzzyNameIndex({'enabled': True})
+        index._building = True
+        index.build = MagicMock(side_effect=RuntimeError('database unavailable'))
+
+        with patch('search_indexing.services.fuzzy_index.connection') as db_connection:
+            with self.assertRaises(RuntimeError):
+                index._build_in_background()
+        db_connection.close.assert_called_once_with()
+        self.assertFalse(index._building)
+
+
+class FacetPostingsTest(SimpleTestCase):
+    """Delta-encoded facet postings"""
+
+    mappings = {
+        'section 302': [40, 3, 7, 3],
+        'section 497': [100000, 5],
+        'bail': [],
+        'qatl-e-amd': [2 ** 40, 1],
+    }
+
+    def test_round_trip(self):
+        buffer = encode_postings(self.mappings)
+        postings = FacetPostings(buffer)
+
+        self.assertEqual(postings.terms, ['qatl-e-amd', 'section 302', 'section 497'])
+        self.assertEqual(postings.get('section 302').tolist(), [3, 7, 40])
+        self.assertEqual(postings.get('section 497').tolist(), [5, 100000])
+        self.assertEqual(postings.get('qatl-e-amd').tolist(), [1, 2 ** 40])
+        self.assertEqual(postings.get('bail').tolist(), [])
+        self.assertEqual(postings.case_count('section 302'), 3)
+        self.assertEqual(postings.union(['section 302', 'section 497']).tolist(), [3, 5, 7, 40, 100000])
+        self.assertEqual(FacetPostings(encode_postings({})).terms, [])
+
+    def test_small_gaps_are_stored_narrow_and_loaded_zero_copy(self):
+        buffer = encode_postings({'section 302': range(1, 1001)})
+        postings = FacetPostings(memoryview(buffer))
+
+        self.assertEqual(postings.deltas.dtype.itemsize, 1)
+        self.assertFalse(postings.deltas.flags.owndata)
+        self.assertLess(len(buffer), 1100)
+        self.assertEqual(postings.get('section 302').tolist(), list(range(1, 1001)))
+        with self.assertRaises(ValueError):
+            FacetPostings(b'JSON' + buffer[4:])
+
+    def test_filter_keeps_result_order(self):
+        store = FacetPostingsStore()
+        with patch('search_indexing.services.facet_postings.get_index_version', return_value=1), \
+                patch.object(store, '_load', return_value=FacetPostings(encode_postings(self.mappings))) as load:
+            self.assertEqual(store.filter_case_ids('section', 'section 302', [40, 5, None, 3, 8]), [40, 3])
+            self.assertEqual(store.filter_case_ids('section', ['section 302', 'section 497'], [5, 40]), [5, 40])
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual(store.get_stats()['terms'], 3)
+
+
+class NormalizedFacetServiceTest(TestCase):
+    """Set-based rebuild of the normalized facet tables"""
+
+    def setUp(self):
+        self.service = NormalizedFacetService()
+        self.cases = [Case.objects.create(case_number=f'Crl.A {i}/2020', case_title='A vs B') for i in range(3)]
+        self.ppc = Term.objects.create(type='section', canonical='ppc:302', occurrence_count=3)
+        self.crpc = Term.objects.create(type='section', canonical='crpc:497', occurrence_count=1)
+        self.occur(self.ppc, self.cases[0], times=2)
+        self.occur(self.ppc, self.cases[1])
+        self.occur(self.crpc, self.cases[2])
+
+    def occur(self, term, case, times=1):
+        for _ in range(times):
+            position = TermOccurrence.objects.count() * 10
+            TermOccurrence.objects.create(
+                term=term, case=case, start_char=position, end_char=position + 3,
+                surface=term.canonical, source_rule='test', rules_version='1'
+            )
+
+    def mappings(self):
+        return set(FacetMapping.objects.values_list('facet_term__canonical_term', 'case_id', 'occurrence_count'))
+
+    def test_new_terms_and_mappings_are_created(self):
+        stats = self.service._rebuild_facet_type('section')
+
+        self.assertEqual((stats['terms_created'], stats['mappings_created']), (2, 3))
+        term = FacetTerm.objects.get(facet_type='section', canonical_term='ppc:302')
+        self.assertEqual((term.occurrence_count, term.case_count, term.is_active), (3, 2, True))
+        self.assertEqual(self.mappings(), {
+            ('ppc:302', self.cases[0].id, 2), ('ppc:302', self.cases[1].id, 1), ('crpc:497', self.cases[2].id, 1),
+        })
+
+    def test_changed_rows_are_updated_and_missing_terms_deactivated(self):
+        self.service._rebuild_facet_type('section')
+        self.occur(self.ppc, self.cases[2])
+        Term.objects.filter(id=self.ppc.id).update(occurrence_count=4)
+        TermOccurrence.objects.filter(term=self.ppc, case=self.cases[0]).first().delete()
+        TermOccurrence.objects.filter(term=self.crpc).delete()
+
+        stats = self.service._rebuild_facet_type('section')
+
+        self.assertEqual(
+            (stats['terms_updated'], stats['terms_deactivated'], stats['mappings_created'],
+             stats['mappings_updated'], stats['mappings_deleted']),
+            (1, 1, 1, 1, 1)
+        )
+        ppc = FacetTerm.objects.get(canonical_term='ppc:302')
+        self.assertEqual((ppc.occurrence_count, ppc.case_count), (4, 3))
+        crpc = FacetTerm.objects.get(canonical_term='crpc:497')
+        self.assertEqual((crpc.is_active, crpc.case_count), (False, 0))
+        self.assertEqual(self.mappings(), {('ppc:302', case.id, 1) for case in self.cases})
+
+    def test_unchanged_rows_are_not_written(self):
+        self.service._rebuild_facet_type('section')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.service._rebuild_facet_type('section')
+
+        writes = [
+            query['sql'] for query in queries
+            if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ]
+        self.assertEqual(writes, [])
+        self.assertEqual(stats['terms_processed'], 2)
+        self.assertFalse(any(value for key, value in stats.items() if key != 'terms_processed'))
+
+    def test_update_case_counts_writes_only_changed_terms(self):
+        self.service._rebuild_facet_type('section')
+        FacetTerm.objects.filter(canonical_term='ppc:302').update(case_count=7)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.service._update_case_counts()
+
+        updates = [query for query in queries if query['sql'].lstrip().upper().startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            dict(FacetTerm.objects.values_list('canonical_term', 'case_count')),
+            {'ppc:302': 2, 'crpc:497': 1}
+        )
+
+
+class FacetSearchTest(TestCase):
+    """Facet search results with and without the case feature store"""
+
+    def setUp(self):
+        court = Court.objects.create(name='Islamabad High Court', code='IHC')
+        self.case = Case.objects.create(
+            case_number='Crl.A 12/2020', case_title='Muhammad Ali vs The State', status='Decided', court=court
+        )
+        self.courtless = Case.objects.create(case_number='W.P 3/2021', case_title='Bashir vs Federation')
+        postings = FacetPostings(encode_postings({'ppc:302': [self.case.id, self.courtless.id, 999]}))
+        patcher = patch('search_indexing.services.keyword_indexing.get_facet_postings')
+        patcher.start().return_value.get.return_value = postings
+        self.addCleanup(patcher.stop)
+        self.service = KeywordIndexingService(use_bm25=False)
+
+    def search(self, store):
+        with patch('search_indexing.services.keyword_indexing.get_case_feature_store', return_value=store):
+            return self.service.search_by_facet('section', 'ppc:302')
+
+    @patch('search_indexing.services.case_feature_store.get_index_version', return_value=1)
+    def test_store_and_database_paths_agree(self, _version):
+        store = CaseFeatureStore({'enabled': True})
+        self.assertTrue(store.ensure_loaded())
+
+        results = self.search(store)
+        self.assertEqual(results, self.search(CaseFeatureStore({'enabled': False})))
+        self.assertEqual(results[0], {
+            'case_id': self.case.id,
+            'case_number': 'Crl.A 12/2020',
+            'case_title': 'Muhammad Ali vs The State',
+            'status': 'Decided',
+            'court': 'Islamabad High Court',
+            'facet_type': 'section',
+            'facet_term': 'ppc:302',
+        })
+        # Unknown case ids are dropped on both paths
+        self.assertEqual([result['case_id'] for result in results], [self.case.id, self.courtless.id])
+
+
+class SearchServiceContainerTest(SimpleTestCase):
+    """Test cases for the shared search service container"""
+
+    def build_container(self, vector_service=None):
+        """Build the container with the index-backed hybrid service replaced"""
+        hybrid_module = MagicMock()
+        hybrid_module.HybridIndexingService.return_value = MagicMock(vector_service=vector_service)
+        with patch.dict(sys.modules, {'search_indexing.services.hybrid_indexing': hybrid_module}):
+            return SearchServiceContainer()
+
+    def test_snippets_are_scored_by_default_pinecone_service(self):
+        with patch.dict(sys.modules, {'pinecone': MagicMock(), 'sentence_transformers': MagicMock()}):
+            pinecone_indexing = importlib.import_module('search_indexing.services.pinecone_indexing')
+            with patch.object(pinecone_indexing.PineconeIndexingService, '_instance', None), \
+                    patch.object(pinecone_indexing.PineconeIndexingService, '_initialized', False):
+                vector_service = pinecone_indexing.PineconeIndexingService()
+        vector_service.model = MagicMock()
+        vector_service.model.encode.return_value = np.array([[1.0, 0.0]])
+        vector_service.index = MagicMock()
+        vector_service.index.fetch.return_value = MagicMock(vectors={
+            'chunk_a': MagicMock(values=[2.0, 0.0]),
+            'chunk_b': MagicMock(values=[0.0, 3.0]),
+        })
+
+        container = self.build_container(vector_service)
+        chunks = [MagicMock(chunk_id='a'), MagicMock(chunk_id='b'), MagicMock(chunk_id='missing')]
+        scores = container.snippet_service.score_chunks('bail', chunks)
+
+        self.assertIs(container.snippet_service.vector_service, vector_service)
+        vector_service.index.fetch.assert_called_once_with(ids=['chunk_a', 'chunk_b', 'chunk_missing'])
+        self.assertEqual(scores, {'a': 1.0, 'b': 0.0})
+
+
+    def test_container_is_built_once_and_shared_across_views(self):
+        from search_indexing.views import BatchSearchAPIView, CaseContextAPIView, SearchAPIView
+
+        reset_search_services()
+        self.addCleanup(reset_search_services)
+        with patch('search_indexing.services.service_container.SearchServiceContainer') as container_class:
+            views = [SearchAPIView(), BatchSearchAPIView(), CaseContextAPIView()]
+            self.assertIs(get_search_services(), container_class.return_value)
+
+        container_class.assert_called_once_with()
+        services = container_class.return_value
+        self.assertIs(views[0].hybrid_service, services.hybrid_service)
+        self.assertIs(views[1].query_planner, views[0].query_planner)
+        self.assertIs(views[2].snippet_service, services.snippet_service)
+
+    def ready(self, **settings):
+        """Run the app's startup hook as a serving process would"""
+        config = apps.get_app_config('search_indexing')
+        with override_settings(**settings), \
+                patch.object(config, '_is_serving_process', return_value=True), \
+                patch('search_indexing.services.service_container.get_search_services') as get_services:
+            config.ready()
+        return get_services
+
+    def test_startup_build_and_warm_up_follow_settings(self):
+        get_services = self.ready(SEARCH_SERVICES_BUILD_ON_READY=True, SEARCH_SERVICES_WARM_UP=False)
+        get_services.assert_called_once_with()
+        get_services.return_value.warm_up.assert_not_called()
+
+        get_services = self.ready(SEARCH_SERVICES_BUILD_ON_READY=True, SEARCH_SERVICES_WARM_UP=True)
+        get_services.return_value.warm_up.assert_called_once_with()
+
+        get_services = self.ready(SEARCH_SERVICES_BUILD_ON_READY=False, SEARCH_SERVICES_WARM_UP=True)
+        get_services.assert_not_called()
+
+    def test_warm_up_records_failed_steps(self):
+        vector_service = MagicMock()
+        vector_service.search.side_effect = RuntimeError('index missing')
+        container = self.build_container(vector_service)
+        container.query_intelligence = MagicMock()
+        container.query_normalizer = MagicMock()
+
+        with self.assertLogs('search_indexing.services.service_container', 'WARNING'):
+            stats = container.warm_up('bail')
+
+        self.assertTrue(container.is_warm)
+        self.assertEqual(stats['vector_service'], {'ok': False, 'error': 'index missing'})
+        self.assertTrue(stats['keyword_service']['ok'])
+        container.query_normalizer.normalize_query.assert_called_once_with('bail')
+        self.assertEqual(container.get_status()['warm_up'], stats)
+
+@patch('search_indexing.views.get_search_services', MagicMock())
+class BatchSearchParamsTest(SimpleTestCase):
+    """Request body parsing of the batch search endpoint"""
+
+    def parse(self, body, content_type='application/json'):
+        from search_indexing.views import BatchSearchAPIView
+
+        view = BatchSearchAPIView()
+        request = view.initialize_request(APIRequestFactory().post('/search/batch/', body, content_type=content_type))
+        return view._parse_batch_params(request), request
+
+    def test_filters_apply_to_every_query_without_touching_query_string(self):
+        params, request = self.parse(
+            '{"queries": ["bail", " murder "], "mode": "LEXICAL", "limit": 5, '
+            '"filters": {"year": 2020, "status": "Decided", "date_from": "19-06-2020", "judge": null}}'
+        )
+
+        self.assertTrue(params['is_valid'])
+        self.assertEqual(params['queries'], ['bail', 'murder'])
+        self.assertEqual(params['mode'], 'lexical')
+        self.assertEqual(params['filters'], {'year': 2020, 'status': 'Decided', 'date_from': '2020-06-19'})
+        self.assertEqual(dict(request.GET), {})
+
+    def test_bad_json_is_rejected(self):
+        params, _ = self.parse('{"queries": ["bail"')
+        self.assertFalse(params['is_valid'])
+        self.assertIn('Parameter parsing error', params['errors'][0])
+
+        params, _ = self.parse('["bail"]')
+        self.assertFalse(params['is_valid'])
+
+    @override_settings(SEARCH_BATCH_MAX_QUERIES=2)
+    def test_batches_over_the_limit_are_rejected(self):
+        params, _ = self.parse('{"queries": ["a", "b", "c"]}')
+        self.assertFalse(params['is_valid'])
+        self.assertEqual(params['errors'], ['At most 2 queries are allowed per batch'])
+
+        params, _ = self.parse('{"queries": ["a", "b"]}')
+        self.assertTrue(params['is_valid'])
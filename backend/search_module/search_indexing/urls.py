@@ -1,7 +1,7 @@
 from django.urls import path
 from .views import (
-    SearchAPIView, SuggestAPIView, CaseContextAPIView, SearchStatusAPIView, 
-    CaseDetailsAPIView, DocumentViewAPIView, DocumentDownloadAPIView, 
+    SearchAPIView, BatchSearchAPIView, AsyncSearchAPIView, SuggestAPIView, CaseContextAPIView, SearchStatusAPIView, 
+    SearchMetricsAPIView, CaseDetailsAPIView, DocumentViewAPIView, DocumentDownloadAPIView, 
     JudgementViewAPIView, JudgementDownloadAPIView, OrderDocumentAPIView
 )
 
@@ -11,6 +11,12 @@ urlpatterns = [
     # Main search endpoint
     path('search/', SearchAPIView.as_view(), name='search'),
     
+    # Batch search for offline workloads
+    path('search/batch/', BatchSearchAPIView.as_view(), name='search_batch'),
+    
+    # Async (ASGI) search; model inference runs on a bounded executor
+    path('search/async/', AsyncSearchAPIView.as_view(), name='search_async'),
+    
     # Typeahead suggestions
     path('suggest/', SuggestAPIView.as_view(), name='suggest'),
     
@@ -20,6 +26,9 @@ urlpatterns = [
     # System status and health
     path('status/', SearchStatusAPIView.as_view(), name='status'),
     
+    # Per-stage latency histograms and cache hit rates
+    path('metrics/', SearchMetricsAPIView.as_view(), name='metrics'),
+    
     # Case details
     path('case/<int:case_id>/', CaseDetailsAPIView.as_view(), name='case_details'),
     
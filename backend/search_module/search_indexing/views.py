@@ -5,7 +5,8 @@ Implements the main search endpoints with proper request handling and response f
 
 import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from django.conf import settings
 from django.http import JsonResponse
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
@@ -15,6 +16,7 @@ from django.core.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ParseError
 from rest_framework.decorators import api_view, throttle_classes
 from rest_framework.throttling import UserRateThrottle
 from django.db.models import Count
@@ -23,14 +25,21 @@ from django.http import HttpResponse
 import os
 import mimetypes
 
-from .services.query_normalization import QueryNormalizationService
-from .services.hybrid_indexing import HybridIndexingService
-from .services.fast_ranking import FastRankingService
-from .services.snippet_service import SnippetService
-from .services.faceting_service import FacetingService
-from .services.advanced_query_intelligence import AdvancedQueryIntelligence
-from .services.result_quality_engine import ResultQualityEngine
+from .services.service_container import get_search_services
+from .services.search_tracing import SearchTrace, get_stage_metrics
+from .services.search_deadline import SearchDeadline
+from .services.query_plan import QueryPlan
+from .services.async_executor import ExecutorSaturated, get_search_executor
+from .services.case_feature_store import get_case_feature_store
+from .services.lexical_features import get_lexical_feature_extractor
+from .services.ai_snippet_jobs import get_ai_snippet_jobs
+from .services.facet_engine import get_facet_engine
+from .services.completion_index import get_completion_index
+from .services.facet_postings import get_facet_postings
+from .services.fuzzy_index import get_fuzzy_index
+from .services.static_priors import get_static_priors
 from apps.cases.models import Case, Court, JudgementData, CaseDocument, Document, ViewLinkData
+from apps.cases.services.data_cleaner import parse_case_date
 
 logger = logging.getLogger(__name__)
 
@@ -43,20 +52,26 @@ class SearchAPIView(APIView):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.query_normalizer = QueryNormalizationService()
-        self.hybrid_service = HybridIndexingService(use_pinecone=True)  # Use Pinecone for better performance
-        self.ranking_service = FastRankingService()
-        self.snippet_service = SnippetService()
-        self.faceting_service = FacetingService()
+        # Services are shared process-wide; see services/service_container.py
+        services = get_search_services()
+        self.query_normalizer = services.query_normalizer
+        self.hybrid_service = services.hybrid_service
+        self.ranking_service = services.ranking_service
+        self.snippet_service = services.snippet_service
+        self.faceting_service = services.faceting_service
         
         # TIER 1 INTEGRATION: Advanced services
-        self.query_intelligence = AdvancedQueryIntelligence()
-        self.quality_engine = ResultQualityEngine()
+        self.query_intelligence = services.query_intelligence
+        self.quality_engine = services.quality_engine
+        self.result_cache = services.result_cache
+        self.cursor_store = services.cursor_store
+        self.query_planner = services.query_planner
     
     def get(self, request):
         """Handle GET search requests"""
         try:
             start_time = time.time()
+            trace = SearchTrace()
             
             # Parse and validate request parameters
             params = self._parse_search_params(request)
@@ -66,91 +81,118 @@ class SearchAPIView(APIView):
                     'details': params['errors']
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # TIER 1 ENHANCEMENT: Advanced query analysis (with timeout protection)
-            try:
-                query_analysis = self.query_intelligence.analyze_query(params['query'])
-                expanded_query = self.query_intelligence.expand_query_intelligently(params['query'], query_analysis)
-            except Exception as e:
-                logger.warning(f"Query intelligence failed, falling back to basic analysis: {e}")
-                # Fallback to basic query info
-                query_analysis = None
-                expanded_query = None
-            
-            # Legacy query normalization (for backward compatibility)
-            query_info = self.query_normalizer.normalize_query(params['query'])
-            
-            # Enhanced query info with intelligence (with null checks)
-            if query_analysis and expanded_query:
-                query_info.update({
-                    'query_analysis': query_analysis.to_dict() if hasattr(query_analysis, 'to_dict') else {},
-                    'expanded_query': expanded_query,
-                    'intent': getattr(query_analysis, 'intent', 'unknown').value if hasattr(getattr(query_analysis, 'intent', 'unknown'), 'value') else str(getattr(query_analysis, 'intent', 'unknown')),
-                    'specificity_score': getattr(query_analysis, 'specificity_score', 0.5),
-                    'search_strategy': getattr(query_analysis, 'search_strategy', 'balanced_hybrid')
-                })
-            else:
-                # Add basic fallback info
-                query_info.update({
-                    'intent': 'unknown',
-                    'specificity_score': 0.5,
-                    'search_strategy': 'balanced_hybrid',
-                    'query_expansion_applied': False
-                })
+            # Later pages are served from the ranked snapshot behind the cursor
+            deepen = False
+            if params.get('cursor'):
+                with trace.stage('cursor_lookup'):
+                    decoded = self.cursor_store.decode(params['cursor'])
+                    snapshot = self.cursor_store.get(decoded[0]) if decoded else None
+                cursor_error = self._cursor_error(snapshot, params)
+                if cursor_error:
+                    return Response(cursor_error, status=status.HTTP_400_BAD_REQUEST)
+                
+                token, offset = decoded
+                if self.cursor_store.covers(snapshot, offset, params['limit']):
+                    return self._serve_cursor_page(params, snapshot, token, offset, start_time, trace)
+                
+                # The snapshot ends before this page: re-run its search, ranking deeper
+                params = dict(
+                    params, query=snapshot['query'], mode=snapshot['mode'],
+                    filters=snapshot['filters'], offset=offset, cursor=None
+                )
+                deepen = True
+            
+            # Latency budget: optional stages are skipped once they no longer fit
+            deadline = SearchDeadline(params.get('budget_ms'), params['mode'])
+            
+            # Normalization, query intelligence and expansion run once per query
+            # string; every later stage reads the shared plan
+            with trace.stage('query_plan'):
+                query_plan = self.query_planner.plan(params['query'], params['mode'])
+                query_info = query_plan.query_info()
+            
+            # Serve repeated searches from the versioned result cache
+            cache_key = None
+            if self.result_cache.enabled and not params.get('debug', False):
+                with trace.stage('cache_lookup'):
+                    cache_key = self.result_cache.build_key(query_info['normalized_query'], params)
+                    cached_response = self.result_cache.get(cache_key)
+                if cached_response is not None and self._cursor_is_live(cached_response):
+                    latency = (time.time() - start_time) * 1000
+                    get_stage_metrics().record_trace(trace, latency)
+                    cached_response['search_metadata']['latency_ms'] = round(latency, 2)
+                    cached_response['search_metadata']['cache_hit'] = True
+                    return Response(cached_response, status=status.HTTP_200_OK)
+            
+            # TIER 1 ENHANCEMENT: Advanced query analysis (None when it failed)
+            query_analysis = query_plan.analysis if query_plan.has_intelligence else None
+            expanded_query = query_info.get('expanded_query')
+            
+            # Rank the requested page plus a lookahead for its cursors; only a
+            # followed cursor the snapshot can't serve ranks deeper
+            ranking_depth = self.cursor_store.ranking_depth(params['offset'], params['limit'], deepen)
             
             # Perform search based on mode
             if params['mode'] == 'lexical':
-                search_results = self._perform_lexical_search(params, query_info)
+                search_results = self._perform_lexical_search(params, query_info, trace)
             elif params['mode'] == 'semantic':
-                search_results = self._perform_semantic_search(params, query_info)
+                search_results = self._perform_semantic_search(params, query_info, trace)
             else:  # hybrid
-                search_results = self._perform_hybrid_search(params, query_info)
+                search_results = self._perform_hybrid_search(params, query_info, trace, deadline, query_plan)
             
             # Apply advanced ranking
-            ranked_results = self.ranking_service.rank_results(
-                search_results.get('vector_results', []),
-                search_results.get('keyword_results', []),
-                params['query'],
-                None,  # exact_case_match - will be handled by fast ranking service
-                params.get('filters'),
-                params['limit']  # Pass the limit parameter to control number of results
-            )
+            with trace.stage('ranking'):
+                ranked_results = self.ranking_service.rank_results(
+                    search_results.get('vector_results', []),
+                    search_results.get('keyword_results', []),
+                    params['query'],
+                    None,  # exact_case_match - will be handled by fast ranking service
+                    params.get('filters'),
+                    ranking_depth  # Controls how many ranked results are kept
+                )
             
             # TIER 1 ENHANCEMENT: Apply quality-based optimization (with timeout protection)
             try:
-                quality_optimized_results = self.quality_engine.optimize_results_by_quality(
-                    ranked_results, 
-                    query_analysis=query_info, 
-                    max_results=params['limit'] * 2  # Allow more for quality filtering
-                )
+                if deadline.fits('quality'):
+                    with trace.stage('quality'):
+                        quality_optimized_results = self.quality_engine.optimize_results_by_quality(
+                            ranked_results, 
+                            query_analysis=query_info, 
+                            max_results=ranking_depth  # The page and its lookahead
+                        )
+                else:
+                    quality_optimized_results = ranked_results
             except Exception as e:
                 logger.warning(f"Quality optimization failed, using ranked results: {e}")
                 quality_optimized_results = ranked_results
             
             # Apply conservative relevance-based result cutoff
-            final_results = self._apply_relevance_cutoff(quality_optimized_results, params, query_info)
-            
-            # Generate snippets if requested
-            if params.get('highlight', False):
-                for result in final_results:
-                    result['snippets'] = self.snippet_service.generate_snippets(
-                        result['case_id'],
-                        params['query'],
-                        query_info
-                    )
+            with trace.stage('relevance_cutoff'):
+                final_results = self._apply_relevance_cutoff(quality_optimized_results, params, query_info)
             
             # Compute facets if requested
             facets = {}
-            if params.get('return_facets', False):
-                facets = self.faceting_service.compute_facets(
-                    result_case_ids=[r['case_id'] for r in ranked_results],
-                    filters=params.get('filters')
-                )
+            if params.get('return_facets', False) and deadline.fits('facets'):
+                with trace.stage('facets'):
+                    facets = self.faceting_service.compute_facets(
+                        result_case_ids=[r['case_id'] for r in ranked_results],
+                        filters=params.get('filters')
+                    )
             
             # Apply pagination
-            paginated_results = self._apply_pagination(final_results, params)
+            with trace.stage('pagination'):
+                paginated_results = self._apply_pagination(final_results, params)
+            
+            # Generate snippets for the returned page only
+            if params.get('highlight', False) and deadline.fits('snippets', deadline.estimate_ms('snippet_per_result')):
+                with trace.stage('snippets'):
+                    self._generate_snippets_within_deadline(
+                        paginated_results['results'], params, query_info, deadline, trace
+                    )
             
             # Calculate latency
             latency = (time.time() - start_time) * 1000  # Convert to milliseconds
+            get_stage_metrics().record_trace(trace, latency)
             
             # Build response
             response_data = {
@@ -160,7 +202,9 @@ class SearchAPIView(APIView):
                     'offset': params['offset'],
                     'limit': params['limit'],
                     'has_next': paginated_results['has_next'],
-                    'has_previous': paginated_results['has_previous']
+                    'has_previous': paginated_results['has_previous'],
+                    'next_cursor': None,
+                    'previous_cursor': None
                 },
                 'facets': facets,
                 'query_info': {
@@ -184,34 +228,32 @@ class SearchAPIView(APIView):
                     'search_type': 'hybrid' if params['mode'] == 'hybrid' else params['mode'],
                     # TIER 1 ENHANCEMENT: Quality indicators
                     'quality_optimization_applied': True,
-                    'average_quality_score': sum(r.get('quality_score', 0) for r in final_results) / len(final_results) if final_results else 0
+                    'average_quality_score': sum(r.get('quality_score', 0) for r in final_results) / len(final_results) if final_results else 0,
+                    'cache_hit': False,
+                    'latency_budget': deadline.to_dict(),
+                    'skipped_stages': [stage['stage'] for stage in deadline.degraded_stages]
                 }
             }
             
+            # Snapshot the ranked list so later pages skip the search pipeline
+            if paginated_results['total'] > params['limit']:
+                with trace.stage('cursor_store'):
+                    cursor_token = self.cursor_store.create(
+                        final_results, params, query_info,
+                        response_query_info=response_data['query_info'],
+                        facets=facets,
+                        complete=len(ranked_results) < ranking_depth
+                    )
+                response_data['pagination'].update(self.cursor_store.page_cursors(
+                    cursor_token, params['offset'], params['limit'], paginated_results['total']
+                ))
+            
             # Ensure results have proper score fields and case information for display
-            for result in response_data['results']:
-                # Extract scores from the fast ranking service results
-                if 'vector_score' in result:
-                    result['vector_score'] = round(result['vector_score'], 4)
-                if 'keyword_score' in result:
-                    result['keyword_score'] = round(result['keyword_score'], 4)
-                if 'final_score' in result:
-                    result['final_score'] = round(result['final_score'], 4)
-                if 'base_score' in result:
-                    result['base_score'] = round(result['base_score'], 4)
-                
-                # Extract case information from result_data if available
-                if 'result_data' in result:
-                    result_data = result['result_data']
-                    # Update result with case information from result_data
-                    result.update({
-                        'case_title': result_data.get('case_title', ''),
-                        'case_number': result_data.get('case_number', ''),
-                        'court': result_data.get('court', ''),
-                        'status': result_data.get('status', ''),
-                        'institution_date': result_data.get('institution_date'),
-                        'hearing_date': result_data.get('hearing_date')
-                    })
+            self._format_results(response_data['results'])
+            
+            # Degraded responses are not cached so a later request can get the full pipeline
+            if cache_key and not deadline.is_degraded:
+                self.result_cache.set(cache_key, response_data)
             
             # Add debug information if requested
             if params.get('debug', False):
@@ -221,8 +263,9 @@ class SearchAPIView(APIView):
                     'boost_signals': query_info.get('boost_signals', {}),
                     'search_performance': {
                         'query_time': latency,
-                        'ranking_time': 0,  # Would need to measure separately
-                        'facet_time': 0,    # Would need to measure separately
+                        'ranking_time': round(trace.stages.get('ranking', 0.0), 2),
+                        'facet_time': round(trace.stages.get('facets', 0.0), 2),
+                        'stages': trace.to_dict(),
                     }
                 }
             
@@ -257,6 +300,10 @@ class SearchAPIView(APIView):
                     query_dict['return_facets'] = str(request.data['return_facets'])
                 if 'highlight' in request.data:
                     query_dict['highlight'] = str(request.data['highlight'])
+                if 'budget_ms' in request.data:
+                    query_dict['budget_ms'] = str(request.data['budget_ms'])
+                if 'cursor' in request.data:
+                    query_dict['cursor'] = str(request.data['cursor'])
                 
                 # Create a new request object with GET parameters
                 request.GET = query_dict
@@ -277,18 +324,22 @@ class SearchAPIView(APIView):
             params = {
                 'query': request.GET.get('q', '').strip(),
                 'mode': request.GET.get('mode', 'hybrid').lower(),
-                'filters': self._parse_filters(request),
+                'filters': self._parse_filters(request.GET),
                 'offset': int(request.GET.get('offset', 0)),
                 'limit': min(int(request.GET.get('limit', 10)), 1000),  # Cap at 1000 for better user experience
                 'return_facets': request.GET.get('return_facets', 'false').lower() == 'true',
                 'highlight': request.GET.get('highlight', 'false').lower() == 'true',
                 'debug': request.GET.get('debug', 'false').lower() == 'true',
+                # Optional latency budget; defaults per mode from settings
+                'budget_ms': float(request.GET['budget_ms']) if request.GET.get('budget_ms') else None,
+                # Opaque cursor from a previous response's pagination block
+                'cursor': request.GET.get('cursor', '').strip() or None,
                 'is_valid': True,
                 'errors': []
             }
             
             # Validate required parameters
-            if not params['query']:
+            if not params['query'] and not params['cursor']:
                 params['is_valid'] = False
                 params['errors'].append('Query parameter "q" is required')
             
@@ -304,6 +355,10 @@ class SearchAPIView(APIView):
                 params['is_valid'] = False
                 params['errors'].append('Limit must be positive')
             
+            if params['budget_ms'] is not None and params['budget_ms'] <= 0:
+                params['is_valid'] = False
+                params['errors'].append('Budget must be positive')
+            
             return params
             
         except (ValueError, TypeError) as e:
@@ -312,12 +367,12 @@ class SearchAPIView(APIView):
                 'errors': [f'Parameter parsing error: {str(e)}']
             }
     
-    def _parse_filters(self, request) -> Dict[str, Any]:
-        """Parse filter parameters"""
+    def _parse_filters(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """Parse filter parameters from the query string or a request body mapping"""
         filters = {}
         
         # Court filter
-        court_filter = request.GET.get('court')
+        court_filter = values.get('court')
         if court_filter:
             try:
                 # Try to parse as court ID first
@@ -330,7 +385,7 @@ class SearchAPIView(APIView):
                 filters['court'] = court_filter  # Use as name
         
         # Year filter
-        year_filter = request.GET.get('year')
+        year_filter = values.get('year')
         if year_filter:
             try:
                 filters['year'] = int(year_filter)
@@ -338,36 +393,45 @@ class SearchAPIView(APIView):
                 pass  # Ignore invalid year
         
         # Status filter
-        status_filter = request.GET.get('status')
+        status_filter = values.get('status')
         if status_filter:
             filters['status'] = status_filter
         
         # Judge filter
-        judge_filter = request.GET.get('judge')
+        judge_filter = values.get('judge')
         if judge_filter:
             filters['judge'] = judge_filter
         
         # Section filter
-        section_filter = request.GET.get('section')
+        section_filter = values.get('section')
         if section_filter:
             filters['section'] = section_filter
         
         # Citation filter
-        citation_filter = request.GET.get('citation')
+        citation_filter = values.get('citation')
         if citation_filter:
             filters['citation'] = citation_filter
         
+        # Institution date range filters (dd-mm-YYYY or YYYY-mm-dd)
+        for date_key in ('date_from', 'date_to'):
+            date_filter = parse_case_date(values.get(date_key))
+            if date_filter:
+                filters[date_key] = date_filter.isoformat()
+        
         return filters
     
-    def _perform_lexical_search(self, params: Dict[str, Any], query_info: Dict[str, Any]) -> Dict[str, Any]:
+    def _perform_lexical_search(self, params: Dict[str, Any], query_info: Dict[str, Any],
+                                trace: SearchTrace = None) -> Dict[str, Any]:
         """Perform lexical-only search"""
+        trace = trace or SearchTrace()
         try:
             # Use keyword service for lexical search
-            keyword_results = self.hybrid_service.keyword_service.search(
-                params['query'],
-                filters=params.get('filters'),
-                top_k=params['limit'] * 2  # Get more for ranking
-            )
+            with trace.stage('retrieval_keyword'):
+                keyword_results = self.hybrid_service.keyword_service.search(
+                    params['query'],
+                    filters=params.get('filters'),
+                    top_k=params['limit'] * 2  # Get more for ranking
+                )
             
             return {
                 'vector_results': [],
@@ -378,33 +442,29 @@ class SearchAPIView(APIView):
             logger.error(f"Error in lexical search: {str(e)}")
             return {'vector_results': [], 'keyword_results': []}
     
-    def _perform_semantic_search(self, params: Dict[str, Any], query_info: Dict[str, Any]) -> Dict[str, Any]:
+    def _perform_semantic_search(self, params: Dict[str, Any], query_info: Dict[str, Any],
+                                 trace: SearchTrace = None) -> Dict[str, Any]:
         """Perform semantic-only search with adaptive result limiting"""
+        trace = trace or SearchTrace()
         try:
             # Determine adaptive fetch size based on query characteristics
-            base_fetch_size = params['limit'] * 5  # Start with 5x the requested limit
-            
-            # Adjust fetch size based on query specificity
-            query_specificity = self._calculate_query_specificity(params['query'], query_info)
-            if query_specificity < 0.3:  # Generic query
-                max_fetch_size = 200  # Allow more results for generic queries
-            elif query_specificity < 0.6:  # Moderately specific
-                max_fetch_size = 100
-            else:  # Very specific query
-                max_fetch_size = 50
-            
-            fetch_size = min(base_fetch_size, max_fetch_size)
+            fetch_size, query_specificity = self._semantic_fetch_plan(params, query_info)
             
             # Use vector service for semantic search
-            vector_results = self.hybrid_service.vector_service.search(
-                params['query'],
-                top_k=fetch_size
-            )
+            with trace.stage('retrieval_vector'):
+                vector_results = self.hybrid_service.vector_service.search(
+                    params['query'],
+                    top_k=fetch_size
+                )
+            
+            # Vector retrieval takes no filters; apply them to the candidates
+            vector_results = self.hybrid_service.apply_result_filters(vector_results, params.get('filters'))
             
             # Apply adaptive filtering based on score distribution
-            filtered_vector_results = self._apply_adaptive_semantic_filtering(
-                vector_results, params['query'], query_specificity
-            )
+            with trace.stage('adaptive_filtering'):
+                filtered_vector_results = self._apply_adaptive_semantic_filtering(
+                    vector_results, params['query'], query_specificity
+                )
             
             logger.info(f"Semantic search: {len(vector_results)} raw results, {len(filtered_vector_results)} after adaptive filtering (specificity: {query_specificity:.2f})")
             
@@ -417,8 +477,26 @@ class SearchAPIView(APIView):
             logger.error(f"Error in semantic search: {str(e)}")
             return {'vector_results': [], 'keyword_results': []}
     
-    def _perform_hybrid_search(self, params: Dict[str, Any], query_info: Dict[str, Any]) -> Dict[str, Any]:
+    def _semantic_fetch_plan(self, params: Dict[str, Any], query_info: Dict[str, Any]) -> Tuple[int, float]:
+        """Adaptive semantic fetch size and the query specificity it was derived from"""
+        base_fetch_size = params['limit'] * 5  # Start with 5x the requested limit
+        
+        # Adjust fetch size based on query specificity
+        query_specificity = self._calculate_query_specificity(params['query'], query_info)
+        if query_specificity < 0.3:  # Generic query
+            max_fetch_size = 200  # Allow more results for generic queries
+        elif query_specificity < 0.6:  # Moderately specific
+            max_fetch_size = 100
+        else:  # Very specific query
+            max_fetch_size = 50
+        
+        return min(base_fetch_size, max_fetch_size), query_specificity
+    
+    def _perform_hybrid_search(self, params: Dict[str, Any], query_info: Dict[str, Any],
+                               trace: SearchTrace = None, deadline: SearchDeadline = None,
+                               query_plan: QueryPlan = None) -> Dict[str, Any]:
         """Perform hybrid search with adaptive result limiting"""
+        trace = trace or SearchTrace()
         try:
             # IMPROVED: Use conservative fetch size to ensure relevant results are included
             # The hybrid search service has internal filtering that can push out relevant results
@@ -429,74 +507,219 @@ class SearchAPIView(APIView):
             hybrid_results = self.hybrid_service.hybrid_search(
                 params['query'],
                 filters=params.get('filters'),
-                top_k=fetch_size
+                top_k=fetch_size,
+                trace=trace,
+                deadline=deadline,
+                query_plan=query_plan
             )
             
-            # Calculate query specificity for adaptive filtering
-            query_specificity = self._calculate_query_specificity(params['query'], query_info)
+            return self._split_hybrid_results(hybrid_results, params, query_info, trace)
             
-            # Apply adaptive filtering based on score distribution
+        except Exception as e:
+            logger.error(f"Error in hybrid search: {str(e)}")
+            return {'vector_results': [], 'keyword_results': []}
+    
+    def _split_hybrid_results(self, hybrid_results: List[Dict], params: Dict[str, Any],
+                              query_info: Dict[str, Any], trace: SearchTrace) -> Dict[str, Any]:
+        """Adaptively filter hybrid results and split them into vector/keyword lists for ranking"""
+        # Calculate query specificity for adaptive filtering
+        query_specificity = self._calculate_query_specificity(params['query'], query_info)
+        
+        # Apply adaptive filtering based on score distribution
+        with trace.stage('adaptive_filtering'):
             filtered_results = self._apply_adaptive_hybrid_filtering(
                 hybrid_results, params['query'], query_specificity
             )
+        
+        # Convert to expected format for fast ranking service
+        vector_results = []
+        keyword_results = []
+        
+        for result in filtered_results:
+            # Each hybrid result contains both vector and keyword scores
+            vector_score = result.get('vector_score', 0)
+            keyword_score = result.get('keyword_score', 0)
+            final_score = result.get('final_score', 0)
+            
+            if vector_score > 0:
+                vector_results.append({
+                    'case_id': result['case_id'],
+                    'similarity': vector_score,  # Use vector_score as similarity
+                    'case_number': result.get('case_number', ''),
+                    'case_title': result.get('case_title', ''),
+                    'court': result.get('court', ''),
+                    'status': result.get('status', ''),
+                    'institution_date': result.get('institution_date'),
+                    'hearing_date': result.get('hearing_date')
+                })
             
-            # Convert to expected format for fast ranking service
-            vector_results = []
-            keyword_results = []
+            if keyword_score > 0:
+                keyword_results.append({
+                    'case_id': result['case_id'],
+                    'rank': keyword_score,  # Use keyword_score as rank
+                    'case_number': result.get('case_number', ''),
+                    'case_title': result.get('case_title', ''),
+                    'court': result.get('court', ''),
+                    'status': result.get('status', ''),
+                    'institution_date': result.get('institution_date'),
+                    'hearing_date': result.get('hearing_date')
+                })
             
-            for result in filtered_results:
-                # Each hybrid result contains both vector and keyword scores
-                vector_score = result.get('vector_score', 0)
-                keyword_score = result.get('keyword_score', 0)
-                final_score = result.get('final_score', 0)
-                
-                if vector_score > 0:
-                    vector_results.append({
-                        'case_id': result['case_id'],
-                        'similarity': vector_score,  # Use vector_score as similarity
-                        'case_number': result.get('case_number', ''),
-                        'case_title': result.get('case_title', ''),
-                        'court': result.get('court', ''),
-                        'status': result.get('status', ''),
-                        'institution_date': result.get('institution_date'),
-                        'hearing_date': result.get('hearing_date')
-                    })
-                
-                if keyword_score > 0:
-                    keyword_results.append({
-                        'case_id': result['case_id'],
-                        'rank': keyword_score,  # Use keyword_score as rank
-                        'case_number': result.get('case_number', ''),
-                        'case_title': result.get('case_title', ''),
-                        'court': result.get('court', ''),
-                        'status': result.get('status', ''),
-                        'institution_date': result.get('institution_date'),
-                        'hearing_date': result.get('hearing_date')
-                    })
+            # If neither score is > 0 but final_score is meaningful, include as vector result
+            if vector_score == 0 and keyword_score == 0 and final_score > 0:
+                vector_results.append({
+                    'case_id': result['case_id'],
+                    'similarity': final_score,  # Use final_score as similarity
+                    'case_number': result.get('case_number', ''),
+                    'case_title': result.get('case_title', ''),
+                    'court': result.get('court', ''),
+                    'status': result.get('status', ''),
+                    'institution_date': result.get('institution_date'),
+                    'hearing_date': result.get('hearing_date')
+                })
+        
+        logger.info(f"Hybrid search: {len(hybrid_results)} raw results, {len(filtered_results)} after adaptive filtering, {len(vector_results)} vector + {len(keyword_results)} keyword (specificity: {query_specificity:.2f})")
+        
+        return {
+            'vector_results': vector_results,
+            'keyword_results': keyword_results
+        }
+    
+    def _generate_snippets_within_deadline(self, results: List[Dict], params: Dict[str, Any],
+                                           query_info: Dict[str, Any], deadline: SearchDeadline,
+                                           trace: SearchTrace = None) -> None:
+        """
+        Generate the page's snippets in one batch, capped to the results the latency budget allows
+        
+        The batch is sized from the observed cost per snippet; the cost
+        measured here is recorded on the trace as ``snippet_per_result`` so
+        the stage metrics keep that estimate current.
+        """
+        per_result_estimate = deadline.estimate_ms('snippet_per_result')
+        completed = len(results)
+        if per_result_estimate > 0:
+            completed = max(1, min(completed, int(deadline.remaining_ms() // per_result_estimate)))
+        
+        page = results[:completed]
+        batch_start = time.perf_counter()
+        snippets = self.snippet_service.generate_snippets_batch(
+            [result['case_id'] for result in page],
+            params['query'],
+            query_info,
+            deadline=deadline
+        )
+        if trace is not None and page:
+            trace.record('snippet_per_result', (time.perf_counter() - batch_start) * 1000 / len(page))
+        for result in page:
+            result['snippets'] = snippets.get(result['case_id'], [])
+        
+        if completed < len(results):
+            deadline.record_capped('snippets', completed, len(results))
+    
+    def _format_results(self, results: List[Dict]) -> None:
+        """Round score fields and copy case information from result_data for display"""
+        for result in results:
+            # Extract scores from the fast ranking service results
+            if 'vector_score' in result:
+                result['vector_score'] = round(result['vector_score'], 4)
+            if 'keyword_score' in result:
+                result['keyword_score'] = round(result['keyword_score'], 4)
+            if 'final_score' in result:
+                result['final_score'] = round(result['final_score'], 4)
+            if 'base_score' in result:
+                result['base_score'] = round(result['base_score'], 4)
                 
-                # If neither score is > 0 but final_score is meaningful, include as vector result
-                if vector_score == 0 and keyword_score == 0 and final_score > 0:
-                    vector_results.append({
-                        'case_id': result['case_id'],
-                        'similarity': final_score,  # Use final_score as similarity
-                        'case_number': result.get('case_number', ''),
-                        'case_title': result.get('case_title', ''),
-                        'court': result.get('court', ''),
-                        'status': result.get('status', ''),
-                        'institution_date': result.get('institution_date'),
-                        'hearing_date': result.get('hearing_date')
-                    })
-            
-            logger.info(f"Hybrid search: {len(hybrid_results)} raw results, {len(filtered_results)} after adaptive filtering, {len(vector_results)} vector + {len(keyword_results)} keyword (specificity: {query_specificity:.2f})")
-            
+            # Extract case information from result_data if available
+            if 'result_data' in result:
+                result_data = result['result_data']
+                # Update result with case information from result_data
+                result.update({
+                    'case_title': result_data.get('case_title', ''),
+                    'case_number': result_data.get('case_number', ''),
+                    'court': result_data.get('court', ''),
+                    'status': result_data.get('status', ''),
+                    'institution_date': result_data.get('institution_date'),
+                    'hearing_date': result_data.get('hearing_date')
+                })
+    
+    def _cursor_is_live(self, response_data: Dict[str, Any]) -> bool:
+        """Whether the cursors in a cached response still point at a stored snapshot"""
+        pagination = response_data.get('pagination', {})
+        cursor = pagination.get('next_cursor') or pagination.get('previous_cursor')
+        if not cursor:
+            return True
+        decoded = self.cursor_store.decode(cursor)
+        return bool(decoded) and self.cursor_store.touch(decoded[0])
+    
+    def _serve_cursor_page(self, params: Dict[str, Any], snapshot: Dict[str, Any], token: str, offset: int,
+                           start_time: float, trace: SearchTrace) -> Response:
+        """Serve a page from a ranked snapshot: one cache read plus one hydration query"""
+        entries = snapshot['results'][offset:offset + params['limit']]
+        
+        with trace.stage('hydration'):
+            results = self.cursor_store.hydrate(entries)
+        
+        if params.get('highlight', False):
+            query = params['query'] or snapshot['query']
+            deadline = SearchDeadline(params.get('budget_ms'), snapshot['mode'])
+            if deadline.fits('snippets', deadline.estimate_ms('snippet_per_result')):
+                with trace.stage('snippets'):
+                    self._generate_snippets_within_deadline(
+                        results, dict(params, query=query), snapshot['query_info'], deadline, trace
+                    )
+        
+        latency = (time.time() - start_time) * 1000
+        get_stage_metrics().record_trace(trace, latency)
+        
+        return Response(
+            self._cursor_page_payload(snapshot, token, offset, results, params, latency),
+            status=status.HTTP_200_OK
+        )
+    
+    def _cursor_error(self, snapshot: Optional[Dict[str, Any]], params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Error payload for a cursor that can't serve this request, else None"""
+        if snapshot is None:
             return {
-                'vector_results': vector_results,
-                'keyword_results': keyword_results
+                'error': 'Invalid search parameters',
+                'details': ['Cursor is invalid or has expired; repeat the search without a cursor']
             }
-            
-        except Exception as e:
-            logger.error(f"Error in hybrid search: {str(e)}")
-            return {'vector_results': [], 'keyword_results': []}
+        if params.get('query') and params['query'] != snapshot['query']:
+            return {
+                'error': 'Invalid search parameters',
+                'details': ['Cursor belongs to a different query; repeat the search without a cursor']
+            }
+        return None
+    
+    def _cursor_page_payload(self, snapshot: Dict[str, Any], token: str, offset: int, results: List[Dict],
+                             params: Dict[str, Any], latency: float) -> Dict[str, Any]:
+        """Response body for a page served from a ranked snapshot"""
+        total = len(snapshot['results'])
+        self._format_results(results)
+        
+        pagination = {
+            'total': total,
+            'offset': offset,
+            'limit': params['limit'],
+            'has_next': offset + params['limit'] < total,
+            'has_previous': offset > 0
+        }
+        pagination.update(self.cursor_store.page_cursors(token, offset, params['limit'], total))
+        
+        return {
+            'results': results,
+            'pagination': pagination,
+            'facets': snapshot['facets'] if params.get('return_facets', False) else {},
+            'query_info': snapshot['response_query_info'],
+            'search_metadata': {
+                'mode': snapshot['mode'],
+                'total_results': total,
+                'latency_ms': round(latency, 2),
+                'search_type': snapshot['mode'],
+                'cache_hit': False,
+                'cursor_page': True,
+                'index_version': snapshot['index_version']
+            }
+        }
     
     def _apply_pagination(self, results: List[Dict], params: Dict[str, Any]) -> Dict[str, Any]:
         """Apply pagination to results"""
@@ -713,12 +936,330 @@ class SearchAPIView(APIView):
             return ranked_results
 
 
+class BatchSearchAPIView(SearchAPIView):
+    """
+    Batch search endpoint for offline and analytics workloads.
+    
+    Runs many queries in one request: query embeddings are encoded in a
+    single forward pass, keyword search reuses the loaded BM25 index, and
+    the learned reranker scores all (query, candidate) pairs together.
+    Results are returned per query without snippets or facets.
+    """
+    
+    http_method_names = ['post', 'options']
+    
+    def post(self, request):
+        """Handle batch search requests"""
+        try:
+            start_time = time.time()
+            trace = SearchTrace()
+            
+            params = self._parse_batch_params(request)
+            if not params['is_valid']:
+                return Response({
+                    'error': 'Invalid search parameters',
+                    'details': params['errors']
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            queries = params['queries']
+            with trace.stage('query_plan'):
+                # Batch ranking uses the basic intent/specificity defaults
+                query_plans = [self.query_planner.plan(query, params['mode']) for query in queries]
+                query_infos = [query_plan.query_info(include_intelligence=False) for query_plan in query_plans]
+            
+            query_params = [dict(params, query=query) for query in queries]
+            batch_search_results = self._perform_batch_search(params, query_params, query_infos, trace, query_plans)
+            
+            batch_results = []
+            for query_param, query_info, search_results in zip(query_params, query_infos, batch_search_results):
+                try:
+                    with trace.stage('ranking'):
+                        ranked_results = self.ranking_service.rank_results(
+                            search_results.get('vector_results', []),
+                            search_results.get('keyword_results', []),
+                            query_param['query'],
+                            None,
+                            params.get('filters'),
+                            params['limit']
+                        )
+                    
+                    try:
+                        with trace.stage('quality'):
+                            ranked_results = self.quality_engine.optimize_results_by_quality(
+                                ranked_results,
+                                query_analysis=query_info,
+                                max_results=params['limit'] * 2
+                            )
+                    except Exception as e:
+                        logger.warning(f"Quality optimization failed, using ranked results: {e}")
+                    
+                    with trace.stage('relevance_cutoff'):
+                        final_results = self._apply_relevance_cutoff(ranked_results, query_param, query_info)[:params['limit']]
+                    self._format_results(final_results)
+                    
+                    batch_results.append({
+                        'query': query_param['query'],
+                        'normalized_query': query_info['normalized_query'],
+                        'total': len(final_results),
+                        'results': final_results
+                    })
+                except Exception as e:
+                    logger.error(f"Error ranking batch query '{query_param['query']}': {str(e)}")
+                    batch_results.append({
+                        'query': query_param['query'],
+                        'total': 0,
+                        'results': [],
+                        'error': str(e)
+                    })
+            
+            latency = (time.time() - start_time) * 1000
+            
+            return Response({
+                'results': batch_results,
+                'batch_metadata': {
+                    'mode': params['mode'],
+                    'query_count': len(queries),
+                    'limit': params['limit'],
+                    'latency_ms': round(latency, 2),
+                    'avg_latency_per_query_ms': round(latency / len(queries), 2),
+                    'stages': trace.to_dict()
+                }
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error in batch search API: {str(e)}")
+            return Response({
+                'error': 'Internal server error',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def _parse_batch_params(self, request) -> Dict[str, Any]:
+        """Parse and validate batch search parameters from the request body"""
+        try:
+            data = request.data if hasattr(request, 'data') else {}
+            queries = data.get('queries') or []
+            max_queries = getattr(settings, 'SEARCH_BATCH_MAX_QUERIES', 100)
+            
+            # Filters use the same names and parsing as the single search endpoint
+            filters = {key: str(value) for key, value in (data.get('filters') or {}).items() if value is not None}
+            
+            params = {
+                'queries': [str(query).strip() for query in queries] if isinstance(queries, list) else [],
+                'mode': str(data.get('mode', 'hybrid')).lower(),
+                'filters': self._parse_filters(filters),
+                'limit': min(int(data.get('limit', 10)), 100),
+                'is_valid': True,
+                'errors': []
+            }
+            
+            if not params['queries'] or not all(params['queries']):
+                params['is_valid'] = False
+                params['errors'].append('"queries" must be a non-empty list of non-empty strings')
+            
+            if len(params['queries']) > max_queries:
+                params['is_valid'] = False
+                params['errors'].append(f'At most {max_queries} queries are allowed per batch')
+            
+            if params['mode'] not in ['lexical', 'semantic', 'hybrid']:
+                params['is_valid'] = False
+                params['errors'].append('Mode must be one of: lexical, semantic, hybrid')
+            
+            if params['limit'] <= 0:
+                params['is_valid'] = False
+                params['errors'].append('Limit must be positive')
+            
+            return params
+            
+        except (ParseError, ValueError, TypeError, AttributeError) as e:
+            return {
+                'is_valid': False,
+                'errors': [f'Parameter parsing error: {str(e)}']
+            }
+    
+    def _perform_batch_search(self, params: Dict[str, Any], query_params: List[Dict[str, Any]],
+                              query_infos: List[Dict[str, Any]], trace: SearchTrace,
+                              query_plans: List[QueryPlan] = None) -> List[Dict[str, Any]]:
+        """Retrieve candidates for every query, sharing model passes across the batch"""
+        queries = [query_param['query'] for query_param in query_params]
+        
+        try:
+            if params['mode'] == 'lexical':
+                with trace.stage('retrieval_keyword'):
+                    return [
+                        {
+                            'vector_results': [],
+                            'keyword_results': self.hybrid_service.keyword_service.search(
+                                query, filters=params.get('filters'), top_k=params['limit'] * 2
+                            )
+                        }
+                        for query in queries
+                    ]
+            
+            if params['mode'] == 'semantic':
+                plans = [
+                    self._semantic_fetch_plan(query_param, query_info)
+                    for query_param, query_info in zip(query_params, query_infos)
+                ]
+                vector_service = self.hybrid_service.vector_service
+                with trace.stage('retrieval_vector'):
+                    max_fetch_size = max(fetch_size for fetch_size, _ in plans)
+                    if hasattr(vector_service, 'search_batch'):
+                        batch_vector_results = vector_service.search_batch(queries, top_k=max_fetch_size)
+                    else:
+                        batch_vector_results = [vector_service.search(query, top_k=max_fetch_size) for query in queries]
+                
+                batch_search_results = []
+                with trace.stage('adaptive_filtering'):
+                    for query, (fetch_size, specificity), vector_results in zip(queries, plans, batch_vector_results):
+                        batch_search_results.append({
+                            'vector_results': self._apply_adaptive_semantic_filtering(
+                                self.hybrid_service.apply_result_filters(vector_results[:fetch_size], params.get('filters')),
+                                query, specificity
+                            ),
+                            'keyword_results': []
+                        })
+                return batch_search_results
+            
+            # hybrid: same fixed fetch size as the single search endpoint
+            batch_hybrid_results = self.hybrid_service.batch_hybrid_search(
+                queries,
+                filters=params.get('filters'),
+                top_k=20,
+                trace=trace,
+                query_plans=query_plans
+            )
+            return [
+                self._split_hybrid_results(hybrid_results, query_param, query_info, trace)
+                for hybrid_results, query_param, query_info in zip(batch_hybrid_results, query_params, query_infos)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in batch retrieval: {str(e)}")
+            return [{'vector_results': [], 'keyword_results': []} for _ in queries]
+
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSearchAPIView(View):
+    """
+    ASGI search endpoint.
+    
+    Cursor pages are served natively: the snapshot is read with the async
+    cache API and the page's cases are hydrated with one async query, so no
+    worker thread is used. Every other search runs the regular
+    ``SearchAPIView`` pipeline on the bounded search executor, keeping model
+    inference off the event loop. When the executor is saturated the request
+    is rejected with 503 instead of queueing without bound.
+    """
+    
+    http_method_names = ['get', 'post', 'options']
+    
+    async def get(self, request):
+        """Handle GET search requests"""
+        try:
+            if request.GET.get('cursor') and request.GET.get('highlight', 'false').lower() != 'true':
+                return await self._serve_cursor_page(request)
+            return await get_search_executor().run(self._run_search, request)
+        except ExecutorSaturated as e:
+            return self._saturated_response(e)
+        except Exception as e:
+            logger.error(f"Error in async search API: {str(e)}")
+            return JsonResponse({
+                'error': 'Internal server error',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    async def post(self, request):
+        """Handle POST search requests"""
+        try:
+            return await get_search_executor().run(self._run_search, request)
+        except ExecutorSaturated as e:
+            return self._saturated_response(e)
+        except Exception as e:
+            logger.error(f"Error in async search API: {str(e)}")
+            return JsonResponse({
+                'error': 'Internal server error',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @staticmethod
+    def _run_search(request):
+        # Runs on a worker thread; render there so serialization stays off the loop
+        response = SearchAPIView.as_view()(request)
+        response.render()
+        return response
+    
+    async def _serve_cursor_page(self, request):
+        """Serve a snapshot page with async cache and database access only"""
+        start_time = time.time()
+        trace = SearchTrace()
+        
+        try:
+            params = {
+                'query': request.GET.get('q', '').strip(),
+                'cursor': request.GET['cursor'].strip(),
+                'limit': min(int(request.GET.get('limit', 10)), 1000),
+                'return_facets': request.GET.get('return_facets', 'false').lower() == 'true',
+            }
+        except (ValueError, TypeError) as e:
+            return JsonResponse({
+                'error': 'Invalid search parameters',
+                'details': [f'Parameter parsing error: {str(e)}']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if params['limit'] <= 0:
+            return JsonResponse({
+                'error': 'Invalid search parameters',
+                'details': ['Limit must be positive']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Building the services loads models; never do that on the event loop
+        await get_search_executor().run(get_search_services)
+        search_view = SearchAPIView()
+        cursor_store = search_view.cursor_store
+        
+        with trace.stage('cursor_lookup'):
+            decoded = cursor_store.decode(params['cursor'])
+            snapshot = await cursor_store.aget(decoded[0]) if decoded else None
+        
+        cursor_error = search_view._cursor_error(snapshot, params)
+        if cursor_error:
+            return JsonResponse(cursor_error, status=status.HTTP_400_BAD_REQUEST)
+        
+        token, offset = decoded
+        if not cursor_store.covers(snapshot, offset, params['limit']):
+            # Past the end of the snapshot: the regular view re-runs the search deeper
+            return await get_search_executor().run(self._run_search, request)
+        
+        entries = snapshot['results'][offset:offset + params['limit']]
+        
+        with trace.stage('hydration'):
+            results = await cursor_store.ahydrate(entries)
+        
+        latency = (time.time() - start_time) * 1000
+        get_stage_metrics().record_trace(trace, latency)
+        
+        return JsonResponse(
+            search_view._cursor_page_payload(snapshot, token, offset, results, params, latency),
+            status=status.HTTP_200_OK
+        )
+    
+    def _saturated_response(self, error: ExecutorSaturated) -> JsonResponse:
+        logger.warning(f"Async search rejected, executor saturated: {str(error)}")
+        response = JsonResponse({
+            'error': 'Search service busy',
+            'message': 'Too many concurrent searches; retry shortly'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '1'
+        return response
+
 class SuggestAPIView(APIView):
     """Typeahead suggestions endpoint"""
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.faceting_service = FacetingService()
+        self.faceting_service = get_search_services().faceting_service
+        # Prefix index; the database lookups below are used until it is built
+        self.completion_index = get_completion_index()
     
     def get(self, request):
         """Handle GET suggestion requests"""
@@ -744,6 +1285,8 @@ class SuggestAPIView(APIView):
                 suggestions = self._get_section_suggestions(query)
             elif suggestion_type == 'judge':
                 suggestions = self._get_judge_suggestions(query)
+            elif suggestion_type == 'party':
+                suggestions = self._get_party_suggestions(query)
             else:
                 return Response({
                     'error': 'Invalid suggestion type'
@@ -775,11 +1318,19 @@ class SuggestAPIView(APIView):
         section_suggestions = self._get_section_suggestions(query)
         suggestions.extend(section_suggestions)
         
+        # Try party name suggestions
+        party_suggestions = self._get_party_suggestions(query)
+        suggestions.extend(party_suggestions)
+        
         return suggestions
     
     def _get_case_suggestions(self, query: str) -> List[Dict[str, Any]]:
         """Get case number suggestions"""
         try:
+            indexed = self.completion_index.suggest('case', query, 5)
+            if indexed is not None:
+                return indexed
+            
             cases = Case.objects.filter(
                 case_number__icontains=query
             ).order_by('-created_at')[:5]
@@ -804,6 +1355,12 @@ class SuggestAPIView(APIView):
         try:
             from apps.cases.models import Term, Case
             
+            indexed = self.completion_index.suggest('citation', query, 3)
+            if indexed is not None:
+                # Case numbers complete citations too
+                cases = self.completion_index.suggest('case', query, 3) or []
+                return indexed + [dict(case, type='citation') for case in cases]
+            
             suggestions = []
             
             # Try to find citation-like terms in the Term model
@@ -856,6 +1413,15 @@ class SuggestAPIView(APIView):
         try:
             from apps.cases.models import Term, Case
             
+            indexed = self.completion_index.suggest('section', query, 3)
+            if indexed is not None:
+                # Case numbers naming the statute (PPC, CrPC, ...) the query is part of
+                for pattern in ['PPC', 'CrPC', 'CPC', 'PLD', 'SCMR']:
+                    if query.upper() in pattern:
+                        cases = self.completion_index.suggest('case', pattern, 2) or []
+                        indexed.extend(dict(case, type='section') for case in cases)
+                return indexed[:6]
+            
             suggestions = []
             
             # Try to find section terms in the Term model
@@ -907,6 +1473,10 @@ class SuggestAPIView(APIView):
     def _get_judge_suggestions(self, query: str) -> List[Dict[str, Any]]:
         """Get judge suggestions"""
         try:
+            indexed = self.completion_index.suggest('judge', query, 5)
+            if indexed is not None:
+                return indexed
+            
             judges = Case.objects.filter(
                 bench__icontains=query
             ).values('bench').annotate(
@@ -927,6 +1497,35 @@ class SuggestAPIView(APIView):
         except Exception as e:
             logger.error(f"Error getting judge suggestions: {str(e)}")
             return []
+    
+    def _get_party_suggestions(self, query: str) -> List[Dict[str, Any]]:
+        """Get party name suggestions"""
+        try:
+            indexed = self.completion_index.suggest('party', query, 3)
+            if indexed is not None:
+                return indexed
+            
+            from apps.cases.models import PartiesDetailData
+            
+            parties = PartiesDetailData.objects.filter(
+                party_name__icontains=query
+            ).values('party_name').annotate(
+                count=Count('case', distinct=True)
+            ).order_by('-count')[:3]
+            
+            return [
+                {
+                    'value': party['party_name'],
+                    'type': 'party',
+                    'canonical_key': party['party_name'],
+                    'additional_info': f"Party in {party['count']} cases"
+                }
+                for party in parties
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error getting party suggestions: {str(e)}")
+            return []
 
 
 class CaseContextAPIView(APIView):
@@ -934,7 +1533,7 @@ class CaseContextAPIView(APIView):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.snippet_service = SnippetService()
+        self.snippet_service = get_search_services().snippet_service
     
     def get(self, request, case_id: int):
         """Handle GET case context requests"""
@@ -975,10 +1574,13 @@ class CaseContextAPIView(APIView):
         try:
             from ..models import DocumentChunk
             
-            chunks = DocumentChunk.objects.filter(
+            chunks = list(DocumentChunk.objects.filter(
                 case_id=case_id,
                 is_embedded=True
-            ).order_by('chunk_index')
+            ).order_by('chunk_index'))
+            
+            # Stored index vectors when available, term overlap otherwise
+            vector_scores = self.snippet_service.score_chunks(query, chunks) if query else {}
             
             chunk_data = []
             for chunk in chunks:
@@ -995,7 +1597,9 @@ class CaseContextAPIView(APIView):
                 }
                 
                 # If query provided, compute relevance score
-                if query:
+                if vector_scores:
+                    chunk_info['vector_score'] = vector_scores.get(chunk.chunk_id, 0.0)
+                elif query:
                     chunk_info['vector_score'] = self._compute_chunk_relevance(chunk, query)
                 
                 chunk_data.append(chunk_info)
@@ -1076,7 +1680,9 @@ class SearchStatusAPIView(APIView):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.hybrid_service = HybridIndexingService()
+        services = get_search_services()
+        self.hybrid_service = services.hybrid_service
+        self.result_cache = services.result_cache
     
     def get(self, request):
         """Handle GET status requests"""
@@ -1092,6 +1698,7 @@ class SearchStatusAPIView(APIView):
                 'timestamp': time.time(),
                 'indexes': index_status,
                 'health': health_metrics,
+                'result_cache': self.result_cache.get_stats(),
                 'system_info': {
                     'version': '1.0.0',
                     'environment': 'production'  # Would get from settings
@@ -1148,6 +1755,42 @@ class SearchStatusAPIView(APIView):
             }
 
 
+class SearchMetricsAPIView(APIView):
+    """Search pipeline latency and cache metrics endpoint"""
+    
+    def get(self, request):
+        """Handle GET metrics requests"""
+        try:
+            return Response({
+                'timestamp': time.time(),
+                'stage_latency': get_stage_metrics().summary(),
+                'result_cache': get_search_services().result_cache.get_stats(),
+                'query_plan_cache': get_search_services().query_planner.get_stats(),
+                'learned_reranker': self._learned_reranker_stats(),
+                'case_feature_store': get_case_feature_store().get_stats(),
+                'static_priors': get_static_priors().get_stats(),
+                'rerank_cascade': get_search_services().hybrid_service.cascade.get_stats(),
+                'lexical_features': get_lexical_feature_extractor().get_stats(),
+                'ai_snippet_jobs': get_ai_snippet_jobs().get_stats(),
+                'facet_engine': get_facet_engine().get_stats(),
+                'completion_index': get_completion_index().get_stats(),
+                'fuzzy_index': get_fuzzy_index().get_stats(),
+                'facet_postings': get_facet_postings().get_stats(),
+                'async_executor': get_search_executor().get_stats(),
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error in metrics API: {str(e)}")
+            return Response({
+                'error': 'Internal server error',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def _learned_reranker_stats(self):
+        learned_reranker = get_search_services().hybrid_service.learned_reranker
+        return learned_reranker.get_stats() if learned_reranker else None
+
+
 class CaseDetailsAPIView(APIView):
     """API endpoint to get detailed information about a specific case"""
     
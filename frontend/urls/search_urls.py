@@ -43,5 +43,10 @@ urlpatterns = [
     path('api/search/', search_views.search_api, name='search_api'),
     path('api/suggestions/', search_views.suggestions_api, name='suggestions_api'),
     path('api/filters/', search_views.filters_api, name='filters_api'),
+    
+    # Async (ASGI) API endpoints
+    path('api/async/search/', search_views.search_api_async, name='search_api_async'),
+    path('api/async/suggestions/', search_views.suggestions_api_async, name='suggestions_api_async'),
+    path('api/async/filters/', search_views.filters_api_async, name='filters_api_async'),
     path('case/<int:case_id>/', search_views.case_details, name='case_details'),
 ]
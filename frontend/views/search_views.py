@@ -8,6 +8,7 @@ from django.views.decorators.http import require_http_methods
 from django.contrib import messages
 from django.db import transaction
 import json
+import httpx
 import requests
 from django.conf import settings
 
@@ -217,6 +218,86 @@ def filters_api(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# Async (ASGI) variants of the API proxies. Each request opens its own
+# client: an httpx.AsyncClient is bound to the event loop it first ran on.
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def search_api_async(request):
+    """Frontend API endpoint for search, awaiting the backend"""
+    try:
+        data = json.loads(request.body)
+        
+        # Forward request to backend search API
+        backend_url = f"{request.build_absolute_uri('/').rstrip('/')}/api/search/search/"
+        
+        payload = {
+            'q': data.get('query', ''),
+            'mode': data.get('mode', 'hybrid'),
+            'filters': json.dumps(data.get('filters', {})),
+            'offset': data.get('offset', 0),
+            'limit': data.get('limit', 10),
+            'return_facets': 'true',
+            'highlight': 'true'
+        }
+        
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(backend_url, params=payload)
+        
+        if response.status_code == 200:
+            return JsonResponse(response.json())
+        else:
+            return JsonResponse({'error': 'Search failed'}, status=500)
+            
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def suggestions_api_async(request):
+    """Frontend API endpoint for suggestions, awaiting the backend"""
+    try:
+        # Forward request to backend suggestions API
+        backend_url = f"{request.build_absolute_uri('/').rstrip('/')}/api/search/suggest/"
+        
+        payload = {
+            'q': request.GET.get('q', ''),
+            'type': request.GET.get('type', 'auto')
+        }
+        
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(backend_url, params=payload)
+        
+        if response.status_code == 200:
+            return JsonResponse(response.json())
+        else:
+            return JsonResponse({'error': 'Suggestions failed'}, status=500)
+            
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+async def filters_api_async(request):
+    """Frontend API endpoint for filters, awaiting the backend"""
+    try:
+        # Forward request to backend status API to get filter information
+        backend_url = f"{request.build_absolute_uri('/').rstrip('/')}/api/search/status/"
+        
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(backend_url)
+        
+        if response.status_code == 200:
+            return JsonResponse(response.json())
+        else:
+            return JsonResponse({'error': 'Filters failed'}, status=500)
+            
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @login_required
 def case_details(request, case_id):
     """Display detailed information about a specific case"""